@@ -0,0 +1,109 @@
+"""
+Exports many articles from the same journal in a single run.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+from typing import Dict, Iterable, List
+
+import plugins.editorial_manager_transfer_service.logger_messages as logger_messages
+from journal.models import Journal
+from plugins.editorial_manager_transfer_service.file_exporter import ExportFileCreation
+from plugins.editorial_manager_transfer_service.models import TransferReport
+from plugins.editorial_manager_transfer_service.utils.data_fetch import fetch_articles_for_export, \
+    fetch_answer_fields_for_jats_bulk
+from plugins.editorial_manager_transfer_service.utils.settings import ExportSettings, get_export_settings
+from plugins.editorial_manager_transfer_service.utils.transfer_log_buffer import TransferLogBuffer
+from plugins.editorial_manager_transfer_service.utils.transfer_report import get_or_create_transfer_reports
+from plugins.production_transporter.utilities import data_fetch
+from submission.models import Article
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class BatchExportFileCreation:
+    """
+    Creates the export files for many articles of a journal, resolving the shared state only once.
+    """
+
+    def __init__(self, janeway_journal_code: str, article_ids: Iterable[int], streaming: bool = False,
+                 delivery_bundle: bool = False) -> None:
+        """
+        Constructor.
+        :param janeway_journal_code: The code of the Janeway journal the articles live in.
+        :param article_ids: The IDs of the articles to export.
+        :param streaming: True to write the files straight into the archive, False to stage them in a temp folder.
+        :param delivery_bundle: True to deliver each article as a single archive with its go file inside.
+        """
+        self.janeway_journal_code: str = janeway_journal_code
+        self.article_ids: List[int] = list(dict.fromkeys(article_ids))
+        self.streaming: bool = streaming
+        self.delivery_bundle: bool = delivery_bundle
+        self.exports: Dict[int, ExportFileCreation] = dict()
+        self.missing_article_ids: List[int] = []
+        self.failed_article_ids: List[int] = []
+        self.in_error_state: bool = False
+        self.journal: Journal | None = None
+        self.export_settings: ExportSettings | None = None
+
+        logger.info(logger_messages.batch_export_beginning(janeway_journal_code, len(self.article_ids)))
+
+        # Gets the journal and a fresh snapshot of its settings once for every article.
+        logger.debug(logger_messages.process_fetching_journal(janeway_journal_code))
+        self.journal = data_fetch.fetch_journal_data(janeway_journal_code)
+        if self.journal is None:
+            self.in_error_state = True
+            return
+        logger.debug(logger_messages.process_finished_fetching_journal(janeway_journal_code))
+        self.export_settings = get_export_settings(self.journal, fetch_fresh=True)
+
+        # Fetch every article and the relations used during export in a few queries.
+        articles: List[Article] = fetch_articles_for_export(self.journal, self.article_ids)
+        found_ids = {article.pk for article in articles}
+        self.missing_article_ids = [article_id for article_id in self.article_ids if article_id not in found_ids]
+        if self.missing_article_ids:
+            logger.warning(logger_messages.batch_export_missing_articles(janeway_journal_code,
+                                                                          self.missing_article_ids))
+
+        fetch_answer_fields_for_jats_bulk(articles)
+        transfer_reports: Dict[int, TransferReport] = get_or_create_transfer_reports(self.journal, articles)
+
+        # Every export logs into one buffer, which is written once the whole batch is bundled.
+        # An article which raises is left out, so the rest of the batch is still exported and logged.
+        log_buffer = TransferLogBuffer()
+        try:
+            for article in articles:
+                try:
+                    self.exports[article.pk] = ExportFileCreation(janeway_journal_code, article.pk,
+                                                                  streaming=streaming, journal=self.journal,
+                                                                  article=article,
+                                                                  export_settings=self.export_settings,
+                                                                  transfer_report=transfer_reports[article.pk],
+                                                                  log_buffer=log_buffer,
+                                                                  delivery_bundle=delivery_bundle)
+                except Exception:
+                    logger.exception(logger_messages.batch_export_article_failed(janeway_journal_code, article.pk))
+                    self.failed_article_ids.append(article.pk)
+        finally:
+            log_buffer.flush()
+
+        failed: int = len(self.missing_article_ids) + len(self.failed_article_ids) + sum(
+                1 for export in self.exports.values() if export.in_error_state)
+        logger.info(logger_messages.batch_export_finished(janeway_journal_code, len(self.article_ids) - failed,
+                                                          failed))
+
+    def get_filepaths(self) -> Dict[int, tuple[str | None, str | None]]:
+        """
+        Gets the zip and go file paths for every requested article.
+        :return: The zip and go file paths keyed by article ID. Both are None for articles which failed to export.
+        """
+        filepaths: Dict[int, tuple[str | None, str | None]] = dict()
+        for article_id in self.article_ids:
+            export: ExportFileCreation | None = self.exports.get(article_id)
+            if export is None:
+                filepaths[article_id] = (None, None)
+            else:
+                filepaths[article_id] = (export.get_zip_filepath(), export.get_go_filepath())
+        return filepaths
@@ -21,11 +21,124 @@ PLUGIN_SETTINGS_GROUP_NAME = "plugin:editorial_manager_transfer_service"
 PLUGIN_SETTINGS_LICENSE_CODE = "license_code"
 PLUGIN_SETTINGS_JOURNAL_CODE = "journal_code"
 PLUGIN_SETTINGS_SUBMISSION_PARTNER_CODE = "submission_partner_code"
+PLUGIN_SETTINGS_COMPRESSION_POLICY = "compression_policy"
+PLUGIN_SETTINGS_COMPRESSION_LEVEL = "compression_level"
+PLUGIN_SETTINGS_JATS_BUILDER = "jats_builder"
+PLUGIN_SETTINGS_RETENTION_DAYS = "retention_days"
+# How long a journal's settings snapshot is kept, in seconds. Saving the settings through the plugin replaces it
+# straight away; this only bounds how long changes made elsewhere take to show up.
+EXPORT_SETTINGS_CACHE_TIMEOUT = 15 * 60
+
+# JATS builders
+JATS_BUILDER_TEMPLATE = "template"
+JATS_BUILDER_PRECOMPILED = "precompiled"
+JATS_BUILDER_ETREE = "etree"
+JATS_BUILDERS = (JATS_BUILDER_TEMPLATE, JATS_BUILDER_PRECOMPILED, JATS_BUILDER_ETREE)
+# How long rendered JATS metadata is kept for reuse, in seconds.
+JATS_CACHE_TIMEOUT = 7 * 24 * 60 * 60
+# How long the answer fields of an article are cached, in seconds. Saving or deleting an answer drops them earlier.
+ANSWER_FIELDS_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Author and affiliation identifiers
+IDENTIFIER_CACHE_SIZE = 10000
+IDENTIFIER_CACHE_TTL = 60 * 60
+# Misses are kept for less time, so identifiers filled in the background are picked up soon after.
+IDENTIFIER_MISS_CACHE_TTL = 5 * 60
+# How long identifiers are kept in the cache shared between workers, in seconds.
+IDENTIFIER_SHARED_CACHE_TIMEOUT = 24 * 60 * 60
+IDENTIFIER_WARM_BATCH_SIZE = 1000
+INSTITUTION_INDEX_PATH = os.path.join(settings.BASE_DIR, 'files', 'plugins', 'editorial-manager-transfer-service',
+                                      'institutions.idx')
+# The lowest trigram similarity, between 0 and 1, at which an institution name matches one in the index.
+INSTITUTION_INDEX_FUZZY_THRESHOLD = 0.8
+# The most names compared while fuzzily matching one institution.
+INSTITUTION_INDEX_MAX_CANDIDATES = 2000
+
+# Archive compression
+COMPRESSION_POLICY_AUTO = "auto"
+COMPRESSION_POLICY_DEFLATE = "deflate"
+COMPRESSION_POLICY_STORE = "store"
+COMPRESSION_POLICIES = (COMPRESSION_POLICY_AUTO, COMPRESSION_POLICY_DEFLATE, COMPRESSION_POLICY_STORE)
+COMPRESSION_LEVEL_MIN = 1
+COMPRESSION_LEVEL_MAX = 9
+COMPRESSION_LEVEL_DEFAULT = 6
+COMPRESSION_PROBE_SIZE = 64 * 1024
+COMPRESSION_PROBE_MIN_RATIO = 0.95
+COMPRESSION_PRECOMPRESSED_EXTENSIONS = frozenset({
+    ".jpg", ".jpeg", ".png", ".gif", ".webp",
+    ".pdf", ".docx", ".xlsx", ".pptx", ".odt", ".ods", ".odp", ".epub",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar",
+    ".mp4", ".m4v", ".mov", ".avi", ".mkv", ".webm", ".wmv", ".mpg", ".mpeg",
+    ".mp3", ".m4a", ".aac", ".ogg", ".flac",
+})
+COMPRESSION_COMPRESSIBLE_EXTENSIONS = frozenset({
+    ".txt", ".xml", ".html", ".htm", ".csv", ".tsv", ".json", ".tex", ".rtf", ".doc", ".svg", ".eps", ".ps",
+})
+
+# Parallel exports
+PARALLEL_EXPORT_MAX_WORKERS = os.cpu_count() or 1
+PARALLEL_EXPORT_PER_JOURNAL_CAP = 2
 
 # Import and export filepaths
 EXPORT_FILE_PATH = os.path.join(settings.BASE_DIR, 'files', 'plugins', 'editorial-manager-transfer-service', 'export')
 IMPORT_FILE_PATH = os.path.join(settings.BASE_DIR, 'files', 'plugins', 'editorial-manager-transfer-service', 'import')
 
+# People ID feeds
+# People ID feeds exported from Editorial Manager are dropped here as CSV files.
+PEOPLE_ID_FEED_PATH = os.path.join(IMPORT_FILE_PATH, 'people_ids')
+PEOPLE_ID_FEED_PROCESSED_FOLDER = "processed"
+PEOPLE_ID_FEED_FAILED_FOLDER = "failed"
+# The headers, lowercased and without spaces or punctuation, of the columns holding the email address and People ID.
+PEOPLE_ID_FEED_EMAIL_HEADERS = frozenset({"email", "emailaddress", "primaryemailaddress"})
+PEOPLE_ID_FEED_PEOPLE_ID_HEADERS = frozenset({"peopleid", "empeopleid", "peopleidnumber"})
+# How many days back the authors of submitted articles are warmed.
+PEOPLE_ID_WARM_DAYS = 30
+
+# The number of rows on each page of the transfer report and log listings.
+TRANSFER_LISTING_PAGE_SIZE = 50
+
+# Retention of transfer reports and logs
+RETENTION_DAYS_DEFAULT = 180
+RETENTION_BATCH_SIZE = 500
+RETENTION_BATCH_PAUSE = 0.5
+RETENTION_ARCHIVE_PATH = os.path.join(settings.BASE_DIR, 'files', 'plugins', 'editorial-manager-transfer-service',
+                                      'archive')
+
+# Export stages, in the order they run, timed on each transfer report.
+EXPORT_STAGE_FETCH_JOURNAL = "fetch_journal"
+EXPORT_STAGE_FETCH_ARTICLE = "fetch_article"
+EXPORT_STAGE_FETCH_REPORT = "fetch_report"
+EXPORT_STAGE_MANIFEST = "manifest"
+EXPORT_STAGE_JATS = "jats"
+EXPORT_STAGE_COPY = "copy"
+EXPORT_STAGE_ARCHIVE = "archive"
+EXPORT_STAGE_GO_FILE = "go_file"
+EXPORT_STAGES = (EXPORT_STAGE_FETCH_JOURNAL, EXPORT_STAGE_FETCH_ARTICLE, EXPORT_STAGE_FETCH_REPORT,
+                 EXPORT_STAGE_MANIFEST, EXPORT_STAGE_JATS, EXPORT_STAGE_COPY, EXPORT_STAGE_ARCHIVE,
+                 EXPORT_STAGE_GO_FILE)
+# The reports summarised by the stage timing metrics, by how recently they started, in seconds.
+STAGE_METRICS_WINDOW = 24 * 60 * 60
+STAGE_METRICS_QUANTILES = (0.5, 0.95, 0.99)
+
+# Delivery events queued by the asynchronous callbacks.
+DELIVERY_EVENT_QUEUE_SIZE = 10000
+DELIVERY_EVENT_BATCH_SIZE = 200
+# How long a batch waits for more events once its first event arrives, in seconds.
+DELIVERY_EVENT_LINGER = 0.05
+
+# Reaping of export files left behind in the export folder.
+# Files and folders are only reaped once they are this old, in seconds.
+REAPER_MAX_AGE = 7 * 24 * 60 * 60
+REAPER_BATCH_SIZE = 500
+
+# Reusable export archives, kept in a folder within the export folder.
+BUNDLE_STORE_FOLDER = "bundles"
+BUNDLE_STORE_MAX_BYTES = 5 * 1024 * 1024 * 1024
+
+# Delivery bundles: single archives with the go file inside, moved into a folder within the export folder once ready.
+DELIVERY_SPOOL_FOLDER = "ready"
+DELIVERY_BUNDLE_PART_SUFFIX = ".zip.part"
+
 # XML File
 GO_FILE_ELEMENT_TAG_GO = "GO"
 GO_FILE_GO_ELEMENT_ATTRIBUTE_XMLNS_XSI_KEY = "xmlns:xsi"
@@ -52,3 +165,4 @@ GO_FILE_ELEMENT_TAG_FILE = "file"
 GO_FILE_ELEMENT_TAG_METADATA_FILE = "metadata-file"
 
 JATS_XML_FILE = 'editorial_manager_transfer_service/encoding/article_jats_1_2_aries.xml'
+JATS_XML_PRECOMPILED_FILE = 'editorial_manager_transfer_service/encoding/article_jats_1_2_aries_precompiled.xml'
@@ -0,0 +1,15 @@
+"""
+A file for tracking the delivery events reported back for an export job.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import django.db.models as models
+from django.utils.translation import gettext_lazy as _
+
+class DeliveryEventType(models.TextChoices):
+    ZIP_FILE_DELIVERED = "ZD", _("Zip File Delivered")
+    GO_FILE_DELIVERED = "GD", _("Go File Delivered")
+    BUNDLE_DELIVERED = "BD", _("Bundle Delivered")
+    FAILED = "FA", _("Delivery Failed")
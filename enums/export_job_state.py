@@ -0,0 +1,15 @@
+"""
+A file for tracking where an export job is in its journey to Editorial Manager.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import django.db.models as models
+from django.utils.translation import gettext_lazy as _
+
+class ExportJobState(models.TextChoices):
+    BUNDLED = "BU", _("Bundled")
+    ZIP_FILE_DELIVERED = "ZD", _("Zip File Delivered")
+    DELIVERED = "DE", _("Delivered")
+    FAILED = "FA", _("Failed")
@@ -0,0 +1,15 @@
+"""
+A file for tracking the role each file plays within an article export.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import django.db.models as models
+from django.utils.translation import gettext_lazy as _
+
+class FileRole(models.TextChoices):
+    MANUSCRIPT = "MS", _("Manuscript")
+    FIGURE = "FG", _("Data Figure")
+    SOURCE = "SR", _("Source File")
+    SUPPLEMENTARY = "SP", _("Supplementary File")
@@ -6,25 +6,34 @@ __license__ = "AGPL v3"
 __maintainer__ = "The Public Library of Science (PLOS)"
 
 import os
+import shutil
 import uuid
-import xml.etree.cElementTree as ETree
 from collections.abc import Sequence
 from typing import List
 
-from janeway_ftp import helpers as deposit_helpers
-
 import plugins.editorial_manager_transfer_service.consts as consts
 import plugins.editorial_manager_transfer_service.logger_messages as logger_messages
-from core.models import File
 from journal.models import Journal
 from plugins.editorial_manager_transfer_service.enums.report_state import ReportState
-from plugins.editorial_manager_transfer_service.enums.transfer_log_message_type import TransferLogMessageType
-from plugins.editorial_manager_transfer_service.models import TransferLogs
-from plugins.editorial_manager_transfer_service.utils.jats import get_xml_license_code, generate_jats_metadata
-from plugins.editorial_manager_transfer_service.utils.settings import get_license_code, get_submission_partner_code, \
-    get_journal_code
-from plugins.editorial_manager_transfer_service.utils.transfer_report import get_or_create_transfer_report, \
-    resolve_transfer_report
+from plugins.editorial_manager_transfer_service.models import TransferReport
+from plugins.editorial_manager_transfer_service.utils.archive import ExportArchiveWriter
+from plugins.editorial_manager_transfer_service.utils.bundle_store import ExportBundleStore, get_bundle_key
+from plugins.editorial_manager_transfer_service.utils.compression import CompressionPolicy
+from plugins.editorial_manager_transfer_service.utils.go_file import GoFileWriter, write_go_file
+from plugins.editorial_manager_transfer_service.utils.interfaces.ArticleFileManifest import ArticleFileManifest
+from plugins.editorial_manager_transfer_service.utils.interfaces.ExportBundle import ExportBundle
+from plugins.editorial_manager_transfer_service.utils.interfaces.ExportResult import ExportResult
+from plugins.editorial_manager_transfer_service.utils.interfaces.JatsSources import JatsSources
+from plugins.editorial_manager_transfer_service.utils.jats import generate_jats_metadata, render_jats_metadata, \
+    get_jats_filename, build_jats_context, fetch_jats_sources
+from plugins.editorial_manager_transfer_service.utils.jats_cache import fingerprint_jats_context, \
+    get_cached_jats_metadata, cache_jats_metadata, CapturingStream
+from plugins.editorial_manager_transfer_service.utils.jats_tree import write_jats_tree
+from plugins.editorial_manager_transfer_service.utils.manifest import fetch_article_file_manifest
+from plugins.editorial_manager_transfer_service.utils.stage_timer import StageTimer
+from plugins.editorial_manager_transfer_service.utils.settings import ExportSettings, get_export_settings
+from plugins.editorial_manager_transfer_service.utils.transfer_log_buffer import TransferLogBuffer
+from plugins.editorial_manager_transfer_service.utils.transfer_report import get_or_create_transfer_report
 from plugins.production_transporter.utilities import data_fetch
 from plugins.production_transporter.utilities.file_utils import copy_files_to_temp_deposit_folder
 from submission.models import Article
@@ -50,30 +59,67 @@ class ExportFileCreation:
     A class for managing the export file creation process.
     """
 
-    def __init__(self, janeway_journal_code: str, article_id: int | None) -> None:
+    def __init__(self, janeway_journal_code: str, article_id: int | None, streaming: bool = False,
+                 journal: Journal | None = None, article: Article | None = None,
+                 export_settings: ExportSettings | None = None, transfer_report: TransferReport | None = None,
+                 log_buffer: TransferLogBuffer | None = None, delivery_bundle: bool = False) -> None:
+        """
+        Constructor.
+        :param janeway_journal_code: The code of the Janeway journal the article lives in.
+        :param article_id: The ID of the article to export.
+        :param streaming: True to write the files straight into the archive, False to stage them in a temp folder.
+        :param journal: The journal, if it was already fetched.
+        :param article: The article, if it was already fetched.
+        :param export_settings: The journal's plugin settings, if they were already fetched.
+        :param transfer_report: The report tracking this export, if it was already fetched.
+        :param log_buffer: A buffer shared with other exports, which the caller flushes once they are all created.
+        :param delivery_bundle: True to embed the go file in the archive and move the finished archive into the
+        delivery spool folder, so it is delivered as a single file. Delivery bundles are always streamed.
+        """
+        self.streaming: bool = streaming or delivery_bundle
+        self.delivery_bundle: bool = delivery_bundle
+        self.bytes_written: int = 0
+        self.prefix: str | None = None
         self.zip_filepath: str | None = None
         self.go_filepath: str | None = None
         self.in_error_state: bool = False
-        self.__license_code: str | None = None
-        self.__journal_code: str | None = None
-        self.__submission_partner_code: str | None = None
+        self.__export_settings: ExportSettings | None = export_settings
+        self.__compression_policy: CompressionPolicy | None = None
         self.article_id: int | None = article_id
         self.article: Article | None = None
         self.journal: Journal | None = None
         self.export_folder: str | None = None
         self.xml_filepath: str | None = None
+        self.manifest: ArticleFileManifest | None = None
         self.__temp_folder: str | None = None
+        self.__jats_sources: JatsSources | None = None
+        self.__jats_context: dict | None = None
+        self.__jats_fingerprint: str | None = None
+        self.__bundle_store: ExportBundleStore | None = None
+        self.__bundle_key: str | None = None
+        self.transfer_report: TransferReport | None = None
+        self.log_buffer: TransferLogBuffer = log_buffer if log_buffer else TransferLogBuffer()
+        self.stage_timer: StageTimer = StageTimer()
 
         # Gets the journal
-        self.journal: Journal | None = self.__fetch_journal(janeway_journal_code)
+        with self.stage_timer.stage(consts.EXPORT_STAGE_FETCH_JOURNAL):
+            self.journal: Journal | None = journal if journal else self.__fetch_journal(janeway_journal_code)
         if self.in_error_state:
             return
 
         # Get the article based upon the given article ID.
-        self.article: Article | None = self.__fetch_article(self.journal, article_id)
+        with self.stage_timer.stage(consts.EXPORT_STAGE_FETCH_ARTICLE):
+            self.article: Article | None = article if article else self.__fetch_article(self.journal, article_id)
         if self.in_error_state:
             return
 
+        # Creates or fetches a report to track where this process is.
+        with self.stage_timer.stage(consts.EXPORT_STAGE_FETCH_REPORT):
+            if transfer_report:
+                self.transfer_report = transfer_report
+            else:
+                self.transfer_report = get_or_create_transfer_report(self.journal, self.article)
+
         # Get the export folder.
         export_folders: str = get_article_export_folders()
         if len(export_folders) <= 0:
@@ -82,11 +128,22 @@ class ExportFileCreation:
             return
         self.export_folder = export_folders
 
-        # Creates or fetches a report to track where this process is.
-        self.transfer_report = get_or_create_transfer_report(self.journal, self.article)
-
         # Start export process
         self.__create_export_file()
+        self.log_stage_timings()
+
+        # The bundling stage is over. A shared buffer is flushed by its owner once every export is created.
+        if not log_buffer:
+            self.log_buffer.flush()
+
+    def get_export_result(self) -> ExportResult:
+        """
+        Gets what this export produced, without the journal, article and other state it was built from.
+        :return: The export result.
+        """
+        return ExportResult(getattr(self.journal, "pk", None), self.article_id,
+                            getattr(self.transfer_report, "pk", None), self.prefix, self.zip_filepath,
+                            self.go_filepath, self.delivery_bundle, self.in_error_state)
 
     def get_zip_filepath(self) -> str | None:
         """
@@ -102,9 +159,9 @@ class ExportFileCreation:
     def get_go_filepath(self) -> str | None:
         """
         Gets the filepath for the go.xml file for exporting to Editorial Manager.
-        :return: The filepath for the go.xml file or None, if the process failed.
+        :return: The filepath for the go.xml file or None, if the process failed or the go file is in the archive.
         """
-        if self.go_filepath is None:
+        if self.go_filepath is None and not self.delivery_bundle:
             self.in_error_state = True
             return None
         else:
@@ -120,63 +177,269 @@ class ExportFileCreation:
             return
 
         prefix: str = "{0}_{1}".format(self.get_submission_partner_code(), uuid.uuid4())
+        self.prefix = prefix
+
+        if self.delivery_bundle:
+            self.zip_filepath: str = os.path.join(self.export_folder, consts.DELIVERY_SPOOL_FOLDER,
+                                                  "{0}.zip".format(prefix))
+        else:
+            self.zip_filepath: str = os.path.join(self.export_folder, "{0}.zip".format(prefix))
+
+        # Attempt to fetch the article files.
+        with self.stage_timer.stage(consts.EXPORT_STAGE_MANIFEST):
+            self.manifest = fetch_article_file_manifest(self.article)
+        if len(self.manifest) <= 0:
+            self.log_error(logger_messages.process_failed_fetching_article_files(self.article_id))
+            self.in_error_state = True
+            return
+
+        # Build the metadata context once. It fingerprints the metadata and feeds whichever builder renders it.
+        with self.stage_timer.stage(consts.EXPORT_STAGE_JATS):
+            self.__jats_sources = fetch_jats_sources(self.article)
+            self.__jats_context = build_jats_context(self.journal, self.article, self.manifest, self.__jats_sources)
+            self.__jats_fingerprint = fingerprint_jats_context(self.__jats_context, self.get_jats_builder())
+
+        # An unchanged article reuses the archive built for it before, however it was built. A delivery bundle is
+        # never reused, as the go file written into it is different for every export.
+        self.__bundle_store = ExportBundleStore(os.path.join(self.export_folder, consts.BUNDLE_STORE_FOLDER))
+        if not self.delivery_bundle:
+            self.__bundle_key = get_bundle_key(self.manifest, self.__jats_fingerprint, self.get_compression_policy())
+        if self.__bundle_key and self.__reuse_bundle(prefix):
+            return
+
+        try:
+            if self.streaming:
+                self.__create_streamed_export_file(prefix)
+            else:
+                self.__create_staged_export_file(prefix)
+        except Exception:
+            # Whoever created this export handles the error. The files of the failed export go now.
+            self.in_error_state = True
+            self.__delete_temp_folder()
+            raise
+
+    def __reuse_bundle(self, prefix: str) -> bool:
+        """
+        Links the archive stored for the export's bundle key into place and writes a new go file for it.
+        :param prefix: The prefix shared by the zip and go files.
+        :return: True if a stored archive was reused, False if the archive must be built.
+        """
+        with self.stage_timer.stage(consts.EXPORT_STAGE_ARCHIVE):
+            bundle: ExportBundle | None = self.__bundle_store.checkout(self.__bundle_key, self.zip_filepath)
+        if not bundle:
+            return False
+
+        self.log_bundle_reused(self.__bundle_key)
+        self.__count_bytes(consts.EXPORT_STAGE_ARCHIVE, os.path.getsize(self.zip_filepath))
+        self.__create_go_xml_file(bundle.metadata_filename, bundle.filenames, prefix)
+        return True
+
+    def __store_bundle(self, metadata_filename: str, filenames: List[str]) -> None:
+        """
+        Keeps the finished archive in the bundle store, so the next export of the unchanged article reuses it.
+        :param metadata_filename: The name of the metadata entry within the archive.
+        :param filenames: The names of the other entries within the archive.
+        """
+        if self.__bundle_key:
+            self.__bundle_store.put(self.__bundle_key, ExportBundle(self.zip_filepath, metadata_filename, filenames))
 
-        self.zip_filepath: str = os.path.join(self.export_folder, "{0}.zip".format(prefix))
+    def __create_staged_export_file(self, prefix: str):
+        """
+        Creates the export file by copying every file into a temp folder and zipping the folder afterward.
+        :param prefix: The prefix shared by the zip and go files.
+        """
         self.__temp_folder = os.path.join(self.export_folder, "{0}".format(prefix))
         os.makedirs(self.__temp_folder, exist_ok=True)
 
         # Attempt to get the metadata file.
-        if self.__get_xml_filepath() is None:
+        with self.stage_timer.stage(consts.EXPORT_STAGE_JATS):
+            xml_filepath: str | None = self.__get_xml_filepath()
+        if xml_filepath is None:
             logger.error(logger_messages.process_failed_fetching_metadata(self.article_id))
             self.in_error_state = True
+            self.__delete_temp_folder()
             return
+        self.__count_bytes(consts.EXPORT_STAGE_JATS, os.path.getsize(self.xml_filepath))
 
-        # Attempt to fetch the article files.
-        article_files: Sequence[File] = self.__fetch_article_files(self.article)
-        if len(article_files) <= 0:
-            self.log_error(logger_messages.process_failed_fetching_article_files(self.article_id))
+        filenames: List[str] = []
+
+        # Move files to temp folder.
+        with self.stage_timer.stage(consts.EXPORT_STAGE_COPY):
+            for manifest_file in self.manifest:
+                try:
+                    copy_files_to_temp_deposit_folder(manifest_file.filepath, self.__temp_folder)
+                    self.__count_bytes(consts.EXPORT_STAGE_COPY, os.path.getsize(manifest_file.filepath))
+                except OSError as e:
+                    self.log_error(logger_messages.process_failed_copying_file(self.article_id,
+                                                                               manifest_file.filepath), e)
+                    self.in_error_state = True
+                    self.__delete_temp_folder()
+                    return
+                filenames.append(manifest_file.filename)
+
+        # Archive the temp folder with the journal's compression policy, the same way a streamed export is archived,
+        # listing each entry in the go file as it is added.
+        try:
+            with self.stage_timer.stage(consts.EXPORT_STAGE_ARCHIVE), \
+                    ExportArchiveWriter(self.zip_filepath, self.get_compression_policy()) as archive, \
+                    self.__open_go_file(prefix) as go_file:
+                metadata_filename: str = archive.add_file(xml_filepath)
+                with self.stage_timer.stage(consts.EXPORT_STAGE_GO_FILE):
+                    go_file.add_metadata_file(metadata_filename)
+                for filename in filenames:
+                    if archive.add_file(os.path.join(self.__temp_folder, filename), filename):
+                        with self.stage_timer.stage(consts.EXPORT_STAGE_GO_FILE):
+                            go_file.add_file(filename)
+        except OSError as e:
+            self.log_error(logger_messages.process_failed_writing_archive(self.article_id), e)
+            self.in_error_state = True
+            self.__delete_temp_folder()
+            if os.path.exists(self.zip_filepath):
+                os.remove(self.zip_filepath)
+            return
+        self.__count_bytes(consts.EXPORT_STAGE_ARCHIVE, archive.get_bytes_written())
+        self.log_archive_statistics(archive)
+
+        # Everything in the temp folder is in the zip file now.
+        self.__delete_temp_folder()
+        self.__store_bundle(metadata_filename, go_file.filenames)
+        self.__finish_go_file(go_file)
+
+    def __create_streamed_export_file(self, prefix: str):
+        """
+        Creates the export file by writing every file and the rendered metadata straight into the archive.
+        :param prefix: The prefix shared by the zip and go files.
+        """
+        jats_builder: str = self.get_jats_builder()
+        jats_context: dict = self.__jats_context
+        fingerprint: str = self.__jats_fingerprint
+
+        # Attempt to render the metadata. The element tree builder is written into the archive as it is built.
+        rendered_jats: str | None = None
+        with self.stage_timer.stage(consts.EXPORT_STAGE_JATS):
+            if jats_builder == consts.JATS_BUILDER_ETREE:
+                rendered_jats = get_cached_jats_metadata(self.article_id, fingerprint)
+            else:
+                rendered_jats = render_jats_metadata(self.journal, self.article, self.manifest, jats_builder,
+                                                     jats_context, self.__jats_sources)
+        if jats_builder != consts.JATS_BUILDER_ETREE and rendered_jats is None:
+            logger.error(logger_messages.process_failed_fetching_metadata(self.article_id))
             self.in_error_state = True
             return
 
         filenames: List[str] = []
+        # A delivery bundle is written into the export folder and only moved into the spool folder once complete.
+        archive_filepath: str = self.__get_part_filepath(prefix) if self.delivery_bundle else self.zip_filepath
+
+        archive_complete: bool = False
+        try:
+            with self.stage_timer.stage(consts.EXPORT_STAGE_ARCHIVE), \
+                    ExportArchiveWriter(archive_filepath, self.get_compression_policy()) as archive, \
+                    self.__open_go_file(prefix) as go_file:
+                if rendered_jats is None:
+                    written_jats: List[bytes] = []
+
+                    def write_metadata(stream):
+                        capturing_stream = CapturingStream(stream)
+                        try:
+                            with self.stage_timer.stage(consts.EXPORT_STAGE_JATS):
+                                write_jats_tree(jats_context, capturing_stream)
+                        except Exception as error:
+                            self.log_error(logger_messages.process_failed_fetching_metadata(self.article_id), error)
+                            self.in_error_state = True
+                            raise
+                        written_jats.append(capturing_stream.getvalue())
+
+                    metadata_filename: str = archive.add_stream(get_jats_filename(self.article), write_metadata)
+                    cache_jats_metadata(self.article_id, fingerprint, written_jats[0].decode("utf-8"))
+                    self.stage_timer.add_bytes(consts.EXPORT_STAGE_JATS, len(written_jats[0]))
+                else:
+                    encoded_jats: bytes = rendered_jats.encode("utf-8")
+                    metadata_filename: str = archive.add_bytes(get_jats_filename(self.article), encoded_jats)
+                    self.stage_timer.add_bytes(consts.EXPORT_STAGE_JATS, len(encoded_jats))
+                with self.stage_timer.stage(consts.EXPORT_STAGE_GO_FILE):
+                    go_file.add_metadata_file(metadata_filename)
+
+                for manifest_file in self.manifest:
+                    filename: str | None = archive.add_file(manifest_file.filepath, manifest_file.filename)
+                    if filename:
+                        filenames.append(filename)
+                        with self.stage_timer.stage(consts.EXPORT_STAGE_GO_FILE):
+                            go_file.add_file(filename)
+
+                if self.delivery_bundle:
+                    with self.stage_timer.stage(consts.EXPORT_STAGE_GO_FILE):
+                        go_file.close()
+                    archive.add_bytes("{0}.go.xml".format(prefix), go_file.getvalue())
+            archive_complete = True
+        except Exception as e:
+            # A metadata failure is logged where it happens.
+            if not self.in_error_state:
+                self.log_error(logger_messages.process_failed_writing_archive(self.article_id), e)
+            self.in_error_state = True
+            return
+        finally:
+            # Never leave a partial archive behind, whatever stopped it being written.
+            if not archive_complete and os.path.exists(archive_filepath):
+                os.remove(archive_filepath)
 
-        # Move files to temp folder.
-        for article_file in article_files:
-            filepath: str = article_file.get_file_path(self.article)
-            copy_files_to_temp_deposit_folder(filepath, self.__temp_folder)
-            filenames.append(os.path.basename(filepath))
+        self.__count_bytes(consts.EXPORT_STAGE_ARCHIVE, archive.get_bytes_written())
+        self.log_archive_statistics(archive)
 
-        deposit_helpers.zip_temp_folder(temp_folder=self.__temp_folder)
+        if self.delivery_bundle and not self.__spool_delivery_bundle(archive_filepath):
+            return
+
+        self.__store_bundle(metadata_filename, filenames)
+
+        self.__finish_go_file(go_file)
 
-        # Remove the manuscript
-        self.__create_go_xml_file(os.path.basename(self.__get_xml_filepath()), filenames, prefix)
+    def get_export_settings(self) -> ExportSettings:
+        """
+        Gets the settings snapshot of the journal, which every stage of this export reads from.
+        :return: The settings snapshot.
+        """
+        if self.__export_settings is None:
+            self.__export_settings = get_export_settings(self.journal)
+        return self.__export_settings
 
     def get_license_code(self) -> str:
         """
         Gets the license code for exporting files.
         :return: The license code or None, if the process failed.
         """
-        if not self.__license_code:
-            self.__license_code: str = get_license_code(self.journal)
-        return self.__license_code
+        return self.get_export_settings().license_code
 
     def get_journal_code(self) -> str:
         """
         Gets the journal code for exporting files.
         :return: The journal code or None, if the process failed.
         """
-        if not self.__journal_code:
-            self.__journal_code: str = get_journal_code(self.journal)
-        return self.__journal_code
+        return self.get_export_settings().journal_code
 
     def get_submission_partner_code(self) -> str:
         """
         Gets the submission partner code for exporting files.
         :return: The submission partner code or None, if the process failed.
         """
-        if not self.__submission_partner_code:
-            self.__submission_partner_code: str = get_submission_partner_code(self.journal)
-        return self.__submission_partner_code
+        return self.get_export_settings().submission_partner_code
+
+    def get_compression_policy(self) -> CompressionPolicy:
+        """
+        Gets the compression policy for the export archive.
+        :return: The compression policy configured for the journal.
+        """
+        if not self.__compression_policy:
+            export_settings: ExportSettings = self.get_export_settings()
+            self.__compression_policy = CompressionPolicy(export_settings.compression_policy,
+                                                          export_settings.compression_level)
+        return self.__compression_policy
+
+    def get_jats_builder(self) -> str:
+        """
+        Gets how the JATS metadata is built for this export.
+        :return: One of the JATS_BUILDER_* values from consts.
+        """
+        return self.get_export_settings().jats_builder
 
     def can_export(self) -> bool:
         """
@@ -197,46 +460,84 @@ class ExportFileCreation:
         :param article_filenames: The filenames of the article's associated files.
         :param filename: The name to use for the go.xml file (Must match the name of the zip file).
         """
-        if not self.can_export():
-            self.in_error_state = True
+        if self.in_error_state:
             return
 
-        go: ETree.Element = ETree.Element(consts.GO_FILE_ELEMENT_TAG_GO)
-        go.set(consts.GO_FILE_GO_ELEMENT_ATTRIBUTE_XMLNS_XSI_KEY, consts.GO_FILE_GO_ELEMENT_ATTRIBUTE_XMLNS_XSI_VALUE)
-        go.set(consts.GO_FILE_GO_ELEMENT_ATTRIBUTE_SCHEMA_LOCATION_KEY,
-               consts.GO_FILE_GO_ELEMENT_ATTRIBUTE_SCHEMA_LOCATION_VALUE)
-
-        # Format the header.
-        header: ETree.Element = ETree.SubElement(go, consts.GO_FILE_ELEMENT_TAG_HEADER)
-        version: ETree.Element = ETree.SubElement(header, consts.GO_FILE_ELEMENT_TAG_VERSION)
-        version.set(consts.GO_FILE_VERSION_ELEMENT_ATTRIBUTE_NUMBER_KEY,
-                    consts.GO_FILE_VERSION_ELEMENT_ATTRIBUTE_NUMBER_VALUE)
-        journal: ETree.Element = ETree.SubElement(header, consts.GO_FILE_ELEMENT_TAG_JOURNAL)
-        journal.set(consts.GO_FILE_JOURNAL_ELEMENT_ATTRIBUTE_CODE_KEY, self.get_journal_code())
-        import_type: ETree.Element = ETree.SubElement(header, consts.GO_FILE_ELEMENT_TAG_IMPORT_TYPE)
-        import_type.set(consts.GO_FILE_IMPORT_TYPE_ELEMENT_ATTRIBUTE_ID_KEY,
-                        consts.GO_FILE_IMPORT_TYPE_ELEMENT_ATTRIBUTE_ID_VALUE)
-        parameters: ETree.Element = ETree.SubElement(header, consts.GO_FILE_ELEMENT_TAG_PARAMETERS)
-        parameter: ETree.Element = ETree.SubElement(parameters, consts.GO_FILE_ELEMENT_TAG_PARAMETER)
-        parameter.set(consts.GO_FILE_ATTRIBUTE_ELEMENT_NAME_KEY, consts.GO_FILE_PARAMETER_ELEMENT_NAME_VALUE)
-        parameter.set(consts.GO_FILE_PARAMETER_ELEMENT_VALUE_KEY, get_xml_license_code(self.journal))
-
-        # Begin the filegroup.
-        filegroup: ETree.Element = ETree.SubElement(go, consts.GO_FILE_ELEMENT_TAG_FILEGROUP)
-
-        # Create the archive and metadata files.
-        archive_file: ETree.Element = ETree.SubElement(filegroup, consts.GO_FILE_ELEMENT_TAG_ARCHIVE_FILE)
-        archive_file.set(consts.GO_FILE_ATTRIBUTE_ELEMENT_NAME_KEY, "{0}.zip".format(filename))
-        metadata_file: ETree.Element = ETree.SubElement(filegroup, consts.GO_FILE_ELEMENT_TAG_METADATA_FILE)
-        metadata_file.set(consts.GO_FILE_ATTRIBUTE_ELEMENT_NAME_KEY, metadata_filename)
-
-        for article_filename in article_filenames:
-            file_tree = ETree.SubElement(filegroup, consts.GO_FILE_ELEMENT_TAG_FILE)
-            file_tree.set(consts.GO_FILE_ATTRIBUTE_ELEMENT_NAME_KEY, article_filename)
-
-        tree = ETree.ElementTree(go)
-        self.go_filepath = os.path.join(self.export_folder, "{0}.go.xml".format(filename))
-        tree.write(self.go_filepath)
+        with self.stage_timer.stage(consts.EXPORT_STAGE_GO_FILE):
+            go_file: GoFileWriter = write_go_file(self.__get_go_filepath(filename), self.get_journal_code(),
+                                                  self.get_export_settings().xml_license_code,
+                                                  "{0}.zip".format(filename), metadata_filename, article_filenames)
+        self.__finish_go_file(go_file)
+
+    def __open_go_file(self, filename: str) -> GoFileWriter:
+        """
+        Opens a go xml file which lists the entries of the archive as they are added. The go file of a delivery
+        bundle is kept in memory until it is written into the archive.
+        :param filename: The name to use for the go.xml file (Must match the name of the zip file).
+        :return: The open go file.
+        """
+        go_filepath: str | None = None if self.delivery_bundle else self.__get_go_filepath(filename)
+        with self.stage_timer.stage(consts.EXPORT_STAGE_GO_FILE):
+            return GoFileWriter(go_filepath, self.get_journal_code(), self.get_export_settings().xml_license_code,
+                                "{0}.zip".format(filename))
+
+    def __finish_go_file(self, go_file: GoFileWriter) -> None:
+        """
+        Records a go xml file once it is written.
+        :param go_file: The closed go file.
+        """
+        self.go_filepath = go_file.go_filepath
+        self.stage_timer.add_bytes(consts.EXPORT_STAGE_GO_FILE, go_file.bytes_written)
+
+    def __get_part_filepath(self, filename: str) -> str:
+        """
+        Gets where a delivery bundle is written before it is moved into the delivery spool folder.
+        :param filename: The name to use for the bundle (Must match the name of the zip file).
+        :return: The filepath of the unfinished bundle.
+        """
+        return os.path.join(self.export_folder, "{0}{1}".format(filename, consts.DELIVERY_BUNDLE_PART_SUFFIX))
+
+    def __spool_delivery_bundle(self, part_filepath: str) -> bool:
+        """
+        Moves a finished delivery bundle into the delivery spool folder in a single rename, so whatever sends the
+        bundles never sees one half written.
+        :param part_filepath: Where the bundle was written.
+        :return: True if the bundle is ready to send, False otherwise.
+        """
+        try:
+            os.makedirs(os.path.dirname(self.zip_filepath), exist_ok=True)
+            os.replace(part_filepath, self.zip_filepath)
+        except OSError as e:
+            self.log_error(logger_messages.process_failed_writing_archive(self.article_id), e)
+            self.in_error_state = True
+            if os.path.exists(part_filepath):
+                os.remove(part_filepath)
+            return False
+        return True
+
+    def __get_go_filepath(self, filename: str) -> str:
+        """
+        Gets where the go xml file of the export is written.
+        :param filename: The name to use for the go.xml file (Must match the name of the zip file).
+        :return: The filepath of the go xml file.
+        """
+        return os.path.join(self.export_folder, "{0}.go.xml".format(filename))
+
+    def __delete_temp_folder(self) -> None:
+        """
+        Deletes the temp folder the files of a staged export were copied into.
+        """
+        if self.__temp_folder and os.path.isdir(self.__temp_folder):
+            shutil.rmtree(self.__temp_folder, ignore_errors=True)
+
+    def __count_bytes(self, stage: str, size: int) -> None:
+        """
+        Counts bytes written for the export toward the given stage.
+        :param stage: One of the EXPORT_STAGE_* values from consts.
+        :param size: The number of bytes.
+        """
+        self.bytes_written += size
+        self.stage_timer.add_bytes(stage, size)
 
     def __get_xml_filepath(self) -> str | None:
         """
@@ -244,7 +545,8 @@ class ExportFileCreation:
         :return:The filepath to the JATS XML file.
         """
         if not self.xml_filepath:
-            filepath = generate_jats_metadata(self.journal, self.article, self.__temp_folder)
+            filepath = generate_jats_metadata(self.journal, self.article, self.__temp_folder, self.manifest,
+                                              self.get_jats_builder(), self.__jats_context, self.__jats_sources)
 
             if not filepath:
                 self.in_error_state = True
@@ -292,56 +594,40 @@ class ExportFileCreation:
                   stage: ReportState = ReportState.FAILED_BUNDLING) -> None:
         """
         Logs the given error message in both the database and plaintext logs.
+        The error is written right away, along with anything else still buffered.
         :param message: The message to log.
         :param error: The exception, if there is one.
         :param stage: Specify which stage this transfer is in.
         """
         logger.exception(error)
         logger.error(message)
-        if self.transfer_report.report_state != stage:
-            self.transfer_report.report_state = stage
-            self.transfer_report.save()
-        TransferLogs.objects.create(report=self.transfer_report, journal=self.journal, article=self.article,
-                                    message=message,
-                                    message_type=TransferLogMessageType.EXPORT, success=False)
+        self.log_buffer.log_error(self.transfer_report, self.journal, self.article, message, stage)
 
-    def log_success_go_file(self) -> None:
+    def log_archive_statistics(self, archive: ExportArchiveWriter) -> None:
         """
-        Logs a success message in both the database and plaintext logs.
+        Logs the size and CPU effect of compressing the export archive.
+        :param archive: The archive that was written.
         """
-        TransferLogs.objects.create(report=self.transfer_report, journal=self.journal, article=self.article,
-                                    message=logger_messages.export_go_file_process_succeeded(self.article_id),
-                                    message_type=TransferLogMessageType.EXPORT, success=True)
-
-    def log_success_zip_file(self) -> None:
+        message: str = logger_messages.export_archive_statistics(self.article_id, self.get_compression_policy().policy,
+                                                                 archive.stored_entries, archive.deflated_entries,
+                                                                 archive.bytes_read, archive.bytes_compressed,
+                                                                 archive.cpu_time)
+        logger.info(message)
+        self.log_buffer.log(self.transfer_report, self.journal, self.article, message, True)
+
+    def log_bundle_reused(self, bundle_key: str) -> None:
         """
-        Logs a success message in both the database and plaintext logs.
+        Logs that the export reused an archive from the bundle store instead of writing a new one.
+        :param bundle_key: The key of the reused archive.
         """
-        TransferLogs.objects.create(report=self.transfer_report, journal=self.journal, article=self.article,
-                                    message=logger_messages.export_zip_file_process_succeeded(self.article_id),
-                                    message_type=TransferLogMessageType.EXPORT, success=True)
-        resolve_transfer_report(self.transfer_report)
+        message: str = logger_messages.export_bundle_reused(self.article_id, bundle_key)
+        logger.info(message)
+        self.log_buffer.log(self.transfer_report, self.journal, self.article, message, True)
 
-    @staticmethod
-    def __fetch_article_files(article: Article) -> List[File]:
+    def log_stage_timings(self) -> None:
         """
-        Fetches the manuscript (or content or body) of an article alongside any other files associated with it.
-        :param article: The article to fetch the manuscript files for.
-        :return: A list of all files related to the article.
+        Logs how long each export stage took and adds the timings to the earlier attempts on the transfer report.
         """
-
-        files: List[File] = list()
-
-        for manuscript in article.manuscript_files.all():
-            files.append(manuscript)
-
-        for data_file in article.data_figure_files.all():
-            files.append(data_file)
-
-        for source_file in article.source_files.all():
-            files.append(source_file)
-
-        for supplementary_file in article.supplementary_files.all():
-            files.append(supplementary_file)
-
-        return files
+        stage_timings: dict = self.stage_timer.as_dict()
+        logger.info(logger_messages.export_stage_timings(self.article_id, stage_timings))
+        self.log_buffer.set_stage_timings(self.transfer_report, stage_timings)
@@ -6,11 +6,18 @@ __license__ = "AGPL v3"
 __maintainer__ = "The Public Library of Science (PLOS)"
 
 import os
-from typing import List
+from typing import Dict, Iterable, List, Sequence
 
 from plugins.editorial_manager_transfer_service import logger_messages
-from plugins.editorial_manager_transfer_service.enums.report_state import ReportState
+from plugins.editorial_manager_transfer_service.batch_exporter import BatchExportFileCreation
+from plugins.editorial_manager_transfer_service.enums.delivery_event_type import DeliveryEventType
 from plugins.editorial_manager_transfer_service.file_exporter import ExportFileCreation
+from plugins.editorial_manager_transfer_service.models import ExportJob
+from plugins.editorial_manager_transfer_service.parallel_exporter import ParallelExportFileCreation
+from plugins.editorial_manager_transfer_service.utils.delivery_queue import DeliveryEventQueue
+from plugins.editorial_manager_transfer_service.utils.export_jobs import get_export_job, get_export_jobs, \
+    create_export_job, create_export_jobs, apply_delivery_event, apply_delivery_events
+from plugins.editorial_manager_transfer_service.utils.interfaces.DeliveryEvent import DeliveryEvent
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -19,6 +26,7 @@ logger = get_logger(__name__)
 class FileTransferService:
     """
     Manages the transfers to and from Aries's Editorial Manager system.
+    The state of each export lives in the database as an ExportJob, so any worker can handle its callbacks.
     """
     _instance = None
 
@@ -32,40 +40,125 @@ class FileTransferService:
         Constructor.
         """
         if not hasattr(self, '_initialized'):  # Prevent re-initialization on subsequent calls
-            self.exports: dict[str, ExportFileCreation] = dict()
             self.files_to_delete: List[str] = list()
             self._initialized = True
 
-    def get_export_file_creator(self, journal_code: str, article_id: int,
-                                can_create: bool = False) -> ExportFileCreation | None:
+    @staticmethod
+    def get_export_job(journal_code: str, article_id: int, can_create: bool = False) -> ExportJob | None:
         """
-        Gets the export file creator for the given article.
-        :param can_create: True if this fetch can create the export file creator, false otherwise.
+        Gets the active export job for the given article.
+        :param can_create: True if this fetch can export the article when there is no active job, false otherwise.
         :param journal_code: The journal code of the journal where the article lives.
         :param article_id: The article id.
-        :return: The export file creator.
+        :return: The export job or None, if there is none or the export failed.
+        """
+        # Jobs created here have a separate zip and go file, so a delivery bundle cannot stand in for them.
+        export_job: ExportJob | None = get_export_job(journal_code, article_id,
+                                                      delivery_bundle=False if can_create else None)
+        if not export_job and can_create:
+            export_job = create_export_job(ExportFileCreation(journal_code, article_id))
+        return export_job
+
+    @staticmethod
+    def get_export_jobs(journal_code: str, article_ids: Iterable[int], delivery_bundle: bool = False,
+                        streaming: bool = False) -> Dict[int, ExportJob | None]:
+        """
+        Gets or creates the export jobs for many articles of the same journal in one batch.
+        :param journal_code: The journal code of the journal where the articles live.
+        :param article_ids: The article ids.
+        :param delivery_bundle: True to get delivery bundles, with the go file inside the zip file.
+        :param streaming: True to write the files straight into the archive, False to stage them in a temp folder.
+        :return: The export jobs keyed by article id. None for articles which failed to export.
         """
+        article_ids = list(dict.fromkeys(article_ids))
+        export_jobs: Dict[int, ExportJob | None] = get_export_jobs(journal_code, article_ids,
+                                                                   delivery_bundle=delivery_bundle)
+        to_create: List[int] = [article_id for article_id in article_ids if article_id not in export_jobs]
 
-        dictionary_identifier: str = self.__get_dictionary_identifier(journal_code, article_id)
-        file_creator: ExportFileCreation | None = self.exports.get(dictionary_identifier)
+        if to_create:
+            batch = BatchExportFileCreation(journal_code, to_create, streaming=streaming,
+                                            delivery_bundle=delivery_bundle)
+            export_jobs.update(create_export_jobs(batch.exports.values()))
 
-        if not file_creator:
-            if can_create:
-                file_creator = ExportFileCreation(journal_code, article_id)
-                self.exports[dictionary_identifier] = file_creator
-            else:
-                return None
-        return self.exports[dictionary_identifier]
+        return {article_id: export_jobs.get(article_id) for article_id in article_ids}
 
     @staticmethod
-    def __get_dictionary_identifier(journal_code: str, article_id: int) -> str:
+    def get_export_jobs_in_parallel(articles: Iterable[tuple[str, int]], max_workers: int | None = None,
+                                    per_journal_cap: int | None = None,
+                                    streaming: bool = False) -> Dict[tuple[str, int], ExportJob | None]:
         """
-        Gets the dictionary identifier for the given article.
-        :param journal_code: The journal code of the journal where the article lives.
+        Gets or creates the export jobs for many articles, exporting them across a pool of worker processes.
+        :param articles: The (journal code, article id) pairs to export.
+        :param max_workers: The largest number of exports running at once.
+        :param per_journal_cap: The largest number of exports running at once for any single journal.
+        :param streaming: True to write the files straight into the archive, False to stage them in a temp folder.
+        :return: The export jobs keyed by (journal code, article id). None for failed exports.
+        """
+        export_jobs: Dict[tuple[str, int], ExportJob | None] = dict()
+        to_create: List[tuple[str, int]] = []
+        for journal_code, article_id in articles:
+            export_job = get_export_job(journal_code, article_id, delivery_bundle=False)
+            if export_job:
+                export_jobs[(journal_code, article_id)] = export_job
+            else:
+                to_create.append((journal_code, article_id))
+
+        if to_create:
+            parallel = ParallelExportFileCreation(to_create, max_workers=max_workers, per_journal_cap=per_journal_cap,
+                                                  streaming=streaming)
+            created_jobs = create_export_jobs(parallel.exports.values())
+            for journal_code, article_id in to_create:
+                export_jobs[(journal_code, article_id)] = created_jobs.get(article_id)
+
+        return export_jobs
+
+    def get_export_filepaths(self, journal_code: str, article_ids: Iterable[int], max_workers: int | None = None,
+                             per_journal_cap: int | None = None,
+                             streaming: bool = False) -> Dict[int, tuple[str | None, str | None]]:
+        """
+        Gets the export zip and go file paths for many articles of the same journal.
+        :param journal_code: The journal code of the journal the articles live in.
+        :param article_ids: The article ids.
+        :param max_workers: If more than one, the articles are exported in parallel using this many worker processes.
+        :param per_journal_cap: The largest number of parallel exports running at once for the journal.
+        :param streaming: True to write the files straight into the archive, False to stage them in a temp folder.
+        :return: The zip and go file paths keyed by article id. Both are None for articles which failed to export.
+        """
+        if max_workers and max_workers > 1:
+            export_jobs = {article_id: export_job for (_, article_id), export_job in
+                           self.get_export_jobs_in_parallel([(journal_code, article_id) for article_id in
+                                                             article_ids], max_workers, per_journal_cap,
+                                                            streaming).items()}
+        else:
+            export_jobs = self.get_export_jobs(journal_code, article_ids, streaming=streaming)
+
+        filepaths: Dict[int, tuple[str | None, str | None]] = dict()
+        for article_id, export_job in export_jobs.items():
+            if export_job:
+                filepaths[article_id] = (export_job.zip_filepath, export_job.go_filepath)
+            else:
+                filepaths[article_id] = (None, None)
+        return filepaths
+
+    def get_export_bundle_filepaths(self, journal_code: str, article_ids: Iterable[int]) -> Dict[int, str | None]:
+        """
+        Gets the delivery bundles for many articles of the same journal, exporting them in one batch. Each bundle is
+        a single zip file with the go file inside, waiting in the delivery spool folder.
+        :param journal_code: The journal code of the journal the articles live in.
+        :param article_ids: The article ids.
+        :return: The bundle file paths keyed by article id. None for articles which failed to export.
+        """
+        return {article_id: export_job.zip_filepath if export_job else None
+                for article_id, export_job in self.get_export_jobs(journal_code, article_ids, True).items()}
+
+    def get_export_bundle_filepath(self, journal_code: str, article_id: int) -> str | None:
+        """
+        Gets the delivery bundle for the given article.
+        :param journal_code: The journal code of the journal the article lives in.
         :param article_id: The article id.
-        :return: The dictionary identifier.
+        :return: The bundle file path.
         """
-        return f"{journal_code}-{article_id}".strip()
+        return self.get_export_bundle_filepaths(journal_code, [article_id]).get(article_id)
 
     def get_export_zip_filepath(self, journal_code: str, article_id: int) -> str | None:
         """
@@ -74,8 +167,8 @@ class FileTransferService:
         :param article_id: The article id.
         :return: The export zip file path.
         """
-        file_export_creator = self.get_export_file_creator(journal_code, article_id, True)
-        return file_export_creator.get_zip_filepath() if file_export_creator else None
+        export_job = self.get_export_job(journal_code, article_id, True)
+        return export_job.zip_filepath if export_job else None
 
     def get_export_go_filepath(self, journal_code: str, article_id: int) -> str | None:
         """
@@ -84,8 +177,8 @@ class FileTransferService:
         :param article_id: The article id.
         :return: The export go file path.
         """
-        file_export_creator = self.get_export_file_creator(journal_code, article_id, True)
-        return file_export_creator.get_go_filepath() if file_export_creator else None
+        export_job = self.get_export_job(journal_code, article_id, True)
+        return export_job.go_filepath if export_job else None
 
     def log_export_error(self, journal_code: str,
                          article_id: int,
@@ -98,10 +191,10 @@ class FileTransferService:
         :param journal_code: The journal code of the journal where the article lives.
         :param article_id: The article id.
         """
-        file_export_creator = self.get_export_file_creator(journal_code, article_id)
-        if file_export_creator:
-            file_export_creator.log_error(logger_messages.export_process_failed_ingest(article_id, error_message),
-                                          error, stage=ReportState.FAILED_INGEST)
+        export_job = self.get_export_job(journal_code, article_id)
+        if export_job:
+            apply_delivery_event(export_job, DeliveryEvent(DeliveryEventType.FAILED, journal_code, article_id,
+                                                           error_message, error))
 
     def log_export_success_go_file(self, journal_code: str,
                                    article_id: int) -> None:
@@ -110,10 +203,22 @@ class FileTransferService:
         :param journal_code: The journal code of the journal where the article lives.
         :param article_id: The article id.
         """
-        file_export_creator = self.get_export_file_creator(journal_code, article_id)
-        if file_export_creator:
-            file_export_creator.log_success_go_file()
-            self.delete_export_files(journal_code, article_id)
+        export_job = self.get_export_job(journal_code, article_id)
+        if export_job and apply_delivery_event(export_job, DeliveryEvent(DeliveryEventType.GO_FILE_DELIVERED,
+                                                                         journal_code, article_id)):
+            self.delete_export_job_files([export_job])
+
+    def log_export_success_bundle(self, journal_code: str,
+                                  article_id: int) -> None:
+        """
+        Logs the success message for when the delivery bundle of an article has reached Editorial Manager.
+        :param journal_code: The journal code of the journal where the article lives.
+        :param article_id: The article id.
+        """
+        export_job = self.get_export_job(journal_code, article_id)
+        if export_job and apply_delivery_event(export_job, DeliveryEvent(DeliveryEventType.BUNDLE_DELIVERED,
+                                                                         journal_code, article_id)):
+            self.delete_export_job_files([export_job])
 
     def log_export_success_zip_file(self, journal_code: str,
                                     article_id: int) -> None:
@@ -122,39 +227,52 @@ class FileTransferService:
         :param journal_code: The journal code of the journal where the article lives.
         :param article_id: The article id.
         """
-        file_export_creator = self.get_export_file_creator(journal_code, article_id)
-        if file_export_creator:
-            file_export_creator.log_success_zip_file()
+        export_job = self.get_export_job(journal_code, article_id)
+        if export_job:
+            apply_delivery_event(export_job, DeliveryEvent(DeliveryEventType.ZIP_FILE_DELIVERED, journal_code,
+                                                           article_id))
+
+    def apply_delivery_events(self, events: Sequence[DeliveryEvent]) -> None:
+        """
+        Applies a batch of delivery events, deleting the files of the exports they finish.
+        :param events: The delivery events, in the order they happened.
+        """
+        self.delete_export_job_files(apply_delivery_events(events))
 
     def delete_export_files(self, journal_code: str, article_id: int) -> None:
         """
         Deletes the export files for the given article.
+        Files which cannot be deleted now are retried on the next call, and left for the export reaper otherwise.
         :param journal_code: The journal code of the journal the article lives in.
         :param article_id: The article id.
         """
-        dictionary_identifier: str = self.__get_dictionary_identifier(journal_code, article_id)
-        if dictionary_identifier not in self.exports:
-            return
-        file_exporter = self.exports.pop(dictionary_identifier)
-
-        self.files_to_delete.append(file_exporter.get_zip_filepath())
-        self.files_to_delete.append(file_exporter.get_go_filepath())
+        export_job = get_export_job(journal_code, article_id, active_only=False)
+        self.delete_export_job_files([export_job] if export_job else [])
 
-        del file_exporter
+    def delete_export_job_files(self, export_jobs: Iterable[ExportJob]) -> None:
+        """
+        Deletes the export files of the given jobs.
+        :param export_jobs: The jobs whose files are no longer needed.
+        """
+        for export_job in export_jobs:
+            self.files_to_delete.append(export_job.zip_filepath)
+            self.files_to_delete.append(export_job.go_filepath)
+        self.__delete_files()
 
     def __delete_files(self) -> None:
-        for file in self.files_to_delete:
-            if self.__delete_file(file):
-                self.files_to_delete.remove(file)
+        """
+        Deletes every file waiting to be deleted, keeping those which could not be deleted for another attempt.
+        """
+        self.files_to_delete = [filepath for filepath in self.files_to_delete if not self.__delete_file(filepath)]
 
     @staticmethod
-    def __delete_file(filepath: str) -> bool:
+    def __delete_file(filepath: str | None) -> bool:
         """
         Deletes the given file.
         :param filepath: The file path of the file to delete.
         :return: True if the file was deleted, false otherwise.
         """
-        if not os.path.exists(filepath):
+        if not filepath or not os.path.exists(filepath):
             return True
         try:
             os.remove(filepath)
@@ -186,6 +304,51 @@ def get_export_go_filepath(journal_code: str, article_id: int) -> str | None:
     return FileTransferService().get_export_go_filepath(journal_code, article_id)
 
 
+def get_export_filepaths(journal_code: str, article_ids: Iterable[int], max_workers: int | None = None,
+                         per_journal_cap: int | None = None,
+                         streaming: bool = False) -> Dict[int, tuple[str | None, str | None]]:
+    """
+    Gets the zip and go file paths for many articles of the same journal, exporting them in one batch.
+    :param journal_code: The journal code of the journal the articles live in.
+    :param article_ids: The article ids.
+    :param max_workers: If more than one, the articles are exported in parallel using this many worker processes.
+    :param per_journal_cap: The largest number of parallel exports running at once for the journal.
+    :param streaming: True to write the files straight into the archive, False to stage them in a temp folder.
+    :return: The zip and go file paths keyed by article id.
+    """
+    return FileTransferService().get_export_filepaths(journal_code, article_ids, max_workers, per_journal_cap,
+                                                      streaming)
+
+
+def get_export_bundle_filepath(journal_code: str, article_id: int) -> str | None:
+    """
+    Gets the delivery bundle for a given article, a single zip file with the go file inside.
+    :param journal_code: The journal code of the journal the article lives in.
+    :param article_id: The article id.
+    :return: The bundle file path.
+    """
+    return FileTransferService().get_export_bundle_filepath(journal_code, article_id)
+
+
+def get_export_bundle_filepaths(journal_code: str, article_ids: Iterable[int]) -> Dict[int, str | None]:
+    """
+    Gets the delivery bundles for many articles of the same journal, exporting them in one batch.
+    :param journal_code: The journal code of the journal the articles live in.
+    :param article_ids: The article ids.
+    :return: The bundle file paths keyed by article id.
+    """
+    return FileTransferService().get_export_bundle_filepaths(journal_code, article_ids)
+
+
+def export_success_callback_bundle(journal_code: str, article_id: int) -> None:
+    """
+    The callback in case of a successful delivery of a delivery bundle.
+    :param journal_code: The journal code of the journal the article lives in.
+    :param article_id: The article id.
+    """
+    FileTransferService().log_export_success_bundle(journal_code, article_id)
+
+
 def export_success_callback_go_file(journal_code: str, article_id: int) -> None:
     """
     The callback in case of a successful export.
@@ -215,3 +378,60 @@ def export_failure_callback(journal_code: str, article_id: int, error_message: s
     """
     FileTransferService().log_export_error(journal_code, article_id, error_message, error)
     FileTransferService().delete_export_files(journal_code, article_id)
+
+
+_delivery_event_queue: DeliveryEventQueue | None = None
+
+
+def get_delivery_event_queue() -> DeliveryEventQueue:
+    """
+    Gets the queue the asynchronous callbacks put their delivery events on. Run its consume method as a task on the
+    same event loop as the delivery loop.
+    :return: The delivery event queue.
+    """
+    global _delivery_event_queue
+    if _delivery_event_queue is None:
+        _delivery_event_queue = DeliveryEventQueue(FileTransferService().apply_delivery_events)
+    return _delivery_event_queue
+
+
+async def export_success_callback_go_file_async(journal_code: str, article_id: int) -> None:
+    """
+    The asynchronous callback in case of a successful export. Returns as soon as the event is queued.
+    :param journal_code: The journal code of the journal the article lives in.
+    :param article_id: The article id.
+    """
+    await get_delivery_event_queue().put(DeliveryEvent(DeliveryEventType.GO_FILE_DELIVERED, journal_code, article_id))
+
+
+async def export_success_callback_bundle_async(journal_code: str, article_id: int) -> None:
+    """
+    The asynchronous callback in case of a successful delivery of a delivery bundle. Returns as soon as the event is
+    queued.
+    :param journal_code: The journal code of the journal the article lives in.
+    :param article_id: The article id.
+    """
+    await get_delivery_event_queue().put(DeliveryEvent(DeliveryEventType.BUNDLE_DELIVERED, journal_code, article_id))
+
+
+async def export_success_callback_zip_file_async(journal_code: str, article_id: int) -> None:
+    """
+    The asynchronous callback in case of a successful export. Returns as soon as the event is queued.
+    :param journal_code: The journal code of the journal the article lives in.
+    :param article_id: The article id.
+    """
+    await get_delivery_event_queue().put(DeliveryEvent(DeliveryEventType.ZIP_FILE_DELIVERED, journal_code,
+                                                       article_id))
+
+
+async def export_failure_callback_async(journal_code: str, article_id: int, error_message: str = None,
+                                        error: Exception = None) -> None:
+    """
+    The asynchronous callback in case of a failed export. Returns as soon as the event is queued.
+    :param error: The exception, if there is one.
+    :param error_message: The error message to print.
+    :param journal_code: The journal code of the journal the article lives in.
+    :param article_id: The article id.
+    """
+    await get_delivery_event_queue().put(DeliveryEvent(DeliveryEventType.FAILED, journal_code, article_id,
+                                                       error_message, error))
@@ -6,6 +6,8 @@ from django import forms
 from django.core.exceptions import ValidationError
 import re
 
+from plugins.editorial_manager_transfer_service import consts
+
 
 class EditorialManagerTransferServiceForm(forms.Form):
     """
@@ -14,6 +16,32 @@ class EditorialManagerTransferServiceForm(forms.Form):
     submission_partner_code = forms.CharField(required=False, help_text="Your organization's Submission Partner Code.")
     license_code = forms.CharField(required=False, help_text="The license code for your organization.")
     journal_code = forms.CharField(required=False, help_text="The code for the current journal.")
+    compression_policy = forms.ChoiceField(required=False,
+                                           choices=[(consts.COMPRESSION_POLICY_AUTO, "Automatic"),
+                                                    (consts.COMPRESSION_POLICY_DEFLATE, "Always Deflate"),
+                                                    (consts.COMPRESSION_POLICY_STORE, "Always Store")],
+                                           initial=consts.COMPRESSION_POLICY_AUTO,
+                                           help_text="How files are compressed in the export archive. Automatic "
+                                                     "stores already-compressed files (images, PDFs, videos) as-is.")
+    compression_level = forms.IntegerField(required=False,
+                                           min_value=consts.COMPRESSION_LEVEL_MIN,
+                                           max_value=consts.COMPRESSION_LEVEL_MAX,
+                                           initial=consts.COMPRESSION_LEVEL_DEFAULT,
+                                           help_text="The compression level (1-9) for files that are compressed.")
+    jats_builder = forms.ChoiceField(required=False,
+                                     choices=[(consts.JATS_BUILDER_TEMPLATE, "Template"),
+                                              (consts.JATS_BUILDER_PRECOMPILED, "Precompiled"),
+                                              (consts.JATS_BUILDER_ETREE, "Element tree")],
+                                     initial=consts.JATS_BUILDER_TEMPLATE,
+                                     help_text="How the JATS metadata is built. Precompiled loads all article data "
+                                               "up front and renders without further database queries. Element tree "
+                                               "builds the same data as XML elements and streams it into the archive.")
+    retention_days = forms.IntegerField(required=False,
+                                        min_value=0,
+                                        initial=consts.RETENTION_DAYS_DEFAULT,
+                                        help_text="How many days resolved transfer reports and their logs are kept "
+                                                  "before they are rolled up into daily counts and archived. "
+                                                  "0 keeps them forever.")
 
 def validate_only_underscore_and_alphanumeric(value):
     """
@@ -100,6 +100,86 @@ def process_finished_fetching_journal(janeway_journal_code: str) -> str:
     return "Completed fetching journal from database (Code: {0})...".format(janeway_journal_code)
 
 
+def batch_export_beginning(janeway_journal_code: str, article_count: int) -> str:
+    """
+    Gets the log message for when a batch export is starting.
+    :param janeway_journal_code: The code of the journal the articles live in.
+    :param article_count: The number of articles requested.
+    :return: The logger message.
+    """
+    return "Beginning batch export of {0} article(s) for journal (Code: {1})...".format(article_count,
+                                                                                      janeway_journal_code)
+
+
+def batch_export_finished(janeway_journal_code: str, succeeded: int, failed: int) -> str:
+    """
+    Gets the log message for when a batch export has finished.
+    :param janeway_journal_code: The code of the journal the articles live in.
+    :param succeeded: The number of articles exported.
+    :param failed: The number of articles which could not be exported.
+    :return: The logger message.
+    """
+    return "Completed batch export for journal (Code: {0}): {1} succeeded, {2} failed.".format(janeway_journal_code,
+                                                                                               succeeded, failed)
+
+
+def batch_export_article_failed(janeway_journal_code: str, article_id) -> str:
+    """
+    Gets the log message for when an article in a batch export raised an error while being exported.
+    :param janeway_journal_code: The code of the journal the article lives in.
+    :param article_id: The ID of the article.
+    :return: The logger message.
+    """
+    return "Exporting article (ID: {0}) in the batch for journal (Code: {1}) failed. Continuing with the batch.".format(
+            article_id, janeway_journal_code)
+
+
+def batch_export_missing_articles(janeway_journal_code: str, article_ids) -> str:
+    """
+    Gets the log message for when articles requested in a batch export could not be found.
+    :param janeway_journal_code: The code of the journal the articles should live in.
+    :param article_ids: The IDs of the articles that could not be found.
+    :return: The logger message.
+    """
+    return "Articles not found in journal (Code: {0}) and skipped: {1}.".format(
+            janeway_journal_code, ", ".join(str(article_id) for article_id in article_ids))
+
+
+def parallel_export_beginning(article_count: int, max_workers: int, per_journal_cap: int) -> str:
+    """
+    Gets the log message for when a parallel export is starting.
+    :param article_count: The number of articles requested.
+    :param max_workers: The largest number of exports running at once.
+    :param per_journal_cap: The largest number of exports running at once for a single journal.
+    :return: The logger message.
+    """
+    return "Beginning parallel export of {0} article(s) with {1} worker(s), at most {2} per journal...".format(
+            article_count, max_workers, per_journal_cap)
+
+
+def parallel_export_finished(article_count: int, elapsed: float, throughput: float) -> str:
+    """
+    Gets the log message for when a parallel export has finished.
+    :param article_count: The number of articles processed.
+    :param elapsed: The wall time taken, in seconds.
+    :param throughput: The number of articles processed per minute.
+    :return: The logger message.
+    """
+    return "Completed parallel export of {0} article(s) in {1:.2f}s ({2:.1f} articles/minute).".format(
+            article_count, elapsed, throughput)
+
+
+def parallel_export_worker_failed(janeway_journal_code: str, article_id: int) -> str:
+    """
+    Gets the log message for when a worker process failed to export an article.
+    :param janeway_journal_code: The code of the journal the article lives in.
+    :param article_id: The ID of the article being exported.
+    :return: The logger message.
+    """
+    return "Parallel export worker failed for article (ID: {0}) in journal (Code: {1}).".format(article_id,
+                                                                                               janeway_journal_code)
+
+
 def process_failed_fetching_article_files(article_id) -> str:
     """
     Gets the log message for when an article's files failed to be fetched.
@@ -118,6 +198,26 @@ def process_failed_fetching_metadata(article_id) -> str:
     return "Fetching article (ID: {0}) metadata failed. Discontinuing export process.".format(article_id)
 
 
+def process_failed_copying_file(article_id, filepath: str) -> str:
+    """
+    Gets the log message for when one of an article's files could not be copied into the temp folder.
+    :param: article_id: The ID of the article being exported.
+    :param filepath: The path of the file that could not be copied.
+    :return: The logger message.
+    """
+    return "Copying file ({0}) for article (ID: {1}) failed. Discontinuing export process.".format(filepath,
+                                                                                                 article_id)
+
+
+def process_failed_writing_archive(article_id) -> str:
+    """
+    Gets the log message for when an article's files failed to be written into the export archive.
+    :param: article_id: The ID of the article being exported.
+    :return: The logger message.
+    """
+    return "Writing the export archive for article (ID: {0}) failed. Discontinuing export process.".format(article_id)
+
+
 def export_process_failed_no_export_folder() -> str:
     """
     Gets the log message for when an export folder was not created.
@@ -163,6 +263,55 @@ def export_zip_file_process_succeeded(article_id: int) -> str:
     return "Export process succeeded for the zip file for article (ID: {0}).".format(article_id)
 
 
+def export_bundle_process_succeeded(article_id: int) -> str:
+    """
+    Gets the log message for when the delivery bundle of an export was delivered.
+    :return: The logger message.
+    """
+    return "Export process succeeded for the delivery bundle for article (ID: {0}).".format(article_id)
+
+
+def export_archive_statistics(article_id: int, policy: str, stored_entries: int, deflated_entries: int,
+                              bytes_read: int, bytes_compressed: int, cpu_time: float) -> str:
+    """
+    Gets the log message describing the compression effect on an export archive.
+    :param article_id: The ID of the article being exported.
+    :param policy: The compression policy used.
+    :param stored_entries: The number of entries stored without compression.
+    :param deflated_entries: The number of entries compressed with DEFLATE.
+    :param bytes_read: The uncompressed size of all entries.
+    :param bytes_compressed: The compressed size of all entries.
+    :param cpu_time: The CPU time spent writing the archive, in seconds.
+    :return: The logger message.
+    """
+    ratio = bytes_compressed / bytes_read if bytes_read else 1
+    return ("Export archive for article (ID: {0}) written with the \"{1}\" compression policy: {2} stored, "
+            "{3} deflated, {4} bytes compressed to {5} bytes ({6:.1%}) using {7:.3f}s of CPU time.").format(
+            article_id, policy, stored_entries, deflated_entries, bytes_read, bytes_compressed, ratio, cpu_time)
+
+
+def export_bundle_reused(article_id: int, bundle_key: str) -> str:
+    """
+    Gets the log message for when an export reuses an archive that was already built.
+    :param article_id: The ID of the article being exported.
+    :param bundle_key: The key of the reused archive.
+    :return: The logger message.
+    """
+    return "Export process reused the unchanged archive {0} for article (ID: {1}).".format(bundle_key, article_id)
+
+
+def export_stage_timings(article_id: int, stage_timings: dict) -> str:
+    """
+    Gets the log message listing how long each export stage took.
+    :param article_id: The ID of the article being exported.
+    :param stage_timings: The seconds and bytes of each stage, keyed by stage.
+    :return: The logger message.
+    """
+    stages = ", ".join("{0}={1:.3f}s/{2}B".format(stage, timing["seconds"], timing["bytes"])
+                       for stage, timing in stage_timings.items())
+    return "Export stage timings for article (ID: {0}): {1}.".format(article_id, stages)
+
+
 def export_process_failed_delete_file(filepath: str) -> str:
     """
     Gets the log message for when an export file failed to be deleted.
@@ -170,3 +319,71 @@ def export_process_failed_delete_file(filepath: str) -> str:
     :return: The logger message.
     """
     return "Export process failed to delete file at filepath: {0}.".format(filepath)
+
+
+def export_reaper_finished(export_folder: str, entries: int, bytes_reclaimed: int, dry_run: bool) -> str:
+    """
+    Gets the log message for when the export folder has been reaped.
+    :param export_folder: The folder that was reaped.
+    :param entries: The number of files and folders deleted.
+    :param bytes_reclaimed: The disk space freed, in bytes.
+    :param dry_run: True if nothing was actually deleted.
+    :return: The logger message.
+    """
+    return "Export reaper {0} {1} stale files and folders in {2}, reclaiming {3} bytes.".format(
+            "would delete" if dry_run else "deleted", entries, export_folder, bytes_reclaimed)
+
+
+def delivery_event_failed(event_type: str, janeway_journal_code: str, article_id: int) -> str:
+    """
+    Gets the log message for when a queued delivery event could not be applied.
+    :param event_type: The type of the delivery event.
+    :param janeway_journal_code: The code of the journal the article lives in.
+    :param article_id: The ID of the article the event is for.
+    :return: The logger message.
+    """
+    return "Failed to apply the delivery event {0} for article (ID: {1}) of journal {2}.".format(
+            event_type, article_id, janeway_journal_code)
+
+
+def identifier_backfill_failed(table: str, keys: int) -> str:
+    """
+    Gets the log message for when identifiers missing from a lookup table could not be filled in.
+    :param table: The name of the lookup table.
+    :param keys: The number of keys which were missing.
+    :return: The logger message.
+    """
+    return "Failed to backfill {0} missing identifiers into {1}.".format(keys, table)
+
+
+def people_id_feed_failed(filepath: str, reason: str) -> str:
+    """
+    Gets the log message for when a People ID feed could not be read.
+    :param filepath: The path to the feed.
+    :param reason: Why the feed could not be read.
+    :return: The logger message.
+    """
+    return "Failed to import the People ID feed at filepath: {0}. {1}".format(filepath, reason)
+
+
+def people_id_feeds_imported(files: int, imported: int, skipped: int, failed_files: int) -> str:
+    """
+    Gets the log message for when the People ID feeds have been imported.
+    :param files: The number of feeds found.
+    :param imported: The number of People IDs imported.
+    :param skipped: The number of rows skipped for lacking an email address or People ID.
+    :param failed_files: The number of feeds which could not be read.
+    :return: The logger message.
+    """
+    return "Imported {0} People IDs from {1} feed(s), skipping {2} row(s). {3} feed(s) could not be read.".format(
+            imported, files, skipped, failed_files)
+
+
+def institution_index_failed(filepath: str, reason: str) -> str:
+    """
+    Gets the log message for when the institution index could not be opened.
+    :param filepath: The path to the index.
+    :param reason: Why the index could not be opened.
+    :return: The logger message.
+    """
+    return "Failed to open the institution index at filepath: {0}. {1}".format(filepath, reason)
@@ -0,0 +1,59 @@
+"""
+Commands for looking up the Ringgold IDs of affiliations exported to Aries's Editorial Manager.
+"""
+
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+import plugins.editorial_manager_transfer_service.consts as consts
+from plugins.editorial_manager_transfer_service.utils.institution_index import build_institution_index, \
+    read_ringgold_csv, read_ror_json
+
+FORMAT_RINGGOLD_CSV = "ringgold-csv"
+FORMAT_ROR_JSON = "ror-json"
+
+
+class Command(BaseCommand):
+    """Builds the institution index from a Ringgold or ROR data dump."""
+
+    help = "Builds the on-disk institution index used to find the Ringgold IDs of affiliations from a Ringgold CSV " \
+           "export or a ROR JSON data dump. Running exports pick up the new index once it is written."
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help="The path to the data dump.")
+        parser.add_argument('--format', choices=(FORMAT_RINGGOLD_CSV, FORMAT_ROR_JSON), default=FORMAT_RINGGOLD_CSV,
+                            help="The format of the data dump.")
+        parser.add_argument('--output', default=consts.INSTITUTION_INDEX_PATH,
+                            help="Where to write the index.")
+        parser.add_argument('--id-column', default="ringgold_id",
+                            help="The CSV column holding the Ringgold ID.")
+        parser.add_argument('--name-column', default="name",
+                            help="The CSV column holding the main name of the institution.")
+        parser.add_argument('--alias-column', default="aliases",
+                            help="The CSV column holding the other names of the institution.")
+        parser.add_argument('--alias-separator', default="|",
+                            help="What separates the other names in the alias column.")
+        parser.add_argument('--id-type', default="ringgold",
+                            help="The type of ROR external ID holding the Ringgold ID.")
+
+    def handle(self, *args, **options):
+        if not os.path.isfile(options["source"]):
+            raise CommandError("No data dump exists at {0}.".format(options["source"]))
+
+        if options["format"] == FORMAT_ROR_JSON:
+            institutions = read_ror_json(options["source"], id_type=options["id_type"].lower())
+        else:
+            institutions = read_ringgold_csv(options["source"], id_column=options["id_column"],
+                                             name_column=options["name_column"],
+                                             alias_column=options["alias_column"] or None,
+                                             alias_separator=options["alias_separator"])
+
+        os.makedirs(os.path.dirname(options["output"]) or ".", exist_ok=True)
+        institution_count, name_count = build_institution_index(institutions, options["output"])
+        print("Indexed {0} institution(s) under {1} name(s) into {2}.".format(institution_count, name_count,
+                                                                              options["output"]))
@@ -0,0 +1,50 @@
+"""
+Commands for exporting and importing files to/form Aries's Editorial Manager.
+"""
+
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+from django.core.management.base import BaseCommand, CommandError
+
+import plugins.editorial_manager_transfer_service.file_transfer_service as file_transfer_service
+
+
+class Command(BaseCommand):
+    """Creates export ZIPs for many articles of the same journal in one batch."""
+
+    help = "Creates export ZIP and GO files for many articles of the same journal in one batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument('journal_code', help="The code of the journal where the articles to export live.")
+        parser.add_argument('article_ids', nargs='+', type=int, help="The IDs of the articles to export.")
+        parser.add_argument('--workers', type=int, default=1,
+                            help="The number of worker processes to export with. More than one exports in parallel.")
+        parser.add_argument('--per-journal-cap', type=int, default=None,
+                            help="The largest number of parallel exports running at once for the journal.")
+        parser.add_argument('--streaming', action='store_true',
+                            help="Write the files straight into the archives instead of copying them to a temp "
+                                 "folder first.")
+
+    def handle(self, *args, **options):
+        journal_code: str = options["journal_code"].strip()
+        article_ids: list[int] = options["article_ids"]
+
+        print("Beginning bundling process for {0} article(s)...".format(len(article_ids)))
+        filepaths = file_transfer_service.get_export_filepaths(journal_code, article_ids, options["workers"],
+                                                               options["per_journal_cap"], options["streaming"])
+
+        failed: list[int] = []
+        for article_id, (export_zip_file, export_go_file) in filepaths.items():
+            if not export_zip_file or not export_go_file:
+                failed.append(article_id)
+                print("Article {0}: failed.".format(article_id))
+            else:
+                print("Article {0}: {1}, {2}".format(article_id, export_zip_file, export_go_file))
+
+        if failed:
+            raise CommandError("Error while creating export files for article(s): {0}.".format(
+                    ", ".join(str(article_id) for article_id in failed)))
+
+        print("Export files created.")
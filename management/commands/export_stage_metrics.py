@@ -0,0 +1,25 @@
+"""
+Commands for monitoring the exports of the Editorial Manager Transfer Service.
+"""
+
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+from django.core.management.base import BaseCommand
+
+import plugins.editorial_manager_transfer_service.consts as consts
+from plugins.editorial_manager_transfer_service.utils.stage_metrics import render_stage_metrics
+
+
+class Command(BaseCommand):
+    """Prints the export stage timings of every journal in the Prometheus text format."""
+
+    help = "Prints the export stage timings of every journal in the Prometheus text format."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window', type=int, default=consts.STAGE_METRICS_WINDOW,
+                            help="Only exports started within this many seconds are included.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(render_stage_metrics(window=options["window"]), ending="")
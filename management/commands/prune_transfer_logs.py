@@ -0,0 +1,56 @@
+"""
+Commands for pruning the transfer reports and logs kept by the Editorial Manager Transfer Service.
+"""
+
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+from django.core.management.base import BaseCommand, CommandError
+
+import plugins.editorial_manager_transfer_service.consts as consts
+from journal.models import Journal
+from plugins.editorial_manager_transfer_service.utils.retention import RetentionEngine
+
+
+class Command(BaseCommand):
+    """Rolls up, archives and deletes resolved transfer reports and logs past each journal's retention period."""
+
+    help = "Rolls up, archives and deletes resolved transfer reports and logs past each journal's retention period."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--journal', dest='journal_codes', action='append', default=None,
+                            help="The code of a journal to prune. May be repeated. Defaults to every journal.")
+        parser.add_argument('--retention-days', type=int, default=None,
+                            help="Overrides the retention period set for each journal.")
+        parser.add_argument('--batch-size', type=int, default=consts.RETENTION_BATCH_SIZE,
+                            help="The number of reports deleted in each transaction.")
+        parser.add_argument('--sleep', type=float, default=consts.RETENTION_BATCH_PAUSE,
+                            help="The seconds to wait between batches.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only count what would be pruned.")
+
+    def handle(self, *args, **options):
+        journals = Journal.objects.all().order_by("code")
+        if options["journal_codes"]:
+            journals = journals.filter(code__in=options["journal_codes"])
+            missing = set(options["journal_codes"]) - set(journals.values_list("code", flat=True))
+            if missing:
+                raise CommandError("Unknown journal code(s): {0}".format(", ".join(sorted(missing))))
+
+        if options["retention_days"] is not None and options["retention_days"] < 0:
+            raise CommandError("The retention period cannot be negative.")
+
+        for journal in journals:
+            engine = RetentionEngine(journal, retention_days=options["retention_days"],
+                                     batch_size=options["batch_size"], pause=options["sleep"],
+                                     dry_run=options["dry_run"])
+            result = engine.run()
+            if result.cutoff is None:
+                print("{0}: retention disabled.".format(journal.code))
+            elif options["dry_run"]:
+                print("{0}: would prune {1} report(s) and {2} log(s) older than {3}.".format(
+                        journal.code, result.reports, result.logs, result.cutoff))
+            else:
+                print("{0}: pruned {1} report(s) and {2} log(s) in {3} batch(es). Archive: {4}".format(
+                        journal.code, result.reports, result.logs, result.batches, result.archive_filepath))
@@ -0,0 +1,37 @@
+"""
+Commands for cleaning up after exports to Aries's Editorial Manager.
+"""
+
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+from django.core.management.base import BaseCommand, CommandError
+
+import plugins.editorial_manager_transfer_service.consts as consts
+from plugins.editorial_manager_transfer_service.utils.reaper import ExportReaper
+
+
+class Command(BaseCommand):
+    """Deletes stale zip files, go files and temp folders which no active export needs."""
+
+    help = "Deletes stale zip files, go files and temp folders from the export folder which no active export needs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age-hours', type=float, default=consts.REAPER_MAX_AGE / 3600,
+                            help="Only files and folders last modified more than this many hours ago are deleted.")
+        parser.add_argument('--batch-size', type=int, default=consts.REAPER_BATCH_SIZE,
+                            help="The number of entries checked against the export jobs in each query.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only count what would be deleted.")
+
+    def handle(self, *args, **options):
+        if options["max_age_hours"] < 0:
+            raise CommandError("The maximum age cannot be negative.")
+
+        reaper = ExportReaper(max_age=options["max_age_hours"] * 3600, batch_size=options["batch_size"],
+                              dry_run=options["dry_run"])
+        result = reaper.run()
+        print("Scanned {0} export file(s) and folder(s): {1} {2}, {3} kept. {4} bytes reclaimed.".format(
+                result.scanned, "would delete" if options["dry_run"] else "deleted", result.deleted, result.kept,
+                result.bytes_reclaimed))
@@ -0,0 +1,57 @@
+"""
+Commands for looking up the People IDs of authors exported to Aries's Editorial Manager.
+"""
+
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+import plugins.editorial_manager_transfer_service.consts as consts
+from plugins.editorial_manager_transfer_service.utils.enrichment import people_id_store
+from plugins.editorial_manager_transfer_service.utils.identifier_keys import normalize_email
+from plugins.editorial_manager_transfer_service.utils.people_id_feed import import_people_id_feeds
+from submission.models import FrozenAuthor
+
+
+class Command(BaseCommand):
+    """Imports the waiting People ID feeds, then loads the People IDs of recent authors into the shared cache."""
+
+    help = "Imports the People ID feeds waiting in the import folder, then loads the People IDs of the authors of " \
+           "recently submitted articles into the cache shared by the workers, so the first exports are not slowed " \
+           "down by lookups."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=consts.PEOPLE_ID_WARM_DAYS,
+                            help="Warm the authors of articles submitted within this many days.")
+        parser.add_argument('--journal', action='append', dest='journals', default=None,
+                            help="Only warm the authors of articles from this journal code. Can be repeated.")
+        parser.add_argument('--batch-size', type=int, default=consts.IDENTIFIER_WARM_BATCH_SIZE,
+                            help="The number of People IDs read or saved in each query.")
+        parser.add_argument('--skip-import', action='store_true',
+                            help="Do not import the waiting People ID feeds first.")
+
+    def handle(self, *args, **options):
+        if options["days"] < 0:
+            raise CommandError("The number of days cannot be negative.")
+        if options["batch_size"] < 1:
+            raise CommandError("The batch size must be at least 1.")
+
+        if not options["skip_import"]:
+            result = import_people_id_feeds(batch_size=options["batch_size"])
+            print("Imported {0} People ID(s) from {1} feed(s), skipping {2} row(s). {3} feed(s) failed.".format(
+                    result.imported, result.files, result.skipped, result.failed_files))
+
+        authors = FrozenAuthor.objects.filter(
+                article__date_submitted__gte=timezone.now() - timedelta(days=options["days"])).select_related("author")
+        if options["journals"]:
+            authors = authors.filter(article__journal__code__in=options["journals"])
+
+        emails = {normalize_email(getattr(author, "email", None)) for author in authors.iterator()}
+        emails.discard(None)
+        loaded = people_id_store.warm(emails, batch_size=options["batch_size"])
+        print("Warmed {0} People ID(s) for {1} recent author email address(es).".format(loaded, len(emails)))
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.22 on 2026-10-17 10:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('editorial_manager_transfer_service', '0002_editorialmanagersection'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transferreport',
+            index=models.Index(fields=['journal', 'report_state', '-message_date_time_start'],
+                               name='emts_report_state_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transferreport',
+            index=models.Index(fields=['journal', 'article', '-message_date_time_start'],
+                               name='emts_report_article_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transferlogs',
+            index=models.Index(fields=['report', '-message_date_time'], name='emts_logs_report_idx'),
+        ),
+    ]
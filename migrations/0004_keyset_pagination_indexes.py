@@ -0,0 +1,39 @@
+# Generated by Django 4.2.22 on 2026-10-17 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('editorial_manager_transfer_service', '0003_transfer_report_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='transferreport',
+            name='emts_report_state_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transferreport',
+            name='emts_report_article_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transferlogs',
+            name='emts_logs_report_idx',
+        ),
+        migrations.AddIndex(
+            model_name='transferreport',
+            index=models.Index(fields=['journal', 'report_state', '-message_date_time_start', '-id'],
+                               name='emts_report_state_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transferreport',
+            index=models.Index(fields=['journal', 'article', '-message_date_time_start', '-id'],
+                               name='emts_report_article_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transferlogs',
+            index=models.Index(fields=['report', '-message_date_time', '-id'], name='emts_logs_report_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.22 on 2026-10-17 13:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0068_issue_cached_display_title_a11y_and_more'),
+        ('editorial_manager_transfer_service', '0004_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransferReportRollup',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('report_state', models.CharField(blank=True, choices=[('000', 'No Error Detected'), ('001', 'Article is in Flight'), ('002', 'Failed Bundling'), ('003', 'Editorial Manager Rejected at SFTP')], max_length=3)),
+                ('message_type', models.CharField(blank=True, choices=[('EX', 'Export Message'), ('IM', 'Import Message')], max_length=2)),
+                ('report_count', models.PositiveIntegerField(default=0)),
+                ('log_count', models.PositiveIntegerField(default=0)),
+                ('success_count', models.PositiveIntegerField(default=0)),
+                ('journal', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='journal.journal')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='transferreportrollup',
+            constraint=models.UniqueConstraint(fields=('journal', 'day', 'report_state', 'message_type'), name='emts_rollup_unique'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.22 on 2026-10-17 14:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('editorial_manager_transfer_service', '0005_transferreportrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transferreport',
+            name='stage_timings',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.22 on 2026-10-17 15:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submission', '0091_alter_field_slug'),
+        ('journal', '0068_issue_cached_display_title_a11y_and_more'),
+        ('editorial_manager_transfer_service', '0006_transferreport_stage_timings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('prefix', models.CharField(max_length=255, unique=True)),
+                ('state', models.CharField(choices=[('BU', 'Bundled'), ('ZD', 'Zip File Delivered'), ('DE', 'Delivered'), ('FA', 'Failed')], default='BU', max_length=2)),
+                ('zip_filepath', models.CharField(blank=True, max_length=1024, null=True)),
+                ('go_filepath', models.CharField(blank=True, max_length=1024, null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='submission.article')),
+                ('journal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='journal.journal')),
+                ('report', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='editorial_manager_transfer_service.transferreport')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='exportjob',
+            index=models.Index(fields=['journal', 'article', '-created'], name='emts_job_article_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.22 on 2026-10-17 16:40
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('editorial_manager_transfer_service', '0007_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InstitutionIdentifier',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('ringgold_id', models.CharField(max_length=32)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PeopleIdentifier',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('email', models.CharField(max_length=254, unique=True)),
+                ('people_id', models.CharField(max_length=64)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.22 on 2026-10-17 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('editorial_manager_transfer_service', '0008_peopleidentifier_institutionidentifier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='delivery_bundle',
+            field=models.BooleanField(default=False),
+        ),
+    ]
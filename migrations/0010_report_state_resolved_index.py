@@ -0,0 +1,22 @@
+# Generated by Django 4.2.22 on 2026-10-18 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('editorial_manager_transfer_service', '0009_exportjob_delivery_bundle'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='transferreport',
+            name='emts_report_state_idx',
+        ),
+        migrations.AddIndex(
+            model_name='transferreport',
+            index=models.Index(fields=['journal', 'report_state', 'resolved', '-message_date_time_start', '-id'],
+                               name='emts_report_state_idx'),
+        ),
+    ]
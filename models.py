@@ -7,6 +7,7 @@ __maintainer__ = "The Public Library of Science (PLOS)"
 
 import uuid
 from django.db import models
+from plugins.editorial_manager_transfer_service.enums.export_job_state import ExportJobState
 from plugins.editorial_manager_transfer_service.enums.report_state import ReportState
 from plugins.editorial_manager_transfer_service.enums.transfer_log_message_type import TransferLogMessageType
 
@@ -40,6 +41,20 @@ class TransferReport(models.Model):
             null=True, blank=True
     )
     resolved = models.BooleanField(default=False)
+    # The seconds and bytes of each export stage, keyed by stage.
+    stage_timings = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        # Each index ends with the ID, so the listings can be paged by timestamp and ID straight off the index.
+        indexes = [
+            # The failed bundle listing of unresolved reports, newest first.
+            models.Index(fields=["journal", "report_state", "resolved", "-message_date_time_start", "-id"],
+                         name="emts_report_state_idx"),
+            # The reports for an article, newest first. Also finds an article's unresolved report, since each
+            # article only has a handful of reports to check the resolved flag on.
+            models.Index(fields=["journal", "article", "-message_date_time_start", "-id"],
+                         name="emts_report_article_idx"),
+        ]
 
 
 class TransferLogs(models.Model):
@@ -76,6 +91,13 @@ class TransferLogs(models.Model):
     message_date_time = models.DateTimeField(auto_now_add=True)
     success = models.BooleanField(default=False)
 
+    class Meta:
+        # Ends with the ID, so the listing can be paged by timestamp and ID straight off the index.
+        indexes = [
+            # The logs of a report, newest first.
+            models.Index(fields=["report", "-message_date_time", "-id"], name="emts_logs_report_idx"),
+        ]
+
 class EditorialManagerSection(models.Model):
     """
     The model used for the editorial manager section to save the variable IDs.
@@ -88,4 +110,113 @@ class EditorialManagerSection(models.Model):
             null=False, blank=False
     )
 
-    editorial_manager_section_id = models.CharField(max_length=64, null=False, blank=False)
\ No newline at end of file
+    editorial_manager_section_id = models.CharField(max_length=64, null=False, blank=False)
+
+class TransferReportRollup(models.Model):
+    """
+    Daily counts kept for transfer reports and logs once the rows themselves are archived and deleted.
+    Each row counts, for a journal and the day the reports started, the reports in one state and their logs of one
+    message type. Reports without any logs are counted with a blank message type.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    journal = models.ForeignKey(
+            "journal.Journal",
+            on_delete=models.CASCADE,
+            null=True, blank=True
+    )
+
+    day = models.DateField()
+
+    report_state = models.CharField(
+            max_length=3,
+            choices=ReportState.choices,
+            blank=True,
+    )
+
+    message_type = models.CharField(
+            max_length=2,
+            choices=TransferLogMessageType.choices,
+            blank=True,
+    )
+
+    report_count = models.PositiveIntegerField(default=0)
+    log_count = models.PositiveIntegerField(default=0)
+    success_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["journal", "day", "report_state", "message_type"],
+                                    name="emts_rollup_unique"),
+        ]
+
+class ExportJob(models.Model):
+    """
+    An export bundled for Editorial Manager, kept in the database so its delivery callbacks can be handled by any
+    worker.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    journal = models.ForeignKey(
+            "journal.Journal",
+            on_delete=models.CASCADE,
+    )
+
+    article = models.ForeignKey(
+            "submission.Article",
+            on_delete=models.CASCADE,
+    )
+
+    report = models.ForeignKey(
+            TransferReport,
+            on_delete=models.SET_NULL,
+            null=True, blank=True
+    )
+
+    # The name shared by the zip and go files of the bundle.
+    prefix = models.CharField(max_length=255, unique=True)
+
+    state = models.CharField(
+            max_length=2,
+            choices=ExportJobState.choices,
+            default=ExportJobState.BUNDLED,
+    )
+
+    zip_filepath = models.CharField(max_length=1024, null=True, blank=True)
+    go_filepath = models.CharField(max_length=1024, null=True, blank=True)
+
+    # Whether the go file is inside the zip file, so the bundle is delivered as a single file.
+    delivery_bundle = models.BooleanField(default=False)
+
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["journal", "article", "-created"], name="emts_job_article_idx"),
+        ]
+
+class PeopleIdentifier(models.Model):
+    """
+    The Editorial Manager People ID of a person, looked up by their normalized email address when their authorship is
+    exported.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    email = models.CharField(max_length=254, unique=True)
+
+    people_id = models.CharField(max_length=64)
+
+    updated = models.DateTimeField(auto_now=True)
+
+class InstitutionIdentifier(models.Model):
+    """
+    The Ringgold ID of an institution, looked up by its normalized name when an affiliation is exported.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    name = models.CharField(max_length=255, unique=True)
+
+    ringgold_id = models.CharField(max_length=32)
+
+    updated = models.DateTimeField(auto_now=True)
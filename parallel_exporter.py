@@ -0,0 +1,149 @@
+"""
+Spreads article exports across a pool of worker processes.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Deque, Dict, Iterable, List
+
+import django
+from django.db import connections
+
+import plugins.editorial_manager_transfer_service.consts as consts
+import plugins.editorial_manager_transfer_service.logger_messages as logger_messages
+from plugins.editorial_manager_transfer_service.file_exporter import ExportFileCreation
+from plugins.editorial_manager_transfer_service.utils.interfaces.ExportResult import ExportResult
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _initialize_worker() -> None:
+    """
+    Prepares a worker process to use Django and open its own database connections.
+    """
+    django.setup()
+    connections.close_all()
+
+
+def _export_article(journal_code: str, article_id: int, streaming: bool = False,
+                    delivery_bundle: bool = False) -> ExportResult | None:
+    """
+    Exports a single article inside a worker process.
+    :param journal_code: The journal code of the journal where the article lives.
+    :param article_id: The article id.
+    :param streaming: True to write the files straight into the archive, False to stage them in a temp folder.
+    :param delivery_bundle: True to deliver the article as a single archive with its go file inside.
+    :return: What the export produced or None, if the export raised an exception. Only this small result is sent
+    back to the parent process, rather than the export with the journal, article and settings it holds.
+    """
+    try:
+        return ExportFileCreation(journal_code, article_id, streaming=streaming,
+                                  delivery_bundle=delivery_bundle).get_export_result()
+    except Exception as e:
+        logger.exception(e)
+        logger.error(logger_messages.parallel_export_worker_failed(journal_code, article_id))
+        return None
+
+
+def _schedule_round_robin(pending: Dict[str, Deque[int]], journal_counts: Counter, free_workers: int,
+                          per_journal_cap: int) -> List[tuple[str, int]]:
+    """
+    Picks the next exports to submit, taking one article from each journal in turn and skipping journals at their cap.
+    :param pending: The articles still to export, keyed by journal code. Picked articles are removed.
+    :param journal_counts: The number of exports running for each journal. Picked articles are counted.
+    :param free_workers: The number of exports which can be submitted now.
+    :param per_journal_cap: The largest number of exports running at once for any single journal.
+    :return: The (journal code, article id) pairs to submit, in order.
+    """
+    scheduled: List[tuple[str, int]] = []
+    submitted: bool = True
+    while submitted and len(scheduled) < free_workers:
+        submitted = False
+        for journal_code in list(pending.keys()):
+            if len(scheduled) >= free_workers:
+                break
+            if journal_counts[journal_code] >= per_journal_cap:
+                continue
+            article_id: int = pending[journal_code].popleft()
+            if not pending[journal_code]:
+                del pending[journal_code]
+            journal_counts[journal_code] += 1
+            scheduled.append((journal_code, article_id))
+            submitted = True
+    return scheduled
+
+
+class ParallelExportFileCreation:
+    """
+    Creates the export files for many articles across a process pool with bounded concurrency.
+    """
+
+    def __init__(self, articles: Iterable[tuple[str, int]], max_workers: int | None = None,
+                 per_journal_cap: int | None = None, streaming: bool = False, delivery_bundle: bool = False) -> None:
+        """
+        Constructor.
+        :param articles: The (journal code, article id) pairs to export.
+        :param max_workers: The largest number of exports running at once.
+        :param per_journal_cap: The largest number of exports running at once for any single journal.
+        :param streaming: True to write the files straight into the archive, False to stage them in a temp folder.
+        :param delivery_bundle: True to deliver each article as a single archive with its go file inside.
+        """
+        self.articles: List[tuple[str, int]] = list(dict.fromkeys(articles))
+        self.max_workers: int = max(1, max_workers or consts.PARALLEL_EXPORT_MAX_WORKERS)
+        self.per_journal_cap: int = max(1, per_journal_cap or consts.PARALLEL_EXPORT_PER_JOURNAL_CAP)
+        self.streaming: bool = streaming
+        self.delivery_bundle: bool = delivery_bundle
+        self.exports: Dict[tuple[str, int], ExportResult | None] = dict()
+        self.elapsed: float = 0
+        self.throughput: float = 0
+
+        logger.info(logger_messages.parallel_export_beginning(len(self.articles), self.max_workers,
+                                                              self.per_journal_cap))
+        start: float = time.perf_counter()
+        self.__run()
+        self.elapsed = time.perf_counter() - start
+        if self.elapsed > 0:
+            self.throughput = len(self.exports) / self.elapsed * 60
+        logger.info(logger_messages.parallel_export_finished(len(self.exports), self.elapsed, self.throughput))
+
+    def __run(self) -> None:
+        """
+        Submits exports to the pool, keeping every journal under its cap, until all articles are exported.
+        """
+        if not self.articles:
+            return
+
+        pending: Dict[str, Deque[int]] = dict()
+        for journal_code, article_id in self.articles:
+            pending.setdefault(journal_code, deque()).append(article_id)
+        in_flight: Dict[Future, tuple[str, int]] = dict()
+        journal_counts: Counter = Counter()
+
+        # Child processes must open their own connections rather than share the parent's sockets.
+        connections.close_all()
+
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_initialize_worker) as executor:
+            while pending or in_flight:
+                # Fill free workers round-robin across the journals that are still under their cap.
+                for journal_code, article_id in _schedule_round_robin(pending, journal_counts,
+                                                                      self.max_workers - len(in_flight),
+                                                                      self.per_journal_cap):
+                    future = executor.submit(_export_article, journal_code, article_id, self.streaming,
+                                             self.delivery_bundle)
+                    in_flight[future] = (journal_code, article_id)
+
+                done, _ = wait(in_flight.keys(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    journal_code, article_id = in_flight.pop(future)
+                    journal_counts[journal_code] -= 1
+                    try:
+                        self.exports[(journal_code, article_id)] = future.result()
+                    except Exception as e:
+                        logger.exception(e)
+                        logger.error(logger_messages.parallel_export_worker_failed(journal_code, article_id))
+                        self.exports[(journal_code, article_id)] = None
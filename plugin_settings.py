@@ -102,4 +102,5 @@ def hook_registry():
 
 
 def register_for_events():
-    pass
+    # Connects the signal receivers which keep the export caches up to date.
+    import plugins.editorial_manager_transfer_service.signals  # noqa: F401
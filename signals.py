@@ -0,0 +1,37 @@
+"""
+Keeps the caches used during export in step with the data they were built from.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from plugins.editorial_manager_transfer_service.utils.data_fetch import invalidate_answer_fields
+from submission.models import Field, FieldAnswer
+
+
+@receiver([post_save, post_delete], sender=FieldAnswer, dispatch_uid="emts_invalidate_answer_fields")
+def invalidate_answer_fields_on_answer_change(sender, instance: FieldAnswer, **kwargs) -> None:
+    """
+    Drops the cached answer fields of an article when one of its answers is saved or deleted.
+    :param sender: The FieldAnswer model.
+    :param instance: The answer which changed.
+    """
+    if instance.article_id is not None:
+        invalidate_answer_fields([instance.article_id])
+
+
+@receiver(post_save, sender=Field, dispatch_uid="emts_invalidate_answer_fields_for_field")
+def invalidate_answer_fields_on_field_change(sender, instance: Field, created: bool = False, **kwargs) -> None:
+    """
+    Drops the cached answer fields of every article answering a question when the question is renamed.
+    :param sender: The Field model.
+    :param instance: The question which changed.
+    :param created: True if the question is new, so no answers can be cached for it yet.
+    """
+    if created:
+        return
+    invalidate_answer_fields(FieldAnswer.objects.filter(field=instance).values_list('article_id', flat=True)
+                             .distinct())
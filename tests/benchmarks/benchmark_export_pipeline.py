@@ -0,0 +1,209 @@
+"""
+Measures end-to-end exports of synthetic articles, each shaped to stress one part of the pipeline, and writes the
+results as JSON so they can be compared across commits with compare_benchmark_results.
+
+Benchmarks are not picked up by the default test discovery. Run them explicitly with:
+python src/manage.py test plugins.editorial_manager_transfer_service.tests.benchmarks.benchmark_export_pipeline
+
+Environment variables:
+EMTS_BENCHMARK_OUTPUT  Where the JSON results are written. Defaults to export_pipeline.json in the export folder.
+EMTS_BENCHMARK_SCALE   Multiplies the size of every generated file, e.g. 0.1 for a quick run.
+EMTS_BENCHMARK_CORPORA A comma separated list of the corpora to run. Defaults to every corpus.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Dict, List
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from hypothesis import given, settings, HealthCheck, strategies as st
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.consts as consts
+import plugins.editorial_manager_transfer_service.file_exporter as file_exporter
+import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.utils.bundle_store import ExportBundleStore
+from plugins.editorial_manager_transfer_service.utils.compression import CompressionPolicy
+from submission.models import Article
+
+BENCHMARK_ROUNDS = 5
+RESULTS_VERSION = 1
+MEBIBYTE = 1024 * 1024
+
+# The shape of each synthetic article, as arguments to article_utils.create_shaped_article.
+CORPORA: Dict[str, dict] = {
+    "baseline": dict(authors=1, affiliations_per_author=1, answers=1, figures=1, figure_size=64 * 1024),
+    "many_authors": dict(authors=150, affiliations_per_author=3, answers=1, figures=1, figure_size=64 * 1024),
+    "many_answers": dict(authors=1, affiliations_per_author=1, answers=250, figures=1, figure_size=64 * 1024),
+    "many_figures": dict(authors=1, affiliations_per_author=1, answers=1, figures=36, figure_size=4 * MEBIBYTE),
+    "large_videos": dict(authors=1, affiliations_per_author=1, answers=1, videos=2, video_size=128 * MEBIBYTE),
+}
+
+
+def _get_submission_partner_code(self):
+    return "SUBMISSION_PARTNER"
+
+
+def _get_license_code(self):
+    return "LCODE"
+
+
+def _get_journal_code(self):
+    return "JOURNAL_CODE"
+
+
+def _get_compression_policy(self):
+    return CompressionPolicy()
+
+
+def _get_jats_builder(self):
+    return consts.JATS_BUILDER_TEMPLATE
+
+
+def _checkout_nothing(self, key, zip_filepath):
+    # Every round builds the archive from scratch rather than reusing the first round's.
+    return None
+
+
+def _get_corpora() -> Dict[str, dict]:
+    """
+    Gets the corpora to run, scaled by EMTS_BENCHMARK_SCALE.
+    """
+    scale: float = float(os.environ.get("EMTS_BENCHMARK_SCALE", "1"))
+    names: List[str] = [name.strip() for name in os.environ.get("EMTS_BENCHMARK_CORPORA", "").split(",")
+                        if name.strip()] or list(CORPORA)
+
+    corpora: Dict[str, dict] = dict()
+    for name in names:
+        shape = dict(CORPORA[name])
+        for key in ("figure_size", "video_size"):
+            if key in shape:
+                shape[key] = max(int(shape[key] * scale), 1)
+        corpora[name] = shape
+    return corpora
+
+
+def _get_commit() -> str | None:
+    """
+    Gets the commit the plugin is checked out at, if it is a git checkout.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(consts.__file__),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _get_peak_rss() -> int:
+    """
+    Gets the high-water mark of the process's resident set size in bytes.
+    """
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kibibytes, macOS reports bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class BenchmarkExportPipeline(TestCase):
+    def setUp(self):
+        """
+        Sets up the export folder structure.
+        """
+        article_utils.database_crafter_do_preqs()
+        if not os.path.exists(article_utils._get_article_export_folders()):
+            try:
+                os.makedirs(article_utils._get_article_export_folders())
+            except FileExistsError:
+                pass
+
+    @settings(max_examples=1, derandomize=True, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow,
+                                     HealthCheck.data_too_large])
+    @given(data=st.data())
+    @patch('plugins.editorial_manager_transfer_service.file_exporter.get_article_export_folders',
+           new=article_utils._get_article_export_folders)
+    @patch.object(file_exporter.ExportFileCreation, 'get_submission_partner_code', new=_get_submission_partner_code)
+    @patch.object(file_exporter.ExportFileCreation, 'get_license_code', new=_get_license_code)
+    @patch.object(file_exporter.ExportFileCreation, 'get_journal_code', new=_get_journal_code)
+    @patch.object(file_exporter.ExportFileCreation, 'get_compression_policy', new=_get_compression_policy)
+    @patch.object(file_exporter.ExportFileCreation, 'get_jats_builder', new=_get_jats_builder)
+    @patch.object(ExportBundleStore, 'checkout', new=_checkout_nothing)
+    def test_export_pipeline(self, data) -> None:
+        """
+        Exports each corpus and writes the results.
+        """
+        results: Dict[str, dict] = dict()
+        corpora: Dict[str, dict] = _get_corpora()
+        for name, shape in corpora.items():
+            article: Article = data.draw(article_utils.create_shaped_article(**shape), label=name)
+            results[name] = self.__run_corpus(article)
+            print("{0}: {1:.2f} ms/export (median), {2} queries, {3} bytes written, {4} bytes peak RSS".format(
+                    name, results[name]["median_seconds"] * 1000, results[name]["queries"],
+                    results[name]["bytes_written"], results[name]["peak_rss_bytes"]))
+
+        output: str = os.environ.get("EMTS_BENCHMARK_OUTPUT",
+                                     os.path.join(article_utils._get_article_export_folders(),
+                                                  "export_pipeline.json"))
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump({
+                "version": RESULTS_VERSION,
+                "commit": _get_commit(),
+                "created": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "rounds": BENCHMARK_ROUNDS,
+                "corpora": corpora,
+                "results": results,
+            }, file, indent=2, sort_keys=True)
+        print("Benchmark results written to {0}".format(output))
+
+    def __run_corpus(self, article: Article) -> dict:
+        """
+        Exports the given article several times.
+        :param article: The article to export.
+        :return: The wall times, query count, bytes written and memory use of the exports.
+        """
+        seconds: List[float] = []
+        queries: int = 0
+        bytes_written: int = 0
+        for _ in range(BENCHMARK_ROUNDS):
+            cache.clear()
+            with CaptureQueriesContext(connection) as captured_queries:
+                start = time.perf_counter()
+                exporter = file_exporter.ExportFileCreation(article.journal.code, article.pk, streaming=True)
+                seconds.append(time.perf_counter() - start)
+            self.assertFalse(exporter.in_error_state)
+            queries = len(captured_queries)
+            bytes_written = exporter.bytes_written
+
+        # Tracing allocations slows the export down, so memory is measured in a round of its own.
+        cache.clear()
+        tracemalloc.start()
+        try:
+            file_exporter.ExportFileCreation(article.journal.code, article.pk, streaming=True)
+            peak_traced_bytes: int = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "median_seconds": statistics.median(seconds),
+            "min_seconds": min(seconds),
+            "max_seconds": max(seconds),
+            "queries": queries,
+            "bytes_written": bytes_written,
+            "peak_traced_bytes": peak_traced_bytes,
+            "peak_rss_bytes": _get_peak_rss(),
+        }
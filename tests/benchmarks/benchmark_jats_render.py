@@ -0,0 +1,89 @@
+"""
+Compares rendering JATS through the ORM-backed template against the precompiled, query-free template and the
+element tree builder.
+
+Benchmarks are not picked up by the default test discovery. Run them explicitly with:
+python src/manage.py test plugins.editorial_manager_transfer_service.tests.benchmarks.benchmark_jats_render
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import os
+import time
+from unittest.mock import patch
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from hypothesis import given, settings, HealthCheck
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.consts as consts
+import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.utils.jats import render_jats_metadata, build_jats_context, \
+    render_precompiled_jats_metadata
+from plugins.editorial_manager_transfer_service.utils.jats_tree import build_jats_tree
+from plugins.editorial_manager_transfer_service.utils.settings import ExportSettings
+from submission.models import Article
+
+BENCHMARK_ROUNDS = 20
+
+
+def _get_export_settings(journal, fetch_fresh: bool = False) -> ExportSettings:
+    return ExportSettings(submission_partner_code="SUBMISSION_PARTNER", license_code="LCODE",
+                          journal_code="JOURNAL_CODE")
+
+
+class BenchmarkJatsRender(TestCase):
+    def setUp(self):
+        """
+        Sets up the export folder structure.
+        """
+        article_utils.database_crafter_do_preqs()
+        if not os.path.exists(article_utils._get_article_export_folders()):
+            try:
+                os.makedirs(article_utils._get_article_export_folders())
+            except FileExistsError:
+                pass
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    @patch('plugins.editorial_manager_transfer_service.utils.settings.get_export_settings', new=_get_export_settings)
+    def test_builders_against_template_render(self, article: Article) -> None:
+        """
+        Renders the same article through every builder and reports the time and queries spent by each.
+        """
+        article = Article.objects.get(pk=article.pk)
+
+        template_time, template_queries = self.__measure(
+                lambda: render_jats_metadata(article.journal, article, builder=consts.JATS_BUILDER_TEMPLATE))
+        build_time, build_queries = self.__measure(lambda: build_jats_context(article.journal, article))
+        context = build_jats_context(article.journal, article)
+        render_time, render_queries = self.__measure(lambda: render_precompiled_jats_metadata(context, article.pk))
+        tree_time, tree_queries = self.__measure(lambda: build_jats_tree(context))
+
+        print("")
+        print(f"Template render:      {template_time * 1000:.3f} ms/render, {template_queries} queries")
+        print(f"Precompiled context:  {build_time * 1000:.3f} ms/build, {build_queries} queries")
+        print(f"Precompiled render:   {render_time * 1000:.3f} ms/render, {render_queries} queries")
+        print(f"Element tree build:   {tree_time * 1000:.3f} ms/build, {tree_queries} queries")
+
+        self.assertEqual(0, render_queries)
+        self.assertEqual(0, tree_queries)
+
+    @staticmethod
+    def __measure(render) -> tuple[float, int]:
+        """
+        Calls the given function several times.
+        :param render: The function to call.
+        :return: The mean wall time in seconds and the number of queries issued by a single call.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            render()
+        query_count: int = len(queries)
+
+        start = time.perf_counter()
+        for _ in range(BENCHMARK_ROUNDS):
+            render()
+        return (time.perf_counter() - start) / BENCHMARK_ROUNDS, query_count
@@ -0,0 +1,98 @@
+"""
+Seeds large transfer report and log tables and checks the staff pages' queries are planned with the composite indexes.
+
+Benchmarks are not picked up by the default test discovery. Run them explicitly with:
+python src/manage.py test plugins.editorial_manager_transfer_service.tests.benchmarks.benchmark_query_plans
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import time
+
+from django.db import connection
+from django.db.models import QuerySet
+from hypothesis import given, settings, HealthCheck
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.enums.report_state import ReportState
+from plugins.editorial_manager_transfer_service.models import TransferReport, TransferLogs
+from plugins.editorial_manager_transfer_service.utils.transfer_report import get_failed_bundle_reports, \
+    get_article_reports, get_report_logs
+from submission.models import Article
+
+SEEDED_REPORTS = 20000
+SEEDED_LOGS = 100000
+# One in this many reports failed bundling, and one in this many belongs to the benchmarked article.
+FAILED_REPORT_INTERVAL = 100
+ARTICLE_REPORT_INTERVAL = 1000
+BATCH_SIZE = 5000
+
+
+class BenchmarkQueryPlans(TestCase):
+    def setUp(self):
+        article_utils.database_crafter_do_preqs()
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_report_views_use_indexes(self, article: Article) -> None:
+        """
+        Tests each report view's query is served by the index designed for it.
+        """
+        journal = article.journal
+        reports = TransferReport.objects.bulk_create(
+                [TransferReport(journal=journal,
+                                article=article if counter % ARTICLE_REPORT_INTERVAL == 0 else None,
+                                report_state=ReportState.FAILED_BUNDLING if counter % FAILED_REPORT_INTERVAL == 0
+                                else ReportState.NORMAL,
+                                resolved=counter % ARTICLE_REPORT_INTERVAL != 0)
+                 for counter in range(SEEDED_REPORTS)], batch_size=BATCH_SIZE)
+        TransferLogs.objects.bulk_create(
+                [TransferLogs(report=reports[counter % len(reports)], journal=journal, message="Seeded log.",
+                              success=True)
+                 for counter in range(SEEDED_LOGS)], batch_size=BATCH_SIZE)
+        self.__analyze()
+
+        unresolved_reports = TransferReport.objects.filter(journal=journal, article=article,
+                                                           resolved=False).order_by("-message_date_time_start", "-id")
+        # Only the failed reports which are still unresolved are listed, in the index's own order.
+        failed_reports = get_failed_bundle_reports(journal)
+        self.assertEqual(SEEDED_REPORTS // ARTICLE_REPORT_INTERVAL, failed_reports.count())
+        self.__check_plan("Failed bundles", failed_reports, "emts_report_state_idx", sorted_by_index=True)
+        self.__check_plan("Article reports", get_article_reports(journal, article), "emts_report_article_idx")
+        self.__check_plan("Unresolved report", unresolved_reports, "emts_report_article_idx")
+        self.__check_plan("Report logs", get_report_logs(reports[0]), "emts_logs_report_idx")
+
+    def __check_plan(self, label: str, queryset: QuerySet, index_name: str, sorted_by_index: bool = False) -> None:
+        """
+        Prints how long a query takes and checks its plan uses the given index.
+        :param label: The name of the query to print.
+        :param queryset: The query to check.
+        :param index_name: The index the query should use.
+        :param sorted_by_index: True if the rows should come out of the index in order, without a sort.
+        """
+        start = time.perf_counter()
+        list(queryset)
+        elapsed = time.perf_counter() - start
+
+        plan: str = queryset.explain()
+        print("")
+        print(f"{label}: {elapsed * 1000:.3f} ms")
+        print(plan)
+        self.assertIn(index_name, plan)
+        if sorted_by_index:
+            self.assertNotIn("sort", plan.lower())
+
+    @staticmethod
+    def __analyze() -> None:
+        """
+        Refreshes the planner statistics, so the plans reflect the seeded tables.
+        """
+        with connection.cursor() as cursor:
+            if connection.vendor == "mysql":
+                cursor.execute("ANALYZE TABLE {0}, {1}".format(TransferReport._meta.db_table,
+                                                               TransferLogs._meta.db_table))
+            else:
+                cursor.execute("ANALYZE")
@@ -0,0 +1,98 @@
+"""
+Compares the staged (temp folder) export path against the streamed export path.
+
+Benchmarks are not picked up by the default test discovery. Run them explicitly with:
+python src/manage.py test plugins.editorial_manager_transfer_service.tests.benchmarks.benchmark_streaming_export
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import os
+import time
+from unittest.mock import patch
+
+from hypothesis import given, settings, HealthCheck
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.consts as consts
+import plugins.editorial_manager_transfer_service.file_exporter as file_exporter
+import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.utils.compression import CompressionPolicy
+from submission.models import Article
+
+BENCHMARK_ROUNDS = 5
+
+
+def _get_submission_partner_code(self):
+    return "SUBMISSION_PARTNER"
+
+
+def _get_license_code(self):
+    return "LCODE"
+
+
+def _get_journal_code(self):
+    return "JOURNAL_CODE"
+
+
+def _get_compression_policy(self):
+    return CompressionPolicy()
+
+
+def _get_jats_builder(self):
+    return consts.JATS_BUILDER_TEMPLATE
+
+
+class BenchmarkStreamingExport(TestCase):
+    def setUp(self):
+        """
+        Sets up the export folder structure.
+        """
+        article_utils.database_crafter_do_preqs()
+        if not os.path.exists(article_utils._get_article_export_folders()):
+            try:
+                os.makedirs(article_utils._get_article_export_folders())
+            except FileExistsError:
+                pass
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    @patch('plugins.editorial_manager_transfer_service.file_exporter.get_article_export_folders',
+           new=article_utils._get_article_export_folders)
+    @patch.object(file_exporter.ExportFileCreation, 'get_submission_partner_code', new=_get_submission_partner_code)
+    @patch.object(file_exporter.ExportFileCreation, 'get_license_code', new=_get_license_code)
+    @patch.object(file_exporter.ExportFileCreation, 'get_journal_code', new=_get_journal_code)
+    @patch.object(file_exporter.ExportFileCreation, 'get_compression_policy', new=_get_compression_policy)
+    @patch.object(file_exporter.ExportFileCreation, 'get_jats_builder', new=_get_jats_builder)
+    def test_streamed_export_against_staged_export(self, article: Article) -> None:
+        """
+        Exports the same article through both paths and reports the wall time and bytes written by each.
+        """
+        staged_time, staged_bytes = self.__run_export(article, streaming=False)
+        streamed_time, streamed_bytes = self.__run_export(article, streaming=True)
+
+        print("")
+        print(f"Staged export:   {staged_time * 1000:.2f} ms/export, {staged_bytes} bytes written")
+        print(f"Streamed export: {streamed_time * 1000:.2f} ms/export, {streamed_bytes} bytes written")
+
+        self.assertLess(streamed_bytes, staged_bytes)
+
+    @staticmethod
+    def __run_export(article: Article, streaming: bool) -> tuple[float, int]:
+        """
+        Exports the given article several times.
+        :param article: The article to export.
+        :param streaming: True to use the streamed export path, False to use the staged one.
+        :return: The mean wall time in seconds and the mean number of bytes written per export.
+        """
+        total_time: float = 0
+        total_bytes: int = 0
+        for _ in range(BENCHMARK_ROUNDS):
+            start = time.perf_counter()
+            exporter = file_exporter.ExportFileCreation(article.journal.code, article.pk, streaming=streaming)
+            total_time += time.perf_counter() - start
+            total_bytes += exporter.bytes_written
+
+        return total_time / BENCHMARK_ROUNDS, total_bytes // BENCHMARK_ROUNDS
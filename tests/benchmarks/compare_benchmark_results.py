@@ -0,0 +1,67 @@
+"""
+Compares two result files written by benchmark_export_pipeline and flags regressions.
+
+Run it with:
+python compare_benchmark_results.py baseline.json candidate.json [--threshold 0.1]
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import argparse
+import json
+import sys
+from typing import List
+
+# The measurements compared, all of which are better when lower.
+METRICS = ("median_seconds", "queries", "bytes_written", "peak_traced_bytes")
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> List[str]:
+    """
+    Compares the results of two benchmark runs.
+    :param baseline: The results to compare against.
+    :param candidate: The new results.
+    :param threshold: The relative increase counted as a regression, e.g. 0.1 for 10%.
+    :return: A description of each regression.
+    """
+    regressions: List[str] = []
+    for corpus, candidate_result in sorted(candidate["results"].items()):
+        baseline_result: dict | None = baseline["results"].get(corpus)
+        if baseline_result is None:
+            print("{0}: not in the baseline.".format(corpus))
+            continue
+
+        for metric in METRICS:
+            before, after = baseline_result.get(metric), candidate_result.get(metric)
+            if before is None or after is None:
+                continue
+            change: float = (after - before) / before if before else 0.0
+            print("{0} {1}: {2} -> {3} ({4:+.1%})".format(corpus, metric, before, after, change))
+            if change > threshold:
+                regressions.append("{0} {1} rose by {2:.1%}".format(corpus, metric, change))
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compares two export pipeline benchmark result files.")
+    parser.add_argument("baseline", help="The results to compare against.")
+    parser.add_argument("candidate", help="The new results.")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="The relative increase counted as a regression.")
+    arguments = parser.parse_args()
+
+    with open(arguments.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    with open(arguments.candidate, encoding="utf-8") as file:
+        candidate = json.load(file)
+
+    print("Comparing {0} against {1}.".format(candidate.get("commit"), baseline.get("commit")))
+    regressions = compare(baseline, candidate, arguments.threshold)
+    for regression in regressions:
+        print("Regression: {0}".format(regression))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
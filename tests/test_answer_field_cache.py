@@ -0,0 +1,93 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+from typing import List
+
+import hypothesis.strategies as hypothesis_strategies
+from django.core.cache import cache
+from hypothesis import given, settings, HealthCheck
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.signals  # noqa: F401
+import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.utils.data_fetch import fetch_answer_fields_for_jats, \
+    fetch_answer_fields_for_jats_bulk
+from plugins.editorial_manager_transfer_service.utils.interfaces.JATSAnswerField import JATSAnswerField
+from submission.models import Article, FieldAnswer
+
+
+class TestAnswerFieldCache(TestCase):
+    def setUp(self):
+        """
+        Sets up the settings the articles need.
+        """
+        article_utils.database_crafter_do_preqs()
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_cached_as_plain_tuples(self, article: Article) -> None:
+        """
+        Tests the answer fields are cached as plain tuples and read back without queries.
+        """
+        cache.clear()
+        answer_fields: List[JATSAnswerField] = fetch_answer_fields_for_jats(article)
+        expected = [JATSAnswerField(answer.field.slug, answer.field.name, answer.answer)
+                    for answer in FieldAnswer.objects.filter(article=article).order_by("pk")]
+        self.assertEqual(expected, answer_fields)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(expected, fetch_answer_fields_for_jats(article))
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_articles_without_answers_are_cached(self, article: Article) -> None:
+        """
+        Tests an article without answers is cached, rather than read from the database every time.
+        """
+        FieldAnswer.objects.filter(article=article).delete()
+        cache.clear()
+        self.assertEqual([], fetch_answer_fields_for_jats(article))
+
+        with self.assertNumQueries(0):
+            self.assertEqual([], fetch_answer_fields_for_jats(article))
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_saving_an_answer_invalidates(self, article: Article) -> None:
+        """
+        Tests saving or deleting an answer drops the cached answer fields of its article.
+        """
+        cache.clear()
+        fetch_answer_fields_for_jats(article)
+
+        answer: FieldAnswer | None = FieldAnswer.objects.filter(article=article).first()
+        if answer is not None:
+            answer.answer = "A changed answer"
+            answer.save()
+            self.assertIn("A changed answer", [field.answer for field in fetch_answer_fields_for_jats(article)])
+
+            answer.delete()
+            self.assertNotIn("A changed answer", [field.answer for field in fetch_answer_fields_for_jats(article)])
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(articles=hypothesis_strategies.lists(article_utils.create_article(), min_size=2, max_size=3,
+                                                unique_by=lambda article: article.pk))
+    def test_bulk_reads_only_missing_articles(self, articles: List[Article]) -> None:
+        """
+        Tests the bulk fetch reads every cached article at once and queries only the missing ones.
+        """
+        cache.clear()
+        fetch_answer_fields_for_jats(articles[0])
+
+        with self.assertNumQueries(1):
+            answer_fields = fetch_answer_fields_for_jats_bulk(articles)
+        for article in articles:
+            self.assertEqual(fetch_answer_fields_for_jats(article, fetch_fresh=True), answer_fields[article.pk])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(answer_fields, fetch_answer_fields_for_jats_bulk(articles))
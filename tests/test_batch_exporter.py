@@ -0,0 +1,100 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import os
+from typing import List
+from unittest.mock import patch
+
+import hypothesis.strategies as hypothesis_strategies
+from hypothesis import given, settings, HealthCheck
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.batch_exporter import BatchExportFileCreation
+from plugins.editorial_manager_transfer_service.models import TransferLogs, TransferReport
+from plugins.editorial_manager_transfer_service.utils.settings import ExportSettings
+from submission.models import Article
+
+
+def _get_export_settings(journal, fetch_fresh: bool = False) -> ExportSettings:
+    return ExportSettings(submission_partner_code="SUBMISSION_PARTNER", license_code="LCODE",
+                          journal_code="JOURNAL_CODE")
+
+
+class TestBatchExport(TestCase):
+    def setUp(self):
+        """
+        Sets up the export folder structure.
+        """
+        article_utils.database_crafter_do_preqs()
+        if not os.path.exists(article_utils._get_article_export_folders()):
+            try:
+                os.makedirs(article_utils._get_article_export_folders())
+            except FileExistsError:
+                pass
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(articles=hypothesis_strategies.lists(article_utils.create_article(), min_size=2, max_size=3))
+    @patch('plugins.editorial_manager_transfer_service.file_exporter.get_article_export_folders',
+           new=article_utils._get_article_export_folders)
+    @patch('plugins.editorial_manager_transfer_service.batch_exporter.get_export_settings', new=_get_export_settings)
+    @patch('plugins.editorial_manager_transfer_service.file_exporter.get_export_settings', new=_get_export_settings)
+    @patch('plugins.editorial_manager_transfer_service.utils.settings.get_export_settings', new=_get_export_settings)
+    def test_batch_export(self, articles: List[Article]) -> None:
+        """
+        Tests every article in a batch gets its own zip and go file and report, and missing articles are skipped.
+        """
+        journal = articles[0].journal
+        Article.objects.filter(pk__in=[article.pk for article in articles]).update(journal=journal)
+        article_ids = [article.pk for article in articles]
+        missing_article_id = max(article_ids) + 1000
+
+        batch = BatchExportFileCreation(journal.code, article_ids + [missing_article_id])
+        self.assertFalse(batch.in_error_state)
+        self.assertEqual([missing_article_id], batch.missing_article_ids)
+
+        filepaths = batch.get_filepaths()
+        self.assertEqual((None, None), filepaths[missing_article_id])
+        for article_id in article_ids:
+            zip_filepath, go_filepath = filepaths[article_id]
+            self.assertTrue(os.path.exists(zip_filepath))
+            self.assertTrue(os.path.exists(go_filepath))
+            self.assertEqual(1, TransferReport.objects.filter(journal=journal, article_id=article_id,
+                                                              resolved=False).count())
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(articles=hypothesis_strategies.lists(article_utils.create_article(), min_size=3, max_size=3))
+    @patch('plugins.editorial_manager_transfer_service.file_exporter.get_article_export_folders',
+           new=article_utils._get_article_export_folders)
+    @patch('plugins.editorial_manager_transfer_service.batch_exporter.get_export_settings', new=_get_export_settings)
+    @patch('plugins.editorial_manager_transfer_service.file_exporter.get_export_settings', new=_get_export_settings)
+    @patch('plugins.editorial_manager_transfer_service.utils.settings.get_export_settings', new=_get_export_settings)
+    def test_batch_export_missing_file(self, articles: List[Article]) -> None:
+        """
+        Tests an article whose file is missing fails on its own, leaving no temp folder, while the rest of the batch
+        is exported and every log is written.
+        """
+        journal = articles[0].journal
+        Article.objects.filter(pk__in=[article.pk for article in articles]).update(journal=journal)
+        article_ids = [article.pk for article in articles]
+        broken_article = articles[1]
+        os.remove(broken_article.manuscript_files.first().get_file_path(broken_article))
+
+        batch = BatchExportFileCreation(journal.code, article_ids)
+        self.assertFalse(batch.in_error_state)
+
+        broken_export = batch.exports[broken_article.pk]
+        self.assertTrue(broken_export.in_error_state)
+        self.assertFalse(os.path.exists(os.path.join(broken_export.export_folder, broken_export.prefix)))
+        self.assertFalse(os.path.exists(broken_export.zip_filepath))
+        self.assertTrue(TransferLogs.objects.filter(report=broken_export.transfer_report, success=False).exists())
+
+        for article_id in (articles[0].pk, articles[2].pk):
+            export = batch.exports[article_id]
+            self.assertFalse(export.in_error_state)
+            self.assertTrue(os.path.exists(export.get_zip_filepath()))
+            self.assertTrue(os.path.exists(export.get_go_filepath()))
+            self.assertTrue(TransferLogs.objects.filter(report=export.transfer_report, success=True).exists())
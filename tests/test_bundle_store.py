@@ -0,0 +1,65 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import os
+import shutil
+
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.utils.bundle_store import ExportBundleStore
+from plugins.editorial_manager_transfer_service.utils.interfaces.ExportBundle import ExportBundle
+
+BUNDLE_SIZE = 1024
+
+
+class TestExportBundleStore(TestCase):
+    def setUp(self):
+        """
+        Sets up an empty bundle store within the export folder.
+        """
+        self.folder = os.path.join(article_utils._get_article_export_folders(), "test_bundles")
+        shutil.rmtree(self.folder, ignore_errors=True)
+        os.makedirs(self.folder)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_checkout_returns_stored_bundle(self):
+        """
+        Tests a stored archive is placed at the new path along with its entry names.
+        """
+        store = ExportBundleStore(os.path.join(self.folder, "store"))
+        store.put("key", ExportBundle(self.__write_bundle("original.zip"), "metadata.xml", ["figure.png"]))
+
+        bundle = store.checkout("key", os.path.join(self.folder, "resend.zip"))
+        self.assertIsNotNone(bundle)
+        self.assertEqual("metadata.xml", bundle.metadata_filename)
+        self.assertEqual(["figure.png"], bundle.filenames)
+        self.assertEqual(BUNDLE_SIZE, os.path.getsize(bundle.zip_filepath))
+
+        self.assertIsNone(store.checkout("other", os.path.join(self.folder, "other.zip")))
+
+    def test_least_recently_used_bundles_are_evicted(self):
+        """
+        Tests the store is trimmed back to its size limit, evicting the archives used longest ago first.
+        """
+        store = ExportBundleStore(os.path.join(self.folder, "store"), max_bytes=2 * BUNDLE_SIZE)
+        for counter, key in enumerate(("first", "second")):
+            store.put(key, ExportBundle(self.__write_bundle(key + ".zip"), "metadata.xml", []))
+            os.utime(os.path.join(store.folder, key + ".zip"), (counter, counter))
+
+        # Using the first archive makes the second one the least recently used.
+        self.assertIsNotNone(store.checkout("first", os.path.join(self.folder, "resend.zip")))
+        store.put("third", ExportBundle(self.__write_bundle("third.zip"), "metadata.xml", []))
+
+        self.assertIsNotNone(store.checkout("first", os.path.join(self.folder, "first_again.zip")))
+        self.assertIsNone(store.checkout("second", os.path.join(self.folder, "second_again.zip")))
+        self.assertIsNotNone(store.checkout("third", os.path.join(self.folder, "third_again.zip")))
+
+    def __write_bundle(self, filename: str) -> str:
+        filepath = os.path.join(self.folder, filename)
+        with open(filepath, "wb") as bundle_file:
+            bundle_file.write(os.urandom(BUNDLE_SIZE))
+        return filepath
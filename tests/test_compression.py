@@ -0,0 +1,58 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import os
+import zipfile
+
+import hypothesis.strategies as hypothesis_strategies
+from hypothesis import given
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.consts as consts
+import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.utils.compression import CompressionPolicy
+
+
+class TestCompressionPolicy(TestCase):
+    def setUp(self):
+        """
+        Sets up the export folder structure.
+        """
+        if not os.path.exists(article_utils._get_article_export_folders()):
+            try:
+                os.makedirs(article_utils._get_article_export_folders())
+            except FileExistsError:
+                pass
+
+    @given(extension=hypothesis_strategies.sampled_from(sorted(consts.COMPRESSION_PRECOMPRESSED_EXTENSIONS)))
+    def test_precompressed_files_are_stored(self, extension: str):
+        """
+        Tests already-compressed file types are stored without probing them.
+        """
+        filepath = os.path.join(article_utils._get_article_export_folders(), "missing{0}".format(extension))
+        self.assertEqual((zipfile.ZIP_STORED, None), CompressionPolicy().for_file(filepath))
+
+    def test_probe_detects_incompressible_data(self):
+        """
+        Tests the probe stores random data and deflates repetitive data.
+        """
+        policy = CompressionPolicy(consts.COMPRESSION_POLICY_AUTO, 9)
+        self.assertEqual((zipfile.ZIP_STORED, None), policy.for_bytes(os.urandom(consts.COMPRESSION_PROBE_SIZE)))
+        self.assertEqual((zipfile.ZIP_DEFLATED, 9), policy.for_bytes(b"<article></article>" * 1000))
+
+    @given(data=hypothesis_strategies.binary(min_size=1))
+    def test_fixed_policies_ignore_content(self, data: bytes):
+        """
+        Tests the deflate and store policies apply to every entry regardless of content.
+        """
+        self.assertEqual((zipfile.ZIP_DEFLATED, 3), CompressionPolicy(consts.COMPRESSION_POLICY_DEFLATE, 3).for_bytes(data))
+        self.assertEqual((zipfile.ZIP_STORED, None), CompressionPolicy(consts.COMPRESSION_POLICY_STORE).for_bytes(data))
+
+    def test_invalid_settings_fall_back_to_defaults(self):
+        """
+        Tests unknown policies and out of range levels fall back to the defaults.
+        """
+        policy = CompressionPolicy("unknown", 42)
+        self.assertEqual(consts.COMPRESSION_POLICY_AUTO, policy.policy)
+        self.assertEqual(consts.COMPRESSION_LEVEL_DEFAULT, policy.level)
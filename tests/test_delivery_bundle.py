@@ -0,0 +1,127 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import os
+import xml.etree.ElementTree as ElementTree
+import zipfile
+from unittest.mock import patch
+
+from hypothesis import given, settings, HealthCheck
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.consts as consts
+import plugins.editorial_manager_transfer_service.file_exporter as file_exporter
+import plugins.editorial_manager_transfer_service.file_transfer_service as file_transfer_service
+import plugins.editorial_manager_transfer_service.logger_messages as logger_messages
+import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.enums.export_job_state import ExportJobState
+from plugins.editorial_manager_transfer_service.models import ExportJob, TransferLogs, TransferReport
+from plugins.editorial_manager_transfer_service.utils.compression import CompressionPolicy
+from submission.models import Article
+
+
+def _get_submission_partner_code(self):
+    return "SUBMISSION_PARTNER"
+
+
+def _get_license_code(self):
+    return "LCODE"
+
+
+def _get_journal_code(self):
+    return "JOURNAL_CODE"
+
+
+def _get_compression_policy(self):
+    return CompressionPolicy()
+
+
+def _get_jats_builder(self):
+    return consts.JATS_BUILDER_TEMPLATE
+
+
+class TestDeliveryBundle(TestCase):
+    def setUp(self):
+        """
+        Sets up the export folder structure and the plugin settings every export reads.
+        """
+        article_utils.database_crafter_do_preqs()
+        if not os.path.exists(article_utils._get_article_export_folders()):
+            try:
+                os.makedirs(article_utils._get_article_export_folders())
+            except FileExistsError:
+                pass
+
+        for patcher in (
+                patch('plugins.editorial_manager_transfer_service.file_exporter.get_article_export_folders',
+                      new=article_utils._get_article_export_folders),
+                patch.object(file_exporter.ExportFileCreation, 'get_submission_partner_code',
+                             new=_get_submission_partner_code),
+                patch.object(file_exporter.ExportFileCreation, 'get_license_code', new=_get_license_code),
+                patch.object(file_exporter.ExportFileCreation, 'get_journal_code', new=_get_journal_code),
+                patch.object(file_exporter.ExportFileCreation, 'get_compression_policy', new=_get_compression_policy),
+                patch.object(file_exporter.ExportFileCreation, 'get_jats_builder', new=_get_jats_builder),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_bundle_holds_go_file(self, article: Article) -> None:
+        """
+        Tests a delivery bundle is a single archive in the spool folder, listing its own entries in the go file inside.
+        """
+        exporter = file_exporter.ExportFileCreation(article.journal.code, article.pk, delivery_bundle=True)
+        self.assertFalse(exporter.in_error_state)
+        self.assertIsNone(exporter.get_go_filepath())
+        self.assertFalse(exporter.in_error_state)
+
+        zip_filepath = exporter.get_zip_filepath()
+        spool_folder = os.path.join(article_utils._get_article_export_folders(), consts.DELIVERY_SPOOL_FOLDER)
+        self.assertEqual(spool_folder, os.path.dirname(zip_filepath))
+        self.assertFalse(os.path.exists(os.path.join(article_utils._get_article_export_folders(), "{0}{1}".format(
+                exporter.prefix, consts.DELIVERY_BUNDLE_PART_SUFFIX))))
+        self.assertFalse(os.path.exists(os.path.join(article_utils._get_article_export_folders(),
+                                                     "{0}.go.xml".format(exporter.prefix))))
+
+        go_filename = "{0}.go.xml".format(exporter.prefix)
+        with zipfile.ZipFile(zip_filepath) as archive:
+            self.assertIsNone(archive.testzip())
+            root: ElementTree.Element = ElementTree.fromstring(archive.read(go_filename))
+            filegroup: ElementTree.Element = root.find(consts.GO_FILE_ELEMENT_TAG_FILEGROUP)
+            self.assertEqual(os.path.basename(zip_filepath), filegroup.find(
+                    consts.GO_FILE_ELEMENT_TAG_ARCHIVE_FILE).get(consts.GO_FILE_ATTRIBUTE_ELEMENT_NAME_KEY))
+            listed = [filegroup.find(consts.GO_FILE_ELEMENT_TAG_METADATA_FILE).get(
+                    consts.GO_FILE_ATTRIBUTE_ELEMENT_NAME_KEY)]
+            listed += [file.get(consts.GO_FILE_ATTRIBUTE_ELEMENT_NAME_KEY) for file in
+                       filegroup.findall(consts.GO_FILE_ELEMENT_TAG_FILE)]
+            self.assertEqual(sorted(listed + [go_filename]), sorted(archive.namelist()))
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_bundle_delivered_with_one_callback(self, article: Article) -> None:
+        """
+        Tests a delivery bundle is tracked as one job, finished by a single callback and a single log.
+        """
+        journal_code: str = article.journal.code
+        bundle_filepath = file_transfer_service.get_export_bundle_filepath(journal_code, article.pk)
+        self.assertIsNotNone(bundle_filepath)
+        self.assertEqual(bundle_filepath, file_transfer_service.get_export_bundle_filepath(journal_code, article.pk))
+
+        export_job = ExportJob.objects.get(article=article)
+        self.assertTrue(export_job.delivery_bundle)
+        self.assertIsNone(export_job.go_filepath)
+        self.assertEqual(bundle_filepath, export_job.zip_filepath)
+
+        file_transfer_service.FileTransferService._instance = None
+        file_transfer_service.export_success_callback_bundle(journal_code, article.pk)
+        file_transfer_service.export_success_callback_bundle(journal_code, article.pk)
+        self.assertEqual(ExportJobState.DELIVERED, ExportJob.objects.get(pk=export_job.pk).state)
+        self.assertTrue(TransferReport.objects.get(pk=export_job.report_id).resolved)
+        self.assertEqual(1, TransferLogs.objects.filter(
+                report_id=export_job.report_id,
+                message=logger_messages.export_bundle_process_succeeded(article.pk)).count())
+        self.assertFalse(os.path.exists(bundle_filepath))
@@ -0,0 +1,111 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import asyncio
+import os
+from typing import List, Sequence
+from unittest.mock import patch
+
+from hypothesis import given, settings, HealthCheck
+from hypothesis.extra.django import TestCase, TransactionTestCase
+
+import plugins.editorial_manager_transfer_service.consts as consts
+import plugins.editorial_manager_transfer_service.file_exporter as file_exporter
+import plugins.editorial_manager_transfer_service.file_transfer_service as file_transfer_service
+import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.enums.delivery_event_type import DeliveryEventType
+from plugins.editorial_manager_transfer_service.enums.export_job_state import ExportJobState
+from plugins.editorial_manager_transfer_service.models import ExportJob, TransferLogs
+from plugins.editorial_manager_transfer_service.utils.compression import CompressionPolicy
+from plugins.editorial_manager_transfer_service.utils.delivery_queue import DeliveryEventQueue
+from plugins.editorial_manager_transfer_service.utils.interfaces.DeliveryEvent import DeliveryEvent
+from submission.models import Article
+
+
+def _get_submission_partner_code(self):
+    return "SUBMISSION_PARTNER"
+
+
+def _get_license_code(self):
+    return "LCODE"
+
+
+def _get_journal_code(self):
+    return "JOURNAL_CODE"
+
+
+def _get_compression_policy(self):
+    return CompressionPolicy()
+
+
+def _get_jats_builder(self):
+    return consts.JATS_BUILDER_TEMPLATE
+
+
+class TestDeliveryEventQueue(TestCase):
+    def test_events_are_applied_in_batches(self):
+        """
+        Tests queued events are applied in order, in batches no larger than the batch size.
+        """
+        batches: List[List[int]] = []
+
+        def apply(events: Sequence[DeliveryEvent]) -> None:
+            batches.append([event.article_id for event in events])
+
+        async def deliver() -> None:
+            queue = DeliveryEventQueue(apply, batch_size=3, linger=0.5)
+            consumer = asyncio.create_task(queue.consume())
+            for article_id in range(7):
+                await queue.put(DeliveryEvent(DeliveryEventType.GO_FILE_DELIVERED, "JOURNAL", article_id))
+            await queue.join()
+            consumer.cancel()
+
+        asyncio.run(deliver())
+        self.assertEqual([[0, 1, 2], [3, 4, 5], [6]], batches)
+
+
+class TestAsyncCallbacks(TransactionTestCase):
+    def setUp(self):
+        """
+        Sets up the export folder structure.
+        """
+        article_utils.database_crafter_do_preqs()
+        if not os.path.exists(article_utils._get_article_export_folders()):
+            try:
+                os.makedirs(article_utils._get_article_export_folders())
+            except FileExistsError:
+                pass
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    @patch('plugins.editorial_manager_transfer_service.file_exporter.get_article_export_folders',
+           new=article_utils._get_article_export_folders)
+    @patch.object(file_exporter.ExportFileCreation, 'get_submission_partner_code', new=_get_submission_partner_code)
+    @patch.object(file_exporter.ExportFileCreation, 'get_license_code', new=_get_license_code)
+    @patch.object(file_exporter.ExportFileCreation, 'get_journal_code', new=_get_journal_code)
+    @patch.object(file_exporter.ExportFileCreation, 'get_compression_policy', new=_get_compression_policy)
+    @patch.object(file_exporter.ExportFileCreation, 'get_jats_builder', new=_get_jats_builder)
+    def test_async_callbacks(self, article: Article) -> None:
+        """
+        Tests the asynchronous callbacks queue their events and the consumer applies them to the export job.
+        """
+        journal_code: str = article.journal.code
+        zip_filepath = file_transfer_service.get_export_zip_filepath(journal_code, article.pk)
+        export_job = ExportJob.objects.get(article=article)
+
+        async def deliver() -> None:
+            file_transfer_service._delivery_event_queue = None
+            queue = file_transfer_service.get_delivery_event_queue()
+            consumer = asyncio.create_task(queue.consume())
+            await file_transfer_service.export_success_callback_zip_file_async(journal_code, article.pk)
+            await file_transfer_service.export_success_callback_go_file_async(journal_code, article.pk)
+            await file_transfer_service.export_failure_callback_async(journal_code, article.pk, "Too late")
+            await queue.join()
+            consumer.cancel()
+
+        asyncio.run(deliver())
+        self.assertEqual(ExportJobState.DELIVERED, ExportJob.objects.get(pk=export_job.pk).state)
+        self.assertEqual(0, TransferLogs.objects.filter(report_id=export_job.report_id, success=False).count())
+        self.assertFalse(os.path.exists(zip_filepath))
@@ -0,0 +1,164 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import os
+import shutil
+import tempfile
+from typing import List
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from hypothesis import given, settings, HealthCheck
+from hypothesis.extra.django import TestCase
+from lxml import etree
+
+import plugins.editorial_manager_transfer_service.consts as consts
+import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.models import PeopleIdentifier, InstitutionIdentifier
+from plugins.editorial_manager_transfer_service.utils.enrichment import enrich_frozen_authors, people_id_store, \
+    ringgold_id_store, get_institution_name
+from plugins.editorial_manager_transfer_service.utils.identifier_keys import normalize_email, \
+    normalize_institution_name
+from plugins.editorial_manager_transfer_service.utils.institution_index import build_institution_index, \
+    InstitutionIndex
+from plugins.editorial_manager_transfer_service.utils.interfaces.FrozenAuthorForJats import FrozenAuthorForJats
+from plugins.editorial_manager_transfer_service.utils.jats import render_jats_metadata
+from plugins.editorial_manager_transfer_service.utils.settings import ExportSettings
+from plugins.editorial_manager_transfer_service.utils.ttl_cache import TTLCache
+from core.models import OrganizationName
+from submission.models import Article
+
+
+def _get_export_settings(journal, fetch_fresh: bool = False) -> ExportSettings:
+    return ExportSettings(submission_partner_code="SUBMISSION_PARTNER", license_code="LCODE",
+                          journal_code="JOURNAL_CODE")
+
+
+class TestTTLCache(TestCase):
+    def test_least_recently_used_is_evicted(self):
+        """
+        Tests the least recently used entry is evicted once the cache is full.
+        """
+        cache = TTLCache(2, 60)
+        cache.set_many({"a": "1", "b": "2"})
+        cache.get_many(["a"])
+        cache.set_many({"c": "3"})
+        self.assertEqual({"a": "1", "c": "3"}, cache.get_many(["a", "b", "c"]))
+
+    def test_entries_expire(self):
+        """
+        Tests entries, including cached misses, are dropped once they expire.
+        """
+        cache = TTLCache(10, 60)
+        with patch("plugins.editorial_manager_transfer_service.utils.ttl_cache.time.monotonic", return_value=0):
+            cache.set_many({"a": "1"})
+            cache.set_many({"b": None}, ttl=5)
+        with patch("plugins.editorial_manager_transfer_service.utils.ttl_cache.time.monotonic", return_value=10):
+            self.assertEqual({"a": "1"}, cache.get_many(["a", "b"]))
+        self.assertEqual(1, len(cache))
+
+
+class TestEnrichment(TestCase):
+    def setUp(self):
+        """
+        Sets up the settings the articles need and empties the identifier caches.
+        """
+        article_utils.database_crafter_do_preqs()
+        people_id_store.cache.clear()
+        ringgold_id_store.cache.clear()
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(few=article_utils.create_shaped_article(authors=1, affiliations_per_author=1),
+           many=article_utils.create_shaped_article(authors=10, affiliations_per_author=3))
+    def test_queries_do_not_grow_with_authors(self, few: Article, many: Article) -> None:
+        """
+        Tests enriching the authors of an article takes the same number of queries however many authors it has.
+        """
+        few_authors = list(few.frozen_authors_for_jats_contribs())
+        many_authors = list(many.frozen_authors_for_jats_contribs())
+
+        with CaptureQueriesContext(connection) as few_queries:
+            enrich_frozen_authors(few_authors)
+        people_id_store.cache.clear()
+        ringgold_id_store.cache.clear()
+        with CaptureQueriesContext(connection) as many_queries:
+            enriched: List[FrozenAuthorForJats] = enrich_frozen_authors(many_authors)
+        self.assertEqual(len(few_queries), len(many_queries))
+        self.assertEqual(len(many_authors), len(enriched))
+
+        people_id_store.cache.clear()
+        ringgold_id_store.cache.clear()
+        enrich_frozen_authors(many_authors)
+        with self.assertNumQueries(0):
+            enrich_frozen_authors(many_authors)
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_shaped_article(authors=2, affiliations_per_author=1))
+    def test_identifiers_come_from_lookup_tables(self, article: Article) -> None:
+        """
+        Tests the People ID and Ringgold ID saved for an author and an institution are used, and authors without a
+        People ID get none.
+        """
+        frozen_authors = list(article.frozen_authors_for_jats_contribs())
+        author = frozen_authors[0]['author']
+        affiliation = frozen_authors[0]['affiliations'][0]
+        PeopleIdentifier.objects.create(email=normalize_email(author.email), people_id="EM-1")
+        if get_institution_name(affiliation):
+            InstitutionIdentifier.objects.create(name=normalize_institution_name(get_institution_name(affiliation)),
+                                                 ringgold_id="60000")
+
+        enriched: List[FrozenAuthorForJats] = enrich_frozen_authors(frozen_authors)
+        self.assertEqual("EM-1", enriched[0].author.people_id)
+        if get_institution_name(affiliation):
+            self.assertEqual("60000", enriched[0].affiliations[0].ringgold_id)
+        for frozen_author in enriched[1:]:
+            if normalize_email(frozen_author.author.person.email) != normalize_email(author.email):
+                self.assertIsNone(frozen_author.author.people_id)
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_shaped_article(authors=1, affiliations_per_author=1))
+    @patch('plugins.editorial_manager_transfer_service.utils.settings.get_export_settings', new=_get_export_settings)
+    def test_institution_index_ringgold_id(self, article: Article) -> None:
+        """
+        Tests an institution missing from the table gets its Ringgold ID from the institution index, and every builder
+        writes it as the institution ID.
+        """
+        cache.clear()
+        organization = article.frozen_authors_for_jats_contribs()[0]['affiliations'][0].organization
+        OrganizationName.objects.filter(ror_display_for=organization).update(value="University of Oxford")
+        OrganizationName.objects.filter(label_for=organization).update(value="University of Oxford")
+
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        index_path = os.path.join(folder, "institutions.idx")
+        build_institution_index([("6396", ["University of Oxford"])], index_path)
+        index = InstitutionIndex(index_path)
+        self.addCleanup(index.close)
+
+        parser = etree.XMLParser(remove_blank_text=True)
+        with patch('plugins.editorial_manager_transfer_service.utils.institution_index.get_institution_index',
+                   return_value=index):
+            for builder in (consts.JATS_BUILDER_TEMPLATE, consts.JATS_BUILDER_PRECOMPILED, consts.JATS_BUILDER_ETREE):
+                rendered_jats = render_jats_metadata(article.journal, article, builder=builder)
+                root = etree.fromstring(rendered_jats.encode("utf-8"), parser=parser)
+                institution_ids = [institution_id.text.strip() for institution_id in
+                                   root.findall(".//aff/institution-wrap/institution-id")]
+                self.assertEqual(["6396"], institution_ids, builder)
+
+    def test_backfill_stores_resolved_identifiers(self):
+        """
+        Tests a backfill saves what the sources resolve and caches it.
+        """
+        with patch.object(people_id_store, "sources", [lambda emails: {"a@example.com": "EM-2"}]):
+            self.assertEqual({"a@example.com": "EM-2"}, people_id_store.backfill(["a@example.com", "b@example.com"]))
+
+        self.assertEqual("EM-2", PeopleIdentifier.objects.get(email="a@example.com").people_id)
+        with self.assertNumQueries(0):
+            self.assertEqual({"a@example.com": "EM-2"}, people_id_store.resolve(["a@example.com"]))
+        self.assertIsNone(people_id_store.resolve(["b@example.com"])["b@example.com"])
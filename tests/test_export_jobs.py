@@ -0,0 +1,90 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import os
+from unittest.mock import patch
+
+from hypothesis import given, settings, HealthCheck
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.consts as consts
+import plugins.editorial_manager_transfer_service.file_exporter as file_exporter
+import plugins.editorial_manager_transfer_service.file_transfer_service as file_transfer_service
+import plugins.editorial_manager_transfer_service.logger_messages as logger_messages
+import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.enums.export_job_state import ExportJobState
+from plugins.editorial_manager_transfer_service.models import ExportJob, TransferLogs, TransferReport
+from plugins.editorial_manager_transfer_service.utils.compression import CompressionPolicy
+from submission.models import Article
+
+
+def _get_submission_partner_code(self):
+    return "SUBMISSION_PARTNER"
+
+
+def _get_license_code(self):
+    return "LCODE"
+
+
+def _get_journal_code(self):
+    return "JOURNAL_CODE"
+
+
+def _get_compression_policy(self):
+    return CompressionPolicy()
+
+
+def _get_jats_builder(self):
+    return consts.JATS_BUILDER_TEMPLATE
+
+
+class TestExportJobs(TestCase):
+    def setUp(self):
+        """
+        Sets up the export folder structure.
+        """
+        article_utils.database_crafter_do_preqs()
+        if not os.path.exists(article_utils._get_article_export_folders()):
+            try:
+                os.makedirs(article_utils._get_article_export_folders())
+            except FileExistsError:
+                pass
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    @patch('plugins.editorial_manager_transfer_service.file_exporter.get_article_export_folders',
+           new=article_utils._get_article_export_folders)
+    @patch.object(file_exporter.ExportFileCreation, 'get_submission_partner_code', new=_get_submission_partner_code)
+    @patch.object(file_exporter.ExportFileCreation, 'get_license_code', new=_get_license_code)
+    @patch.object(file_exporter.ExportFileCreation, 'get_journal_code', new=_get_journal_code)
+    @patch.object(file_exporter.ExportFileCreation, 'get_compression_policy', new=_get_compression_policy)
+    @patch.object(file_exporter.ExportFileCreation, 'get_jats_builder', new=_get_jats_builder)
+    def test_callbacks_from_another_worker(self, article: Article) -> None:
+        """
+        Tests callbacks resolve the export job even when the process which bundled it is gone, and only once.
+        """
+        journal_code: str = article.journal.code
+        zip_filepath = file_transfer_service.get_export_zip_filepath(journal_code, article.pk)
+        self.assertIsNotNone(zip_filepath)
+        self.assertEqual(zip_filepath, file_transfer_service.get_export_zip_filepath(journal_code, article.pk))
+
+        export_job = ExportJob.objects.get(article=article)
+        self.assertEqual(ExportJobState.BUNDLED, export_job.state)
+        self.assertEqual(zip_filepath, export_job.zip_filepath)
+
+        # A fresh service stands in for a different worker process.
+        file_transfer_service.FileTransferService._instance = None
+        file_transfer_service.export_success_callback_zip_file(journal_code, article.pk)
+        file_transfer_service.export_success_callback_zip_file(journal_code, article.pk)
+        self.assertEqual(ExportJobState.ZIP_FILE_DELIVERED, ExportJob.objects.get(pk=export_job.pk).state)
+        self.assertTrue(TransferReport.objects.get(pk=export_job.report_id).resolved)
+        self.assertEqual(1, TransferLogs.objects.filter(
+                report_id=export_job.report_id,
+                message=logger_messages.export_zip_file_process_succeeded(article.pk)).count())
+
+        file_transfer_service.FileTransferService._instance = None
+        file_transfer_service.export_success_callback_go_file(journal_code, article.pk)
+        self.assertEqual(ExportJobState.DELIVERED, ExportJob.objects.get(pk=export_job.pk).state)
+        self.assertIsNone(file_transfer_service.FileTransferService().get_export_job(journal_code, article.pk))
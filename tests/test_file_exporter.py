@@ -5,14 +5,22 @@ __maintainer__ = "The Public Library of Science (PLOS)"
 import os
 import shutil
 import xml.etree.ElementTree as ElementTree
+import zipfile
 from unittest.mock import patch
 
+from django.core.cache import cache
 from hypothesis import given, settings, HealthCheck
 from hypothesis.extra.django import TestCase
+from lxml import etree
 
 import plugins.editorial_manager_transfer_service.consts as consts
 import plugins.editorial_manager_transfer_service.file_exporter as file_exporter
+import plugins.editorial_manager_transfer_service.file_transfer_service as file_transfer_service
 import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.models import TransferLogs, TransferReport
+from plugins.editorial_manager_transfer_service.utils.compression import CompressionPolicy
+from plugins.editorial_manager_transfer_service.utils.go_file import GoFileWriter
+from plugins.editorial_manager_transfer_service.utils.stage_metrics import render_stage_metrics
 from submission.models import Article
 
 
@@ -28,6 +36,26 @@ def _get_journal_code(self):
     return "JOURNAL_CODE"
 
 
+def _get_compression_policy(self):
+    return CompressionPolicy()
+
+
+def _get_store_compression_policy(self):
+    return CompressionPolicy(consts.COMPRESSION_POLICY_STORE)
+
+
+def _get_jats_builder(self):
+    return consts.JATS_BUILDER_TEMPLATE
+
+
+def _get_etree_jats_builder(self):
+    return consts.JATS_BUILDER_ETREE
+
+
+def _fail_writing_jats_tree(context, stream):
+    raise etree.SerialisationError("Failed writing the metadata.")
+
+
 settings.register_profile("single_run", max_examples=1)
 settings.load_profile("single_run")
 
@@ -35,7 +63,7 @@ settings.load_profile("single_run")
 class TestFileCreation(TestCase):
     def setUp(self):
         """
-        Sets up the export folder structure.
+        Sets up the export folder structure and the plugin settings every export reads.
         """
         article_utils.database_crafter_do_preqs()
         if not os.path.exists(article_utils._get_article_export_folders()):
@@ -44,6 +72,19 @@ class TestFileCreation(TestCase):
             except FileExistsError:
                 pass
 
+        for patcher in (
+                patch('plugins.editorial_manager_transfer_service.file_exporter.get_article_export_folders',
+                      new=article_utils._get_article_export_folders),
+                patch.object(file_exporter.ExportFileCreation, 'get_submission_partner_code',
+                             new=_get_submission_partner_code),
+                patch.object(file_exporter.ExportFileCreation, 'get_license_code', new=_get_license_code),
+                patch.object(file_exporter.ExportFileCreation, 'get_journal_code', new=_get_journal_code),
+                patch.object(file_exporter.ExportFileCreation, 'get_compression_policy', new=_get_compression_policy),
+                patch.object(file_exporter.ExportFileCreation, 'get_jats_builder', new=_get_jats_builder),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
     def tearDown(self):
         """
         Tears down after each test to ensure each test is unique.
@@ -54,11 +95,6 @@ class TestFileCreation(TestCase):
     @settings(max_examples=1, derandomize=False, deadline=None,
               suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
     @given(article=article_utils.create_article())
-    @patch('plugins.editorial_manager_transfer_service.file_exporter.get_article_export_folders',
-           new=article_utils._get_article_export_folders)
-    @patch.object(file_exporter.ExportFileCreation, 'get_submission_partner_code', new=_get_submission_partner_code)
-    @patch.object(file_exporter.ExportFileCreation, 'get_license_code', new=_get_license_code)
-    @patch.object(file_exporter.ExportFileCreation, 'get_journal_code', new=_get_journal_code)
     def test_regular_article_creation_process(self, article: Article) -> None:
         """
         Tests a basic end to end use case of exporting articles.
@@ -76,6 +112,221 @@ class TestFileCreation(TestCase):
         count = article.data_figure_files.count() + article.manuscript_files.count()
         self.__check_go_file(exporter.get_go_filepath(), count)
 
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_streamed_archive_contents(self, article: Article) -> None:
+        """
+        Tests the streamed archive holds the metadata and every file listed in the go file, without a temp folder.
+        """
+        exporter = file_exporter.ExportFileCreation(article.journal.code, article.pk, streaming=True)
+        zip_filepath = exporter.get_zip_filepath()
+        self.assertIsNotNone(zip_filepath)
+        self.assertFalse(os.path.exists(zip_filepath[:-len(".zip")]))
+
+        root: ElementTree.Element = ElementTree.parse(exporter.get_go_filepath()).getroot()
+        filegroup: ElementTree.Element = root.find(consts.GO_FILE_ELEMENT_TAG_FILEGROUP)
+        metadata_filename = filegroup.find(consts.GO_FILE_ELEMENT_TAG_METADATA_FILE).get(
+                consts.GO_FILE_ATTRIBUTE_ELEMENT_NAME_KEY)
+        filenames = [file.get(consts.GO_FILE_ATTRIBUTE_ELEMENT_NAME_KEY) for file in
+                     filegroup.findall(consts.GO_FILE_ELEMENT_TAG_FILE)]
+
+        with zipfile.ZipFile(zip_filepath) as archive:
+            self.assertEqual(sorted([metadata_filename] + filenames), sorted(archive.namelist()))
+            self.assertIsNone(archive.testzip())
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    @patch.object(file_exporter.ExportFileCreation, 'get_compression_policy', new=_get_store_compression_policy)
+    def test_staged_archive_compression_policy(self, article: Article) -> None:
+        """
+        Tests the staged archive is written with the journal's compression policy and its statistics are logged.
+        """
+        exporter = file_exporter.ExportFileCreation(article.journal.code, article.pk)
+        self.assertFalse(exporter.in_error_state)
+
+        with zipfile.ZipFile(exporter.get_zip_filepath()) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertTrue(all(info.compress_type == zipfile.ZIP_STORED for info in archive.infolist()))
+        self.assertTrue(TransferLogs.objects.filter(
+                report=exporter.transfer_report, success=True,
+                message__contains='"{0}" compression policy'.format(consts.COMPRESSION_POLICY_STORE)).exists())
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_staged_go_file_is_deterministic(self, article: Article) -> None:
+        """
+        Tests the staged export writes its go file with the go file writer, listing the archive's own entries.
+        """
+        exporter = file_exporter.ExportFileCreation(article.journal.code, article.pk)
+        self.assertFalse(exporter.in_error_state)
+
+        with zipfile.ZipFile(exporter.get_zip_filepath()) as archive:
+            entries = archive.namelist()
+        with GoFileWriter(None, _get_journal_code(None), exporter.get_export_settings().xml_license_code,
+                          os.path.basename(exporter.get_zip_filepath())) as expected:
+            expected.add_metadata_file(entries[0])
+            for entry in entries[1:]:
+                expected.add_file(entry)
+            expected.close()
+            with open(exporter.get_go_filepath(), "rb") as go_file:
+                self.assertEqual(expected.getvalue(), go_file.read())
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    @patch.object(file_exporter.ExportFileCreation, 'get_compression_policy', new=_get_store_compression_policy)
+    def test_export_job_resend(self, article: Article) -> None:
+        """
+        Tests an export created through the file transfer service, and its resend after a failed delivery, use the
+        compression policy, the go file writer and the bundle store.
+        """
+        journal_code: str = article.journal.code
+        file_transfer_service.FileTransferService._instance = None
+        service = file_transfer_service.FileTransferService()
+
+        export_job = service.get_export_job(journal_code, article.pk, can_create=True)
+        self.assertIsNotNone(export_job)
+        with zipfile.ZipFile(export_job.zip_filepath) as archive:
+            self.assertTrue(all(info.compress_type == zipfile.ZIP_STORED for info in archive.infolist()))
+            entries = archive.namelist()
+        self.assertEqual(entries[0], self.__get_metadata_filename(export_job.go_filepath))
+
+        # Editorial Manager rejected the files, so they are deleted and the article is sent again.
+        file_transfer_service.export_failure_callback(journal_code, article.pk, "Rejected at SFTP")
+        self.assertFalse(os.path.exists(export_job.zip_filepath))
+        resent_job = service.get_export_job(journal_code, article.pk, can_create=True)
+        self.assertIsNotNone(resent_job)
+        self.assertNotEqual(export_job.pk, resent_job.pk)
+
+        with zipfile.ZipFile(resent_job.zip_filepath) as archive:
+            self.assertEqual(entries, archive.namelist())
+        self.assertEqual(entries[0], self.__get_metadata_filename(resent_job.go_filepath))
+        self.assertEqual(1, TransferLogs.objects.filter(report=resent_job.report, success=True,
+                                                        message__startswith="Export process reused").count())
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_resend_reuses_bundle(self, article: Article) -> None:
+        """
+        Tests exporting an unchanged article again reuses the archive and only writes a new go file.
+        """
+        first_exporter = file_exporter.ExportFileCreation(article.journal.code, article.pk, streaming=True)
+        second_exporter = file_exporter.ExportFileCreation(article.journal.code, article.pk, streaming=True)
+        self.assertFalse(second_exporter.in_error_state)
+
+        self.assertNotEqual(first_exporter.get_zip_filepath(), second_exporter.get_zip_filepath())
+        self.assertNotEqual(first_exporter.get_go_filepath(), second_exporter.get_go_filepath())
+        with open(first_exporter.get_zip_filepath(), "rb") as first_zip, \
+                open(second_exporter.get_zip_filepath(), "rb") as second_zip:
+            self.assertEqual(first_zip.read(), second_zip.read())
+
+        # The reused archive comes from the bundle store, so its metadata keeps the name it was written with.
+        first_metadata_filename = self.__get_metadata_filename(first_exporter.get_go_filepath())
+        metadata_filename = self.__get_metadata_filename(second_exporter.get_go_filepath())
+        self.assertEqual(first_metadata_filename, metadata_filename)
+        with zipfile.ZipFile(second_exporter.get_zip_filepath()) as archive:
+            self.assertIn(metadata_filename, archive.namelist())
+            self.assertTrue(archive.read(metadata_filename).startswith(b"<?xml"))
+
+        self.assertTrue(TransferLogs.objects.filter(report=second_exporter.transfer_report, success=True,
+                                                    message__startswith="Export process reused").exists())
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_staged_resend_reuses_bundle(self, article: Article) -> None:
+        """
+        Tests the staged export stores its archive for reuse, and a staged resend of the unchanged article reuses it.
+        """
+        first_exporter = file_exporter.ExportFileCreation(article.journal.code, article.pk)
+        second_exporter = file_exporter.ExportFileCreation(article.journal.code, article.pk)
+        self.assertFalse(second_exporter.in_error_state)
+
+        with open(first_exporter.get_zip_filepath(), "rb") as first_zip, \
+                open(second_exporter.get_zip_filepath(), "rb") as second_zip:
+            self.assertEqual(first_zip.read(), second_zip.read())
+        self.assertEqual(self.__get_metadata_filename(first_exporter.get_go_filepath()),
+                         self.__get_metadata_filename(second_exporter.get_go_filepath()))
+
+        # Both exports share the unresolved report, and only the resend reused an archive.
+        self.assertEqual(1, TransferLogs.objects.filter(report=second_exporter.transfer_report, success=True,
+                                                        message__startswith="Export process reused").count())
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    @patch('plugins.editorial_manager_transfer_service.file_exporter.write_jats_tree', new=_fail_writing_jats_tree)
+    @patch.object(file_exporter.ExportFileCreation, 'get_jats_builder', new=_get_etree_jats_builder)
+    def test_failed_stream_leaves_no_files(self, article: Article) -> None:
+        """
+        Tests an error other than a ValueError while streaming the archive still deletes the partial archive and
+        go file.
+        """
+        # The metadata must be written rather than read from the cache.
+        cache.clear()
+        for delivery_bundle in (False, True):
+            exporter = file_exporter.ExportFileCreation(article.journal.code, article.pk, streaming=True,
+                                                        delivery_bundle=delivery_bundle)
+            self.assertTrue(exporter.in_error_state)
+            self.assertIsNone(exporter.get_go_filepath())
+            self.assertFalse(os.path.exists(exporter.zip_filepath))
+            self.assertFalse(os.path.exists(os.path.join(exporter.export_folder,
+                                                         "{0}.go.xml".format(exporter.prefix))))
+            self.assertFalse(os.path.exists(os.path.join(exporter.export_folder, "{0}{1}".format(
+                    exporter.prefix, consts.DELIVERY_BUNDLE_PART_SUFFIX))))
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_stage_timings(self, article: Article) -> None:
+        """
+        Tests the time and bytes of each export stage are recorded on the transfer report and exposed as metrics.
+        """
+        exporter = file_exporter.ExportFileCreation(article.journal.code, article.pk)
+        stage_timings = TransferReport.objects.get(pk=exporter.transfer_report.pk).stage_timings
+
+        for stage in (consts.EXPORT_STAGE_MANIFEST, consts.EXPORT_STAGE_JATS, consts.EXPORT_STAGE_ARCHIVE,
+                      consts.EXPORT_STAGE_GO_FILE):
+            self.assertIn(stage, stage_timings)
+            self.assertGreaterEqual(stage_timings[stage]["seconds"], 0)
+        self.assertEqual(os.path.getsize(exporter.get_go_filepath()),
+                         stage_timings[consts.EXPORT_STAGE_GO_FILE]["bytes"])
+        self.assertEqual(os.path.getsize(exporter.get_zip_filepath()),
+                         stage_timings[consts.EXPORT_STAGE_ARCHIVE]["bytes"])
+
+        metrics = render_stage_metrics([article.journal])
+        self.assertIn('emts_export_stage_seconds_count{{journal="{0}",stage="{1}"}} 1'.format(
+                article.journal.code, consts.EXPORT_STAGE_JATS), metrics)
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_resend_adds_stage_timings(self, article: Article) -> None:
+        """
+        Tests a resend reusing the transfer report adds its stage timings to those of the first attempt.
+        """
+        first_exporter = file_exporter.ExportFileCreation(article.journal.code, article.pk)
+        second_exporter = file_exporter.ExportFileCreation(article.journal.code, article.pk)
+        self.assertEqual(first_exporter.transfer_report.pk, second_exporter.transfer_report.pk)
+
+        stage_timings = TransferReport.objects.get(pk=second_exporter.transfer_report.pk).stage_timings
+        self.assertEqual(os.path.getsize(first_exporter.get_go_filepath()) +
+                         os.path.getsize(second_exporter.get_go_filepath()),
+                         stage_timings[consts.EXPORT_STAGE_GO_FILE]["bytes"])
+        self.assertEqual(os.path.getsize(first_exporter.get_zip_filepath()) +
+                         os.path.getsize(second_exporter.get_zip_filepath()),
+                         stage_timings[consts.EXPORT_STAGE_ARCHIVE]["bytes"])
+
+    @staticmethod
+    def __get_metadata_filename(go_filepath: str) -> str:
+        root: ElementTree.Element = ElementTree.parse(go_filepath).getroot()
+        return root.find(consts.GO_FILE_ELEMENT_TAG_FILEGROUP).find(consts.GO_FILE_ELEMENT_TAG_METADATA_FILE).get(
+                consts.GO_FILE_ATTRIBUTE_ELEMENT_NAME_KEY)
+
     def __check_go_file(self, go_filepath: str, number_of_files: int) -> None:
         if not os.path.exists(go_filepath):
             self.fail("Go_filepath {} does not exist".format(go_filepath))
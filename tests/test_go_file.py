@@ -0,0 +1,114 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import hashlib
+import os
+import shutil
+import tempfile
+import xml.etree.ElementTree as ETree
+from typing import List
+
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.consts as consts
+from plugins.editorial_manager_transfer_service.utils.go_file import GoFileWriter, write_go_file
+
+JOURNAL_CODE = "JOURNAL"
+LICENSE_CODE = "CC BY \"4.0\" & <more>"
+ARCHIVE_FILENAME = "PARTNER_1234.zip"
+METADATA_FILENAME = "article.xml"
+FILENAMES = ["manuscript.docx", "figure 1 & 2.tif", "données.csv"]
+
+
+def _build_element_tree(metadata_filename: str, filenames: List[str]) -> ETree.Element:
+    """
+    Builds the go file as an element tree, the way go files were written before the streaming writer.
+    """
+    go = ETree.Element(consts.GO_FILE_ELEMENT_TAG_GO)
+    go.set(consts.GO_FILE_GO_ELEMENT_ATTRIBUTE_XMLNS_XSI_KEY, consts.GO_FILE_GO_ELEMENT_ATTRIBUTE_XMLNS_XSI_VALUE)
+    go.set(consts.GO_FILE_GO_ELEMENT_ATTRIBUTE_SCHEMA_LOCATION_KEY,
+           consts.GO_FILE_GO_ELEMENT_ATTRIBUTE_SCHEMA_LOCATION_VALUE)
+    header = ETree.SubElement(go, consts.GO_FILE_ELEMENT_TAG_HEADER)
+    ETree.SubElement(header, consts.GO_FILE_ELEMENT_TAG_VERSION).set(
+            consts.GO_FILE_VERSION_ELEMENT_ATTRIBUTE_NUMBER_KEY, consts.GO_FILE_VERSION_ELEMENT_ATTRIBUTE_NUMBER_VALUE)
+    ETree.SubElement(header, consts.GO_FILE_ELEMENT_TAG_JOURNAL).set(consts.GO_FILE_JOURNAL_ELEMENT_ATTRIBUTE_CODE_KEY,
+                                                                     JOURNAL_CODE)
+    ETree.SubElement(header, consts.GO_FILE_ELEMENT_TAG_IMPORT_TYPE).set(
+            consts.GO_FILE_IMPORT_TYPE_ELEMENT_ATTRIBUTE_ID_KEY, consts.GO_FILE_IMPORT_TYPE_ELEMENT_ATTRIBUTE_ID_VALUE)
+    parameter = ETree.SubElement(ETree.SubElement(header, consts.GO_FILE_ELEMENT_TAG_PARAMETERS),
+                                 consts.GO_FILE_ELEMENT_TAG_PARAMETER)
+    parameter.set(consts.GO_FILE_ATTRIBUTE_ELEMENT_NAME_KEY, consts.GO_FILE_PARAMETER_ELEMENT_NAME_VALUE)
+    parameter.set(consts.GO_FILE_PARAMETER_ELEMENT_VALUE_KEY, LICENSE_CODE)
+
+    filegroup = ETree.SubElement(go, consts.GO_FILE_ELEMENT_TAG_FILEGROUP)
+    ETree.SubElement(filegroup, consts.GO_FILE_ELEMENT_TAG_ARCHIVE_FILE).set(consts.GO_FILE_ATTRIBUTE_ELEMENT_NAME_KEY,
+                                                                             ARCHIVE_FILENAME)
+    ETree.SubElement(filegroup, consts.GO_FILE_ELEMENT_TAG_METADATA_FILE).set(
+            consts.GO_FILE_ATTRIBUTE_ELEMENT_NAME_KEY, metadata_filename)
+    for filename in filenames:
+        ETree.SubElement(filegroup, consts.GO_FILE_ELEMENT_TAG_FILE).set(consts.GO_FILE_ATTRIBUTE_ELEMENT_NAME_KEY,
+                                                                         filename)
+    return go
+
+
+class TestGoFile(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def assertSameElement(self, expected: ETree.Element, actual: ETree.Element) -> None:
+        self.assertEqual(expected.tag, actual.tag)
+        self.assertEqual(expected.attrib, actual.attrib)
+        self.assertEqual((expected.text or "").strip(), (actual.text or "").strip())
+        self.assertEqual(len(expected), len(actual), expected.tag)
+        for expected_child, actual_child in zip(expected, actual):
+            self.assertSameElement(expected_child, actual_child)
+
+    def test_matches_element_tree(self):
+        """
+        Tests the streamed go file has the same structure as the element tree it replaces.
+        """
+        legacy_filepath = os.path.join(self.folder, "legacy.go.xml")
+        ETree.ElementTree(_build_element_tree(METADATA_FILENAME, FILENAMES)).write(legacy_filepath)
+
+        go_filepath = os.path.join(self.folder, "streamed.go.xml")
+        with GoFileWriter(go_filepath, JOURNAL_CODE, LICENSE_CODE, ARCHIVE_FILENAME) as go_file:
+            go_file.add_metadata_file(METADATA_FILENAME)
+            for filename in FILENAMES:
+                go_file.add_file(filename)
+
+        self.assertSameElement(ETree.parse(legacy_filepath).getroot(), ETree.parse(go_filepath).getroot())
+        self.assertEqual(os.path.getsize(go_filepath), go_file.bytes_written)
+        with open(go_filepath, "rb") as written:
+            self.assertTrue(written.read().startswith(b'<?xml version="1.0" encoding="UTF-8"?>\n<GO '))
+
+    def test_output_is_byte_stable(self):
+        """
+        Tests the same entries always give the same bytes and digest.
+        """
+        first = write_go_file(os.path.join(self.folder, "first.go.xml"), JOURNAL_CODE, LICENSE_CODE,
+                              ARCHIVE_FILENAME, METADATA_FILENAME, FILENAMES)
+        second = write_go_file(os.path.join(self.folder, "second.go.xml"), JOURNAL_CODE, LICENSE_CODE,
+                               ARCHIVE_FILENAME, METADATA_FILENAME, FILENAMES)
+        with open(first.go_filepath, "rb") as first_file, open(second.go_filepath, "rb") as second_file:
+            first_bytes = first_file.read()
+            self.assertEqual(first_bytes, second_file.read())
+        self.assertEqual(hashlib.sha256(first_bytes).hexdigest(), first.get_digest())
+        self.assertEqual(first.get_digest(), second.get_digest())
+
+        reordered = write_go_file(os.path.join(self.folder, "reordered.go.xml"), JOURNAL_CODE, LICENSE_CODE,
+                                  ARCHIVE_FILENAME, METADATA_FILENAME, list(reversed(FILENAMES)))
+        self.assertNotEqual(first.get_digest(), reordered.get_digest())
+
+    def test_failed_go_file_is_removed(self):
+        """
+        Tests a go file is deleted when writing it fails, and that the metadata file must be listed first.
+        """
+        go_filepath = os.path.join(self.folder, "failed.go.xml")
+        with self.assertRaises(ValueError):
+            with GoFileWriter(go_filepath, JOURNAL_CODE, LICENSE_CODE, ARCHIVE_FILENAME) as go_file:
+                go_file.add_file(FILENAMES[0])
+        self.assertFalse(os.path.exists(go_filepath))
@@ -0,0 +1,90 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import os
+import shutil
+import tempfile
+
+from hypothesis.extra.django import TestCase
+
+from plugins.editorial_manager_transfer_service.utils.identifier_keys import normalize_institution_name
+from plugins.editorial_manager_transfer_service.utils.institution_index import build_institution_index, \
+    get_institution_index, read_ringgold_csv, InstitutionIndex
+
+RINGGOLD_CSV = """ringgold_id,name,aliases
+6396,University of Oxford,Oxford University|Univ. of Oxford
+1812,Harvard University,
+60000,Université de Montréal,UdeM
+"""
+
+
+class TestInstitutionIndex(TestCase):
+    def setUp(self):
+        """
+        Builds an index from a small Ringgold CSV export.
+        """
+        self.folder = tempfile.mkdtemp()
+        csv_path = os.path.join(self.folder, "ringgold.csv")
+        with open(csv_path, "w", encoding="utf-8") as csv_file:
+            csv_file.write(RINGGOLD_CSV)
+
+        self.index_path = os.path.join(self.folder, "institutions.idx")
+        self.assertEqual((3, 6), build_institution_index(read_ringgold_csv(csv_path), self.index_path))
+        self.index = InstitutionIndex(self.index_path)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.folder)
+
+    def test_exact_names_and_aliases(self):
+        """
+        Tests names and aliases match however their case, accents and punctuation are written.
+        """
+        self.assertEqual("6396", self.index.lookup(normalize_institution_name("The University of Oxford")))
+        self.assertEqual("6396", self.index.lookup(normalize_institution_name("Univ of Oxford")))
+        self.assertEqual("60000", self.index.lookup(normalize_institution_name("UNIVERSITE DE MONTREAL")))
+        self.assertEqual("60000", self.index.lookup_exact(normalize_institution_name("UdeM")))
+
+    def test_fuzzy_names(self):
+        """
+        Tests misspelled names match the closest institution, and unrelated names match nothing.
+        """
+        self.assertIsNone(self.index.lookup_exact(normalize_institution_name("Harvard Universty")))
+        self.assertEqual("1812", self.index.lookup(normalize_institution_name("Harvard Universty")))
+        self.assertIsNone(self.index.lookup(normalize_institution_name("Acme Widget Company")))
+
+    def test_rebuilt_index_is_mapped_again(self):
+        """
+        Tests a rebuilt index replaces the mapped one.
+        """
+        self.assertIsNone(get_institution_index(os.path.join(self.folder, "missing.idx")))
+        self.assertEqual("6396", get_institution_index(self.index_path).lookup("oxford university"))
+
+        old_index = get_institution_index(self.index_path)
+        build_institution_index([("7000", ["Oxford University"])], self.index_path)
+        self.assertEqual("7000", get_institution_index(self.index_path).lookup("oxford university"))
+        with self.assertRaises(ValueError):
+            old_index.lookup("oxford university")
+
+    def test_unreadable_index(self):
+        """
+        Tests an empty or corrupt index file gives no index instead of an error.
+        """
+        path = os.path.join(self.folder, "empty.idx")
+        open(path, "wb").close()
+        self.assertIsNone(get_institution_index(path))
+
+        with open(path, "wb") as index_file:
+            index_file.write(b"not an institution index at all, just some bytes")
+        self.assertIsNone(get_institution_index(path))
+
+    def test_not_an_index(self):
+        """
+        Tests a file which is not an index is refused.
+        """
+        path = os.path.join(self.folder, "not_an_index.idx")
+        with open(path, "wb") as index_file:
+            index_file.write(b"not an institution index at all, just some bytes")
+        with self.assertRaises(ValueError):
+            InstitutionIndex(path)
@@ -0,0 +1,69 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import os
+
+from hypothesis import given, settings, HealthCheck
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.enums.file_role import FileRole
+from plugins.editorial_manager_transfer_service.utils.data_fetch import fetch_articles_for_export
+from plugins.editorial_manager_transfer_service.utils.manifest import fetch_article_file_manifest
+from submission.models import Article
+
+# One query for each file relation. The supplementary files' stored files are only queried when there are any.
+MANIFEST_QUERY_COUNT = 4
+
+
+class TestArticleFileManifest(TestCase):
+    def setUp(self):
+        """
+        Sets up the export folder structure.
+        """
+        article_utils.database_crafter_do_preqs()
+        if not os.path.exists(article_utils._get_article_export_folders()):
+            try:
+                os.makedirs(article_utils._get_article_export_folders())
+            except FileExistsError:
+                pass
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_manifest_query_count(self, article: Article) -> None:
+        """
+        Tests the manifest loads every file relation in a fixed number of queries and is free to consume afterward.
+        """
+        article = Article.objects.get(pk=article.pk)
+
+        with self.assertNumQueries(MANIFEST_QUERY_COUNT):
+            manifest = fetch_article_file_manifest(article)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(article.manuscript_files.count(), len(manifest.manuscripts))
+            self.assertEqual(article.data_figure_files.count(), len(manifest.figures))
+            self.assertEqual(len(manifest), len(manifest.manuscripts) + len(manifest.figures) +
+                             len(manifest.sources) + len(manifest.supplementary))
+            for manifest_file in manifest:
+                self.assertTrue(os.path.exists(manifest_file.filepath))
+                self.assertEqual(os.path.basename(manifest_file.filepath), manifest_file.filename)
+
+        # A second load reuses the prefetched relations.
+        with self.assertNumQueries(0):
+            fetch_article_file_manifest(article)
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_batch_prefetched_manifest(self, article: Article) -> None:
+        """
+        Tests articles fetched for a batch export build their manifests without further queries.
+        """
+        prefetched_article = fetch_articles_for_export(article.journal, [article.pk])[0]
+
+        with self.assertNumQueries(0):
+            manifest = fetch_article_file_manifest(prefetched_article)
+
+        self.assertEqual(FileRole.MANUSCRIPT, manifest.files[0].role)
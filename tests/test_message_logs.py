@@ -4,14 +4,18 @@ __maintainer__ = "The Public Library of Science (PLOS)"
 
 import os
 import shutil
+from typing import List
 
 import hypothesis.strategies as hypothesis_strategies
 from hypothesis import given, settings, HealthCheck
 from hypothesis.extra.django import TestCase
 
 import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.enums.report_state import ReportState
 from plugins.editorial_manager_transfer_service.enums.transfer_log_message_type import TransferLogMessageType
-from plugins.editorial_manager_transfer_service.models import TransferLogs
+from plugins.editorial_manager_transfer_service.models import TransferLogs, TransferReport
+from plugins.editorial_manager_transfer_service.utils.transfer_log_buffer import TransferLogBuffer
+from plugins.editorial_manager_transfer_service.utils.transfer_report import get_or_create_transfer_report
 from submission.models import Article
 
 
@@ -67,3 +71,30 @@ class TestMessageLogs(TestCase):
                 message_type=message_type,
                 success=success
         )
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article(),
+           messages=hypothesis_strategies.lists(hypothesis_strategies.text(), min_size=1, max_size=5))
+    def test_buffered_transfer_logs(self, article: Article, messages: List[str]):
+        """
+        Tests buffered logs are only written when flushed and errors are written immediately.
+        """
+        transfer_report = get_or_create_transfer_report(article.journal, article)
+        log_buffer = TransferLogBuffer()
+
+        for message in messages:
+            log_buffer.log(transfer_report, article.journal, article, message, True)
+        self.assertEqual(0, TransferLogs.objects.filter(report=transfer_report).count())
+
+        log_buffer.flush()
+        self.assertEqual(len(messages), TransferLogs.objects.filter(report=transfer_report, success=True).count())
+        self.assertEqual(0, len(log_buffer))
+
+        log_buffer.log_error(transfer_report, article.journal, article, "Failed", ReportState.FAILED_INGEST)
+        self.assertEqual(1, TransferLogs.objects.filter(report=transfer_report, success=False).count())
+        self.assertEqual(ReportState.FAILED_INGEST, TransferReport.objects.get(pk=transfer_report.pk).report_state)
+
+        log_buffer.resolve(transfer_report)
+        log_buffer.flush()
+        self.assertTrue(TransferReport.objects.get(pk=transfer_report.pk).resolved)
@@ -2,30 +2,35 @@ __author__ = "Rosetta Reatherford"
 __license__ = "AGPL v3"
 __maintainer__ = "The Public Library of Science (PLOS)"
 
+import hashlib
 import os
 from unittest.mock import patch
 
+from django.core.cache import cache
+from django.template.loader import get_template
 from hypothesis import given, settings, HealthCheck
 from hypothesis.extra.django import TestCase
 from lxml import etree
 from lxml.etree import ElementTree
 
+import plugins.editorial_manager_transfer_service.consts as consts
 import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.models import PeopleIdentifier
 from plugins.editorial_manager_transfer_service.tests.utils.validate_jats import validate_xml
-from plugins.editorial_manager_transfer_service.utils.jats import generate_jats_metadata
-from submission.models import Article
+from plugins.editorial_manager_transfer_service.utils.enrichment import people_id_store
+from plugins.editorial_manager_transfer_service.utils.identifier_keys import normalize_email
+from plugins.editorial_manager_transfer_service.utils.jats import generate_jats_metadata, build_jats_context, \
+    render_precompiled_jats_metadata, render_jats_metadata, fetch_jats_sources
+from plugins.editorial_manager_transfer_service.utils.jats_cache import get_jats_cache_statistics, \
+    reset_jats_cache_statistics, get_builder_source_digest
+from plugins.editorial_manager_transfer_service.utils.jats_tree import build_jats_tree
+from plugins.editorial_manager_transfer_service.utils.settings import ExportSettings
+from submission.models import Article, FrozenAuthor
 
 
-def _get_submission_partner_code(self):
-    return "SUBMISSION_PARTNER"
-
-
-def _get_license_code(self):
-    return "LCODE"
-
-
-def _get_journal_code(self):
-    return "JOURNAL_CODE"
+def _get_export_settings(journal, fetch_fresh: bool = False) -> ExportSettings:
+    return ExportSettings(submission_partner_code="SUBMISSION_PARTNER", license_code="LCODE",
+                          journal_code="JOURNAL_CODE")
 
 
 settings.register_profile("single_run", max_examples=1)
@@ -54,10 +59,7 @@ class TestMetadataCreation(TestCase):
     @settings(max_examples=1, derandomize=False, deadline=None,
               suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
     @given(article=article_utils.create_article())
-    @patch("plugins.editorial_manager_transfer_service.utils.settings.get_submission_partner_code",
-           new=_get_submission_partner_code)
-    @patch('plugins.editorial_manager_transfer_service.utils.settings.get_license_code', new=_get_license_code)
-    @patch('plugins.editorial_manager_transfer_service.utils.settings.get_journal_code', new=_get_journal_code)
+    @patch('plugins.editorial_manager_transfer_service.utils.settings.get_export_settings', new=_get_export_settings)
     def test_regular_metadata(self, article: Article) -> None:
         """
         Tests a basic end to end use case of exporting articles.
@@ -78,3 +80,198 @@ class TestMetadataCreation(TestCase):
         root = tree.getroot()
         self.assertIsNotNone(root)
         validate_xml(self, root, article)
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    @patch('plugins.editorial_manager_transfer_service.utils.settings.get_export_settings', new=_get_export_settings)
+    def test_precompiled_metadata(self, article: Article) -> None:
+        """
+        Tests the precompiled builder renders valid JATS without issuing any queries.
+        """
+        context = build_jats_context(article.journal, article)
+
+        with self.assertNumQueries(0):
+            rendered_jats = render_precompiled_jats_metadata(context, article.pk)
+        self.assertIsNotNone(rendered_jats)
+
+        parser = etree.XMLParser(remove_blank_text=True)
+        try:
+            root = etree.fromstring(rendered_jats.encode("utf-8"), parser=parser)
+        except etree.ParseError:
+            self.fail(f"Precompiled metadata for article {article.pk} could not be parsed")
+
+        self.assertIsNotNone(root)
+        validate_xml(self, root, article)
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    @patch('plugins.editorial_manager_transfer_service.utils.settings.get_export_settings', new=_get_export_settings)
+    def test_etree_metadata(self, article: Article) -> None:
+        """
+        Tests the element tree builder writes valid JATS with the same structure as the template.
+        """
+        context = build_jats_context(article.journal, article)
+
+        with self.assertNumQueries(0):
+            built_jats = build_jats_tree(context)
+
+        parser = etree.XMLParser(remove_blank_text=True)
+        try:
+            root = etree.fromstring(built_jats, parser=parser)
+        except etree.ParseError:
+            self.fail(f"Element tree metadata for article {article.pk} could not be parsed")
+
+        self.assertIsNotNone(root)
+        validate_xml(self, root, article)
+
+        rendered_jats = render_jats_metadata(article.journal, article, builder=consts.JATS_BUILDER_TEMPLATE)
+        template_root = etree.fromstring(rendered_jats.encode("utf-8"), parser=parser)
+        self.assertEqual(_normalize(template_root), _normalize(root))
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    @patch('plugins.editorial_manager_transfer_service.utils.settings.get_export_settings', new=_get_export_settings)
+    def test_etree_metadata_entities(self, article: Article) -> None:
+        """
+        Tests the element tree builder writes entity-bearing and missing values the same way the template does.
+        """
+        context = build_jats_context(article.journal, article)
+        context['journal']['name'] = "Fish &amp; Chips Review"
+        context['article']['title'] = "Caf&#233; &lt;3 &amp; <i>in situ</i> studies"
+        context['article']['abstract'] = None
+        context['article']['language'] = None
+        for item in context['frozen_authors']:
+            item['author']['given_names'] = None
+
+        parser = etree.XMLParser(remove_blank_text=True)
+        template_root = etree.fromstring(render_precompiled_jats_metadata(context, article.pk).encode("utf-8"),
+                                         parser=parser)
+        root = etree.fromstring(build_jats_tree(context), parser=parser)
+        self.assertEqual(_normalize(template_root), _normalize(root))
+
+        article_title = root.find("front/article-meta/title-group/article-title")
+        self.assertEqual("Caf\u00e9 <3 & ", article_title.text)
+        self.assertEqual("i", article_title[0].tag)
+        self.assertEqual("None", root.find("front/article-meta/abstract").text)
+
+        # The template leaves HTML entities for the JATS DTD to resolve.
+        context['article']['title'] = "Caf&eacute;&nbsp;<b>au lait</b> &amp; more"
+        article_title = etree.fromstring(build_jats_tree(context), parser=parser).find(
+                "front/article-meta/title-group/article-title")
+        self.assertEqual("Caf\u00e9\u00a0", article_title.text)
+        self.assertEqual("b", article_title[0].tag)
+        self.assertEqual(" & more", article_title[0].tail)
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    @patch('plugins.editorial_manager_transfer_service.utils.settings.get_export_settings', new=_get_export_settings)
+    def test_cached_metadata(self, article: Article) -> None:
+        """
+        Tests unchanged articles reuse their rendered metadata and changed articles are rendered again.
+        """
+        reset_jats_cache_statistics()
+
+        rendered_jats = render_jats_metadata(article.journal, article, builder=consts.JATS_BUILDER_PRECOMPILED)
+        self.assertEqual(rendered_jats,
+                         render_jats_metadata(article.journal, article, builder=consts.JATS_BUILDER_PRECOMPILED))
+
+        statistics = get_jats_cache_statistics()
+        self.assertEqual(1, statistics.hits)
+        self.assertEqual(1, statistics.misses)
+        self.assertEqual(0.5, statistics.hit_ratio)
+
+        article.title = article.title + " Revised"
+        article.save()
+        self.assertNotEqual(rendered_jats,
+                            render_jats_metadata(article.journal, article, builder=consts.JATS_BUILDER_PRECOMPILED))
+        self.assertEqual(2, get_jats_cache_statistics().misses)
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    @patch('plugins.editorial_manager_transfer_service.utils.settings.get_export_settings', new=_get_export_settings)
+    def test_template_source_invalidates_cache(self, article: Article) -> None:
+        """
+        Tests the template builder looks its records up once, and editing the template renders the metadata again.
+        """
+        cache.clear()
+        reset_jats_cache_statistics()
+        with open(get_template(consts.JATS_XML_FILE).origin.name, "rb") as template_file:
+            self.assertEqual(hashlib.sha256(template_file.read()).hexdigest(),
+                             get_builder_source_digest(consts.JATS_BUILDER_TEMPLATE))
+
+        with patch('plugins.editorial_manager_transfer_service.utils.jats.fetch_jats_sources',
+                   wraps=fetch_jats_sources) as fetch_sources:
+            rendered_jats = render_jats_metadata(article.journal, article, builder=consts.JATS_BUILDER_TEMPLATE)
+        self.assertEqual(1, fetch_sources.call_count)
+        self.assertEqual(rendered_jats,
+                         render_jats_metadata(article.journal, article, builder=consts.JATS_BUILDER_TEMPLATE))
+        self.assertEqual(1, get_jats_cache_statistics().hits)
+
+        with patch('plugins.editorial_manager_transfer_service.utils.jats_cache.get_builder_source_digest',
+                   return_value="edited"):
+            render_jats_metadata(article.journal, article, builder=consts.JATS_BUILDER_TEMPLATE)
+        self.assertEqual(2, get_jats_cache_statistics().misses)
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    @patch('plugins.editorial_manager_transfer_service.utils.settings.get_export_settings', new=_get_export_settings)
+    def test_principal_award_recipient(self, article: Article) -> None:
+        """
+        Tests every builder lists the corresponding author with an ORCID as the principal award recipient of the
+        first funder only.
+        """
+        cache.clear()
+        orcid = "0000-0002-1825-0097"
+        corresponding_author = FrozenAuthor.objects.filter(article=article,
+                                                           author=article.correspondence_author).first()
+        corresponding_author.frozen_orcid = orcid
+        corresponding_author.save()
+
+        parser = etree.XMLParser(remove_blank_text=True)
+        for builder in (consts.JATS_BUILDER_TEMPLATE, consts.JATS_BUILDER_PRECOMPILED, consts.JATS_BUILDER_ETREE):
+            root = etree.fromstring(render_jats_metadata(article.journal, article, builder=builder).encode("utf-8"),
+                                    parser=parser)
+            award_groups = root.findall(".//funding-group/award-group")
+            self.assertEqual(article.funders.count(), len(award_groups))
+
+            recipients = award_groups[0].findall("principal-award-recipient")
+            self.assertEqual(1, len(recipients), builder)
+            self.assertEqual(orcid, recipients[0].findtext("contrib-id[@contrib-id-type='orcid']"))
+            self.assertEqual(corresponding_author.last_name, recipients[0].findtext("name/surname"))
+            for award_group in award_groups[1:]:
+                self.assertEqual([], award_group.findall("principal-award-recipient"))
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    @patch('plugins.editorial_manager_transfer_service.utils.settings.get_export_settings', new=_get_export_settings)
+    def test_people_id(self, article: Article) -> None:
+        """
+        Tests every builder writes the People ID known for an author as a contributor ID.
+        """
+        cache.clear()
+        people_id_store.cache.clear()
+        corresponding_author = FrozenAuthor.objects.filter(article=article,
+                                                           author=article.correspondence_author).first()
+        PeopleIdentifier.objects.create(email=normalize_email(corresponding_author.email), people_id="EM-1")
+
+        parser = etree.XMLParser(remove_blank_text=True)
+        for builder in (consts.JATS_BUILDER_TEMPLATE, consts.JATS_BUILDER_PRECOMPILED, consts.JATS_BUILDER_ETREE):
+            root = etree.fromstring(render_jats_metadata(article.journal, article, builder=builder).encode("utf-8"),
+                                    parser=parser)
+            people_ids = [contrib_id.text.strip() for contrib_id in
+                          root.findall(".//contrib-group/contrib/contrib-id[@contrib-id-type='people']")]
+            self.assertIn("EM-1", people_ids, builder)
+
+def _normalize(element) -> tuple:
+    """
+    Reduces an element to its tag, attributes, trimmed text and children so whitespace differences are ignored.
+    """
+    return (element.tag, sorted(element.attrib.items()), (element.text or "").strip(),
+            [_normalize(child) for child in element])
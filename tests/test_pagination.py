@@ -0,0 +1,106 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import os
+from typing import List
+
+from hypothesis import given, settings, HealthCheck
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.models import TransferLogs
+from plugins.editorial_manager_transfer_service.utils.pagination import paginate_keyset, encode_cursor
+from plugins.editorial_manager_transfer_service.utils.transfer_report import get_or_create_transfer_report, \
+    get_report_logs
+from submission.models import Article
+
+LOG_COUNT = 8
+PAGE_SIZE = 3
+
+
+class TestKeysetPagination(TestCase):
+    def setUp(self):
+        """
+        Sets up the export folder structure.
+        """
+        article_utils.database_crafter_do_preqs()
+        if not os.path.exists(article_utils._get_article_export_folders()):
+            try:
+                os.makedirs(article_utils._get_article_export_folders())
+            except FileExistsError:
+                pass
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_pages_cover_listing_in_order(self, article: Article) -> None:
+        """
+        Tests paging forward and back visits every log once, in the listing's order, including logs sharing a
+        timestamp.
+        """
+        transfer_report = get_or_create_transfer_report(article.journal, article)
+        logs = TransferLogs.objects.bulk_create([TransferLogs(report=transfer_report, message=str(counter))
+                                                 for counter in range(LOG_COUNT)])
+        # Give half the logs the same timestamp, so only the ID orders them.
+        TransferLogs.objects.filter(pk__in=[log.pk for log in logs[:LOG_COUNT // 2]]).update(
+                message_date_time=logs[0].message_date_time)
+        expected: List = list(get_report_logs(transfer_report).values_list("pk", flat=True))
+
+        pages = [paginate_keyset(get_report_logs(transfer_report), "message_date_time", page_size=PAGE_SIZE)]
+        while pages[-1].has_next:
+            pages.append(paginate_keyset(get_report_logs(transfer_report), "message_date_time",
+                                         after=pages[-1].next_cursor, page_size=PAGE_SIZE))
+
+        self.assertEqual(expected, [log.pk for page in pages for log in page.items])
+        self.assertFalse(pages[0].has_previous)
+        self.assertEqual(-(-LOG_COUNT // PAGE_SIZE), len(pages))
+
+        # Walking back from the last page gives the same pages.
+        for counter in range(len(pages) - 1, 0, -1):
+            previous_page = paginate_keyset(get_report_logs(transfer_report), "message_date_time",
+                                            before=pages[counter].previous_cursor, page_size=PAGE_SIZE)
+            self.assertEqual([log.pk for log in pages[counter - 1].items], [log.pk for log in previous_page.items])
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_malformed_cursor_gives_first_page(self, article: Article) -> None:
+        """
+        Tests a cursor which cannot be decoded falls back to the first page.
+        """
+        transfer_report = get_or_create_transfer_report(article.journal, article)
+        TransferLogs.objects.create(report=transfer_report, message="Log")
+
+        page = paginate_keyset(get_report_logs(transfer_report), "message_date_time", after="not-a-cursor")
+        self.assertEqual(1, len(page.items))
+        self.assertFalse(page.has_previous)
+        self.assertFalse(page.has_next)
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_empty_cursor_page_gives_first_page(self, article: Article) -> None:
+        """
+        Tests a cursor past which no rows are left falls back to the first page, rather than an empty page without
+        links.
+        """
+        transfer_report = get_or_create_transfer_report(article.journal, article)
+        TransferLogs.objects.bulk_create([TransferLogs(report=transfer_report, message=str(counter))
+                                          for counter in range(LOG_COUNT)])
+        first_page = paginate_keyset(get_report_logs(transfer_report), "message_date_time", page_size=PAGE_SIZE)
+        first_page_ids = [log.pk for log in first_page.items]
+
+        # Every log after the first page is removed, so nothing is left after its cursor.
+        get_report_logs(transfer_report).exclude(pk__in=first_page_ids).delete()
+        page = paginate_keyset(get_report_logs(transfer_report), "message_date_time", after=first_page.next_cursor,
+                               page_size=PAGE_SIZE)
+        self.assertEqual(first_page_ids, [log.pk for log in page.items])
+        self.assertFalse(page.has_previous)
+
+        # Nothing is newer than the newest log either.
+        page = paginate_keyset(get_report_logs(transfer_report), "message_date_time",
+                               before=encode_cursor(first_page.items[0], "message_date_time"), page_size=PAGE_SIZE)
+        self.assertEqual(first_page_ids, [log.pk for log in page.items])
+        self.assertFalse(page.has_previous)
+        self.assertFalse(page.has_next)
@@ -0,0 +1,139 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import os
+import pickle
+from collections import Counter, deque
+from concurrent.futures import Future
+from unittest.mock import patch
+
+from hypothesis import given, settings, HealthCheck
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.consts as consts
+import plugins.editorial_manager_transfer_service.file_exporter as file_exporter
+import plugins.editorial_manager_transfer_service.parallel_exporter as parallel_exporter
+import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.models import ExportJob
+from plugins.editorial_manager_transfer_service.utils.compression import CompressionPolicy
+from plugins.editorial_manager_transfer_service.utils.export_jobs import create_export_jobs
+from plugins.editorial_manager_transfer_service.utils.interfaces.ExportResult import ExportResult
+from submission.models import Article
+
+FAILING_ARTICLE_ID = 13
+
+
+class InlineExecutor:
+    """
+    Stands in for the process pool, running each export as soon as it is submitted.
+    """
+
+    def __init__(self, max_workers: int | None = None, initializer=None):
+        self.max_workers = max_workers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+    @staticmethod
+    def submit(function, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(function(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def _export_article(journal_code: str, article_id: int, streaming: bool = False,
+                    delivery_bundle: bool = False) -> ExportResult:
+    if article_id == FAILING_ARTICLE_ID:
+        raise RuntimeError("The worker died.")
+    return ExportResult(1, article_id, None, "{0}_{1}".format(journal_code, article_id),
+                        "{0}.zip".format(article_id), None if delivery_bundle else "{0}.go.xml".format(article_id),
+                        delivery_bundle, False)
+
+
+class TestParallelExport(TestCase):
+    def setUp(self):
+        """
+        Sets up the export folder structure and the plugin settings every export reads.
+        """
+        article_utils.database_crafter_do_preqs()
+        os.makedirs(article_utils._get_article_export_folders(), exist_ok=True)
+
+        for patcher in (
+                patch('plugins.editorial_manager_transfer_service.file_exporter.get_article_export_folders',
+                      new=article_utils._get_article_export_folders),
+                patch.object(file_exporter.ExportFileCreation, 'get_submission_partner_code',
+                             new=lambda exporter: "SUBMISSION_PARTNER"),
+                patch.object(file_exporter.ExportFileCreation, 'get_license_code', new=lambda exporter: "LCODE"),
+                patch.object(file_exporter.ExportFileCreation, 'get_journal_code',
+                             new=lambda exporter: "JOURNAL_CODE"),
+                patch.object(file_exporter.ExportFileCreation, 'get_compression_policy',
+                             new=lambda exporter: CompressionPolicy()),
+                patch.object(file_exporter.ExportFileCreation, 'get_jats_builder',
+                             new=lambda exporter: consts.JATS_BUILDER_TEMPLATE),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_round_robin_schedule(self):
+        """
+        Tests free workers are filled one journal at a time, without any journal going over its cap.
+        """
+        pending = {"A": deque([1, 2, 3]), "B": deque([4]), "C": deque([5, 6])}
+        journal_counts = Counter()
+
+        self.assertEqual([("A", 1), ("B", 4), ("C", 5), ("A", 2)],
+                         parallel_exporter._schedule_round_robin(pending, journal_counts, 4, 2))
+        self.assertEqual({"A": 2, "B": 1, "C": 1}, dict(journal_counts))
+
+        # A is at its cap, so only C can take the free workers.
+        self.assertEqual([("C", 6)], parallel_exporter._schedule_round_robin(pending, journal_counts, 2, 2))
+        self.assertEqual({"A": deque([3])}, pending)
+
+        journal_counts["A"] -= 1
+        self.assertEqual([("A", 3)], parallel_exporter._schedule_round_robin(pending, journal_counts, 1, 2))
+        self.assertEqual({}, pending)
+
+    @patch('plugins.editorial_manager_transfer_service.parallel_exporter.ProcessPoolExecutor', new=InlineExecutor)
+    @patch('plugins.editorial_manager_transfer_service.parallel_exporter._export_article', new=_export_article)
+    @patch.object(parallel_exporter.connections, 'close_all')
+    def test_worker_results(self, close_all):
+        """
+        Tests every article gets a result, failed workers leave None and the throughput is measured.
+        """
+        articles = [("A", 1), ("B", 2), ("A", FAILING_ARTICLE_ID), ("A", 1)]
+        parallel = parallel_exporter.ParallelExportFileCreation(articles, max_workers=2, per_journal_cap=1,
+                                                                delivery_bundle=True)
+
+        self.assertEqual({("A", 1), ("B", 2), ("A", FAILING_ARTICLE_ID)}, set(parallel.exports.keys()))
+        self.assertIsNone(parallel.exports[("A", FAILING_ARTICLE_ID)])
+        self.assertTrue(parallel.exports[("A", 1)].delivery_bundle)
+        self.assertIsNone(parallel.exports[("B", 2)].go_filepath)
+        self.assertGreater(parallel.elapsed, 0)
+        self.assertAlmostEqual(len(parallel.exports) / parallel.elapsed * 60, parallel.throughput)
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_worker_returns_small_result(self, article: Article) -> None:
+        """
+        Tests a worker sends back a small, picklable result which is enough to record the export job.
+        """
+        result = parallel_exporter._export_article(article.journal.code, article.pk)
+        self.assertIsInstance(result, ExportResult)
+        self.assertFalse(result.in_error_state)
+        self.assertEqual(article.pk, result.article_id)
+        self.assertTrue(os.path.exists(result.zip_filepath))
+        self.assertTrue(os.path.exists(result.go_filepath))
+
+        restored: ExportResult = pickle.loads(pickle.dumps(result))
+        export_job: ExportJob = create_export_jobs([restored])[article.pk]
+        self.assertEqual(result.prefix, ExportJob.objects.get(pk=export_job.pk).prefix)
+        self.assertEqual(article.journal_id, ExportJob.objects.get(pk=export_job.pk).journal_id)
+        self.assertEqual(result.report_id, ExportJob.objects.get(pk=export_job.pk).report_id)
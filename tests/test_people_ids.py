@@ -0,0 +1,86 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.consts as consts
+from plugins.editorial_manager_transfer_service.models import PeopleIdentifier
+from plugins.editorial_manager_transfer_service.utils.enrichment import people_id_store, get_people_ids
+from plugins.editorial_manager_transfer_service.utils.people_id_feed import import_people_id_feeds
+
+PEOPLE_ID_FEED = """People ID,First Name,Last Name,E-mail Address
+1001,Ada,Lovelace,Ada@Example.com
+1002,Alan,Turing,alan@example.com
+,Grace,Hopper,grace@example.com
+"""
+
+
+class TestPeopleIds(TestCase):
+    def setUp(self):
+        """
+        Empties the People ID caches and creates a feed folder.
+        """
+        cache.clear()
+        people_id_store.cache.clear()
+        self.feed_folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.feed_folder)
+
+    def __write_feed(self, filename: str, contents: str) -> str:
+        path = os.path.join(self.feed_folder, filename)
+        with open(path, "w", encoding="utf-8") as feed_file:
+            feed_file.write(contents)
+        return path
+
+    def test_import_feed(self):
+        """
+        Tests a feed is imported once, by normalized email, and moved aside.
+        """
+        self.__write_feed("people.csv", PEOPLE_ID_FEED)
+        self.__write_feed("broken.csv", "Name\nAda\n")
+
+        result = import_people_id_feeds(self.feed_folder)
+        self.assertEqual(2, result.files)
+        self.assertEqual(1, result.failed_files)
+        self.assertEqual(2, result.imported)
+        self.assertEqual(1, result.skipped)
+        self.assertEqual("1001", PeopleIdentifier.objects.get(email="ada@example.com").people_id)
+        self.assertTrue(os.path.exists(os.path.join(self.feed_folder, consts.PEOPLE_ID_FEED_PROCESSED_FOLDER,
+                                                    "people.csv")))
+        self.assertTrue(os.path.exists(os.path.join(self.feed_folder, consts.PEOPLE_ID_FEED_FAILED_FOLDER,
+                                                    "broken.csv")))
+
+        self.assertEqual(0, import_people_id_feeds(self.feed_folder).files)
+
+    def test_bulk_lookup(self):
+        """
+        Tests many People IDs are looked up with one query, then from the caches.
+        """
+        PeopleIdentifier.objects.create(email="ada@example.com", people_id="1001")
+        PeopleIdentifier.objects.create(email="alan@example.com", people_id="1002")
+
+        with self.assertNumQueries(1):
+            people_ids = get_people_ids(["ADA@example.com", "alan@example.com", "grace@example.com", None])
+        self.assertEqual({"ada@example.com": "1001", "alan@example.com": "1002", "grace@example.com": None},
+                         people_ids)
+
+        with self.assertNumQueries(0):
+            get_people_ids(["ada@example.com", "alan@example.com", "grace@example.com"])
+
+    def test_warm_shares_between_workers(self):
+        """
+        Tests warmed People IDs are found in the shared cache by a worker whose own cache is empty.
+        """
+        PeopleIdentifier.objects.create(email="ada@example.com", people_id="1001")
+        self.assertEqual(1, people_id_store.warm(["ada@example.com", "grace@example.com"], batch_size=1))
+
+        people_id_store.cache.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual({"ada@example.com": "1001"}, get_people_ids(["ada@example.com"]))
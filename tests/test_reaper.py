@@ -0,0 +1,67 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import os
+import tempfile
+import time
+import uuid
+
+from hypothesis import given, settings, HealthCheck
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.consts as consts
+import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.models import ExportJob
+from plugins.editorial_manager_transfer_service.utils.reaper import ExportReaper
+from submission.models import Article
+
+
+def _write(filepath: str, size: int, age: float) -> None:
+    with open(filepath, "wb") as file:
+        file.write(b"0" * size)
+    os.utime(filepath, (time.time() - age, time.time() - age))
+
+
+class TestReaper(TestCase):
+    def setUp(self):
+        article_utils.database_crafter_do_preqs()
+        if not os.path.exists(article_utils._get_article_export_folders()):
+            try:
+                os.makedirs(article_utils._get_article_export_folders())
+            except FileExistsError:
+                pass
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_reap_stale_export_files(self, article: Article):
+        """
+        Tests only stale artifacts of exports which are no longer active are deleted.
+        """
+        with tempfile.TemporaryDirectory() as export_folder:
+            live, done, new, staged = ("PARTNER_{0}".format(uuid.uuid4()) for _ in range(4))
+            ExportJob.objects.create(journal=article.journal, article=article, prefix=live)
+            _write(os.path.join(export_folder, "{0}.zip".format(live)), 10, 3600)
+            _write(os.path.join(export_folder, "{0}.zip".format(done)), 100, 3600)
+            _write(os.path.join(export_folder, "{0}.go.xml".format(done)), 20, 3600)
+            _write(os.path.join(export_folder, "{0}.zip".format(new)), 10, 0)
+            _write(os.path.join(export_folder, "notes.txt"), 10, 3600)
+            _write(os.path.join(export_folder, "PARTNER_backup.zip"), 10, 3600)
+            os.makedirs(os.path.join(export_folder, staged))
+            _write(os.path.join(export_folder, staged, "manuscript.txt"), 30, 3600)
+            os.utime(os.path.join(export_folder, staged), (time.time() - 3600, time.time() - 3600))
+            os.makedirs(os.path.join(export_folder, consts.BUNDLE_STORE_FOLDER))
+            # Folders which are not named after an export prefix are never reaped.
+            os.makedirs(os.path.join(export_folder, "uploads"))
+            os.utime(os.path.join(export_folder, "uploads"), (time.time() - 3600, time.time() - 3600))
+
+            dry_run = ExportReaper(export_folder, max_age=60, batch_size=2, dry_run=True).run()
+            self.assertEqual((3, 150), (dry_run.deleted, dry_run.bytes_reclaimed))
+            self.assertTrue(os.path.exists(os.path.join(export_folder, "{0}.zip".format(done))))
+
+            result = ExportReaper(export_folder, max_age=60, batch_size=2).run()
+            self.assertEqual((5, 3, 2, 150), (result.scanned, result.deleted, result.kept, result.bytes_reclaimed))
+            self.assertEqual(sorted(["{0}.zip".format(live), "{0}.zip".format(new), "notes.txt", "PARTNER_backup.zip",
+                                     consts.BUNDLE_STORE_FOLDER, "uploads"]),
+                             sorted(os.listdir(export_folder)))
@@ -0,0 +1,66 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import gzip
+import json
+import tempfile
+from datetime import timedelta
+
+from django.utils import timezone
+from hypothesis import given, settings, HealthCheck
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+from plugins.editorial_manager_transfer_service.enums.report_state import ReportState
+from plugins.editorial_manager_transfer_service.enums.transfer_log_message_type import TransferLogMessageType
+from plugins.editorial_manager_transfer_service.models import TransferLogs, TransferReport, TransferReportRollup
+from plugins.editorial_manager_transfer_service.utils.retention import RetentionEngine
+from plugins.editorial_manager_transfer_service.utils.transfer_report import get_or_create_transfer_report
+from submission.models import Article
+
+
+class TestRetention(TestCase):
+    def setUp(self):
+        article_utils.database_crafter_do_preqs()
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(article=article_utils.create_article())
+    def test_prune_resolved_reports(self, article: Article):
+        """
+        Tests old resolved reports are rolled up, archived and deleted while recent and open reports are kept.
+        """
+        journal = article.journal
+        old_report = get_or_create_transfer_report(journal, article)
+        for success in (True, True, False):
+            TransferLogs.objects.create(journal=journal, article=article, report=old_report, success=success,
+                                        message="Exported", message_type=TransferLogMessageType.EXPORT)
+        started = timezone.now() - timedelta(days=30)
+        TransferReport.objects.filter(pk=old_report.pk).update(resolved=True, message_date_time_start=started)
+        open_report = TransferReport.objects.create(journal=journal, article=article,
+                                                    report_state=ReportState.IN_FLIGHT)
+        TransferReport.objects.filter(pk=open_report.pk).update(message_date_time_start=started)
+
+        with tempfile.TemporaryDirectory() as archive_folder:
+            dry_run = RetentionEngine(journal, retention_days=7, pause=0, archive_folder=archive_folder,
+                                      dry_run=True).run()
+            self.assertEqual((1, 3), (dry_run.reports, dry_run.logs))
+            self.assertTrue(TransferReport.objects.filter(pk=old_report.pk).exists())
+
+            result = RetentionEngine(journal, retention_days=7, batch_size=1, pause=0,
+                                     archive_folder=archive_folder).run()
+            self.assertEqual((1, 3, 1), (result.reports, result.logs, result.batches))
+            self.assertFalse(TransferReport.objects.filter(pk=old_report.pk).exists())
+            self.assertFalse(TransferLogs.objects.filter(report_id=old_report.pk).exists())
+            self.assertTrue(TransferReport.objects.filter(pk=open_report.pk).exists())
+
+            rollup = TransferReportRollup.objects.get(journal=journal,
+                                                      message_type=TransferLogMessageType.EXPORT)
+            self.assertEqual((1, 3, 2), (rollup.report_count, rollup.log_count, rollup.success_count))
+
+            with gzip.open(result.archive_filepath, "rt", encoding="utf-8") as archive:
+                records = [json.loads(line) for line in archive]
+            self.assertEqual(1, len(records))
+            self.assertEqual(str(old_report.pk), records[0]["report"]["id"])
+            self.assertEqual(3, len(records[0]["logs"]))
@@ -0,0 +1,107 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+from django.core.cache import cache
+from hypothesis import given, settings, HealthCheck
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.consts as consts
+import plugins.editorial_manager_transfer_service.tests.utils.article_creation_utils as article_utils
+import plugins.editorial_manager_transfer_service.utils.settings as settings_utils
+from plugins.editorial_manager_transfer_service.utils.settings import get_export_settings, save_plugin_settings, \
+    get_plugin_settings, ExportSettings
+from journal.models import Journal
+from utils import setting_handler
+from utils.install import update_settings
+
+
+class TestExportSettings(TestCase):
+    def setUp(self):
+        """
+        Installs the plugin settings.
+        """
+        article_utils.database_crafter_do_preqs()
+        update_settings(file_path="plugins/editorial_manager_transfer_service/install/settings.json")
+
+    @staticmethod
+    def __save_settings(journal: Journal) -> None:
+        cache.clear()
+        save_plugin_settings(journal, "PARTNER", "LCODE", "JCODE", consts.COMPRESSION_POLICY_STORE, 3,
+                             consts.JATS_BUILDER_ETREE, 30)
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(journal=article_utils.create_journal())
+    def test_snapshot_values(self, journal: Journal) -> None:
+        """
+        Tests the snapshot holds the saved settings and builds the XML license code from them.
+        """
+        self.__save_settings(journal)
+        export_settings: ExportSettings = get_export_settings(journal)
+        self.assertEqual("PARTNER", export_settings.submission_partner_code)
+        self.assertEqual("LCODE", export_settings.license_code)
+        self.assertEqual("JCODE", export_settings.journal_code)
+        self.assertEqual(consts.COMPRESSION_POLICY_STORE, export_settings.compression_policy)
+        self.assertEqual(3, export_settings.compression_level)
+        self.assertEqual(consts.JATS_BUILDER_ETREE, export_settings.jats_builder)
+        self.assertEqual(30, export_settings.retention_days)
+        self.assertEqual(("PARTNER", "LCODE", "JCODE"), get_plugin_settings(journal))
+        self.assertEqual("PARTNER_LCODE", export_settings.xml_license_code)
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(journal=article_utils.create_journal())
+    def test_snapshot_is_immutable(self, journal: Journal) -> None:
+        """
+        Tests the snapshot cannot be changed once it is loaded.
+        """
+        self.__save_settings(journal)
+        export_settings: ExportSettings = get_export_settings(journal)
+        with self.assertRaises(AttributeError):
+            export_settings.license_code = "OTHER"
+        with self.assertRaises(AttributeError):
+            del export_settings.journal_code
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(journal=article_utils.create_journal())
+    def test_snapshot_is_cached(self, journal: Journal) -> None:
+        """
+        Tests the snapshot is loaded once and reused without queries.
+        """
+        self.__save_settings(journal)
+        get_export_settings(journal)
+        with self.assertNumQueries(0):
+            export_settings: ExportSettings = get_export_settings(journal)
+        self.assertEqual("LCODE", export_settings.license_code)
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(journal=article_utils.create_journal())
+    def test_saving_replaces_snapshot(self, journal: Journal) -> None:
+        """
+        Tests saving the plugin settings replaces the cached snapshot.
+        """
+        self.__save_settings(journal)
+        get_export_settings(journal)
+        save_plugin_settings(journal, "PARTNER", "NEWCODE", "JCODE")
+
+        export_settings: ExportSettings = get_export_settings(journal)
+        self.assertEqual("NEWCODE", export_settings.license_code)
+        self.assertEqual(consts.COMPRESSION_POLICY_AUTO, export_settings.compression_policy)
+
+    @settings(max_examples=1, derandomize=False, deadline=None,
+              suppress_health_check=[HealthCheck.large_base_example, HealthCheck.too_slow])
+    @given(journal=article_utils.create_journal())
+    def test_values_match_setting_handler(self, journal: Journal) -> None:
+        """
+        Tests the values read in bulk have the same types and values the setting handler gives for each setting.
+        """
+        self.__save_settings(journal)
+        values = getattr(settings_utils, "__fetch_setting_values")(journal)
+        self.assertIsInstance(values[consts.PLUGIN_SETTINGS_COMPRESSION_LEVEL], int)
+        self.assertIsInstance(values[consts.PLUGIN_SETTINGS_RETENTION_DAYS], int)
+        for name, value in values.items():
+            self.assertEqual(setting_handler.get_setting(consts.PLUGIN_SETTINGS_GROUP_NAME, name,
+                                                         journal).processed_value, value, name)
@@ -0,0 +1,63 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import time
+
+from hypothesis.extra.django import TestCase
+
+import plugins.editorial_manager_transfer_service.consts as consts
+from plugins.editorial_manager_transfer_service.utils.stage_timer import StageTimer, get_ordered_stage_timings, \
+    merge_stage_timings
+
+
+class TestStageTimer(TestCase):
+    def test_nested_stages(self):
+        """
+        Tests a stage running inside another is only counted toward itself.
+        """
+        timer = StageTimer()
+        with timer.stage(consts.EXPORT_STAGE_ARCHIVE):
+            with timer.stage(consts.EXPORT_STAGE_JATS):
+                time.sleep(0.05)
+        timer.add_bytes(consts.EXPORT_STAGE_JATS, 10)
+        timer.add_bytes(consts.EXPORT_STAGE_JATS, 5)
+
+        timings = timer.as_dict()
+        self.assertGreaterEqual(timings[consts.EXPORT_STAGE_JATS]["seconds"], 0.05)
+        self.assertLess(timings[consts.EXPORT_STAGE_ARCHIVE]["seconds"], 0.05)
+        self.assertEqual(15, timings[consts.EXPORT_STAGE_JATS]["bytes"])
+        self.assertEqual(0, timings[consts.EXPORT_STAGE_ARCHIVE]["bytes"])
+
+    def test_merge_stage_timings(self):
+        """
+        Tests the timings of another attempt are added to the stored ones, stage by stage.
+        """
+        stage_timings = {
+            consts.EXPORT_STAGE_JATS: {"seconds": 0.5, "bytes": 10},
+            consts.EXPORT_STAGE_COPY: {"seconds": 0.25, "bytes": 100},
+        }
+        new_timings = {
+            consts.EXPORT_STAGE_JATS: {"seconds": 0.25, "bytes": 5},
+            consts.EXPORT_STAGE_ARCHIVE: {"seconds": 1.0, "bytes": 50},
+        }
+        self.assertEqual({consts.EXPORT_STAGE_JATS: {"seconds": 0.75, "bytes": 15},
+                          consts.EXPORT_STAGE_COPY: {"seconds": 0.25, "bytes": 100},
+                          consts.EXPORT_STAGE_ARCHIVE: {"seconds": 1.0, "bytes": 50}},
+                         merge_stage_timings(stage_timings, new_timings))
+        self.assertEqual({consts.EXPORT_STAGE_JATS: {"seconds": 0.5, "bytes": 10},
+                          consts.EXPORT_STAGE_COPY: {"seconds": 0.25, "bytes": 100}}, stage_timings)
+        self.assertEqual(new_timings, merge_stage_timings(None, new_timings))
+
+    def test_ordered_stage_timings(self):
+        """
+        Tests stored timings are listed in the order the stages run.
+        """
+        stage_timings = {
+            consts.EXPORT_STAGE_GO_FILE: {"seconds": 0.1, "bytes": 1},
+            consts.EXPORT_STAGE_MANIFEST: {"seconds": 0.2, "bytes": 0},
+            consts.EXPORT_STAGE_JATS: {"seconds": 0.3, "bytes": 2},
+        }
+        self.assertEqual([(consts.EXPORT_STAGE_MANIFEST, 0.2, 0), (consts.EXPORT_STAGE_JATS, 0.3, 2),
+                          (consts.EXPORT_STAGE_GO_FILE, 0.1, 1)], get_ordered_stage_timings(stage_timings))
+        self.assertEqual([], get_ordered_stage_timings(None))
@@ -12,7 +12,7 @@ from django.core.files import File as DjangoFile
 from hypothesis import strategies as st
 
 from core import (models as core_models, files as core_files, settings as core_settings)
-from core.models import File, Account, Setting, SettingGroup, setting_types, SettingValue, ControlledAffiliation, \
+from core.models import File, SupplementaryFile, Account, Setting, SettingGroup, setting_types, SettingValue, ControlledAffiliation, \
     Organization, OrganizationName, Location, Country, Role
 from journal.models import Journal
 from plugins.editorial_manager_transfer_service import consts
@@ -238,10 +238,11 @@ def create_controlled_affiliation(draw, account: Account, is_primary: bool = Fal
 
 
 @st.composite
-def create_account(draw) -> Account:
+def create_account(draw, other_affiliations: int | None = None) -> Account:
     """
     Creates a new account object from the given settings.
     :param draw: A Hypothesis object provided by the hypothesis framework.
+    :param other_affiliations: The number of affiliations besides the primary one. Random if not given.
     :return: A newly created account.
     """
 
@@ -258,7 +259,8 @@ def create_account(draw) -> Account:
 
     # Make some affiliations
     draw(create_controlled_affiliation(account, is_primary=True))
-    other_affiliations: int = draw(st.integers(min_value=0, max_value=5))
+    if other_affiliations is None:
+        other_affiliations = draw(st.integers(min_value=0, max_value=5))
     for other_affiliation in range(other_affiliations):
         draw(create_controlled_affiliation(account, is_primary=False))
 
@@ -284,8 +286,32 @@ def create_txt_file(draw, article: Article) -> File:
 
 
 @st.composite
-def create_frozen_author(draw, article: Article) -> FrozenAuthor:
-    author = draw(create_account())
+def create_binary_file(draw, article: Article, extension: str, size: int) -> File:
+    """
+    Creates a file of incompressible bytes, standing in for an image or video.
+    :param draw: A Hypothesis object provided by the hypothesis framework.
+    :param article: The article the file belongs to.
+    :param extension: The file extension, including the dot.
+    :param size: The size of the file in bytes.
+    :return: The saved file.
+    """
+    filename: str = draw(st.from_regex(valid_filename_regex))
+    filepath = os.path.join(_get_article_export_folders(), "{0}{1}".format(filename, extension))
+    with open(filepath, 'wb') as file:
+        remaining: int = size
+        while remaining > 0:
+            chunk: int = min(remaining, 1024 * 1024)
+            file.write(os.urandom(chunk))
+            remaining -= chunk
+    with open(filepath, 'rb+') as file:
+        django_file = DjangoFile(file, name=f"{filename}{extension}")
+        return core_files.save_file_to_article(file_to_handle=django_file, article=article,
+                                               owner=draw(create_account(other_affiliations=0)))
+
+
+@st.composite
+def create_frozen_author(draw, article: Article, other_affiliations: int | None = None) -> FrozenAuthor:
+    author = draw(create_account(other_affiliations=other_affiliations))
     return author.snapshot_as_author(article)
 
 @st.composite
@@ -344,3 +370,50 @@ def create_article(draw) -> Article:
     draw(create_funders(article=article))
 
     return article
+
+
+@st.composite
+def create_shaped_article(draw, authors: int = 1, affiliations_per_author: int = 0, answers: int = 0,
+                          figures: int = 0, figure_size: int = 0, videos: int = 0, video_size: int = 0) -> Article:
+    """
+    Creates an article of a controlled shape, for benchmarking exports of articles that stress one part of the
+    pipeline.
+    :param draw: The Hypothesis object provided by the hypothesis framework.
+    :param authors: The number of authors besides the correspondence author.
+    :param affiliations_per_author: The number of affiliations each author has besides their primary one.
+    :param answers: The number of answered submission fields.
+    :param figures: The number of figure files.
+    :param figure_size: The size of each figure file in bytes.
+    :param videos: The number of supplementary video files.
+    :param video_size: The size of each supplementary video file in bytes.
+    :return: The generated article.
+    """
+    title = draw(st.text(alphabet=ACCEPTABLE_CHARACTER_CATEGORIES, min_size=1, max_size=999))
+    abstract = draw(st.text(alphabet=ACCEPTABLE_CHARACTER_CATEGORIES, min_size=1))
+    journal: Journal = draw(create_journal())
+    article: Article = Article.objects.create(title=title, abstract=abstract, journal=journal, )
+
+    article.manuscript_files.add(draw(create_txt_file(article=article)))
+    for i in range(figures):
+        article.data_figure_files.add(draw(create_binary_file(article=article, extension=".png", size=figure_size)))
+    for i in range(videos):
+        video: File = draw(create_binary_file(article=article, extension=".mp4", size=video_size))
+        article.supplementary_files.add(SupplementaryFile.objects.create(file=video))
+
+    frozen_correspondence_author: FrozenAuthor = draw(
+            create_frozen_author(article=article, other_affiliations=affiliations_per_author))
+    article.correspondence_author = frozen_correspondence_author.author
+    article.save()
+
+    for i in range(answers):
+        draw(create_answer_field(article=article))
+
+    for i in range(authors):
+        frozen_author: FrozenAuthor = draw(
+                create_frozen_author(article=article, other_affiliations=affiliations_per_author))
+        frozen_author.associate_with_account()
+        frozen_author.save()
+
+    draw(create_funders(article=article))
+
+    return article
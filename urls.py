@@ -15,4 +15,6 @@ urlpatterns = [
             name="editorial_manager_transfer_service_manager_report_logs"),
     re_path(r"^logs/articles/(?P<article_id>\d+)/reports$", views.transfer_article_reports,
             name="editorial_manager_transfer_service_manager_article_report_logs"),
+    re_path(r'^logs/metrics/$', views.transfer_stage_metrics,
+            name='editorial_manager_transfer_service_manager_stage_metrics'),
 ]
@@ -0,0 +1,130 @@
+"""
+Helpers for writing export archives straight to disk without staging the files in a temporary folder.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import os
+import time
+import zipfile
+from typing import BinaryIO, Callable, List
+
+from plugins.editorial_manager_transfer_service.utils.compression import CompressionPolicy
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ExportArchiveWriter:
+    """
+    Streams files and in-memory documents into a single ZIP archive in one pass.
+    """
+
+    def __init__(self, zip_filepath: str, compression_policy: CompressionPolicy | None = None) -> None:
+        self.zip_filepath: str = zip_filepath
+        self.compression_policy: CompressionPolicy = compression_policy or CompressionPolicy()
+        self.filenames: List[str] = []
+        self.bytes_read: int = 0
+        self.bytes_compressed: int = 0
+        self.stored_entries: int = 0
+        self.deflated_entries: int = 0
+        self.cpu_time: float = 0
+        # Entries opened as streams use the archive's own compression settings.
+        compress_type, compress_level = self.compression_policy.for_stream()
+        self.__zip_file: zipfile.ZipFile = zipfile.ZipFile(zip_filepath, "w", compression=compress_type,
+                                                           compresslevel=compress_level)
+
+    def __enter__(self) -> "ExportArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def add_file(self, filepath: str, arcname: str | None = None) -> str | None:
+        """
+        Streams the file at the given path into the archive.
+        :param filepath: The path of the file to add.
+        :param arcname: The name of the entry within the archive. Defaults to the basename of the file.
+        :return: The name of the entry within the archive or None, if the entry was already written.
+        """
+        if not arcname:
+            arcname = os.path.basename(filepath)
+        if arcname in self.filenames:
+            logger.warning("Skipping duplicate archive entry: %s", arcname)
+            return None
+
+        start: float = time.process_time()
+        compress_type, compress_level = self.compression_policy.for_file(filepath)
+        self.__zip_file.write(filepath, arcname, compress_type=compress_type, compresslevel=compress_level)
+        self.cpu_time += time.process_time() - start
+
+        self.__record_entry(arcname)
+        return arcname
+
+    def add_bytes(self, arcname: str, data: bytes) -> str | None:
+        """
+        Writes the given in-memory document into the archive.
+        :param arcname: The name of the entry within the archive.
+        :param data: The contents of the entry.
+        :return: The name of the entry within the archive or None, if the entry was already written.
+        """
+        if arcname in self.filenames:
+            logger.warning("Skipping duplicate archive entry: %s", arcname)
+            return None
+
+        start: float = time.process_time()
+        compress_type, compress_level = self.compression_policy.for_bytes(data)
+        self.__zip_file.writestr(arcname, data, compress_type=compress_type, compresslevel=compress_level)
+        self.cpu_time += time.process_time() - start
+
+        self.__record_entry(arcname)
+        return arcname
+
+    def add_stream(self, arcname: str, write: Callable[[BinaryIO], None]) -> str | None:
+        """
+        Writes a document into the archive as it is generated, without holding it in memory.
+        :param arcname: The name of the entry within the archive.
+        :param write: Called with the writable entry stream to generate the document.
+        :return: The name of the entry within the archive or None, if the entry was already written.
+        """
+        if arcname in self.filenames:
+            logger.warning("Skipping duplicate archive entry: %s", arcname)
+            return None
+
+        start: float = time.process_time()
+        with self.__zip_file.open(arcname, "w") as stream:
+            write(stream)
+        self.cpu_time += time.process_time() - start
+
+        self.__record_entry(arcname)
+        return arcname
+
+    def __record_entry(self, arcname: str) -> None:
+        """
+        Records the sizes and compression method of an entry that was just written.
+        :param arcname: The name of the entry within the archive.
+        """
+        zip_info: zipfile.ZipInfo = self.__zip_file.getinfo(arcname)
+        self.bytes_read += zip_info.file_size
+        self.bytes_compressed += zip_info.compress_size
+        if zip_info.compress_type == zipfile.ZIP_STORED:
+            self.stored_entries += 1
+        else:
+            self.deflated_entries += 1
+        self.filenames.append(arcname)
+
+    def close(self) -> None:
+        """
+        Finalizes the archive, writing the central directory to disk.
+        """
+        self.__zip_file.close()
+
+    def get_bytes_written(self) -> int:
+        """
+        Gets the number of bytes written to disk for the archive.
+        :return: The size of the archive on disk.
+        """
+        if not os.path.exists(self.zip_filepath):
+            return 0
+        return os.path.getsize(self.zip_filepath)
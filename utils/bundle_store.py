@@ -0,0 +1,161 @@
+"""
+A content-addressed store of export archives, so an article that has not changed since its last export reuses the
+archive that was already built instead of building it again.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from typing import List
+
+from plugins.editorial_manager_transfer_service import consts
+from plugins.editorial_manager_transfer_service.utils.compression import CompressionPolicy
+from plugins.editorial_manager_transfer_service.utils.interfaces.ArticleFileManifest import ArticleFileManifest
+from plugins.editorial_manager_transfer_service.utils.interfaces.ExportBundle import ExportBundle
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BUNDLE_EXTENSION = ".zip"
+BUNDLE_ENTRIES_EXTENSION = ".json"
+
+
+def get_bundle_key(manifest: ArticleFileManifest, jats_fingerprint: str,
+                   compression_policy: CompressionPolicy) -> str | None:
+    """
+    Gets the key of the archive built from the given files and metadata.
+    Files are identified by their size and modification time rather than their contents, to avoid reading them.
+    :param manifest: The article's files.
+    :param jats_fingerprint: The fingerprint of the inputs to the article's JATS metadata.
+    :param compression_policy: The compression policy the archive is written with.
+    :return: The key or None, if a file could not be inspected.
+    """
+    files: List[list] = []
+    for manifest_file in manifest:
+        try:
+            stat = os.stat(manifest_file.filepath)
+        except OSError as e:
+            logger.debug("Could not inspect %s for the bundle key: %s", manifest_file.filepath, e)
+            return None
+        files.append([str(manifest_file.role), manifest_file.filename, stat.st_size, stat.st_mtime_ns])
+
+    payload = json.dumps([jats_fingerprint, compression_policy.policy, compression_policy.level, files],
+                         separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ExportBundleStore:
+    """
+    Keeps built export archives by key and evicts the least recently used ones once the store grows too large.
+    """
+
+    def __init__(self, folder: str, max_bytes: int = consts.BUNDLE_STORE_MAX_BYTES) -> None:
+        """
+        Constructor.
+        :param folder: The folder to keep the archives in.
+        :param max_bytes: The size the store is trimmed back to after every new archive.
+        """
+        self.folder: str = folder
+        self.max_bytes: int = max_bytes
+
+    def checkout(self, key: str, zip_filepath: str) -> ExportBundle | None:
+        """
+        Places the stored archive with the given key at the given path.
+        :param key: The key of the archive.
+        :param zip_filepath: Where the archive should be placed.
+        :return: The archive's details or None, if no archive is stored under the key.
+        """
+        stored_filepath: str = self.__get_filepath(key, BUNDLE_EXTENSION)
+        try:
+            with open(self.__get_filepath(key, BUNDLE_ENTRIES_EXTENSION), "r") as entries_file:
+                entries: dict = json.load(entries_file)
+            self.__link(stored_filepath, zip_filepath)
+            # Mark the archive as recently used, so it is evicted last.
+            os.utime(stored_filepath)
+        except (OSError, ValueError) as e:
+            logger.debug("No reusable bundle for key %s: %s", key, e)
+            return None
+
+        return ExportBundle(zip_filepath, entries["metadata_filename"], entries["filenames"])
+
+    def put(self, key: str, bundle: ExportBundle) -> None:
+        """
+        Keeps a copy of a newly built archive for reuse.
+        :param key: The key of the archive.
+        :param bundle: The archive and its entry names.
+        """
+        os.makedirs(self.folder, exist_ok=True)
+
+        stored_filepath: str = self.__get_filepath(key, BUNDLE_EXTENSION)
+        entries_filepath: str = self.__get_filepath(key, BUNDLE_ENTRIES_EXTENSION)
+        temp_suffix: str = ".{0}.tmp".format(uuid.uuid4())
+        try:
+            # The entries are written last, so a half-written archive is never checked out.
+            self.__link(bundle.zip_filepath, stored_filepath + temp_suffix)
+            os.replace(stored_filepath + temp_suffix, stored_filepath)
+            with open(entries_filepath + temp_suffix, "w") as entries_file:
+                json.dump({"metadata_filename": bundle.metadata_filename, "filenames": bundle.filenames},
+                          entries_file)
+            os.replace(entries_filepath + temp_suffix, entries_filepath)
+        except OSError as e:
+            logger.warning("Could not store bundle for key %s: %s", key, e)
+            for filepath in (stored_filepath + temp_suffix, entries_filepath + temp_suffix):
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+            return
+
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Removes the least recently used archives until the store fits within its size limit.
+        :return: The number of bytes freed.
+        """
+        bundles: List[tuple[float, int, str]] = []
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith(BUNDLE_EXTENSION):
+                        stat = entry.stat()
+                        bundles.append((stat.st_mtime, stat.st_size, entry.name[:-len(BUNDLE_EXTENSION)]))
+        except OSError as e:
+            logger.warning("Could not list the bundle store at %s: %s", self.folder, e)
+            return 0
+
+        total_bytes: int = sum(size for _, size, _ in bundles)
+        freed_bytes: int = 0
+        for _, size, key in sorted(bundles):
+            if total_bytes - freed_bytes <= self.max_bytes:
+                break
+            try:
+                # Remove the entries first, so the archive stops being checked out before it disappears.
+                os.remove(self.__get_filepath(key, BUNDLE_ENTRIES_EXTENSION))
+            except FileNotFoundError:
+                pass
+            try:
+                os.remove(self.__get_filepath(key, BUNDLE_EXTENSION))
+            except FileNotFoundError:
+                pass
+            freed_bytes += size
+
+        if freed_bytes:
+            logger.info("Evicted %d bytes from the bundle store at %s.", freed_bytes, self.folder)
+        return freed_bytes
+
+    def __get_filepath(self, key: str, extension: str) -> str:
+        return os.path.join(self.folder, key + extension)
+
+    @staticmethod
+    def __link(source: str, destination: str) -> None:
+        """
+        Hard links a file where possible, so the store does not cost extra disk space, and copies it otherwise.
+        """
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copyfile(source, destination)
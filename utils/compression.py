@@ -0,0 +1,101 @@
+"""
+Decides how each entry of an export archive should be compressed.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import os
+import zipfile
+import zlib
+
+from plugins.editorial_manager_transfer_service import consts
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CompressionPolicy:
+    """
+    Picks STORE or DEFLATE (and the level) for each archive entry based on its file type or a compressibility probe.
+    """
+
+    def __init__(self, policy: str | None = None, level: int | None = None) -> None:
+        """
+        Constructor.
+        :param policy: One of the COMPRESSION_POLICY_* values from consts. Defaults to automatic detection.
+        :param level: The DEFLATE level (1-9) to use for compressible entries.
+        """
+        if policy not in consts.COMPRESSION_POLICIES:
+            policy = consts.COMPRESSION_POLICY_AUTO
+        if level is None or not consts.COMPRESSION_LEVEL_MIN <= level <= consts.COMPRESSION_LEVEL_MAX:
+            level = consts.COMPRESSION_LEVEL_DEFAULT
+
+        self.policy: str = policy
+        self.level: int = level
+
+    def for_file(self, filepath: str) -> tuple[int, int | None]:
+        """
+        Gets the compression to use for a file on disk.
+        :param filepath: The path to the file.
+        :return: The zipfile compression type and level to use.
+        """
+        if self.policy != consts.COMPRESSION_POLICY_AUTO:
+            return self.__fixed()
+
+        extension = os.path.splitext(filepath)[1].lower()
+        if extension in consts.COMPRESSION_PRECOMPRESSED_EXTENSIONS:
+            return self.__store()
+        if extension in consts.COMPRESSION_COMPRESSIBLE_EXTENSIONS:
+            return self.__deflate()
+
+        try:
+            with open(filepath, "rb") as file:
+                sample: bytes = file.read(consts.COMPRESSION_PROBE_SIZE)
+        except OSError as e:
+            logger.debug("Could not probe %s for compressibility: %s", filepath, e)
+            return self.__deflate()
+
+        return self.for_bytes(sample)
+
+    def for_bytes(self, data: bytes) -> tuple[int, int | None]:
+        """
+        Gets the compression to use for an in-memory document, probing its first bytes.
+        :param data: The contents of the document.
+        :return: The zipfile compression type and level to use.
+        """
+        if self.policy != consts.COMPRESSION_POLICY_AUTO:
+            return self.__fixed()
+
+        sample: bytes = data[:consts.COMPRESSION_PROBE_SIZE]
+        if not sample:
+            return self.__store()
+
+        ratio: float = len(zlib.compress(sample, 1)) / len(sample)
+        if ratio >= consts.COMPRESSION_PROBE_MIN_RATIO:
+            return self.__store()
+        return self.__deflate()
+
+    def for_stream(self) -> tuple[int, int | None]:
+        """
+        Gets the compression to use for a document written into the archive as it is generated.
+        Streams cannot be probed ahead of time, so they are compressed unless the policy forces STORE.
+        :return: The zipfile compression type and level to use.
+        """
+        return self.__fixed()
+
+    def __fixed(self) -> tuple[int, int | None]:
+        """
+        Gets the compression to use when the policy forces a single method.
+        :return: The zipfile compression type and level to use.
+        """
+        if self.policy == consts.COMPRESSION_POLICY_STORE:
+            return self.__store()
+        return self.__deflate()
+
+    def __deflate(self) -> tuple[int, int | None]:
+        return zipfile.ZIP_DEFLATED, self.level
+
+    @staticmethod
+    def __store() -> tuple[int, int | None]:
+        return zipfile.ZIP_STORED, None
@@ -2,18 +2,23 @@ __author__ = "Rosetta Reatherford"
 __license__ = "AGPL v3"
 __maintainer__ = "The Public Library of Science (PLOS)"
 
-from typing import List
+from typing import Dict, Iterable, List, Tuple
 
 from django.core.cache import cache
 
-from plugins.production_transporter.utilities.data_fetch import CACHE_TIMEOUT
+from journal.models import Journal
+from plugins.editorial_manager_transfer_service import consts
+from plugins.editorial_manager_transfer_service.utils.interfaces.JATSAnswerField import JATSAnswerField
+from plugins.editorial_manager_transfer_service.utils.manifest import ARTICLE_FILE_RELATIONS
 from submission.models import FieldAnswer, Article
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+ANSWER_FIELDS_CACHE_KEY = "emts_answer_fields_{0}"
 
-def fetch_answer_fields_for_jats(article: Article, fetch_fresh: bool = False) -> List[FieldAnswer] | None:
+
+def fetch_answer_fields_for_jats(article: Article, fetch_fresh: bool = False) -> List[JATSAnswerField] | None:
     """
     Fetches the answer fields to use for jats generation.
     :param article: The article to fetch the fields for.
@@ -24,17 +29,71 @@ def fetch_answer_fields_for_jats(article: Article, fetch_fresh: bool = False) ->
         logger.error("No article provided.")
         return None
 
-    if fetch_fresh:
-        answer_fields = None
-    else:
-        answer_fields = cache.get(f"answer_fields_jats_{article.pk}", None)
+    # An article without answers is cached as an empty tuple, so only a missing key means a miss.
+    cached_fields: Tuple[Tuple[str, str, str], ...] | None = None
+    if not fetch_fresh:
+        cached_fields = cache.get(ANSWER_FIELDS_CACHE_KEY.format(article.pk))
+
+    if cached_fields is None:
+        cached_fields = __fetch_answer_fields([article.pk])[article.pk]
+        cache.set(ANSWER_FIELDS_CACHE_KEY.format(article.pk), cached_fields, consts.ANSWER_FIELDS_CACHE_TIMEOUT)
+
+    return [JATSAnswerField(*answer_field) for answer_field in cached_fields]
+
+
+def fetch_answer_fields_for_jats_bulk(articles: Iterable[Article],
+                                      fetch_fresh: bool = False) -> Dict[int, List[JATSAnswerField]]:
+    """
+    Fetches the answer fields to use for jats generation for many articles, reading the cached ones in one round trip
+    and the rest in a single query, then caches them.
+    :param articles: The articles to fetch the fields for.
+    :param fetch_fresh: True if we should ignore the cache and fetch new.
+    :return: The fields to use, keyed by article ID.
+    """
+    keys: Dict[int, str] = {article.pk: ANSWER_FIELDS_CACHE_KEY.format(article.pk) for article in articles}
+
+    cached: Dict[str, Tuple[Tuple[str, str, str], ...]] = dict() if fetch_fresh else cache.get_many(keys.values())
+    missing_ids: List[int] = [article_id for article_id, key in keys.items() if key not in cached]
+    if missing_ids:
+        fetched = __fetch_answer_fields(missing_ids)
+        cache.set_many({keys[article_id]: fields for article_id, fields in fetched.items()},
+                       consts.ANSWER_FIELDS_CACHE_TIMEOUT)
+        cached.update({keys[article_id]: fields for article_id, fields in fetched.items()})
+
+    return {article_id: [JATSAnswerField(*answer_field) for answer_field in cached[key]]
+            for article_id, key in keys.items()}
 
-    if not answer_fields:
-        answer_fields_set = FieldAnswer.objects.filter(article=article).prefetch_related('field')
-        if answer_fields_set is None:
-            logger.error(f"Couldn't fetch answer fields for article (ID: {article.pk}).")
-            return None
-        answer_fields = list(answer_fields_set)
-        cache.set(f"answer_fields_jats_{article.pk}", answer_fields_set, CACHE_TIMEOUT)
 
-    return answer_fields
+def invalidate_answer_fields(article_ids: Iterable[int]) -> None:
+    """
+    Drops the cached answer fields of articles, so the next export reads their current answers.
+    :param article_ids: The IDs of the articles.
+    """
+    cache.delete_many([ANSWER_FIELDS_CACHE_KEY.format(article_id) for article_id in article_ids])
+
+
+def __fetch_answer_fields(article_ids: List[int]) -> Dict[int, Tuple[Tuple[str, str, str], ...]]:
+    """
+    Reads the answer fields of articles as plain (slug, name, answer) tuples in a single query.
+    :param article_ids: The IDs of the articles.
+    :return: The fields keyed by article ID, with an empty tuple for articles without answers.
+    """
+    answer_fields: Dict[int, List[Tuple[str, str, str]]] = {article_id: [] for article_id in article_ids}
+    for article_id, slug, name, answer in (FieldAnswer.objects.filter(article_id__in=article_ids)
+                                           .order_by('pk')
+                                           .values_list('article_id', 'field__slug', 'field__name', 'answer')):
+        answer_fields[article_id].append((slug, name, answer))
+    return {article_id: tuple(fields) for article_id, fields in answer_fields.items()}
+
+
+def fetch_articles_for_export(journal: Journal, article_ids: Iterable[int]) -> List[Article]:
+    """
+    Fetches many articles from a journal with the relations used during export prefetched.
+    :param journal: The journal the articles live in.
+    :param article_ids: The IDs of the articles to fetch.
+    :return: The articles which were found, in ID order.
+    """
+    return list(Article.objects.filter(journal=journal, pk__in=list(article_ids))
+                .select_related('journal', 'section', 'correspondence_author')
+                .prefetch_related(*ARTICLE_FILE_RELATIONS, 'keywords', 'funders')
+                .order_by('pk'))
@@ -0,0 +1,110 @@
+"""
+Queues delivery events from asynchronous callbacks and applies them in batches, so the delivery loop never waits on
+writes to the job and log tables.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import asyncio
+from typing import Callable, List, Sequence
+
+from asgiref.sync import sync_to_async
+
+from plugins.editorial_manager_transfer_service import consts, logger_messages
+from plugins.editorial_manager_transfer_service.utils.interfaces.DeliveryEvent import DeliveryEvent
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class DeliveryEventQueue:
+    """
+    An asyncio queue of delivery events with a consumer which applies them in batches on a worker thread.
+    """
+
+    def __init__(self, apply: Callable[[Sequence[DeliveryEvent]], None],
+                 batch_size: int = consts.DELIVERY_EVENT_BATCH_SIZE, linger: float = consts.DELIVERY_EVENT_LINGER,
+                 maxsize: int = consts.DELIVERY_EVENT_QUEUE_SIZE) -> None:
+        """
+        Constructor.
+        :param apply: Applies a batch of events to the database. Called on a worker thread.
+        :param batch_size: The largest number of events applied at once.
+        :param linger: How long a batch waits for more events once its first event arrives, in seconds.
+        :param maxsize: The number of events queued before callbacks wait for the consumer to catch up.
+        """
+        self.__apply: Callable[[Sequence[DeliveryEvent]], None] = apply
+        self.batch_size: int = max(batch_size, 1)
+        self.linger: float = max(linger, 0)
+        self.__queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    def __len__(self) -> int:
+        return self.__queue.qsize()
+
+    async def put(self, event: DeliveryEvent) -> None:
+        """
+        Queues an event. Only waits when the queue is full.
+        :param event: The delivery event.
+        """
+        await self.__queue.put(event)
+
+    async def consume(self) -> None:
+        """
+        Applies queued events in batches until cancelled.
+        """
+        while True:
+            batch: List[DeliveryEvent] = [await self.__queue.get()]
+            deadline: float = asyncio.get_running_loop().time() + self.linger
+            while len(batch) < self.batch_size:
+                if self.__queue.empty():
+                    timeout: float = deadline - asyncio.get_running_loop().time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.__queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self.__queue.get_nowait())
+            await self.__apply_batch(batch)
+
+    async def drain(self) -> int:
+        """
+        Applies every event queued right now, such as when shutting down.
+        :return: The number of events applied.
+        """
+        applied: int = 0
+        while not self.__queue.empty():
+            batch: List[DeliveryEvent] = []
+            while len(batch) < self.batch_size and not self.__queue.empty():
+                batch.append(self.__queue.get_nowait())
+            await self.__apply_batch(batch)
+            applied += len(batch)
+        return applied
+
+    async def join(self) -> None:
+        """
+        Waits until every queued event has been applied by a running consumer.
+        """
+        await self.__queue.join()
+
+    async def __apply_batch(self, batch: List[DeliveryEvent]) -> None:
+        """
+        Applies a batch on a worker thread. If the batch fails, its events are applied one at a time so a single bad
+        event does not lose the rest.
+        :param batch: The events.
+        """
+        try:
+            await sync_to_async(self.__apply, thread_sensitive=True)(batch)
+        except Exception as e:
+            logger.exception(e)
+            for event in batch:
+                try:
+                    await sync_to_async(self.__apply, thread_sensitive=True)([event])
+                except Exception as event_error:
+                    logger.exception(event_error)
+                    logger.error(logger_messages.delivery_event_failed(event.event_type, event.journal_code,
+                                                                       event.article_id))
+        finally:
+            for _ in batch:
+                self.__queue.task_done()
@@ -0,0 +1,94 @@
+"""
+Enriches the authors and affiliations of an article with their Editorial Manager People IDs and Ringgold IDs in a
+single bulk pass, so building the JATS contribs takes the same number of queries however many authors there are.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+from typing import Dict, Iterable, List
+
+from django.db.models import prefetch_related_objects
+
+from plugins.editorial_manager_transfer_service.models import PeopleIdentifier, InstitutionIdentifier
+from plugins.editorial_manager_transfer_service.utils.identifier_keys import normalize_email, \
+    normalize_institution_name
+from plugins.editorial_manager_transfer_service.utils.identifier_store import IdentifierStore
+from plugins.editorial_manager_transfer_service.utils.institution_index import lookup_ringgold_ids
+from plugins.editorial_manager_transfer_service.utils.interfaces.FrozenAuthorForJats import JATSFrozenAuthor, \
+    JATSFrozenAffiliation, FrozenAuthorForJats
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+people_id_store: IdentifierStore = IdentifierStore(PeopleIdentifier, "email", "people_id",
+                                                  shared_cache_key="emts_people_id_{0}")
+ringgold_id_store: IdentifierStore = IdentifierStore(InstitutionIdentifier, "name", "ringgold_id")
+
+
+def get_institution_name(affiliation) -> str | None:
+    """
+    Gets the name of the institution of an affiliation.
+    :param affiliation: The affiliation.
+    :return: The institution name or None, if the affiliation has no organization.
+    """
+    organization = getattr(affiliation, 'organization', None)
+    name = getattr(organization, 'name', None)
+    return str(name) if name else None
+
+
+def get_people_ids(emails: Iterable[str | None]) -> Dict[str, str | None]:
+    """
+    Looks up the People IDs of many people by email address at once.
+    :param emails: The email addresses.
+    :return: The People IDs keyed by normalized email address, with None for people without a known People ID.
+    """
+    return people_id_store.resolve(normalize_email(email) for email in emails)
+
+
+def enrich_frozen_authors(frozen_authors: Iterable[dict]) -> List[FrozenAuthorForJats]:
+    """
+    Adds the People ID to every author and the Ringgold ID to every affiliation, looking them all up at once.
+    Ringgold IDs come from the table or, failing that, the institution index.
+    :param frozen_authors: The authors and their affiliations, as given by Article.frozen_authors_for_jats_contribs.
+    :return: The enriched authors, in the same order.
+    """
+    frozen_authors = list(frozen_authors)
+    __prefetch_organization_names(frozen_authors)
+
+    people_ids = get_people_ids(getattr(frozen_author['author'], 'email', None) for frozen_author in frozen_authors)
+    ringgold_ids = ringgold_id_store.resolve(normalize_institution_name(get_institution_name(affiliation))
+                                             for frozen_author in frozen_authors
+                                             for affiliation in frozen_author['affiliations'])
+    # Institutions missing from the table are matched against the local institution index, misspellings included.
+    ringgold_ids.update(lookup_ringgold_ids([name for name, ringgold_id in ringgold_ids.items() if not ringgold_id]))
+
+    frozen_auths: List[FrozenAuthorForJats] = []
+    for frozen_author in frozen_authors:
+        frozen_auth: FrozenAuthorForJats = FrozenAuthorForJats()
+
+        author = frozen_author['author']
+        # An author without a People ID gets none, rather than a Janeway ID Editorial Manager would not know.
+        frozen_auth.author = JATSFrozenAuthor(author, people_ids.get(normalize_email(getattr(author, 'email', None))))
+
+        for affiliation in frozen_author['affiliations']:
+            ringgold_id = ringgold_ids.get(normalize_institution_name(get_institution_name(affiliation)))
+            frozen_auth.affiliations.append(JATSFrozenAffiliation(affiliation, ringgold_id))
+
+        frozen_auths.append(frozen_auth)
+
+    return frozen_auths
+
+
+def __prefetch_organization_names(frozen_authors: List[dict]) -> None:
+    """
+    Loads the names of every affiliated organization in bulk.
+    :param frozen_authors: The authors and their affiliations.
+    """
+    organizations = [affiliation.organization for frozen_author in frozen_authors
+                     for affiliation in frozen_author['affiliations']
+                     if getattr(affiliation, 'organization', None)]
+    try:
+        prefetch_related_objects(organizations, 'ror_display', 'custom_label')
+    except (AttributeError, ValueError) as e:
+        logger.debug(f'Could not prefetch organization names: {e}')
@@ -0,0 +1,221 @@
+"""
+Keeps track of bundled exports in the database, so the callbacks from Editorial Manager deliveries can be handled by
+any worker process or node rather than only the one which created the bundle.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Sequence
+
+from django.db import transaction
+from django.utils.timezone import now
+
+from plugins.editorial_manager_transfer_service import logger_messages
+from plugins.editorial_manager_transfer_service.enums.delivery_event_type import DeliveryEventType
+from plugins.editorial_manager_transfer_service.enums.export_job_state import ExportJobState
+from plugins.editorial_manager_transfer_service.enums.report_state import ReportState
+from plugins.editorial_manager_transfer_service.file_exporter import ExportFileCreation
+from plugins.editorial_manager_transfer_service.models import ExportJob
+from plugins.editorial_manager_transfer_service.utils.interfaces.DeliveryEvent import DeliveryEvent
+from plugins.editorial_manager_transfer_service.utils.interfaces.ExportResult import ExportResult
+from plugins.editorial_manager_transfer_service.utils.transfer_log_buffer import TransferLogBuffer
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# The states of a job which is still waiting on a delivery callback.
+ACTIVE_EXPORT_JOB_STATES = (ExportJobState.BUNDLED, ExportJobState.ZIP_FILE_DELIVERED)
+
+# The state a job moves into for each delivery event, and the states it may move out of.
+EXPORT_JOB_TRANSITIONS = {
+    DeliveryEventType.ZIP_FILE_DELIVERED: (ExportJobState.ZIP_FILE_DELIVERED, (ExportJobState.BUNDLED,)),
+    DeliveryEventType.GO_FILE_DELIVERED: (ExportJobState.DELIVERED, ACTIVE_EXPORT_JOB_STATES),
+    DeliveryEventType.BUNDLE_DELIVERED: (ExportJobState.DELIVERED, (ExportJobState.BUNDLED,)),
+    DeliveryEventType.FAILED: (ExportJobState.FAILED, ACTIVE_EXPORT_JOB_STATES),
+}
+
+
+def __build_export_job(file_creator: ExportFileCreation | ExportResult | None) -> ExportJob | None:
+    """
+    Builds the job for a finished export.
+    :param file_creator: The export or what it produced.
+    :return: The unsaved job or None, if the export failed. Failures are already logged on the transfer report.
+    """
+    if isinstance(file_creator, ExportFileCreation):
+        file_creator = file_creator.get_export_result()
+    if (file_creator is None or file_creator.in_error_state or not file_creator.zip_filepath
+            or not (file_creator.go_filepath or file_creator.delivery_bundle)):
+        return None
+    return ExportJob(journal_id=file_creator.journal_id, article_id=file_creator.article_id,
+                     report_id=file_creator.report_id, prefix=file_creator.prefix,
+                     zip_filepath=file_creator.zip_filepath, go_filepath=file_creator.go_filepath,
+                     delivery_bundle=file_creator.delivery_bundle)
+
+
+def create_export_job(file_creator: ExportFileCreation | ExportResult | None) -> ExportJob | None:
+    """
+    Records a finished export as a job waiting on its delivery callbacks.
+    :param file_creator: The export or what it produced.
+    :return: The job or None, if the export failed.
+    """
+    export_job: ExportJob | None = __build_export_job(file_creator)
+    if export_job:
+        export_job.save()
+    return export_job
+
+
+def create_export_jobs(file_creators: Iterable[ExportFileCreation | ExportResult | None]) -> Dict[int, ExportJob]:
+    """
+    Records many finished exports as jobs in a single insert.
+    :param file_creators: The exports or what they produced.
+    :return: The jobs keyed by article ID. Failed exports are left out.
+    """
+    export_jobs: List[ExportJob] = [export_job for export_job in map(__build_export_job, file_creators) if export_job]
+    return {export_job.article_id: export_job for export_job in ExportJob.objects.bulk_create(export_jobs)}
+
+
+def get_export_job(journal_code: str, article_id: int, active_only: bool = True,
+                   delivery_bundle: bool | None = None) -> ExportJob | None:
+    """
+    Gets the newest job for an article.
+    :param journal_code: The code of the journal the article lives in.
+    :param article_id: The ID of the article.
+    :param active_only: True to only get a job still waiting on a delivery callback.
+    :param delivery_bundle: True to only get a delivery bundle, False to only get a separate zip and go file.
+    :return: The job, if there is one.
+    """
+    export_jobs = ExportJob.objects.filter(journal__code=journal_code, article_id=article_id)
+    if active_only:
+        export_jobs = export_jobs.filter(state__in=ACTIVE_EXPORT_JOB_STATES)
+    if delivery_bundle is not None:
+        export_jobs = export_jobs.filter(delivery_bundle=delivery_bundle)
+    return export_jobs.select_related("journal", "article", "report").order_by("-created").first()
+
+
+def get_export_jobs(journal_code: str, article_ids: Iterable[int],
+                    delivery_bundle: bool | None = None) -> Dict[int, ExportJob]:
+    """
+    Gets the newest active job for each of the given articles in one query.
+    :param journal_code: The code of the journal the articles live in.
+    :param article_ids: The IDs of the articles.
+    :param delivery_bundle: True to only get delivery bundles, False to only get separate zip and go files.
+    :return: The jobs keyed by article ID.
+    """
+    export_jobs: Dict[int, ExportJob] = dict()
+    queryset = ExportJob.objects.filter(journal__code=journal_code, article_id__in=list(article_ids),
+                                        state__in=ACTIVE_EXPORT_JOB_STATES)
+    if delivery_bundle is not None:
+        queryset = queryset.filter(delivery_bundle=delivery_bundle)
+    for export_job in queryset.order_by("-created"):
+        export_jobs.setdefault(export_job.article_id, export_job)
+    return export_jobs
+
+
+def __move_export_job(export_job: ExportJob, event_type: DeliveryEventType) -> bool:
+    """
+    Moves a job into the state following a delivery event. Only one worker wins when the same callback lands on
+    several.
+    :param export_job: The job to move.
+    :param event_type: The delivery event.
+    :return: True if this call moved the job, False if it was already moved on.
+    """
+    state, from_states = EXPORT_JOB_TRANSITIONS[event_type]
+    moved: int = ExportJob.objects.filter(pk=export_job.pk, state__in=from_states).update(state=state, updated=now())
+    if moved:
+        export_job.state = state
+    return moved > 0
+
+
+def __log_delivery_event(log_buffer: TransferLogBuffer, export_job: ExportJob, event: DeliveryEvent) -> None:
+    """
+    Buffers the logs and transfer report changes for a delivery event which moved a job.
+    :param log_buffer: The buffer to log into.
+    :param export_job: The job which was moved.
+    :param event: The delivery event.
+    """
+    if event.event_type == DeliveryEventType.FAILED:
+        message: str = logger_messages.export_process_failed_ingest(export_job.article_id, event.error_message)
+        if event.error:
+            logger.exception(event.error)
+        logger.error(message)
+        log_buffer.log(export_job.report, export_job.journal, export_job.article, message, False)
+        if export_job.report:
+            log_buffer.set_report_state(export_job.report, ReportState.FAILED_INGEST)
+    elif event.event_type == DeliveryEventType.ZIP_FILE_DELIVERED:
+        log_buffer.log(export_job.report, export_job.journal, export_job.article,
+                       logger_messages.export_zip_file_process_succeeded(export_job.article_id), True)
+        if export_job.report:
+            log_buffer.resolve(export_job.report)
+    elif event.event_type == DeliveryEventType.BUNDLE_DELIVERED:
+        log_buffer.log(export_job.report, export_job.journal, export_job.article,
+                       logger_messages.export_bundle_process_succeeded(export_job.article_id), True)
+        if export_job.report:
+            log_buffer.resolve(export_job.report)
+    else:
+        log_buffer.log(export_job.report, export_job.journal, export_job.article,
+                       logger_messages.export_go_file_process_succeeded(export_job.article_id), True)
+
+
+def apply_delivery_event(export_job: ExportJob, event: DeliveryEvent) -> bool:
+    """
+    Moves a job on for a delivery event and logs it.
+    :param export_job: The job the event is for.
+    :param event: The delivery event.
+    :return: True if this call moved the job, False if it was already moved on.
+    """
+    if not __move_export_job(export_job, event.event_type):
+        return False
+    log_buffer = TransferLogBuffer()
+    __log_delivery_event(log_buffer, export_job, event)
+    log_buffer.flush()
+    return True
+
+
+def apply_delivery_events(events: Sequence[DeliveryEvent]) -> List[ExportJob]:
+    """
+    Applies many delivery events in one transaction: one query to find the jobs of each journal, one to lock them,
+    one update per resulting state and one bulk insert for the logs.
+    :param events: The delivery events, in the order they happened.
+    :return: The jobs which were delivered or failed by these events, whose files are no longer needed.
+    """
+    article_ids_by_journal: Dict[str, List[int]] = defaultdict(list)
+    for event in events:
+        article_ids_by_journal[event.journal_code].append(event.article_id)
+
+    export_jobs: Dict[tuple[str, int], ExportJob] = dict()
+    for journal_code, article_ids in article_ids_by_journal.items():
+        for article_id, export_job in get_export_jobs(journal_code, article_ids).items():
+            export_jobs[(journal_code, article_id)] = export_job
+    if not export_jobs:
+        return []
+
+    log_buffer = TransferLogBuffer()
+    moved_jobs: Dict[str, ExportJob] = dict()
+    with transaction.atomic():
+        # Another worker may have moved the jobs on since they were read.
+        states: Dict[str, str] = {str(pk): state for pk, state in ExportJob.objects.select_for_update().filter(
+                pk__in=[export_job.pk for export_job in export_jobs.values()]).values_list("pk", "state")}
+        for export_job in export_jobs.values():
+            export_job.state = states.get(str(export_job.pk))
+
+        for event in events:
+            export_job: ExportJob | None = export_jobs.get((event.journal_code, event.article_id))
+            if export_job is None:
+                continue
+            state, from_states = EXPORT_JOB_TRANSITIONS[event.event_type]
+            if export_job.state not in from_states:
+                continue
+            export_job.state = state
+            moved_jobs[str(export_job.pk)] = export_job
+            __log_delivery_event(log_buffer, export_job, event)
+
+        job_ids_by_state: Dict[str, List] = defaultdict(list)
+        for export_job in moved_jobs.values():
+            job_ids_by_state[export_job.state].append(export_job.pk)
+        for state, job_ids in job_ids_by_state.items():
+            ExportJob.objects.filter(pk__in=job_ids).update(state=state, updated=now())
+        log_buffer.flush()
+
+    return [export_job for export_job in moved_jobs.values() if export_job.state not in ACTIVE_EXPORT_JOB_STATES]
@@ -0,0 +1,176 @@
+"""
+Helpers for writing the go files which tell Editorial Manager how to import an export archive.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import hashlib
+import io
+import os
+from typing import BinaryIO, Iterable, List, Tuple
+from xml.sax.saxutils import escape
+
+import plugins.editorial_manager_transfer_service.consts as consts
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+INDENT = "  "
+ATTRIBUTE_ENTITIES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#09;"}
+
+
+class GoFileWriter:
+    """
+    Writes a go file a piece at a time, listing each archive entry as soon as it is added.
+    The same header and entries always give the same bytes, so a go file can be hashed and compared.
+    """
+
+    def __init__(self, go_filepath: str | None, journal_code: str, license_code: str, archive_filename: str) -> None:
+        """
+        Opens the go file and writes its header.
+        :param go_filepath: Where to write the go file or None, to keep it in memory for embedding in the archive.
+        :param journal_code: The Editorial Manager code of the journal.
+        :param license_code: The license code of the article.
+        :param archive_filename: The name of the archive the go file describes.
+        """
+        self.go_filepath: str | None = go_filepath
+        self.filenames: List[str] = []
+        self.metadata_filename: str | None = None
+        self.bytes_written: int = 0
+        self.closed: bool = False
+        self.__digest = hashlib.sha256()
+        self.__file: BinaryIO = open(go_filepath, "wb") if go_filepath else io.BytesIO()
+
+        self.__write(XML_DECLARATION)
+        self.__open_element(0, consts.GO_FILE_ELEMENT_TAG_GO, (
+            (consts.GO_FILE_GO_ELEMENT_ATTRIBUTE_XMLNS_XSI_KEY, consts.GO_FILE_GO_ELEMENT_ATTRIBUTE_XMLNS_XSI_VALUE),
+            (consts.GO_FILE_GO_ELEMENT_ATTRIBUTE_SCHEMA_LOCATION_KEY,
+             consts.GO_FILE_GO_ELEMENT_ATTRIBUTE_SCHEMA_LOCATION_VALUE)))
+
+        # Format the header.
+        self.__open_element(1, consts.GO_FILE_ELEMENT_TAG_HEADER)
+        self.__empty_element(2, consts.GO_FILE_ELEMENT_TAG_VERSION, (
+            (consts.GO_FILE_VERSION_ELEMENT_ATTRIBUTE_NUMBER_KEY,
+             consts.GO_FILE_VERSION_ELEMENT_ATTRIBUTE_NUMBER_VALUE),))
+        self.__empty_element(2, consts.GO_FILE_ELEMENT_TAG_JOURNAL, (
+            (consts.GO_FILE_JOURNAL_ELEMENT_ATTRIBUTE_CODE_KEY, journal_code),))
+        self.__empty_element(2, consts.GO_FILE_ELEMENT_TAG_IMPORT_TYPE, (
+            (consts.GO_FILE_IMPORT_TYPE_ELEMENT_ATTRIBUTE_ID_KEY,
+             consts.GO_FILE_IMPORT_TYPE_ELEMENT_ATTRIBUTE_ID_VALUE),))
+        self.__open_element(2, consts.GO_FILE_ELEMENT_TAG_PARAMETERS)
+        self.__empty_element(3, consts.GO_FILE_ELEMENT_TAG_PARAMETER, (
+            (consts.GO_FILE_ATTRIBUTE_ELEMENT_NAME_KEY, consts.GO_FILE_PARAMETER_ELEMENT_NAME_VALUE),
+            (consts.GO_FILE_PARAMETER_ELEMENT_VALUE_KEY, license_code)))
+        self.__close_element(2, consts.GO_FILE_ELEMENT_TAG_PARAMETERS)
+        self.__close_element(1, consts.GO_FILE_ELEMENT_TAG_HEADER)
+
+        # Begin the filegroup.
+        self.__open_element(1, consts.GO_FILE_ELEMENT_TAG_FILEGROUP)
+        self.__empty_element(2, consts.GO_FILE_ELEMENT_TAG_ARCHIVE_FILE, (
+            (consts.GO_FILE_ATTRIBUTE_ELEMENT_NAME_KEY, archive_filename),))
+
+    def __enter__(self) -> "GoFileWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def add_metadata_file(self, metadata_filename: str) -> None:
+        """
+        Lists the metadata file of the archive. Must come before any other file.
+        :param metadata_filename: The name of the metadata file within the archive.
+        """
+        if self.metadata_filename is not None or self.filenames:
+            raise ValueError("The metadata file must be listed once, before any other file.")
+        self.__empty_element(2, consts.GO_FILE_ELEMENT_TAG_METADATA_FILE, (
+            (consts.GO_FILE_ATTRIBUTE_ELEMENT_NAME_KEY, metadata_filename),))
+        self.metadata_filename = metadata_filename
+
+    def add_file(self, filename: str) -> None:
+        """
+        Lists a file of the archive.
+        :param filename: The name of the file within the archive.
+        """
+        if self.metadata_filename is None:
+            raise ValueError("The metadata file must be listed before any other file.")
+        self.__empty_element(2, consts.GO_FILE_ELEMENT_TAG_FILE, (
+            (consts.GO_FILE_ATTRIBUTE_ELEMENT_NAME_KEY, filename),))
+        self.filenames.append(filename)
+
+    def close(self) -> None:
+        """
+        Finishes the go file, closing every element left open.
+        """
+        if self.closed:
+            return
+        self.__close_element(1, consts.GO_FILE_ELEMENT_TAG_FILEGROUP)
+        self.__close_element(0, consts.GO_FILE_ELEMENT_TAG_GO)
+        if self.go_filepath:
+            self.__file.close()
+        self.closed = True
+
+    def abort(self) -> None:
+        """
+        Stops writing the go file and deletes what was written so far.
+        """
+        if not self.__file.closed:
+            self.__file.close()
+        self.closed = True
+        if self.go_filepath and os.path.exists(self.go_filepath):
+            os.remove(self.go_filepath)
+
+    def getvalue(self) -> bytes:
+        """
+        Gets the go file kept in memory.
+        :return: The contents of the go file.
+        """
+        if self.go_filepath:
+            raise ValueError("The go file was written to disk, not kept in memory.")
+        return self.__file.getvalue()
+
+    def get_digest(self) -> str:
+        """
+        Gets the SHA-256 digest of everything written to the go file.
+        :return: The hex digest.
+        """
+        return self.__digest.hexdigest()
+
+    def __open_element(self, depth: int, tag: str, attributes: Iterable[Tuple[str, str]] = ()) -> None:
+        self.__write("{0}<{1}{2}>\n".format(INDENT * depth, tag, self.__format_attributes(attributes)))
+
+    def __empty_element(self, depth: int, tag: str, attributes: Iterable[Tuple[str, str]] = ()) -> None:
+        self.__write("{0}<{1}{2}/>\n".format(INDENT * depth, tag, self.__format_attributes(attributes)))
+
+    def __close_element(self, depth: int, tag: str) -> None:
+        self.__write("{0}</{1}>\n".format(INDENT * depth, tag))
+
+    @staticmethod
+    def __format_attributes(attributes: Iterable[Tuple[str, str]]) -> str:
+        return "".join(' {0}="{1}"'.format(key, escape(str(value), ATTRIBUTE_ENTITIES)) for key, value in attributes)
+
+    def __write(self, text: str) -> None:
+        data: bytes = text.encode("utf-8")
+        self.__file.write(data)
+        self.__digest.update(data)
+        self.bytes_written += len(data)
+
+
+def write_go_file(go_filepath: str, journal_code: str, license_code: str, archive_filename: str,
+                  metadata_filename: str, filenames: Iterable[str]) -> GoFileWriter:
+    """
+    Writes a whole go file at once, for an archive whose entries are already known.
+    :param go_filepath: Where to write the go file.
+    :param journal_code: The Editorial Manager code of the journal.
+    :param license_code: The license code of the article.
+    :param archive_filename: The name of the archive the go file describes.
+    :param metadata_filename: The name of the metadata file within the archive.
+    :param filenames: The names of the other files within the archive.
+    :return: The closed writer, holding the size and digest of the go file.
+    """
+    with GoFileWriter(go_filepath, journal_code, license_code, archive_filename) as go_file:
+        go_file.add_metadata_file(metadata_filename)
+        for filename in filenames:
+            go_file.add_file(filename)
+    return go_file
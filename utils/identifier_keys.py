@@ -0,0 +1,43 @@
+"""
+Normalizes the values used to look up Editorial Manager People IDs and Ringgold IDs, so the same person or
+institution always maps to the same key.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import re
+import unicodedata
+
+PUNCTUATION = re.compile(r"[^\w\s]|_")
+
+
+def normalize_email(email: str | None) -> str | None:
+    """
+    Normalizes an email address for looking up a People ID.
+    :param email: The email address.
+    :return: The trimmed, lowercased email address or None, if there is no email address.
+    """
+    if not email:
+        return None
+    email = email.strip().lower()
+    return email if email else None
+
+
+def normalize_institution_name(name: str | None) -> str | None:
+    """
+    Normalizes an institution name for looking up a Ringgold ID. Accents, punctuation, a leading "the" and the
+    difference between "&" and "and" are dropped, so the common ways of writing a name share one key.
+    :param name: The institution name.
+    :return: The normalized name or None, if there is no name.
+    """
+    if not name:
+        return None
+    name = unicodedata.normalize("NFKD", str(name))
+    name = "".join(character for character in name if not unicodedata.combining(character))
+    name = PUNCTUATION.sub(" ", name.casefold().replace("&", " and "))
+
+    words = name.split()
+    if words and words[0] == "the":
+        words = words[1:]
+    return " ".join(words) if words else None
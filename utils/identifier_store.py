@@ -0,0 +1,216 @@
+"""
+Looks up identifiers kept in a local table, such as Editorial Manager People IDs and Ringgold IDs, in bulk.
+Lookups go through an in-process cache, optionally a cache shared by every worker, the table, then any local sources
+fast enough to ask in-band. The remaining misses are filled in from the registered sources on a background thread, so
+exports never wait on them.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Set, Type
+
+from django.core.cache import cache as shared_cache
+from django.db import connection, models
+
+import plugins.editorial_manager_transfer_service.consts as consts
+import plugins.editorial_manager_transfer_service.logger_messages as logger_messages
+from plugins.editorial_manager_transfer_service.utils.ttl_cache import TTLCache
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Resolves the identifiers for some keys, leaving out the keys it could not resolve.
+IdentifierSource = Callable[[List[str]], Dict[str, str]]
+
+_backfill_executor: ThreadPoolExecutor | None = None
+_backfill_futures: Set[Future] = set()
+_backfill_lock: threading.Lock = threading.Lock()
+
+
+class IdentifierStore:
+    """
+    A table of identifiers keyed by a normalized value, read in bulk through an in-process cache.
+    """
+
+    def __init__(self, model: Type[models.Model], key_field: str, value_field: str,
+                 shared_cache_key: str | None = None) -> None:
+        """
+        Constructor.
+        :param model: The model of the table holding the identifiers.
+        :param key_field: The field holding the normalized key.
+        :param value_field: The field holding the identifier.
+        :param shared_cache_key: The format of the keys in the Django cache, if the identifiers found are shared
+        between workers there.
+        """
+        self.model: Type[models.Model] = model
+        self.key_field: str = key_field
+        self.value_field: str = value_field
+        self.shared_cache_key: str | None = shared_cache_key
+        self.cache: TTLCache = TTLCache(consts.IDENTIFIER_CACHE_SIZE, consts.IDENTIFIER_CACHE_TTL)
+        self.local_sources: List[IdentifierSource] = []
+        self.sources: List[IdentifierSource] = []
+
+    def register_local_source(self, source: IdentifierSource) -> None:
+        """
+        Adds a source which answers quickly enough to be asked during a lookup, such as an on-disk index. What it
+        resolves is cached but not saved, so the table keeps precedence and a rebuilt source is picked up.
+        :param source: The source.
+        """
+        self.local_sources.append(source)
+
+    def register_source(self, source: IdentifierSource) -> None:
+        """
+        Adds a source used to fill in keys missing from the table. Sources are asked in the order they were added.
+        :param source: The source.
+        """
+        self.sources.append(source)
+
+    def resolve(self, keys: Iterable[str | None]) -> Dict[str, str | None]:
+        """
+        Looks up the identifiers for many keys with at most one query. Keys missing from the table and the local
+        sources are cached as misses for a short while and filled in from the sources in the background.
+        :param keys: The normalized keys. Empty keys are skipped.
+        :return: The identifiers keyed by key, with None for keys which could not be resolved yet.
+        """
+        keys: Set[str] = {key for key in keys if key}
+        resolved: Dict[str, str | None] = self.cache.get_many(keys)
+
+        missing: List[str] = [key for key in keys if key not in resolved]
+        if missing and self.shared_cache_key:
+            shared: Dict[str, str] = self.__get_shared(missing)
+            self.cache.set_many(shared)
+            resolved.update(shared)
+            missing = [key for key in missing if key not in shared]
+        if not missing:
+            return resolved
+
+        found: Dict[str, str] = self.__get_stored(missing)
+        self.__set_shared(found)
+        for source in self.local_sources:
+            remaining: List[str] = [key for key in missing if key not in found]
+            if not remaining:
+                break
+            found.update({key: value for key, value in source(remaining).items() if value})
+
+        self.cache.set_many(found)
+        resolved.update(found)
+
+        misses: Dict[str, None] = {key: None for key in missing if key not in found}
+        if misses:
+            self.cache.set_many(misses, ttl=consts.IDENTIFIER_MISS_CACHE_TTL)
+            resolved.update(misses)
+            if self.sources:
+                _submit_backfill(self, list(misses))
+
+        return resolved
+
+    def store(self, identifiers: Dict[str, str]) -> None:
+        """
+        Saves identifiers into the table and the caches, replacing any already saved for the same keys.
+        :param identifiers: The identifiers keyed by normalized key.
+        """
+        if not identifiers:
+            return
+        self.model.objects.bulk_create([self.model(**{self.key_field: key, self.value_field: value})
+                                        for key, value in identifiers.items()],
+                                       update_conflicts=True, unique_fields=[self.key_field],
+                                       update_fields=[self.value_field, "updated"])
+        self.cache.set_many(identifiers)
+        self.__set_shared(identifiers)
+
+    def warm(self, keys: Iterable[str | None], batch_size: int = consts.IDENTIFIER_WARM_BATCH_SIZE) -> int:
+        """
+        Loads the identifiers saved for many keys into the caches, so the first lookups after a restart or a quiet
+        spell do not wait on the table.
+        :param keys: The normalized keys. Empty keys are skipped.
+        :param batch_size: The number of keys read from the table in each query.
+        :return: The number of identifiers loaded.
+        """
+        keys: List[str] = sorted({key for key in keys if key})
+        loaded: int = 0
+        for start in range(0, len(keys), batch_size):
+            found: Dict[str, str] = self.__get_stored(keys[start:start + batch_size])
+            self.cache.set_many(found)
+            self.__set_shared(found)
+            loaded += len(found)
+        return loaded
+
+    def backfill(self, keys: List[str]) -> Dict[str, str]:
+        """
+        Asks the sources for the identifiers of keys missing from the table and saves the ones they resolve.
+        :param keys: The normalized keys.
+        :return: The identifiers which were resolved, keyed by key.
+        """
+        found: Dict[str, str] = dict()
+        remaining: List[str] = list(keys)
+        for source in self.sources:
+            if not remaining:
+                break
+            found.update({key: value for key, value in source(remaining).items() if value})
+            remaining = [key for key in remaining if key not in found]
+
+        self.store(found)
+        return found
+
+    def __get_stored(self, keys: List[str]) -> Dict[str, str]:
+        return dict(self.model.objects.filter(**{"{0}__in".format(self.key_field): keys})
+                    .values_list(self.key_field, self.value_field))
+
+    def __get_shared_key(self, key: str) -> str:
+        # Keys such as email addresses may hold characters cache backends refuse, so they are hashed.
+        return self.shared_cache_key.format(hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+    def __get_shared(self, keys: List[str]) -> Dict[str, str]:
+        shared_keys: Dict[str, str] = {self.__get_shared_key(key): key for key in keys}
+        return {shared_keys[shared_key]: value for shared_key, value in shared_cache.get_many(shared_keys).items()}
+
+    def __set_shared(self, identifiers: Dict[str, str]) -> None:
+        if self.shared_cache_key and identifiers:
+            shared_cache.set_many({self.__get_shared_key(key): value for key, value in identifiers.items()},
+                                  consts.IDENTIFIER_SHARED_CACHE_TIMEOUT)
+
+
+def _submit_backfill(store: IdentifierStore, keys: List[str]) -> None:
+    """
+    Backfills keys on the background thread, starting it if needed.
+    :param store: The store the keys are missing from.
+    :param keys: The normalized keys.
+    """
+    global _backfill_executor
+    with _backfill_lock:
+        if _backfill_executor is None:
+            _backfill_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="emts-identifier-backfill")
+        future: Future = _backfill_executor.submit(_run_backfill, store, keys)
+        _backfill_futures.add(future)
+    future.add_done_callback(_backfill_futures.discard)
+
+
+def _run_backfill(store: IdentifierStore, keys: List[str]) -> None:
+    """
+    Backfills keys, logging rather than raising any failure since nothing waits on the result.
+    :param store: The store the keys are missing from.
+    :param keys: The normalized keys.
+    """
+    try:
+        store.backfill(keys)
+    except Exception as e:
+        logger.exception(e)
+        logger.warning(logger_messages.identifier_backfill_failed(store.model.__name__, len(keys)))
+    finally:
+        # The background thread has its own connection, which is not closed at the end of a request.
+        connection.close()
+
+
+def wait_for_backfills(timeout: float | None = None) -> None:
+    """
+    Waits for the backfills submitted so far to finish.
+    :param timeout: The most seconds to wait, or None to wait for all of them.
+    """
+    with _backfill_lock:
+        futures: List[Future] = list(_backfill_futures)
+    if futures:
+        wait(futures, timeout=timeout)
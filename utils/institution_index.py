@@ -0,0 +1,349 @@
+"""
+A read-only, on-disk index of institutions and their Ringgold IDs, built from a Ringgold or ROR data dump.
+The index is memory-mapped, so every worker on a server shares one copy through the page cache. Names and aliases
+are looked up exactly with a binary search over their normalized forms, then fuzzily through a trigram index.
+
+The file holds, after its header: the institutions, the names sorted by their UTF-8 bytes, the trigrams sorted by
+their UTF-8 bytes, the postings of each trigram (the names containing it) and a blob with every string.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import csv
+import json
+import math
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+import plugins.editorial_manager_transfer_service.consts as consts
+from plugins.editorial_manager_transfer_service import logger_messages
+from plugins.editorial_manager_transfer_service.utils.identifier_keys import normalize_institution_name
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_MAGIC = b"EMTSINS1"
+# Magic, institution count, name count, trigram count, then the offsets of the institutions, names, trigrams,
+# postings and strings.
+HEADER = struct.Struct("<8sIIIQQQQQ")
+# The offset and length of the Ringgold ID in the strings.
+INSTITUTION = struct.Struct("<II")
+# The offset and length of the normalized name in the strings, the index of its institution and its trigram count.
+NAME = struct.Struct("<IIII")
+# The trigram padded to 12 bytes, then the index of its first posting and its posting count.
+TRIGRAM = struct.Struct("<12sII")
+POSTING = struct.Struct("<I")
+
+# The Ringgold ID of an institution and its names, its main name first.
+InstitutionRecord = Tuple[str, List[str]]
+
+
+def get_trigrams(name: str) -> Set[str]:
+    """
+    Splits a normalized name into trigrams, padded so the start and end of the name weigh more.
+    :param name: The normalized name.
+    :return: The trigrams.
+    """
+    padded = "  {0} ".format(name)
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class InstitutionIndex:
+    """
+    A memory-mapped institution index.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Constructor.
+        :param path: The path to the index file.
+        :raises ValueError: If the file is empty or is not an institution index.
+        """
+        self.path: str = path
+        with open(path, "rb") as index_file:
+            self.__map: mmap.mmap = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.__map) < HEADER.size:
+            self.close()
+            raise ValueError("{0} is not an institution index.".format(path))
+        (magic, self.institution_count, self.name_count, self.trigram_count, self.__institutions_offset,
+         self.__names_offset, self.__trigrams_offset, self.__postings_offset,
+         self.__strings_offset) = HEADER.unpack_from(self.__map, 0)
+        if magic != INDEX_MAGIC:
+            self.close()
+            raise ValueError("{0} is not an institution index.".format(path))
+
+    def close(self) -> None:
+        """
+        Unmaps the index file.
+        """
+        self.__map.close()
+
+    def lookup(self, name: str | None) -> str | None:
+        """
+        Looks up the Ringgold ID of an institution by name or alias, exactly first and then fuzzily.
+        :param name: The normalized name.
+        :return: The Ringgold ID or None, if no institution matched.
+        """
+        if not name:
+            return None
+        ringgold_id = self.lookup_exact(name)
+        if ringgold_id is None:
+            ringgold_id = self.lookup_fuzzy(name)
+        return ringgold_id
+
+    def lookup_exact(self, name: str) -> str | None:
+        """
+        Looks up the Ringgold ID of an institution whose name or alias is exactly the given one.
+        :param name: The normalized name.
+        :return: The Ringgold ID or None, if no institution has the name.
+        """
+        key: bytes = name.encode("utf-8")
+        low, high = 0, self.name_count
+        while low < high:
+            middle = (low + high) // 2
+            middle_key, institution, trigram_count = self.__get_name(middle)
+            if middle_key < key:
+                low = middle + 1
+            elif middle_key > key:
+                high = middle
+            else:
+                return self.__get_ringgold_id(institution)
+        return None
+
+    def lookup_fuzzy(self, name: str, threshold: float = consts.INSTITUTION_INDEX_FUZZY_THRESHOLD) -> str | None:
+        """
+        Looks up the Ringgold ID of the institution whose name or alias is most similar to the given one.
+        Similarity is the Dice coefficient of the trigrams of both names.
+        :param name: The normalized name.
+        :param threshold: The lowest similarity accepted, between 0 and 1.
+        :return: The Ringgold ID or None, if no name was similar enough.
+        """
+        query: Set[str] = get_trigrams(name)
+
+        # A name similar enough must share at least this many trigrams, so it must contain one of the rarest
+        # (len(query) - min_overlap + 1) trigrams of the query. Only their postings need reading.
+        min_overlap: int = math.ceil(threshold * len(query) / (2 - threshold))
+        postings: List[Tuple[int, int]] = sorted(self.__find_trigram(trigram) for trigram in query)
+        candidates: Set[int] = set()
+        for count, start in postings[:len(query) - min_overlap + 1]:
+            if count == 0:
+                continue
+            if len(candidates) + count > consts.INSTITUTION_INDEX_MAX_CANDIDATES:
+                break
+            candidates.update(struct.unpack_from("<{0}I".format(count), self.__map,
+                                                 self.__postings_offset + start * POSTING.size))
+
+        # Names with too few or too many trigrams cannot be similar enough, so they are skipped before decoding.
+        min_trigrams: float = threshold * len(query) / (2 - threshold)
+        max_trigrams: float = (2 - threshold) * len(query) / threshold
+        best_score: float = threshold
+        best_institution: int | None = None
+        for candidate in sorted(candidates):
+            candidate_key, institution, trigram_count = self.__get_name(candidate)
+            if not min_trigrams <= trigram_count <= max_trigrams:
+                continue
+            overlap: int = len(query & get_trigrams(candidate_key.decode("utf-8")))
+            score: float = 2 * overlap / (len(query) + trigram_count)
+            if score > best_score or (best_institution is None and score >= best_score):
+                best_score, best_institution = score, institution
+
+        return self.__get_ringgold_id(best_institution) if best_institution is not None else None
+
+    def __get_name(self, index: int) -> Tuple[bytes, int, int]:
+        offset, length, institution, trigram_count = NAME.unpack_from(self.__map,
+                                                                      self.__names_offset + index * NAME.size)
+        start = self.__strings_offset + offset
+        return self.__map[start:start + length], institution, trigram_count
+
+    def __get_ringgold_id(self, institution: int) -> str:
+        offset, length = INSTITUTION.unpack_from(self.__map, self.__institutions_offset + institution * INSTITUTION.size)
+        start = self.__strings_offset + offset
+        return self.__map[start:start + length].decode("utf-8")
+
+    def __find_trigram(self, trigram: str) -> Tuple[int, int]:
+        """
+        Finds the postings of a trigram.
+        :param trigram: The trigram.
+        :return: The posting count and the index of the first posting, with a count of 0 if no name contains it.
+        """
+        key: bytes = trigram.encode("utf-8").ljust(12, b"\0")
+        low, high = 0, self.trigram_count
+        while low < high:
+            middle = (low + high) // 2
+            middle_key, start, count = TRIGRAM.unpack_from(self.__map, self.__trigrams_offset + middle * TRIGRAM.size)
+            if middle_key < key:
+                low = middle + 1
+            elif middle_key > key:
+                high = middle
+            else:
+                return count, start
+        return 0, 0
+
+
+def build_institution_index(institutions: Iterable[InstitutionRecord], path: str) -> Tuple[int, int]:
+    """
+    Writes an institution index, replacing any index at the path at once so workers reading it are not disturbed.
+    :param institutions: The Ringgold ID and the names of each institution, its main name first. Where institutions
+    share a name, the first one keeps it.
+    :param path: The path to write the index to.
+    :return: The number of institutions and names written.
+    """
+    ringgold_ids: List[str] = []
+    names: Dict[bytes, int] = dict()
+    for ringgold_id, institution_names in institutions:
+        keys = [normalize_institution_name(name) for name in institution_names]
+        keys = [key.encode("utf-8") for key in keys if key]
+        if not ringgold_id or not keys:
+            continue
+        for key in keys:
+            names.setdefault(key, len(ringgold_ids))
+        ringgold_ids.append(str(ringgold_id))
+
+    strings = bytearray()
+
+    def add_string(value: bytes) -> Tuple[int, int]:
+        offset = len(strings)
+        strings.extend(value)
+        return offset, len(value)
+
+    institution_records = [INSTITUTION.pack(*add_string(ringgold_id.encode("utf-8"))) for ringgold_id in ringgold_ids]
+
+    name_records: List[bytes] = []
+    trigram_postings: Dict[bytes, List[int]] = dict()
+    for index, key in enumerate(sorted(names)):
+        trigrams = get_trigrams(key.decode("utf-8"))
+        name_records.append(NAME.pack(*add_string(key), names[key], len(trigrams)))
+        for trigram in trigrams:
+            trigram_postings.setdefault(trigram.encode("utf-8").ljust(12, b"\0"), []).append(index)
+
+    trigram_records: List[bytes] = []
+    postings: List[int] = []
+    for trigram in sorted(trigram_postings):
+        trigram_records.append(TRIGRAM.pack(trigram, len(postings), len(trigram_postings[trigram])))
+        postings.extend(trigram_postings[trigram])
+
+    institutions_offset = HEADER.size
+    names_offset = institutions_offset + len(institution_records) * INSTITUTION.size
+    trigrams_offset = names_offset + len(name_records) * NAME.size
+    postings_offset = trigrams_offset + len(trigram_records) * TRIGRAM.size
+    strings_offset = postings_offset + len(postings) * POSTING.size
+
+    temp_path = "{0}.tmp".format(path)
+    with open(temp_path, "wb") as index_file:
+        index_file.write(HEADER.pack(INDEX_MAGIC, len(institution_records), len(name_records), len(trigram_records),
+                                     institutions_offset, names_offset, trigrams_offset, postings_offset,
+                                     strings_offset))
+        index_file.write(b"".join(institution_records))
+        index_file.write(b"".join(name_records))
+        index_file.write(b"".join(trigram_records))
+        index_file.write(struct.pack("<{0}I".format(len(postings)), *postings))
+        index_file.write(strings)
+    os.replace(temp_path, path)
+
+    return len(institution_records), len(name_records)
+
+
+def read_ringgold_csv(path: str, id_column: str = "ringgold_id", name_column: str = "name",
+                      alias_column: str | None = "aliases", alias_separator: str = "|") -> Iterator[InstitutionRecord]:
+    """
+    Reads the institutions of a Ringgold CSV export.
+    :param path: The path to the CSV file.
+    :param id_column: The column holding the Ringgold ID.
+    :param name_column: The column holding the main name.
+    :param alias_column: The column holding the other names, if there is one.
+    :param alias_separator: What separates the other names.
+    :return: The Ringgold ID and names of each institution.
+    """
+    with open(path, newline="", encoding="utf-8") as csv_file:
+        for row in csv.DictReader(csv_file):
+            names = [row.get(name_column)]
+            if alias_column and row.get(alias_column):
+                names.extend(row[alias_column].split(alias_separator))
+            yield (row.get(id_column) or "").strip(), [name for name in names if name]
+
+
+def read_ror_json(path: str, id_type: str = "ringgold") -> Iterator[InstitutionRecord]:
+    """
+    Reads the institutions of a ROR data dump, in either schema version. ROR records only carry a Ringgold ID when
+    their external IDs list one, so records without one are skipped.
+    :param path: The path to the JSON file.
+    :param id_type: The type of external ID to index.
+    :return: The Ringgold ID and names of each institution.
+    """
+    with open(path, encoding="utf-8") as json_file:
+        records = json.load(json_file)
+
+    for record in records:
+        external_ids = record.get("external_ids") or []
+        if isinstance(external_ids, dict):
+            external_ids = [dict(value, type=key) for key, value in external_ids.items()]
+        ringgold_id = None
+        for external_id in external_ids:
+            if str(external_id.get("type", "")).lower() == id_type:
+                all_ids = external_id.get("all") or []
+                ringgold_id = external_id.get("preferred") or (all_ids[0] if isinstance(all_ids, list) and all_ids
+                                                               else all_ids)
+                break
+        if not ringgold_id:
+            continue
+
+        if "names" in record:
+            names = sorted(record["names"], key=lambda name: "ror_display" not in name.get("types", []))
+            names = [name.get("value") for name in names]
+        else:
+            names = ([record.get("name")] + list(record.get("aliases", [])) + list(record.get("acronyms", []))
+                     + [label.get("label") for label in record.get("labels", [])])
+        yield str(ringgold_id), [name for name in names if name]
+
+
+_index: InstitutionIndex | None = None
+_index_identity: Tuple[str, int, int] | None = None
+
+
+def get_institution_index(path: str = consts.INSTITUTION_INDEX_PATH) -> InstitutionIndex | None:
+    """
+    Gets the institution index, mapping it again whenever it was rebuilt. The index it replaces is unmapped.
+    :param path: The path to the index file.
+    :return: The index or None, if it has not been built or cannot be read.
+    """
+    global _index, _index_identity
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    identity = (path, stat.st_ino, stat.st_mtime_ns)
+    if _index_identity != identity:
+        old_index: InstitutionIndex | None = _index
+        try:
+            _index = InstitutionIndex(path)
+        except (OSError, ValueError) as e:
+            # A file which cannot be read is only reported once, until it is rebuilt.
+            logger.error(logger_messages.institution_index_failed(path, str(e)))
+            _index = None
+        _index_identity = identity
+        if old_index is not None:
+            old_index.close()
+    return _index
+
+
+def lookup_ringgold_ids(names: List[str]) -> Dict[str, str]:
+    """
+    Looks up the Ringgold IDs of many institutions in the index.
+    :param names: The normalized institution names.
+    :return: The Ringgold IDs keyed by name, leaving out names which did not match.
+    """
+    index: InstitutionIndex | None = get_institution_index()
+    if index is None:
+        return dict()
+
+    ringgold_ids: Dict[str, str] = dict()
+    for name in names:
+        ringgold_id = index.lookup(name)
+        if ringgold_id:
+            ringgold_ids[name] = ringgold_id
+    return ringgold_ids
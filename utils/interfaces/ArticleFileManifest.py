@@ -0,0 +1,67 @@
+import os
+from typing import Iterator, List
+
+from core.models import File
+from plugins.editorial_manager_transfer_service.enums.file_role import FileRole
+
+
+class ManifestFile:
+    """
+    A single file to export, tagged with the role it plays within the article.
+    """
+    role: FileRole
+
+    file: File
+
+    source: object
+
+    filepath: str
+
+    filename: str
+
+    def __init__(self, role: FileRole, file: File, filepath: str, source: object = None):
+        self.role = role
+        self.file = file
+        self.source = source if source is not None else file
+        self.filepath = filepath
+        self.filename = os.path.basename(filepath)
+
+
+class ArticleFileManifest:
+    """
+    Every file exported for an article, loaded once and shared by the archive and metadata stages.
+    """
+    files: List[ManifestFile]
+
+    def __init__(self, files: List[ManifestFile] = None):
+        self.files = files if files is not None else []
+
+    def __iter__(self) -> Iterator[ManifestFile]:
+        return iter(self.files)
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def by_role(self, role: FileRole) -> List[ManifestFile]:
+        """
+        Gets the files playing the given role, in export order.
+        :param role: The role to filter by.
+        :return: The matching files.
+        """
+        return [manifest_file for manifest_file in self.files if manifest_file.role == role]
+
+    @property
+    def manuscripts(self) -> List[ManifestFile]:
+        return self.by_role(FileRole.MANUSCRIPT)
+
+    @property
+    def figures(self) -> List[ManifestFile]:
+        return self.by_role(FileRole.FIGURE)
+
+    @property
+    def sources(self) -> List[ManifestFile]:
+        return self.by_role(FileRole.SOURCE)
+
+    @property
+    def supplementary(self) -> List[ManifestFile]:
+        return self.by_role(FileRole.SUPPLEMENTARY)
@@ -0,0 +1,24 @@
+from plugins.editorial_manager_transfer_service.enums.delivery_event_type import DeliveryEventType
+
+
+class DeliveryEvent:
+    """
+    A delivery callback for an export, waiting to be applied to its job.
+    """
+    event_type: DeliveryEventType
+
+    journal_code: str
+
+    article_id: int
+
+    error_message: str | None
+
+    error: Exception | None
+
+    def __init__(self, event_type: DeliveryEventType, journal_code: str, article_id: int,
+                 error_message: str | None = None, error: Exception | None = None):
+        self.event_type = event_type
+        self.journal_code = journal_code
+        self.article_id = article_id
+        self.error_message = error_message
+        self.error = error
@@ -0,0 +1,17 @@
+from typing import List
+
+
+class ExportBundle:
+    """
+    An export archive kept for reuse, along with the entry names needed to regenerate its go file.
+    """
+    zip_filepath: str
+
+    metadata_filename: str
+
+    filenames: List[str]
+
+    def __init__(self, zip_filepath: str, metadata_filename: str, filenames: List[str]):
+        self.zip_filepath = zip_filepath
+        self.metadata_filename = metadata_filename
+        self.filenames = filenames
@@ -0,0 +1,34 @@
+import uuid
+
+
+class ExportResult:
+    """
+    What an export produced, small enough to be sent back from a worker process in place of the whole export.
+    """
+    journal_id: int | None
+
+    article_id: int | None
+
+    report_id: uuid.UUID | None
+
+    prefix: str | None
+
+    zip_filepath: str | None
+
+    go_filepath: str | None
+
+    delivery_bundle: bool
+
+    in_error_state: bool
+
+    def __init__(self, journal_id: int | None, article_id: int | None, report_id: uuid.UUID | None,
+                 prefix: str | None, zip_filepath: str | None, go_filepath: str | None, delivery_bundle: bool,
+                 in_error_state: bool):
+        self.journal_id = journal_id
+        self.article_id = article_id
+        self.report_id = report_id
+        self.prefix = prefix
+        self.zip_filepath = zip_filepath
+        self.go_filepath = go_filepath
+        self.delivery_bundle = delivery_bundle
+        self.in_error_state = in_error_state
@@ -0,0 +1,12 @@
+from typing import NamedTuple
+
+
+class JATSAnswerField(NamedTuple):
+    """
+    A submission question answered for an article, as written into the JATS custom metadata.
+    """
+    slug: str
+
+    name: str
+
+    answer: str
@@ -0,0 +1,24 @@
+class JatsCacheStatistics:
+    """
+    How often rendered JATS metadata was reused instead of being rendered again.
+    """
+    hits: int
+
+    misses: int
+
+    def __init__(self, hits: int = 0, misses: int = 0):
+        self.hits = hits
+        self.misses = misses
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        """
+        The share of lookups that were served from the cache, between 0 and 1.
+        """
+        if self.lookups <= 0:
+            return 0.0
+        return self.hits / self.lookups
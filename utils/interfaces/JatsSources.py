@@ -0,0 +1,22 @@
+from typing import List
+
+from plugins.editorial_manager_transfer_service.models import EditorialManagerSection
+from plugins.editorial_manager_transfer_service.utils.interfaces.FrozenAuthorForJats import FrozenAuthorForJats
+from plugins.editorial_manager_transfer_service.utils.interfaces.JATSAnswerField import JATSAnswerField
+
+
+class JatsSources:
+    """
+    The records looked up for the JATS metadata of an article, fetched once and shared by the context and the template.
+    """
+    answer_fields: List[JATSAnswerField]
+
+    frozen_authors: List[FrozenAuthorForJats]
+
+    em_section: EditorialManagerSection | None
+
+    def __init__(self, answer_fields: List[JATSAnswerField], frozen_authors: List[FrozenAuthorForJats],
+                 em_section: EditorialManagerSection | None):
+        self.answer_fields = answer_fields
+        self.frozen_authors = frozen_authors
+        self.em_section = em_section
@@ -0,0 +1,25 @@
+from typing import List
+
+
+class KeysetPage:
+    """
+    One page of a listing, with the cursors to fetch the pages on either side of it.
+    """
+    items: List
+
+    next_cursor: str | None
+
+    previous_cursor: str | None
+
+    def __init__(self, items: List, next_cursor: str | None = None, previous_cursor: str | None = None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
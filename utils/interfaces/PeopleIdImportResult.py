@@ -0,0 +1,17 @@
+class PeopleIdImportResult:
+    """
+    What a pass over the People ID feeds imported.
+    """
+    files: int
+
+    failed_files: int
+
+    imported: int
+
+    skipped: int
+
+    def __init__(self):
+        self.files = 0
+        self.failed_files = 0
+        self.imported = 0
+        self.skipped = 0
@@ -0,0 +1,17 @@
+class ReaperResult:
+    """
+    What a pass of the export reaper found and deleted.
+    """
+    scanned: int
+
+    kept: int
+
+    deleted: int
+
+    bytes_reclaimed: int
+
+    def __init__(self):
+        self.scanned = 0
+        self.kept = 0
+        self.deleted = 0
+        self.bytes_reclaimed = 0
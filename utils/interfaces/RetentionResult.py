@@ -0,0 +1,26 @@
+from datetime import datetime
+
+
+class RetentionResult:
+    """
+    What a retention run pruned for one journal.
+    """
+    journal_code: str
+
+    cutoff: datetime | None
+
+    reports: int
+
+    logs: int
+
+    batches: int
+
+    archive_filepath: str | None
+
+    def __init__(self, journal_code: str, cutoff: datetime | None = None):
+        self.journal_code = journal_code
+        self.cutoff = cutoff
+        self.reports = 0
+        self.logs = 0
+        self.batches = 0
+        self.archive_filepath = None
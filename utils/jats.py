@@ -8,31 +8,80 @@ import uuid
 from typing import List
 
 from django.template import TemplateDoesNotExist, TemplateSyntaxError
-from django.template.loader import render_to_string
+from django.db.models import prefetch_related_objects
+from django.template.loader import render_to_string, get_template
 from django.utils.safestring import SafeString
+from lxml import etree
 
-from core.models import Organization
 from journal.models import Journal
 from plugins.editorial_manager_transfer_service import consts
 from plugins.editorial_manager_transfer_service.models import EditorialManagerSection
 from plugins.editorial_manager_transfer_service.utils import settings
 from plugins.editorial_manager_transfer_service.utils.data_fetch import fetch_answer_fields_for_jats
+from plugins.editorial_manager_transfer_service.utils.enrichment import enrich_frozen_authors
+from plugins.editorial_manager_transfer_service.utils.interfaces.ArticleFileManifest import ArticleFileManifest
 from plugins.editorial_manager_transfer_service.utils.interfaces.FrozenAuthorForJats import JATSFrozenAuthor, \
     JATSFrozenAffiliation, FrozenAuthorForJats
-from submission.models import Article, FieldAnswer, FrozenAuthor
+from plugins.editorial_manager_transfer_service.utils.interfaces.JATSAnswerField import JATSAnswerField
+from plugins.editorial_manager_transfer_service.utils.interfaces.JatsSources import JatsSources
+from plugins.editorial_manager_transfer_service.utils.jats_cache import fingerprint_jats_context, \
+    get_cached_jats_metadata, cache_jats_metadata
+from plugins.editorial_manager_transfer_service.utils.jats_tree import build_jats_tree
+from plugins.editorial_manager_transfer_service.utils.manifest import fetch_article_file_manifest
+from submission.models import Article, FrozenAuthor
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# The precompiled JATS template, loaded on first use.
+_precompiled_template = None
 
-def generate_jats_metadata(journal: Journal, article: Article, article_folder: str) -> str | None:
+
+def generate_jats_metadata(journal: Journal, article: Article, article_folder: str,
+                           manifest: ArticleFileManifest | None = None,
+                           builder: str = consts.JATS_BUILDER_TEMPLATE, jats_context: dict | None = None,
+                           sources: JatsSources | None = None) -> str | None:
     """
     Generates JATS metadata for an article.
     :param journal: The journal the article lives within.
     :param article: The article to generate metadata for.
     :param article_folder: The folder under which the article is stored.
+    :param manifest: The article's files, if they were already fetched.
+    :param builder: One of the JATS_BUILDER_* values from consts.
+    :param jats_context: The context built by build_jats_context, if it was already built.
+    :param sources: The records the context was built from, if they were already fetched.
     :return: Gets the filepath of the generated JATS file
     """
+    if not article_folder:
+        logger.error('No article folder given')
+        return None
+
+    rendered_jats: str | None = render_jats_metadata(journal, article, manifest, builder, jats_context, sources)
+    if rendered_jats is None:
+        return None
+
+    full_path = os.path.join(article_folder, get_jats_filename(article))
+
+    with codecs.open(full_path, 'w', "utf-8") as file:
+        file.write(rendered_jats)
+        file.close()
+
+    return full_path
+
+
+def render_jats_metadata(journal: Journal, article: Article, manifest: ArticleFileManifest | None = None,
+                         builder: str = consts.JATS_BUILDER_TEMPLATE, jats_context: dict | None = None,
+                         sources: JatsSources | None = None) -> str | None:
+    """
+    Renders the JATS metadata for an article in memory.
+    :param journal: The journal the article lives within.
+    :param article: The article to generate metadata for.
+    :param manifest: The article's files, if they were already fetched.
+    :param builder: One of the JATS_BUILDER_* values from consts.
+    :param jats_context: The context built by build_jats_context, if it was already built.
+    :param sources: The records the context was built from, so the template does not look them up again.
+    :return: The rendered JATS document or None, if rendering failed.
+    """
     logger.debug('Generating JATS file...')
 
     if not article:
@@ -43,105 +92,263 @@ def generate_jats_metadata(journal: Journal, article: Article, article_folder: s
         logger.error('No journal given')
         return None
 
-    if not article_folder:
-        logger.error('No article folder given')
-        return None
-
+    if manifest is None:
+        manifest = fetch_article_file_manifest(article)
+
+    if jats_context is None:
+        sources = fetch_jats_sources(article)
+        jats_context = build_jats_context(journal, article, manifest, sources)
+    fingerprint: str = fingerprint_jats_context(jats_context, builder)
+    rendered_jats: str | None = get_cached_jats_metadata(article.pk, fingerprint)
+    if rendered_jats is not None:
+        return rendered_jats
+
+    if builder == consts.JATS_BUILDER_PRECOMPILED:
+        rendered_jats = render_precompiled_jats_metadata(jats_context, article.pk)
+    elif builder == consts.JATS_BUILDER_ETREE:
+        try:
+            rendered_jats = build_jats_tree(jats_context).decode("utf-8")
+        except (ValueError, TypeError, etree.LxmlError):
+            logger.exception(f'JATS tree could not be built for article (ID: {article.pk}).')
+    else:
+        rendered_jats = render_template_jats_metadata(journal, article, manifest, sources)
+
+    if rendered_jats is not None:
+        cache_jats_metadata(article.pk, fingerprint, rendered_jats)
+    return rendered_jats
+
+
+def render_template_jats_metadata(journal: Journal, article: Article, manifest: ArticleFileManifest,
+                                  sources: JatsSources | None = None) -> str | None:
+    """
+    Renders the JATS metadata for an article through the template, which looks up its data as it renders.
+    :param journal: The journal the article lives within.
+    :param article: The article to generate metadata for.
+    :param manifest: The article's files.
+    :param sources: The records fetched for the article's context, if they were already fetched.
+    :return: The rendered JATS document or None, if rendering failed.
+    """
     template = consts.JATS_XML_FILE
 
-    answer_fields: List[FieldAnswer] | None = fetch_answer_fields_for_jats(article)
-    if answer_fields is None:
-        answer_fields = []
-
-    frozen_authors = fetch_author_metadata(article)
-
-    em_section = fetch_em_section(article)
+    if sources is None:
+        sources = fetch_jats_sources(article)
 
     context = {'journal': journal, 'article': article, 'include_declaration': True, 'body': True,
-               'answer_fields': answer_fields, 'license': get_xml_license_code(journal),
-               'frozen_authors': frozen_authors, 'em_section': em_section}
+               'answer_fields': sources.answer_fields, 'license': get_xml_license_code(journal),
+               'frozen_authors': sources.frozen_authors, 'em_section': sources.em_section, 'manifest': manifest,
+               'award_recipients': get_award_recipients(sources.frozen_authors)}
 
     try:
         rendered_jats: SafeString = render_to_string(template, context)
         logger.debug('Generated JATS file.')
-    except TemplateDoesNotExist as e:
-        logger.exception('JATS file not found.', e)
+    except TemplateDoesNotExist:
+        logger.exception('JATS file not found.')
         return None
-    except TemplateSyntaxError as e:
-        logger.exception(f'JATS template syntax error for article (ID: {article.pk}).', e)
+    except TemplateSyntaxError:
+        logger.exception(f'JATS template syntax error for article (ID: {article.pk}).')
         return None
 
-    file_name = f'{uuid.uuid4()}_{article.pk}.xml'
-    full_path = os.path.join(article_folder, file_name)
+    return rendered_jats
 
-    with codecs.open(full_path, 'w', "utf-8") as file:
-        file.write(rendered_jats)
-        file.close()
 
-    return full_path
-
-def fetch_em_section(article: Article) -> EditorialManagerSection | None:
+def render_precompiled_jats_metadata(context: dict, article_id: int | None = None) -> str | None:
     """
-    Fetches the EM Section ID for use.
-    :return: The EM section ID, if one can be located.
+    Renders JATS metadata from a fully materialized context without touching the database.
+    :param context: The context built by build_jats_context.
+    :param article_id: The ID of the article, for logging.
+    :return: The rendered JATS document or None, if rendering failed.
     """
-    if not article or not article.section:
+    global _precompiled_template
+    try:
+        if _precompiled_template is None:
+            _precompiled_template = get_template(consts.JATS_XML_PRECOMPILED_FILE)
+        rendered_jats: SafeString = _precompiled_template.render(context)
+        logger.debug('Generated JATS file.')
+    except TemplateDoesNotExist:
+        logger.exception('JATS file not found.')
         return None
-
-    section = article.section
-
-    em_section = EditorialManagerSection.objects.filter(section=section).first()
-    if not em_section:
-        logger.debug(f'EM section not found for article (ID: {article.pk}).')
+    except TemplateSyntaxError:
+        logger.exception(f'JATS template syntax error for article (ID: {article_id}).')
         return None
 
-    return em_section
+    return rendered_jats
 
-def fetch_author_metadata(article: Article) -> List[FrozenAuthorForJats]:
+
+def fetch_jats_sources(article: Article) -> JatsSources:
     """
-    Fetches the metadata for an author.
-    :param article: The article to fetch the author metadata for.
-    :return: A list of authors and their affiliations.
+    Fetches the records the JATS metadata of an article is built from.
+    :param article: The article to generate metadata for.
+    :return: The answer fields, authors and Editorial Manager section of the article.
     """
-    frozen_authors = article.frozen_authors_for_jats_contribs()
+    answer_fields: List[JATSAnswerField] | None = fetch_answer_fields_for_jats(article)
+    if answer_fields is None:
+        answer_fields = []
 
-    frozen_auths = []
+    frozen_authors: List[FrozenAuthorForJats] = fetch_author_metadata(article)
+    __prefetch_author_relations(frozen_authors)
 
-    for frozen_author in frozen_authors:
-        frozen_auth: FrozenAuthorForJats = FrozenAuthorForJats()
+    return JatsSources(answer_fields, frozen_authors, fetch_em_section(article))
 
-        author = frozen_author['author']
-        affiliations = frozen_author['affiliations']
 
-        frozen_auth.author = add_people_id(author)
-        for affiliation in affiliations:
-            frozen_auth.affiliations.append(add_ringgold_id_to_affiliation(affiliation))
+def build_jats_context(journal: Journal, article: Article, manifest: ArticleFileManifest | None = None,
+                       sources: JatsSources | None = None) -> dict:
+    """
+    Builds a fully materialized, plain-data context for the JATS metadata of an article.
+    Every database lookup happens here, so rendering the context afterward issues no queries.
+    :param journal: The journal the article lives within.
+    :param article: The article to generate metadata for.
+    :param manifest: The article's files, if they were already fetched.
+    :param sources: The records to build the context from, if they were already fetched.
+    :return: The context.
+    """
+    if manifest is None:
+        manifest = fetch_article_file_manifest(article)
 
-        frozen_auths.append(frozen_auth)
+    if sources is None:
+        sources = fetch_jats_sources(article)
+    answer_fields: List[JATSAnswerField] = sources.answer_fields
+    frozen_authors: List[FrozenAuthorForJats] = sources.frozen_authors
+    em_section: EditorialManagerSection | None = sources.em_section
 
-    return frozen_auths
+    authors: List[dict] = [{'author': __materialize_author(frozen_author.author),
+                            'affiliations': [__materialize_affiliation(affiliation)
+                                             for affiliation in frozen_author.affiliations]}
+                           for frozen_author in frozen_authors]
+
+    section = article.section
+    return {
+        'journal': {'name': journal.name},
+        'article': {
+            'pk': article.pk,
+            'article_type': section.jats_article_type if section and section.jats_article_type else None,
+            'language': article.iso639_1_lang_code,
+            'doi': article.get_doi(),
+            'title': article.title,
+            'date_submitted': article.date_submitted,
+            'date_accepted': article.date_accepted,
+            'abstract': article.get_clean_abstract(),
+            'keywords': [keyword.word for keyword in article.keywords.all()],
+            'funders': [{'name': funder.name, 'fundref_id': funder.fundref_id, 'funding_id': funder.funding_id}
+                        for funder in article.funders.all()],
+        },
+        'include_declaration': True,
+        'body': True,
+        'license': get_xml_license_code(journal),
+        'em_section': {'id': em_section.editorial_manager_section_id,
+                       'name': em_section.section.name} if em_section else None,
+        'frozen_authors': authors,
+        'award_recipients': [{'orcid': author['author']['orcid'], 'last_name': author['author']['last_name'],
+                              'given_names': author['author']['given_names']}
+                             for author in authors
+                             if author['author']['is_correspondence_author'] and author['author']['orcid']],
+        'answer_fields': [answer_field._asdict() for answer_field in answer_fields],
+        'has_manuscript': len(manifest.manuscripts) > 0,
+        'figures': [figure.file.name for figure in manifest.figures],
+        'supplementary_files': [str(supplementary.source) for supplementary in manifest.supplementary],
+    }
+
+
+def __prefetch_author_relations(frozen_authors: List[FrozenAuthorForJats]) -> None:
+    """
+    Loads the credits of every author and the locations of every affiliated organization in bulk.
+    :param frozen_authors: The authors to load the relations for.
+    """
+    people = [frozen_author.author.person for frozen_author in frozen_authors if frozen_author.author]
+    organizations = [affiliation.affiliation.organization for frozen_author in frozen_authors
+                     for affiliation in frozen_author.affiliations
+                     if getattr(affiliation.affiliation, 'organization', None)]
+    try:
+        prefetch_related_objects(people, 'credits')
+        prefetch_related_objects(organizations, 'locations')
+    except (AttributeError, ValueError) as e:
+        logger.debug(f'Could not prefetch author relations: {e}')
 
 
-def add_people_id(author: FrozenAuthor) -> JATSFrozenAuthor:
+def __materialize_author(author: JATSFrozenAuthor | None) -> dict:
+    """
+    Copies the fields of an author used in JATS into plain data.
+    :param author: The author to copy.
+    :return: The author's fields.
+    """
+    person = author.person if author else None
+    credits = getattr(person, 'credits', None)
+    return {
+        'people_id': author.people_id if author else None,
+        'is_correspondence_author': bool(getattr(person, 'is_correspondence_author', False)),
+        'order': getattr(person, 'order', None),
+        'credits': [credit.get_role_display() for credit in credits.all()] if credits else [],
+        'last_name': getattr(person, 'last_name', None),
+        'given_names': getattr(person, 'given_names', None),
+        'name_prefix': getattr(person, 'name_prefix', None),
+        'orcid': getattr(person, 'orcid', None),
+        'orcid_uri': getattr(person, 'orcid_uri', None),
+        'email': getattr(person, 'email', None),
+        'is_corporate': bool(getattr(person, 'is_corporate', False)),
+        'corporate_name': getattr(person, 'corporate_name', None),
+    }
+
+
+def __materialize_affiliation(affiliation: JATSFrozenAffiliation) -> dict:
+    """
+    Copies the fields of an affiliation used in JATS into plain data.
+    :param affiliation: The affiliation to copy.
+    :return: The affiliation's fields.
     """
-    Adds the EM people ID to the author using the email of the author.
-    :param author: The author to fetch and add the People ID to.
+    organization = getattr(affiliation.affiliation, 'organization', None)
+    locations = getattr(organization, 'locations', None)
+    return {
+        'ringgold_id': affiliation.ringgold_id,
+        'name': getattr(organization, 'name', None),
+        'title': getattr(organization, 'title', None),
+        'department': getattr(organization, 'department', None),
+        'locations': [str(location) for location in locations.all()] if locations else [],
+        'country': str(organization.country) if getattr(organization, 'country', None) else None,
+    }
+
+
+def get_award_recipients(frozen_authors: List[FrozenAuthorForJats]) -> List[FrozenAuthor]:
     """
-    # TODO: Fetch People ID
-    people_id = author.pk
+    Gets the authors listed as principal award recipients on the first funder.
+    :param frozen_authors: The article's authors.
+    :return: The corresponding authors with an ORCID.
+    """
+    return [frozen_author.author.person for frozen_author in frozen_authors
+            if frozen_author.author and frozen_author.author.person
+            and frozen_author.author.person.is_correspondence_author and frozen_author.author.person.orcid]
 
-    return JATSFrozenAuthor(author, people_id)
 
+def get_jats_filename(article: Article) -> str:
+    """
+    Gets a unique filename for the JATS metadata file of an article.
+    :param article: The article the metadata describes.
+    :return: The filename of the JATS file.
+    """
+    return f'{uuid.uuid4()}_{article.pk}.xml'
 
-def add_ringgold_id_to_affiliation(affiliation: Organization) -> JATSFrozenAffiliation:
+def fetch_em_section(article: Article) -> EditorialManagerSection | None:
     """
-    Adds the Ringgold ID to the affiliation.
-    :param affiliation: The affiliation to add the Ringgold ID to.
+    Fetches the EM Section ID for use.
+    :return: The EM section ID, if one can be located.
     """
-    # TODO: Fetch Ringgold.
-    ringgold_id = "1812"
+    if not article or not article.section:
+        return None
+
+    section = article.section
 
-    return JATSFrozenAffiliation(affiliation, ringgold_id)
+    em_section = EditorialManagerSection.objects.filter(section=section).first()
+    if not em_section:
+        logger.debug(f'EM section not found for article (ID: {article.pk}).')
+        return None
+
+    return em_section
+
+def fetch_author_metadata(article: Article) -> List[FrozenAuthorForJats]:
+    """
+    Fetches the metadata for an author.
+    :param article: The article to fetch the author metadata for.
+    :return: A list of authors and their affiliations.
+    """
+    return enrich_frozen_authors(article.frozen_authors_for_jats_contribs())
 
 
 def get_xml_license_code(journal: Journal) -> str:
@@ -150,4 +357,4 @@ def get_xml_license_code(journal: Journal) -> str:
     :param journal: The journal where the setting lives.
     :return: The XML license code.
     """
-    return "{0}_{1}".format(settings.get_submission_partner_code(journal), settings.get_license_code(journal))
+    return settings.get_export_settings(journal).xml_license_code
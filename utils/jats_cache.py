@@ -0,0 +1,158 @@
+"""
+Caches rendered JATS metadata against a fingerprint of everything that goes into it, so unchanged articles are not
+rendered again on every resend.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import hashlib
+import json
+import os
+from typing import BinaryIO, Dict, List, Tuple
+
+from django.core.cache import cache
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+
+from plugins.editorial_manager_transfer_service import consts
+from plugins.editorial_manager_transfer_service.utils import jats_tree
+from plugins.editorial_manager_transfer_service.utils.interfaces.JatsCacheStatistics import JatsCacheStatistics
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+JATS_CACHE_KEY = "jats_metadata_{0}"
+JATS_CACHE_HITS_KEY = "jats_metadata_cache_hits"
+JATS_CACHE_MISSES_KEY = "jats_metadata_cache_misses"
+
+# The digest of each builder's source file, kept with the modification time it was computed at.
+_source_digests: Dict[str, Tuple[int, str]] = dict()
+
+
+def fingerprint_jats_context(context: dict, builder: str) -> str:
+    """
+    Fingerprints the inputs that drive the JATS metadata of an article.
+    :param context: The context built by utils.jats.build_jats_context.
+    :param builder: One of the JATS_BUILDER_* values from consts, since each builder lays out its output differently.
+    :return: A hex digest that changes whenever the rendered metadata would.
+    """
+    payload = json.dumps([consts.VERSION, builder, get_builder_source_digest(builder), context], sort_keys=True,
+                         default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_builder_source_digest(builder: str) -> str:
+    """
+    Gets the digest of the template or module a builder renders from, so editing it invalidates the cached metadata.
+    The file is only read again once its modification time changes.
+    :param builder: One of the JATS_BUILDER_* values from consts.
+    :return: The hex digest of the source file or an empty string, if it cannot be read.
+    """
+    filepath: str | None = __get_builder_source_filepath(builder)
+    if not filepath:
+        return ""
+
+    try:
+        modified: int = os.stat(filepath).st_mtime_ns
+        cached: Tuple[int, str] | None = _source_digests.get(filepath)
+        if cached is not None and cached[0] == modified:
+            return cached[1]
+        with open(filepath, "rb") as source_file:
+            digest: str = hashlib.sha256(source_file.read()).hexdigest()
+    except OSError as e:
+        logger.warning(f"Could not read the JATS builder source {filepath}: {e}")
+        return ""
+
+    _source_digests[filepath] = (modified, digest)
+    return digest
+
+
+def get_cached_jats_metadata(article_id: int, fingerprint: str) -> str | None:
+    """
+    Gets the rendered JATS metadata for an article, if it was rendered from the same inputs before.
+    :param article_id: The ID of the article.
+    :param fingerprint: The fingerprint of the current inputs.
+    :return: The rendered JATS document or None, if it must be rendered again.
+    """
+    cached = cache.get(JATS_CACHE_KEY.format(article_id))
+    if cached is not None and cached[0] == fingerprint:
+        logger.debug(f"Reusing JATS metadata for article (ID: {article_id}).")
+        __increment(JATS_CACHE_HITS_KEY)
+        return cached[1]
+
+    __increment(JATS_CACHE_MISSES_KEY)
+    return None
+
+
+def cache_jats_metadata(article_id: int, fingerprint: str, rendered_jats: str) -> None:
+    """
+    Stores the rendered JATS metadata for an article, replacing whatever was stored for older inputs.
+    :param article_id: The ID of the article.
+    :param fingerprint: The fingerprint of the inputs the metadata was rendered from.
+    :param rendered_jats: The rendered JATS document.
+    """
+    cache.set(JATS_CACHE_KEY.format(article_id), (fingerprint, str(rendered_jats)), consts.JATS_CACHE_TIMEOUT)
+
+
+def get_jats_cache_statistics() -> JatsCacheStatistics:
+    """
+    Gets how often rendered JATS metadata has been reused.
+    :return: The hit and miss counts.
+    """
+    counts = cache.get_many([JATS_CACHE_HITS_KEY, JATS_CACHE_MISSES_KEY])
+    return JatsCacheStatistics(counts.get(JATS_CACHE_HITS_KEY, 0), counts.get(JATS_CACHE_MISSES_KEY, 0))
+
+
+def reset_jats_cache_statistics() -> None:
+    """
+    Resets the hit and miss counts.
+    """
+    cache.delete_many([JATS_CACHE_HITS_KEY, JATS_CACHE_MISSES_KEY])
+
+
+def __get_builder_source_filepath(builder: str) -> str | None:
+    """
+    Gets the file a builder renders from.
+    :param builder: One of the JATS_BUILDER_* values from consts.
+    :return: The filepath or None, if it cannot be found.
+    """
+    if builder == consts.JATS_BUILDER_ETREE:
+        return jats_tree.__file__
+
+    template_name: str = consts.JATS_XML_PRECOMPILED_FILE if builder == consts.JATS_BUILDER_PRECOMPILED \
+        else consts.JATS_XML_FILE
+    try:
+        return get_template(template_name).origin.name
+    except TemplateDoesNotExist:
+        return None
+
+
+def __increment(key: str) -> None:
+    """
+    Increments a counter shared by every process using the cache backend.
+    :param key: The key of the counter.
+    """
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The counter was evicted between adding and incrementing it.
+        cache.set(key, 1, None)
+
+
+class CapturingStream:
+    """
+    Passes writes through to another stream while keeping a copy, so a streamed document can be cached afterward.
+    """
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self.stream: BinaryIO = stream
+        self.chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        return self.stream.write(data)
+
+    def getvalue(self) -> bytes:
+        return b"".join(self.chunks)
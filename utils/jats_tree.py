@@ -0,0 +1,285 @@
+"""
+Builds JATS metadata as an element tree instead of rendering a text template.
+The output is structurally equivalent to article_jats_1_2_aries.xml and is serialized incrementally.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import html
+import html.entities
+import io
+import re
+from typing import BinaryIO
+
+from django.template.defaultfilters import date as date_filter
+from django.utils.timezone import template_localtime
+from lxml import etree
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+XLINK_NAMESPACE = "http://www.w3.org/1999/xlink"
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+XLINK_HREF = "{%s}href" % XLINK_NAMESPACE
+XLINK_TITLE = "{%s}title" % XLINK_NAMESPACE
+JATS_DOCTYPE = '<!DOCTYPE article SYSTEM "JATS-archivearticle1-mathml3.dtd">'
+DEFAULT_ARTICLE_TYPE = "research-article"
+XML_ENTITIES = ("amp", "lt", "gt", "quot", "apos")
+ENTITY_PATTERN = re.compile(r"&([A-Za-z][A-Za-z0-9]*);")
+
+
+def build_jats_tree(context: dict) -> bytes:
+    """
+    Builds the JATS metadata for an article in memory.
+    :param context: The context built by utils.jats.build_jats_context.
+    :return: The serialized JATS document.
+    """
+    output = io.BytesIO()
+    write_jats_tree(context, output)
+    return output.getvalue()
+
+
+def write_jats_tree(context: dict, output: BinaryIO) -> None:
+    """
+    Writes the JATS metadata for an article to the given stream, one block at a time.
+    :param context: The context built by utils.jats.build_jats_context.
+    :param output: The binary stream to write to, such as an archive entry.
+    """
+    article: dict = context['article']
+
+    with etree.xmlfile(output, encoding="UTF-8") as xml_file:
+        xml_file.write_declaration()
+        xml_file.write_doctype(JATS_DOCTYPE)
+
+        attributes = {"article-type": article['article_type'] or DEFAULT_ARTICLE_TYPE, "dtd-version": "1.1d1",
+                      XML_LANG: __text(article['language'])}
+        with xml_file.element("article", attributes, nsmap={"xlink": XLINK_NAMESPACE}):
+            with xml_file.element("front"):
+                xml_file.write(__journal_meta(context))
+                xml_file.flush()
+                xml_file.write(__article_meta(context))
+                xml_file.flush()
+            if context.get('body'):
+                xml_file.write(__body(context))
+
+
+def __journal_meta(context: dict) -> etree.Element:
+    journal_meta = etree.Element("journal-meta")
+    __sub_element(journal_meta, "journal-id", context['license'], {"journal-id-type": "publisher"})
+    title_group = etree.SubElement(journal_meta, "journal-title-group")
+    __set_safe_text(etree.SubElement(title_group, "journal-title"), context['journal']['name'])
+    return journal_meta
+
+
+def __article_meta(context: dict) -> etree.Element:
+    article: dict = context['article']
+    article_meta = etree.Element("article-meta")
+
+    __sub_element(article_meta, "article-id", article['pk'], {"pub-id-type": "manuscript"})
+    if article['doi']:
+        __sub_element(article_meta, "article-id", article['doi'], {"pub-id-type": "doi"})
+
+    categories = etree.SubElement(article_meta, "article-categories")
+    em_section: dict | None = context['em_section']
+    if em_section:
+        subj_group = etree.SubElement(categories, "subj-group", {"subj-group-type": "Article Type"})
+        __set_safe_text(etree.SubElement(subj_group, "subject", {"id": "atype-{0}".format(em_section['id'])}),
+                        em_section['name'])
+
+    title_group = etree.SubElement(article_meta, "title-group")
+    __set_safe_text(etree.SubElement(title_group, "article-title"), article['title'])
+
+    article_meta.append(__contrib_group(context))
+
+    if context['has_manuscript']:
+        etree.SubElement(article_meta, "ext-link", {"specific-use": "Manuscript",
+                                                    XLINK_HREF: "{0}.docx".format(article['pk']),
+                                                    XLINK_TITLE: "Manuscript"})
+
+    if article['date_submitted'] or article['date_accepted']:
+        history = etree.SubElement(article_meta, "history")
+        if article['date_submitted']:
+            # The received date is stamped with the accepted date, matching the template.
+            __date(history, "received", article['date_submitted'], article['date_accepted'])
+        if article['date_accepted']:
+            __date(history, "accepted", article['date_accepted'], article['date_accepted'])
+
+    __sub_element(article_meta, "abstract", article['abstract'])
+
+    kwd_group = etree.SubElement(article_meta, "kwd-group", {XML_LANG: "en"})
+    for keyword in article['keywords']:
+        __sub_element(kwd_group, "kwd", keyword)
+
+    if article['funders']:
+        funding_group = etree.SubElement(article_meta, "funding-group")
+        for counter, funder in enumerate(article['funders'], start=1):
+            award_group = etree.SubElement(funding_group, "award-group")
+            funding_source = __sub_element(award_group, "funding-source", funder['name'])
+            if funder['fundref_id']:
+                __sub_element(funding_source, "named-content", funder['fundref_id'],
+                              {"content-type": "funder-id"})
+            if funder['funding_id']:
+                __sub_element(award_group, "award-id", funder['funding_id'])
+            if counter == 1:
+                for author in context['award_recipients']:
+                    recipient = etree.SubElement(award_group, "principal-award-recipient")
+                    __sub_element(recipient, "contrib-id", author['orcid'], {"contrib-id-type": "orcid"})
+                    name = etree.SubElement(recipient, "name")
+                    __set_safe_text(etree.SubElement(name, "surname"), author['last_name'])
+                    __set_safe_text(etree.SubElement(name, "given-names"), author['given_names'])
+
+    if context['figures']:
+        counts = etree.SubElement(article_meta, "counts")
+        etree.SubElement(counts, "fig-count", {"count": str(len(context['figures']))})
+
+    if context['answer_fields']:
+        custom_meta_group = etree.SubElement(article_meta, "custom-meta-group")
+        for field in context['answer_fields']:
+            custom_meta = etree.SubElement(custom_meta_group, "custom-meta",
+                                           {"id": __text(field['slug']), "specific-use": "question"})
+            __set_safe_text(etree.SubElement(custom_meta, "meta-name"), field['name'])
+            __set_safe_text(etree.SubElement(custom_meta, "meta-value"), field['answer'])
+
+    return article_meta
+
+
+def __contrib_group(context: dict) -> etree.Element:
+    contrib_group = etree.Element("contrib-group")
+
+    for author_counter, item in enumerate(context['frozen_authors'], start=1):
+        author: dict = item['author']
+        contrib = etree.SubElement(contrib_group, "contrib", {"contrib-type": "author"})
+        if author['is_correspondence_author']:
+            contrib.set("corresp", "yes")
+        if author['order']:
+            etree.SubElement(contrib, "role", {"content-type": str(author['order'])})
+        for credit in author['credits']:
+            etree.SubElement(contrib, "role", {"vocab": "CRediT", "vocab-term": __text(credit)})
+
+        name = etree.SubElement(contrib, "name")
+        __set_safe_text(etree.SubElement(name, "surname"), author['last_name'])
+        __set_safe_text(etree.SubElement(name, "given-names"), author['given_names'])
+        if author['name_prefix']:
+            __set_safe_text(etree.SubElement(name, "prefix"), author['name_prefix'])
+
+        if author['orcid']:
+            contrib_id = __sub_element(contrib, "contrib-id", author['orcid'], {"contrib-id-type": "orcid"})
+            if author['orcid_uri']:
+                contrib_id.set("authenticated", "true")
+        if author['people_id']:
+            __sub_element(contrib, "contrib-id", author['people_id'], {"contrib-id-type": "people"})
+        if author['email']:
+            __sub_element(contrib, "email", author['email'])
+
+        for affiliation_counter, _ in enumerate(item['affiliations'], start=1):
+            etree.SubElement(contrib, "xref", {"ref-type": "aff",
+                                               "rid": "aff{0}-{1}".format(author_counter, affiliation_counter)})
+
+        if author['is_corporate']:
+            collab_contrib = etree.SubElement(contrib_group, "contrib", {"contrib-type": "author"})
+            __set_safe_text(etree.SubElement(collab_contrib, "collab"), author['corporate_name'])
+
+    for author_counter, item in enumerate(context['frozen_authors'], start=1):
+        for affiliation_counter, affiliation in enumerate(item['affiliations'], start=1):
+            aff = etree.SubElement(contrib_group, "aff", {"id": "aff{0}-{1}".format(author_counter,
+                                                                                   affiliation_counter)})
+            if affiliation['ringgold_id']:
+                institution_wrap = etree.SubElement(aff, "institution-wrap")
+                __set_safe_text(etree.SubElement(institution_wrap, "institution"), affiliation['name'])
+                __sub_element(institution_wrap, "institution-id", affiliation['ringgold_id'],
+                              {"institution-id-type": "Ringgold"})
+            else:
+                __set_safe_text(etree.SubElement(aff, "institution"), affiliation['name'])
+            if affiliation['title']:
+                __set_safe_text(etree.SubElement(aff, "institution", {"content-type": "position"}),
+                                affiliation['title'])
+            if affiliation['department']:
+                __set_safe_text(etree.SubElement(aff, "institution", {"content-type": "dept"}),
+                                affiliation['department'])
+            for location_counter, location in enumerate(affiliation['locations'], start=1):
+                __set_safe_text(etree.SubElement(aff, "addr-line",
+                                                 {"content-type": "addrline{0}".format(location_counter)}), location)
+            if affiliation['country']:
+                __set_safe_text(etree.SubElement(aff, "country", {"specific-use": "us"}), affiliation['country'])
+
+    return contrib_group
+
+
+def __body(context: dict) -> etree.Element:
+    body = etree.Element("body")
+    for counter, figure in enumerate(context['figures'], start=1):
+        fig = etree.SubElement(body, "fig", {"fig-type": "color figure", "specific-use": "High_res_figure"})
+        __sub_element(fig, "label", "Figure {0}".format(counter))
+        etree.SubElement(fig, "graphic", {XLINK_HREF: __text(figure)})
+    for counter, supplementary_file in enumerate(context['supplementary_files'], start=1):
+        supplementary = etree.SubElement(body, "supplementary-material",
+                                         {"specific-use": "supplementary_file", XLINK_HREF: __text(supplementary_file)})
+        __sub_element(supplementary, "label", "Video {0}".format(counter))
+    return body
+
+
+def __date(parent: etree.Element, date_type: str, value, iso_value) -> None:
+    date = etree.SubElement(parent, "date", {"date-type": date_type, "iso-8601-date": __format_date(iso_value, "Y-m-d")})
+    __sub_element(date, "day", __format_date(value, "d"))
+    __sub_element(date, "month", __format_date(value, "m"))
+    __sub_element(date, "year", __format_date(value, "Y"))
+
+
+def __format_date(value, date_format: str) -> str:
+    """
+    Formats a date the same way the template's date filter does.
+    """
+    if not value:
+        return ""
+    return date_filter(template_localtime(value), date_format)
+
+
+def __sub_element(parent: etree.Element, tag: str, text, attributes: dict | None = None) -> etree.Element:
+    element = etree.SubElement(parent, tag, attributes or {})
+    element.text = __text(text)
+    return element
+
+
+def __text(value) -> str:
+    """
+    Converts a value to text the same way the template does when rendering a variable, so None becomes "None".
+    """
+    return str(value)
+
+
+def __set_safe_text(element: etree.Element, value) -> None:
+    """
+    Sets the content of an element from a value the template marks as safe. The value is written into the template
+    as it is, so its entities are resolved and any inline markup it holds is kept.
+    :param element: The element to fill.
+    :param value: The value, which may contain entities such as &amp; and inline markup such as <i>.
+    """
+    text = __text(value)
+    try:
+        fragment = etree.fromstring("<fragment>{0}</fragment>".format(__resolve_html_entities(text)))
+    except etree.XMLSyntaxError:
+        logger.debug("Could not parse inline markup, writing it as text: %s", text)
+        element.text = html.unescape(text)
+        return
+
+    element.text = fragment.text
+    for child in fragment:
+        element.append(child)
+
+
+def __resolve_html_entities(text: str) -> str:
+    """
+    Replaces the HTML entities XML does not define, such as &eacute;, with character references, which the JATS DTD
+    would otherwise resolve.
+    :param text: The text, which may contain entities.
+    :return: The text with only XML entities and character references left.
+    """
+    def resolve(match: re.Match) -> str:
+        name: str = match.group(1)
+        if name in XML_ENTITIES or name + ";" not in html.entities.html5:
+            return match.group(0)
+        return "".join("&#{0};".format(ord(character)) for character in html.entities.html5[name + ";"])
+
+    return ENTITY_PATTERN.sub(resolve, text)
@@ -0,0 +1,45 @@
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+from django.db.models import prefetch_related_objects
+
+from plugins.editorial_manager_transfer_service.enums.file_role import FileRole
+from plugins.editorial_manager_transfer_service.utils.interfaces.ArticleFileManifest import ArticleFileManifest, \
+    ManifestFile
+from submission.models import Article
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# The article relations holding exported files, in the order they are exported.
+ARTICLE_FILE_RELATIONS = ('manuscript_files', 'data_figure_files', 'source_files', 'supplementary_files__file')
+
+
+def fetch_article_file_manifest(article: Article) -> ArticleFileManifest:
+    """
+    Fetches every file related to an article in one prefetch pass and tags each with its role.
+    Relations already prefetched on the article (e.g. by a batch export) are not queried again.
+    :param article: The article to fetch the files for.
+    :return: The manifest of the article's files.
+    """
+    prefetch_related_objects([article], *ARTICLE_FILE_RELATIONS)
+
+    manifest: ArticleFileManifest = ArticleFileManifest()
+
+    for manuscript in article.manuscript_files.all():
+        manifest.files.append(ManifestFile(FileRole.MANUSCRIPT, manuscript, manuscript.get_file_path(article)))
+
+    for data_file in article.data_figure_files.all():
+        manifest.files.append(ManifestFile(FileRole.FIGURE, data_file, data_file.get_file_path(article)))
+
+    for source_file in article.source_files.all():
+        manifest.files.append(ManifestFile(FileRole.SOURCE, source_file, source_file.get_file_path(article)))
+
+    # Supplementary files wrap the stored file rather than being one.
+    for supplementary_file in article.supplementary_files.all():
+        manifest.files.append(ManifestFile(FileRole.SUPPLEMENTARY, supplementary_file.file,
+                                           supplementary_file.file.get_file_path(article), supplementary_file))
+
+    logger.debug("Fetched %s file(s) for article (ID: %s).", len(manifest), article.pk)
+    return manifest
@@ -0,0 +1,95 @@
+"""
+Cursor-based pagination for the transfer report and log listings.
+Pages are found by seeking past the last row shown rather than by offset, so every page costs the same to fetch.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import base64
+import binascii
+import uuid
+from datetime import datetime
+
+from django.db.models import Q, QuerySet
+
+from plugins.editorial_manager_transfer_service import consts
+from plugins.editorial_manager_transfer_service.utils.interfaces.KeysetPage import KeysetPage
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CURSOR_SEPARATOR = "|"
+
+
+def paginate_keyset(queryset: QuerySet, timestamp_field: str, after: str | None = None, before: str | None = None,
+                    page_size: int = consts.TRANSFER_LISTING_PAGE_SIZE) -> KeysetPage:
+    """
+    Gets one page of a listing ordered newest first, breaking ties between equal timestamps by ID.
+    :param queryset: The rows to page through. Any ordering it has is replaced.
+    :param timestamp_field: The name of the timestamp field to order by.
+    :param after: The cursor of the last row on the previous page, to fetch the page after it.
+    :param before: The cursor of the first row on the next page, to fetch the page before it.
+    :param page_size: The number of rows on each page.
+    :return: The page. The first page is given instead of an empty page past a cursor.
+    """
+    after_key = decode_cursor(after)
+    before_key = decode_cursor(before) if after_key is None else None
+    listing: QuerySet = queryset
+
+    if before_key is not None:
+        # Walk backward from the cursor, then put the rows back in display order.
+        timestamp, pk = before_key
+        rows = list(queryset.filter(Q(**{f"{timestamp_field}__gt": timestamp}) |
+                                    Q(**{timestamp_field: timestamp, "pk__gt": pk}))
+                    .order_by(timestamp_field, "pk")[:page_size + 1])
+        has_previous = len(rows) > page_size
+        items = list(reversed(rows[:page_size]))
+        has_next = True
+    else:
+        if after_key is not None:
+            timestamp, pk = after_key
+            queryset = queryset.filter(Q(**{f"{timestamp_field}__lt": timestamp}) |
+                                       Q(**{timestamp_field: timestamp, "pk__lt": pk}))
+        rows = list(queryset.order_by(f"-{timestamp_field}", "-pk")[:page_size + 1])
+        has_next = len(rows) > page_size
+        items = rows[:page_size]
+        has_previous = after_key is not None
+
+    if not items:
+        if after_key is not None or before_key is not None:
+            # The rows past the cursor are gone, for example removed by the retention reaper, so start over.
+            return paginate_keyset(listing, timestamp_field, page_size=page_size)
+        return KeysetPage(items)
+
+    return KeysetPage(items,
+                      next_cursor=encode_cursor(items[-1], timestamp_field) if has_next else None,
+                      previous_cursor=encode_cursor(items[0], timestamp_field) if has_previous else None)
+
+
+def encode_cursor(row, timestamp_field: str) -> str:
+    """
+    Encodes the position of a row as an opaque, URL-safe cursor.
+    :param row: The row.
+    :param timestamp_field: The name of the timestamp field the listing is ordered by.
+    :return: The cursor.
+    """
+    key: str = getattr(row, timestamp_field).isoformat() + CURSOR_SEPARATOR + str(row.pk)
+    return base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str | None) -> tuple[datetime, uuid.UUID] | None:
+    """
+    Decodes a cursor made by encode_cursor.
+    :param cursor: The cursor.
+    :return: The timestamp and ID of the row or None, if there is no cursor or it is malformed.
+    """
+    if not cursor:
+        return None
+
+    try:
+        timestamp, pk = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split(CURSOR_SEPARATOR)
+        return datetime.fromisoformat(timestamp), uuid.UUID(pk)
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        logger.warning(f"Ignoring malformed page cursor {cursor}: {e}")
+        return None
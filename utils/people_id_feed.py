@@ -0,0 +1,106 @@
+"""
+Imports the People IDs of Editorial Manager users from the CSV feeds dropped into the import folder.
+Each feed is moved aside once it is read, so it is only imported once.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import csv
+import os
+import re
+from typing import Dict, List
+
+import plugins.editorial_manager_transfer_service.consts as consts
+import plugins.editorial_manager_transfer_service.logger_messages as logger_messages
+from plugins.editorial_manager_transfer_service.utils.enrichment import people_id_store
+from plugins.editorial_manager_transfer_service.utils.identifier_keys import normalize_email
+from plugins.editorial_manager_transfer_service.utils.interfaces.PeopleIdImportResult import PeopleIdImportResult
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+HEADER_CHARACTERS = re.compile(r"[^a-z0-9]")
+
+
+def import_people_id_feeds(feed_folder: str = consts.PEOPLE_ID_FEED_PATH,
+                           batch_size: int = consts.IDENTIFIER_WARM_BATCH_SIZE) -> PeopleIdImportResult:
+    """
+    Imports every feed waiting in the feed folder, oldest first. Later rows replace earlier ones for the same email.
+    :param feed_folder: The folder the feeds are dropped into.
+    :param batch_size: The number of People IDs saved in each query.
+    :return: What was imported.
+    """
+    result = PeopleIdImportResult()
+    if not os.path.isdir(feed_folder):
+        return result
+
+    feeds: List[os.DirEntry] = sorted((entry for entry in os.scandir(feed_folder)
+                                       if entry.is_file() and entry.name.lower().endswith(".csv")),
+                                      key=lambda entry: entry.stat().st_mtime)
+    for feed in feeds:
+        result.files += 1
+        try:
+            people_ids, skipped = read_people_id_feed(feed.path)
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            logger.warning(logger_messages.people_id_feed_failed(feed.path, str(e)))
+            result.failed_files += 1
+            __move_feed(feed, consts.PEOPLE_ID_FEED_FAILED_FOLDER)
+            continue
+
+        emails: List[str] = list(people_ids)
+        for start in range(0, len(emails), batch_size):
+            people_id_store.store({email: people_ids[email] for email in emails[start:start + batch_size]})
+        result.imported += len(people_ids)
+        result.skipped += skipped
+        __move_feed(feed, consts.PEOPLE_ID_FEED_PROCESSED_FOLDER)
+
+    logger.info(logger_messages.people_id_feeds_imported(result.files, result.imported, result.skipped,
+                                                         result.failed_files))
+    return result
+
+
+def read_people_id_feed(path: str) -> tuple[Dict[str, str], int]:
+    """
+    Reads a People ID feed.
+    :param path: The path to the CSV feed.
+    :return: The People IDs keyed by normalized email, and the number of rows skipped for lacking either.
+    :raises ValueError: If the feed has no email or People ID column.
+    """
+    people_ids: Dict[str, str] = dict()
+    skipped: int = 0
+    with open(path, newline="", encoding="utf-8-sig") as feed_file:
+        reader = csv.reader(feed_file)
+        headers = [HEADER_CHARACTERS.sub("", header.lower()) for header in next(reader, [])]
+        email_column = __find_column(headers, consts.PEOPLE_ID_FEED_EMAIL_HEADERS)
+        people_id_column = __find_column(headers, consts.PEOPLE_ID_FEED_PEOPLE_ID_HEADERS)
+        if email_column is None or people_id_column is None:
+            raise ValueError("No email address or People ID column.")
+
+        for row in reader:
+            email = normalize_email(row[email_column]) if len(row) > email_column else None
+            people_id = row[people_id_column].strip() if len(row) > people_id_column else None
+            if not email or not people_id:
+                skipped += 1
+                continue
+            people_ids[email] = people_id
+
+    return people_ids, skipped
+
+
+def __find_column(headers: List[str], names: frozenset) -> int | None:
+    for index, header in enumerate(headers):
+        if header in names:
+            return index
+    return None
+
+
+def __move_feed(feed: os.DirEntry, folder_name: str) -> None:
+    """
+    Moves a feed aside once it has been read.
+    :param feed: The feed.
+    :param folder_name: The name of the folder, next to the feed, to move it into.
+    """
+    folder: str = os.path.join(os.path.dirname(feed.path), folder_name)
+    os.makedirs(folder, exist_ok=True)
+    os.replace(feed.path, os.path.join(folder, feed.name))
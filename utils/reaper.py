@@ -0,0 +1,173 @@
+"""
+Deletes the zip files, go files and temp folders left behind in the export folder by exports which are finished,
+failed or abandoned.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import os
+import re
+import shutil
+import time
+from typing import List, Set
+
+from plugins.editorial_manager_transfer_service import consts, logger_messages
+from plugins.editorial_manager_transfer_service.models import ExportJob
+from plugins.editorial_manager_transfer_service.utils.export_jobs import ACTIVE_EXPORT_JOB_STATES
+from plugins.editorial_manager_transfer_service.utils.interfaces.ReaperResult import ReaperResult
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# The suffixes of the files an export leaves in the export folder, after its prefix.
+EXPORT_FILE_SUFFIXES = (".go.xml", consts.DELIVERY_BUNDLE_PART_SUFFIX, ".zip")
+# An export prefix is the submission partner code followed by a uuid, such as PARTNER_<uuid4>.
+EXPORT_PREFIX_PATTERN = re.compile(r"^.+_[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+
+
+class ExportReaper:
+    """
+    Scans the export folder in batches and deletes stale export artifacts which no active export job still needs.
+    """
+
+    def __init__(self, export_folder: str = consts.EXPORT_FILE_PATH, max_age: float = consts.REAPER_MAX_AGE,
+                 batch_size: int = consts.REAPER_BATCH_SIZE, dry_run: bool = False) -> None:
+        """
+        Constructor.
+        :param export_folder: The folder to reap.
+        :param max_age: Only files and folders last modified more than this many seconds ago are deleted.
+        :param batch_size: The number of entries checked against the export jobs in each query.
+        :param dry_run: True to only count what would be deleted.
+        """
+        self.export_folder: str = export_folder
+        self.max_age: float = max_age
+        self.batch_size: int = max(batch_size, 1)
+        self.dry_run: bool = dry_run
+
+    def run(self) -> ReaperResult:
+        """
+        Reaps the export folder.
+        :return: What was found and deleted.
+        """
+        result = ReaperResult()
+        if not os.path.isdir(self.export_folder):
+            return result
+
+        cutoff: float = time.time() - self.max_age
+        batch: List[os.DirEntry] = []
+        # Delivery bundles waiting in the spool folder are reaped like the files beside it.
+        for folder in (self.export_folder, os.path.join(self.export_folder, consts.DELIVERY_SPOOL_FOLDER)):
+            if not os.path.isdir(folder):
+                continue
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if self.__get_prefix(entry) is None:
+                        continue
+                    result.scanned += 1
+                    batch.append(entry)
+                    if len(batch) >= self.batch_size:
+                        self.__reap_batch(batch, cutoff, result)
+                        batch = []
+        if batch:
+            self.__reap_batch(batch, cutoff, result)
+
+        logger.info(logger_messages.export_reaper_finished(self.export_folder, result.deleted,
+                                                           result.bytes_reclaimed, self.dry_run))
+        return result
+
+    def __reap_batch(self, batch: List[os.DirEntry], cutoff: float, result: ReaperResult) -> None:
+        """
+        Deletes the stale entries of a batch which no active export job refers to.
+        :param batch: The entries to check.
+        :param cutoff: Entries modified after this timestamp are kept.
+        :param result: The result to count into.
+        """
+        stale: List[os.DirEntry] = []
+        for entry in batch:
+            try:
+                if entry.stat(follow_symlinks=False).st_mtime < cutoff:
+                    stale.append(entry)
+                    continue
+            except FileNotFoundError:
+                continue
+            result.kept += 1
+
+        prefixes: Set[str] = {self.__get_prefix(entry) for entry in stale}
+        live_prefixes: Set[str] = set(ExportJob.objects.filter(prefix__in=prefixes, state__in=ACTIVE_EXPORT_JOB_STATES)
+                                      .values_list("prefix", flat=True))
+
+        for entry in stale:
+            if self.__get_prefix(entry) in live_prefixes:
+                result.kept += 1
+                continue
+
+            size: int = self.__get_reclaimable_size(entry)
+            if not self.dry_run and not self.__delete(entry):
+                continue
+            result.deleted += 1
+            result.bytes_reclaimed += size
+
+    @staticmethod
+    def __get_prefix(entry: os.DirEntry) -> str | None:
+        """
+        Gets the prefix of the export an entry of the export folder belongs to.
+        :param entry: The entry.
+        :return: The prefix or None, if the entry was not left by an export.
+        """
+        prefix: str | None = None
+        if entry.is_dir(follow_symlinks=False):
+            # Temp folders are named after the prefix. Any other folder, such as the bundle store or the spool
+            # folder, is not an export's to reap.
+            prefix = entry.name
+        else:
+            for suffix in EXPORT_FILE_SUFFIXES:
+                if entry.name.endswith(suffix):
+                    prefix = entry.name[:-len(suffix)]
+                    break
+
+        if prefix is None or not EXPORT_PREFIX_PATTERN.match(prefix):
+            return None
+        return prefix
+
+    @staticmethod
+    def __get_reclaimable_size(entry: os.DirEntry) -> int:
+        """
+        Gets the disk space deleting an entry would free. Files hard linked elsewhere, such as archives shared with
+        the bundle store, free nothing.
+        :param entry: The entry.
+        :return: The size in bytes.
+        """
+        try:
+            if not entry.is_dir(follow_symlinks=False):
+                stat = entry.stat(follow_symlinks=False)
+                return stat.st_size if stat.st_nlink <= 1 else 0
+
+            size: int = 0
+            for root, _, filenames in os.walk(entry.path):
+                for filename in filenames:
+                    stat = os.lstat(os.path.join(root, filename))
+                    size += stat.st_size if stat.st_nlink <= 1 else 0
+            return size
+        except OSError:
+            return 0
+
+    @staticmethod
+    def __delete(entry: os.DirEntry) -> bool:
+        """
+        Deletes an entry.
+        :param entry: The entry.
+        :return: True if the entry was deleted.
+        """
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.exception(e)
+            logger.error(logger_messages.export_process_failed_delete_file(entry.path))
+            return False
+        return True
@@ -0,0 +1,187 @@
+"""
+Prunes old transfer reports and logs. Resolved reports past a journal's retention period are rolled up into daily
+counts, archived with their logs to compressed JSON Lines files, and deleted in small batches.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import gzip
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, TextIO
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from journal.models import Journal
+from plugins.editorial_manager_transfer_service import consts
+from plugins.editorial_manager_transfer_service.models import TransferReport, TransferLogs, TransferReportRollup
+from plugins.editorial_manager_transfer_service.utils.interfaces.RetentionResult import RetentionResult
+from plugins.editorial_manager_transfer_service.utils.settings import get_retention_days
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+REPORT_FIELDS = ("id", "report_state", "message_date_time_start", "message_date_time_stop", "article_id",
+                 "stage_timings")
+LOG_FIELDS = ("id", "report_id", "article_id", "message_type", "message", "message_date_time", "success")
+
+
+class RetentionEngine:
+    """
+    Applies a journal's retention policy to its transfer reports and logs.
+    """
+
+    def __init__(self, journal: Journal, retention_days: int | None = None,
+                 batch_size: int = consts.RETENTION_BATCH_SIZE, pause: float = consts.RETENTION_BATCH_PAUSE,
+                 archive_folder: str = consts.RETENTION_ARCHIVE_PATH, dry_run: bool = False) -> None:
+        """
+        Constructor.
+        :param journal: The journal to prune.
+        :param retention_days: Overrides the journal's retention period. 0 keeps everything.
+        :param batch_size: The number of reports (or logs without a report) deleted in each transaction.
+        :param pause: The seconds to wait between batches, so other writers can get at the tables.
+        :param archive_folder: The folder the archives are written in, within a folder for each journal.
+        :param dry_run: True to only count what would be pruned.
+        """
+        self.journal: Journal = journal
+        self.retention_days: int = retention_days if retention_days is not None else get_retention_days(journal)
+        self.batch_size: int = max(batch_size, 1)
+        self.pause: float = max(pause, 0)
+        self.archive_folder: str = os.path.join(archive_folder, journal.code)
+        self.dry_run: bool = dry_run
+        self.__archive: TextIO | None = None
+
+    def run(self) -> RetentionResult:
+        """
+        Prunes everything older than the retention period.
+        :return: What was pruned.
+        """
+        if self.retention_days <= 0:
+            logger.info(f"Retention is disabled for journal {self.journal.code}.")
+            return RetentionResult(self.journal.code)
+
+        cutoff: datetime = timezone.now() - timedelta(days=self.retention_days)
+        result = RetentionResult(self.journal.code, cutoff)
+
+        reports = TransferReport.objects.filter(journal=self.journal, resolved=True,
+                                                message_date_time_start__lt=cutoff)
+        orphan_logs = TransferLogs.objects.filter(journal=self.journal, report__isnull=True,
+                                                  message_date_time__lt=cutoff)
+        if self.dry_run:
+            result.reports = reports.count()
+            result.logs = TransferLogs.objects.filter(report__in=reports).count() + orphan_logs.count()
+            return result
+
+        try:
+            while self.__prune_reports(reports, result) or self.__prune_orphan_logs(orphan_logs, result):
+                result.batches += 1
+                time.sleep(self.pause)
+        finally:
+            if self.__archive:
+                self.__archive.close()
+                result.archive_filepath = self.__archive.name
+
+        logger.info(f"Pruned {result.reports} reports and {result.logs} logs older than {cutoff} for journal "
+                    f"{self.journal.code} in {result.batches} batches.")
+        return result
+
+    def __prune_reports(self, reports, result: RetentionResult) -> bool:
+        """
+        Rolls up, archives and deletes one batch of reports along with their logs.
+        :return: True if there was anything to prune.
+        """
+        report_rows: List[dict] = list(reports.order_by("message_date_time_start", "id")
+                                       .values(*REPORT_FIELDS)[:self.batch_size])
+        if not report_rows:
+            return False
+
+        report_ids = [report["id"] for report in report_rows]
+        logs_by_report: Dict = defaultdict(list)
+        for log in TransferLogs.objects.filter(report_id__in=report_ids).values(*LOG_FIELDS):
+            logs_by_report[log["report_id"]].append(log)
+
+        rollups: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0, 0])
+        for report in report_rows:
+            day: date = self.__get_day(report["message_date_time_start"])
+            logs_by_type: Dict[str, List[dict]] = defaultdict(list)
+            for log in logs_by_report[report["id"]]:
+                logs_by_type[log["message_type"]].append(log)
+            for message_type, logs in (logs_by_type.items() or [("", [])]):
+                counts = rollups[(day, report["report_state"], message_type)]
+                counts[0] += 1
+                counts[1] += len(logs)
+                counts[2] += sum(1 for log in logs if log["success"])
+            self.__write_archive({"report": report, "logs": logs_by_report[report["id"]]})
+
+        # The archive is on disk before any row is deleted.
+        self.__archive.flush()
+        log_ids = [log["id"] for logs in logs_by_report.values() for log in logs]
+        with transaction.atomic():
+            self.__save_rollups(rollups)
+            TransferLogs.objects.filter(pk__in=log_ids).delete()
+            TransferReport.objects.filter(pk__in=report_ids).delete()
+
+        result.reports += len(report_ids)
+        result.logs += len(log_ids)
+        return True
+
+    def __prune_orphan_logs(self, orphan_logs, result: RetentionResult) -> bool:
+        """
+        Rolls up, archives and deletes one batch of logs which do not belong to a report.
+        :return: True if there was anything to prune.
+        """
+        logs: List[dict] = list(orphan_logs.order_by("message_date_time", "id").values(*LOG_FIELDS)[:self.batch_size])
+        if not logs:
+            return False
+
+        rollups: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0, 0])
+        for log in logs:
+            counts = rollups[(self.__get_day(log["message_date_time"]), "", log["message_type"])]
+            counts[1] += 1
+            counts[2] += 1 if log["success"] else 0
+        self.__write_archive({"report": None, "logs": logs})
+
+        self.__archive.flush()
+        with transaction.atomic():
+            self.__save_rollups(rollups)
+            TransferLogs.objects.filter(pk__in=[log["id"] for log in logs]).delete()
+
+        result.logs += len(logs)
+        return True
+
+    def __save_rollups(self, rollups: Dict[tuple, List[int]]) -> None:
+        """
+        Adds the given counts to the journal's daily rollups.
+        :param rollups: The report, log and success counts keyed by day, report state and message type.
+        """
+        for (day, report_state, message_type), (report_count, log_count, success_count) in rollups.items():
+            rollup, _ = TransferReportRollup.objects.get_or_create(journal=self.journal, day=day,
+                                                                   report_state=report_state,
+                                                                   message_type=message_type)
+            TransferReportRollup.objects.filter(pk=rollup.pk).update(report_count=F("report_count") + report_count,
+                                                                     log_count=F("log_count") + log_count,
+                                                                     success_count=F("success_count") + success_count)
+
+    def __write_archive(self, record: dict) -> None:
+        """
+        Appends a record to this run's archive, creating the archive on first use.
+        :param record: The record to archive.
+        """
+        if self.__archive is None:
+            os.makedirs(self.archive_folder, exist_ok=True)
+            filepath = os.path.join(self.archive_folder,
+                                    "transfer_logs_{0:%Y%m%d%H%M%S}.jsonl.gz".format(timezone.now()))
+            self.__archive = gzip.open(filepath, "at", encoding="utf-8")
+        self.__archive.write(json.dumps(record, default=str) + "\n")
+
+    @staticmethod
+    def __get_day(value: datetime) -> date:
+        if timezone.is_aware(value):
+            return timezone.localdate(value)
+        return value.date()
@@ -2,24 +2,118 @@ __author__ = "Rosetta Reatherford"
 __license__ = "AGPL v3"
 __maintainer__ = "The Public Library of Science (PLOS)"
 
+from typing import Any, Dict
+
+from django.core.cache import cache
+from django.db.models import F, Q
+
+from core.models import SettingValue
 from journal.models import Journal
 from plugins.editorial_manager_transfer_service import consts
-from plugins.production_transporter.utilities import data_fetch
 from utils import setting_handler
 
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+EXPORT_SETTINGS_CACHE_KEY = "emts_export_settings_{0}"
+
+
+def __fetch_setting_values(journal: Journal) -> Dict[str, Any]:
+    """
+    Fetches every setting of the plugin for the journal in one query. Each value is processed the way the setting
+    handler processes it, so it has the type its setting declares.
+    :param journal: The journal where the settings live.
+    :return: The setting values keyed by setting name. The journal's own values win over the defaults.
+    """
+    values: Dict[str, Any] = dict()
+    setting_values = SettingValue.objects.filter(Q(journal=journal) | Q(journal__isnull=True),
+                                                 setting__group__name=consts.PLUGIN_SETTINGS_GROUP_NAME)
+    for setting_value in setting_values.select_related("setting").order_by(F("journal").asc(nulls_first=True)):
+        values[setting_value.setting.name] = setting_value.processed_value
+    return values
+
+
+def __clean_compression_policy(policy: Any) -> str:
+    if policy not in consts.COMPRESSION_POLICIES:
+        return consts.COMPRESSION_POLICY_AUTO
+    return policy
+
+
+def __clean_compression_level(level: Any) -> int:
+    try:
+        level = int(level)
+    except (TypeError, ValueError):
+        return consts.COMPRESSION_LEVEL_DEFAULT
+
+    if not consts.COMPRESSION_LEVEL_MIN <= level <= consts.COMPRESSION_LEVEL_MAX:
+        return consts.COMPRESSION_LEVEL_DEFAULT
+    return level
+
+
+def __clean_jats_builder(builder: Any) -> str:
+    if builder not in consts.JATS_BUILDERS:
+        return consts.JATS_BUILDER_TEMPLATE
+    return builder
+
+
+def __clean_retention_days(days: Any) -> int:
+    try:
+        days = int(days)
+    except (TypeError, ValueError):
+        return consts.RETENTION_DAYS_DEFAULT
+
+    if days < 0:
+        return consts.RETENTION_DAYS_DEFAULT
+    return days
+
+
 def get_submission_partner_code(journal: Journal, fetch_fresh: bool = False) -> str:
 
-    return data_fetch.fetch_setting(journal, consts.PLUGIN_SETTINGS_GROUP_NAME, "submission_partner_code", fetch_fresh=fetch_fresh)
+    return get_export_settings(journal, fetch_fresh=fetch_fresh).submission_partner_code
 
 def get_license_code(journal: Journal, fetch_fresh: bool = False) -> str:
-    return data_fetch.fetch_setting(journal, consts.PLUGIN_SETTINGS_GROUP_NAME, "license_code", fetch_fresh=fetch_fresh)
+    return get_export_settings(journal, fetch_fresh=fetch_fresh).license_code
 
 def get_journal_code(journal: Journal, fetch_fresh: bool = False) -> str:
-    return data_fetch.fetch_setting(journal, consts.PLUGIN_SETTINGS_GROUP_NAME, "journal_code", fetch_fresh=fetch_fresh)
+    return get_export_settings(journal, fetch_fresh=fetch_fresh).journal_code
+
+def get_compression_policy(journal: Journal, fetch_fresh: bool = False) -> str:
+    """
+    Gets the archive compression policy for the journal.
+    :param journal: The journal where the setting lives.
+    :param fetch_fresh: Fetch fresh settings.
+    :return: One of the COMPRESSION_POLICY_* values, defaulting to automatic detection.
+    """
+    return get_export_settings(journal, fetch_fresh=fetch_fresh).compression_policy
+
+def get_compression_level(journal: Journal, fetch_fresh: bool = False) -> int:
+    """
+    Gets the DEFLATE level used for compressible archive entries for the journal.
+    :param journal: The journal where the setting lives.
+    :param fetch_fresh: Fetch fresh settings.
+    :return: The compression level, defaulting to COMPRESSION_LEVEL_DEFAULT.
+    """
+    return get_export_settings(journal, fetch_fresh=fetch_fresh).compression_level
+
+def get_jats_builder(journal: Journal, fetch_fresh: bool = False) -> str:
+    """
+    Gets how the JATS metadata is built for the journal.
+    :param journal: The journal where the setting lives.
+    :param fetch_fresh: Fetch fresh settings.
+    :return: One of the JATS_BUILDER_* values, defaulting to the template builder.
+    """
+    return get_export_settings(journal, fetch_fresh=fetch_fresh).jats_builder
+
+def get_retention_days(journal: Journal, fetch_fresh: bool = False) -> int:
+    """
+    Gets how many days resolved transfer reports and their logs are kept for the journal.
+    :param journal: The journal where the setting lives.
+    :param fetch_fresh: Fetch fresh settings.
+    :return: The number of days, where 0 keeps them forever. Defaults to RETENTION_DAYS_DEFAULT.
+    """
+    return get_export_settings(journal, fetch_fresh=fetch_fresh).retention_days
+
 
 def get_plugin_settings(journal: Journal, fetch_fresh: bool = False):
     """
@@ -29,27 +123,126 @@ def get_plugin_settings(journal: Journal, fetch_fresh: bool = False):
     """
 
     logger.debug("Fetching journal settings for the following journal: %s", journal.code)
-    submission_partner_code = get_submission_partner_code(journal, fetch_fresh=fetch_fresh)
-    license_code = get_license_code(journal, fetch_fresh=fetch_fresh)
-    journal_code = get_journal_code(journal, fetch_fresh=fetch_fresh)
+    export_settings: ExportSettings = get_export_settings(journal, fetch_fresh=fetch_fresh)
 
     return (
-        submission_partner_code,
-        license_code,
-        journal_code,
+        export_settings.submission_partner_code,
+        export_settings.license_code,
+        export_settings.journal_code,
     )
 
+
+class ExportSettings:
+    """
+    An immutable snapshot of the plugin settings needed to export articles from a journal, shared by every stage of
+    every export.
+    """
+    submission_partner_code: str | None
+
+    license_code: str | None
+
+    journal_code: str | None
+
+    compression_policy: str
+
+    compression_level: int
+
+    jats_builder: str
+
+    retention_days: int
+
+    def __init__(self, submission_partner_code: str | None = None, license_code: str | None = None,
+                 journal_code: str | None = None, compression_policy: str = consts.COMPRESSION_POLICY_AUTO,
+                 compression_level: int = consts.COMPRESSION_LEVEL_DEFAULT,
+                 jats_builder: str = consts.JATS_BUILDER_TEMPLATE,
+                 retention_days: int = consts.RETENTION_DAYS_DEFAULT):
+        object.__setattr__(self, "submission_partner_code", submission_partner_code)
+        object.__setattr__(self, "license_code", license_code)
+        object.__setattr__(self, "journal_code", journal_code)
+        object.__setattr__(self, "compression_policy", compression_policy)
+        object.__setattr__(self, "compression_level", compression_level)
+        object.__setattr__(self, "jats_builder", jats_builder)
+        object.__setattr__(self, "retention_days", retention_days)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ExportSettings cannot be changed. Save the plugin settings instead.")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("ExportSettings cannot be changed. Save the plugin settings instead.")
+
+    @property
+    def xml_license_code(self) -> str:
+        """
+        The license code written into the JATS metadata and the go file.
+        """
+        return "{0}_{1}".format(self.submission_partner_code, self.license_code)
+
+
+def __load_export_settings(journal: Journal) -> ExportSettings:
+    """
+    Loads the settings snapshot for a journal from the database in one query.
+    :param journal: The journal where the settings live.
+    :return: The settings snapshot, with invalid values replaced by their defaults.
+    """
+    logger.debug("Loading export settings for the following journal: %s", journal.code)
+    values: Dict[str, Any] = __fetch_setting_values(journal)
+    return ExportSettings(
+            submission_partner_code=values.get(consts.PLUGIN_SETTINGS_SUBMISSION_PARTNER_CODE),
+            license_code=values.get(consts.PLUGIN_SETTINGS_LICENSE_CODE),
+            journal_code=values.get(consts.PLUGIN_SETTINGS_JOURNAL_CODE),
+            compression_policy=__clean_compression_policy(values.get(consts.PLUGIN_SETTINGS_COMPRESSION_POLICY)),
+            compression_level=__clean_compression_level(values.get(consts.PLUGIN_SETTINGS_COMPRESSION_LEVEL)),
+            jats_builder=__clean_jats_builder(values.get(consts.PLUGIN_SETTINGS_JATS_BUILDER)),
+            retention_days=__clean_retention_days(values.get(consts.PLUGIN_SETTINGS_RETENTION_DAYS)),
+    )
+
+
+def get_export_settings(journal: Journal, fetch_fresh: bool = False) -> ExportSettings:
+    """
+    Gets the settings snapshot for a journal, loading it only when it is not cached. Saving the plugin settings
+    replaces the snapshot.
+    :param journal: The journal where the settings live.
+    :param fetch_fresh: Load the snapshot again, even if it is cached.
+    :return: The settings snapshot.
+    """
+    cache_key: str = EXPORT_SETTINGS_CACHE_KEY.format(journal.pk)
+    if not fetch_fresh:
+        export_settings: ExportSettings | None = cache.get(cache_key)
+        if export_settings is not None:
+            return export_settings
+
+    export_settings = __load_export_settings(journal)
+    cache.set(cache_key, export_settings, consts.EXPORT_SETTINGS_CACHE_TIMEOUT)
+    return export_settings
+
+
+def invalidate_export_settings(journal: Journal) -> None:
+    """
+    Drops the cached settings snapshot for a journal, so the next export loads the saved settings.
+    :param journal: The journal where the settings live.
+    """
+    cache.delete(EXPORT_SETTINGS_CACHE_KEY.format(journal.pk))
+
+
 def save_plugin_settings(
         journal: Journal,
         submission_partner_code: str,
         license_code: str,
         em_journal_code: str,
+        compression_policy: str = consts.COMPRESSION_POLICY_AUTO,
+        compression_level: int = consts.COMPRESSION_LEVEL_DEFAULT,
+        jats_builder: str = consts.JATS_BUILDER_TEMPLATE,
+        retention_days: int = consts.RETENTION_DAYS_DEFAULT,
 ):
     """
     Save the plugin settings for the Editorial Manager Transfer Service.
     :param submission_partner_code: The submission partner code
     :param license_code: The license code
     :param em_journal_code: The journal code
+    :param compression_policy: The archive compression policy
+    :param compression_level: The DEFLATE level for compressible archive entries
+    :param jats_builder: How the JATS metadata is built
+    :param retention_days: How many days resolved transfer reports are kept
     :param journal: The journal where to save the plugin settings
     :return:
     """
@@ -70,4 +263,29 @@ def save_plugin_settings(
         setting_name="journal_code",
         journal=journal,
         value=em_journal_code,
-    )
\ No newline at end of file
+    )
+    setting_handler.save_setting(
+        setting_group_name=consts.PLUGIN_SETTINGS_GROUP_NAME,
+        setting_name=consts.PLUGIN_SETTINGS_COMPRESSION_POLICY,
+        journal=journal,
+        value=compression_policy,
+    )
+    setting_handler.save_setting(
+        setting_group_name=consts.PLUGIN_SETTINGS_GROUP_NAME,
+        setting_name=consts.PLUGIN_SETTINGS_COMPRESSION_LEVEL,
+        journal=journal,
+        value=compression_level,
+    )
+    setting_handler.save_setting(
+        setting_group_name=consts.PLUGIN_SETTINGS_GROUP_NAME,
+        setting_name=consts.PLUGIN_SETTINGS_JATS_BUILDER,
+        journal=journal,
+        value=jats_builder,
+    )
+    setting_handler.save_setting(
+        setting_group_name=consts.PLUGIN_SETTINGS_GROUP_NAME,
+        setting_name=consts.PLUGIN_SETTINGS_RETENTION_DAYS,
+        journal=journal,
+        value=retention_days,
+    )
+    invalidate_export_settings(journal)
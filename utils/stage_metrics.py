@@ -0,0 +1,74 @@
+"""
+Exposes the export stage timings recorded on transfer reports in the Prometheus text format.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import math
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Iterable, List
+
+from django.utils import timezone
+
+from journal.models import Journal
+from plugins.editorial_manager_transfer_service import consts
+from plugins.editorial_manager_transfer_service.models import TransferReport
+from plugins.editorial_manager_transfer_service.utils.stage_timer import SECONDS_KEY, BYTES_KEY
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+METRICS = (
+    ("emts_export_stage_seconds", SECONDS_KEY, "Wall-clock time spent in each export stage."),
+    ("emts_export_stage_bytes", BYTES_KEY, "Bytes read or written by each export stage."),
+)
+
+
+def render_stage_metrics(journals: Iterable[Journal] | None = None,
+                         window: int = consts.STAGE_METRICS_WINDOW) -> str:
+    """
+    Summarises the stage timings of recent exports as one Prometheus summary per measurement, labelled by journal
+    and stage.
+    :param journals: The journals to include. Defaults to every journal.
+    :param window: Only reports started within this many seconds are included.
+    :return: The metrics in the Prometheus text exposition format.
+    """
+    reports = TransferReport.objects.filter(message_date_time_start__gte=timezone.now() - timedelta(seconds=window))
+    if journals is not None:
+        reports = reports.filter(journal__in=journals)
+
+    samples: Dict[str, Dict[tuple, List[float]]] = {key: defaultdict(list) for _, key, _ in METRICS}
+    for journal_code, stage_timings in reports.exclude(stage_timings={}).values_list("journal__code",
+                                                                                     "stage_timings").iterator():
+        for stage, timing in (stage_timings or {}).items():
+            for _, key, _ in METRICS:
+                samples[key][(journal_code, stage)].append(float(timing.get(key, 0)))
+
+    lines: List[str] = []
+    for name, key, description in METRICS:
+        lines.append("# HELP {0} {1}".format(name, description))
+        lines.append("# TYPE {0} summary".format(name))
+        for (journal_code, stage), values in sorted(samples[key].items()):
+            labels = 'journal="{0}",stage="{1}"'.format(__escape(journal_code), __escape(stage))
+            values.sort()
+            for quantile in consts.STAGE_METRICS_QUANTILES:
+                lines.append('{0}{{{1},quantile="{2}"}} {3}'.format(name, labels, quantile,
+                                                                    __get_quantile(values, quantile)))
+            lines.append("{0}_sum{{{1}}} {2}".format(name, labels, sum(values)))
+            lines.append("{0}_count{{{1}}} {2}".format(name, labels, len(values)))
+    return "\n".join(lines) + "\n"
+
+
+def __get_quantile(values: List[float], quantile: float) -> float:
+    """
+    Gets a quantile by the nearest-rank method.
+    :param values: The sorted values.
+    :param quantile: The quantile, between 0 and 1.
+    """
+    index = max(math.ceil(quantile * len(values)) - 1, 0)
+    return values[index]
+
+
+def __escape(value: str | None) -> str:
+    return (value or "").replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
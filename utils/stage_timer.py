@@ -0,0 +1,94 @@
+"""
+Times the stages of an export and counts the bytes each one handles.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from plugins.editorial_manager_transfer_service import consts
+
+SECONDS_KEY = "seconds"
+BYTES_KEY = "bytes"
+
+
+class StageTimer:
+    """
+    Accumulates the wall-clock time and bytes of each export stage. A stage running inside another is only counted
+    toward itself, so the stages add up to the whole export.
+    """
+
+    def __init__(self) -> None:
+        self.__timings: Dict[str, Dict[str, float | int]] = dict()
+        # The time spent in nested stages, for each stage currently running.
+        self.__nested: List[float] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Times the code run within the context as the given stage.
+        :param name: One of the EXPORT_STAGE_* values from consts.
+        """
+        self.__nested.append(0.0)
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed: float = time.perf_counter() - start
+            nested: float = self.__nested.pop()
+            if self.__nested:
+                self.__nested[-1] += elapsed
+            self.__get(name)[SECONDS_KEY] += elapsed - nested
+
+    def add_bytes(self, name: str, size: int) -> None:
+        """
+        Counts bytes toward the given stage.
+        :param name: One of the EXPORT_STAGE_* values from consts.
+        :param size: The number of bytes the stage read or wrote.
+        """
+        self.__get(name)[BYTES_KEY] += size
+
+    def as_dict(self) -> Dict[str, Dict[str, float | int]]:
+        """
+        Gets the timings, ready to be stored on a transfer report.
+        :return: The seconds and bytes of every stage that ran, keyed by stage.
+        """
+        return {name: {SECONDS_KEY: round(timing[SECONDS_KEY], 6), BYTES_KEY: timing[BYTES_KEY]}
+                for name, timing in self.__timings.items()}
+
+    def __get(self, name: str) -> Dict[str, float | int]:
+        return self.__timings.setdefault(name, {SECONDS_KEY: 0.0, BYTES_KEY: 0})
+
+
+def merge_stage_timings(stage_timings: Dict[str, Dict[str, float | int]] | None,
+                        new_timings: Dict[str, Dict[str, float | int]]) -> Dict[str, Dict[str, float | int]]:
+    """
+    Adds the timings of another export attempt to the timings already stored on a transfer report.
+    :param stage_timings: The timings stored on the report, if any.
+    :param new_timings: The timings from StageTimer.as_dict.
+    :return: The seconds and bytes of every stage, summed over every attempt.
+    """
+    merged: Dict[str, Dict[str, float | int]] = {name: dict(timing) for name, timing in (stage_timings or {}).items()}
+    for name, timing in new_timings.items():
+        stored: Dict[str, float | int] = merged.setdefault(name, {SECONDS_KEY: 0.0, BYTES_KEY: 0})
+        stored[SECONDS_KEY] = round(stored.get(SECONDS_KEY, 0.0) + timing.get(SECONDS_KEY, 0.0), 6)
+        stored[BYTES_KEY] = stored.get(BYTES_KEY, 0) + timing.get(BYTES_KEY, 0)
+    return merged
+
+
+def get_ordered_stage_timings(stage_timings: Dict[str, Dict[str, float | int]] | None) -> List[tuple[str, float, int]]:
+    """
+    Orders stored stage timings by when each stage runs in an export.
+    :param stage_timings: The timings stored on a transfer report.
+    :return: The name, seconds and bytes of each stage.
+    """
+    if not stage_timings:
+        return []
+
+    order: Dict[str, int] = {name: index for index, name in enumerate(consts.EXPORT_STAGES)}
+    names = sorted(stage_timings, key=lambda name: (order.get(name, len(order)), name))
+    return [(name, stage_timings[name].get(SECONDS_KEY, 0.0), stage_timings[name].get(BYTES_KEY, 0))
+            for name in names]
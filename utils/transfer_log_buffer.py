@@ -0,0 +1,126 @@
+"""
+Collects transfer logs and report state changes in memory and writes them in bulk at stage boundaries.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+from typing import Dict, List
+
+from django.db import transaction
+from django.utils.timezone import now
+
+from journal.models import Journal
+from plugins.editorial_manager_transfer_service.enums.report_state import ReportState
+from plugins.editorial_manager_transfer_service.enums.transfer_log_message_type import TransferLogMessageType
+from plugins.editorial_manager_transfer_service.models import TransferLogs, TransferReport
+from plugins.editorial_manager_transfer_service.utils.stage_timer import merge_stage_timings
+from submission.models import Article
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# The report fields a buffer may change.
+REPORT_STATE_FIELDS = ("report_state", "resolved", "message_date_time_stop")
+
+
+class TransferLogBuffer:
+    """
+    Buffers the logs and report changes of one or more exports, so each stage costs one bulk insert and one update
+    per distinct report state instead of a transaction per message. Errors are written immediately.
+    """
+
+    def __init__(self) -> None:
+        self.__logs: List[TransferLogs] = []
+        self.__reports: Dict[str, TransferReport] = dict()
+        self.__timed_reports: Dict[str, TransferReport] = dict()
+
+    def __len__(self) -> int:
+        return len(self.__logs)
+
+    def log(self, transfer_report: TransferReport, journal: Journal | None, article: Article | None, message: str,
+            success: bool, message_type: TransferLogMessageType = TransferLogMessageType.EXPORT) -> None:
+        """
+        Adds a log to be written at the next flush.
+        :param transfer_report: The report the log belongs to.
+        :param journal: The journal the log is about.
+        :param article: The article the log is about.
+        :param message: The message to log.
+        :param success: False if the log describes an error.
+        :param message_type: The kind of transfer the log is about.
+        """
+        self.__logs.append(TransferLogs(report=transfer_report, journal=journal, article=article, message=message,
+                                        message_type=message_type, success=success))
+
+    def log_error(self, transfer_report: TransferReport, journal: Journal | None, article: Article | None,
+                  message: str, stage: ReportState,
+                  message_type: TransferLogMessageType = TransferLogMessageType.EXPORT) -> None:
+        """
+        Logs an error and moves the report into the failed stage, writing both (and anything pending) right away so
+        the error survives if the process dies afterward.
+        :param transfer_report: The report the log belongs to.
+        :param journal: The journal the log is about.
+        :param article: The article the log is about.
+        :param message: The message to log.
+        :param stage: The state the report should be in.
+        :param message_type: The kind of transfer the log is about.
+        """
+        self.log(transfer_report, journal, article, message, False, message_type)
+        self.set_report_state(transfer_report, stage)
+        self.flush()
+
+    def set_report_state(self, transfer_report: TransferReport, stage: ReportState) -> None:
+        """
+        Changes the state of a report, to be written at the next flush.
+        :param transfer_report: The report to change.
+        :param stage: The state the report should be in.
+        """
+        if transfer_report.report_state != stage:
+            transfer_report.report_state = stage
+            self.__reports[str(transfer_report.pk)] = transfer_report
+
+    def resolve(self, transfer_report: TransferReport) -> None:
+        """
+        Marks a report as resolved, to be written at the next flush.
+        :param transfer_report: The report to resolve.
+        """
+        transfer_report.resolved = True
+        transfer_report.report_state = ReportState.NORMAL
+        transfer_report.message_date_time_stop = now()
+        self.__reports[str(transfer_report.pk)] = transfer_report
+
+    def set_stage_timings(self, transfer_report: TransferReport, stage_timings: dict) -> None:
+        """
+        Adds the stage timings of an export to its report, to be written at the next flush. A report reused by a
+        resend keeps the timings of the earlier attempts.
+        :param transfer_report: The report to change.
+        :param stage_timings: The timings from StageTimer.as_dict.
+        """
+        transfer_report.stage_timings = merge_stage_timings(transfer_report.stage_timings, stage_timings)
+        self.__timed_reports[str(transfer_report.pk)] = transfer_report
+
+    def flush(self) -> None:
+        """
+        Writes every pending log and report change.
+        """
+        if not self.__logs and not self.__reports and not self.__timed_reports:
+            return
+
+        # Reports moving into the same state are updated together.
+        updates: Dict[tuple, List] = dict()
+        for transfer_report in self.__reports.values():
+            values = tuple(getattr(transfer_report, field) for field in REPORT_STATE_FIELDS)
+            updates.setdefault(values, []).append(transfer_report.pk)
+
+        with transaction.atomic():
+            if self.__logs:
+                TransferLogs.objects.bulk_create(self.__logs)
+            for values, report_ids in updates.items():
+                TransferReport.objects.filter(pk__in=report_ids).update(**dict(zip(REPORT_STATE_FIELDS, values)))
+            if self.__timed_reports:
+                TransferReport.objects.bulk_update(list(self.__timed_reports.values()), ["stage_timings"])
+
+        logger.debug("Flushed %d transfer logs and %d report changes.", len(self.__logs), len(self.__reports))
+        self.__logs = []
+        self.__reports = dict()
+        self.__timed_reports = dict()
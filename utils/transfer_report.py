@@ -1,7 +1,10 @@
+from typing import Dict, Iterable
+
+from django.db.models import QuerySet
 from django.utils.timezone import now
 from journal.models import Journal
 from plugins.editorial_manager_transfer_service.enums.report_state import ReportState
-from plugins.editorial_manager_transfer_service.models import TransferReport
+from plugins.editorial_manager_transfer_service.models import TransferReport, TransferLogs
 from submission.models import Article
 
 
@@ -24,8 +27,64 @@ def get_or_create_transfer_report(journal: Journal, article: Article) -> Transfe
     return transfer_report
 
 
+def get_or_create_transfer_reports(journal: Journal, articles: Iterable[Article]) -> Dict[int, TransferReport]:
+    """
+    Gets or creates the unresolved TransferReport for each of the given articles in bulk.
+    :param journal: The journal to use.
+    :param articles: The articles to use.
+    :return: The newest unresolved TransferReport for each article, keyed by article ID.
+    """
+    articles_by_id: Dict[int, Article] = {article.pk: article for article in articles}
+
+    transfer_reports: Dict[int, TransferReport] = dict()
+    for transfer_report in TransferReport.objects.filter(journal=journal, article_id__in=articles_by_id.keys(),
+                                                         resolved=False).order_by("-message_date_time_start"):
+        transfer_reports.setdefault(transfer_report.article_id, transfer_report)
+
+    new_reports = [TransferReport(journal=journal, article=article) for article_id, article in articles_by_id.items()
+                   if article_id not in transfer_reports]
+    for transfer_report in TransferReport.objects.bulk_create(new_reports):
+        transfer_reports[transfer_report.article_id] = transfer_report
+
+    return transfer_reports
+
+
 def resolve_transfer_report(transfer_report: TransferReport) -> None:
     transfer_report.resolved = True
     transfer_report.report_state = ReportState.NORMAL
     transfer_report.message_date_time_stop = now()
     transfer_report.save()
+
+
+def get_failed_bundle_reports(journal: Journal) -> QuerySet:
+    """
+    Gets the unresolved reports of a journal's articles which failed bundling, newest first. A report resolved by a
+    later delivery needs no resend, so it is left out.
+    :param journal: The journal to use.
+    :return: The reports, with only the fields the listing shows.
+    """
+    return TransferReport.objects.filter(journal=journal, report_state=ReportState.FAILED_BUNDLING,
+                                         resolved=False).select_related("article").only(
+            "id", "message_date_time_start", "article__id", "article__title").order_by("-message_date_time_start",
+                                                                                      "-id")
+
+
+def get_article_reports(journal: Journal, article: Article) -> QuerySet:
+    """
+    Gets every report for an article, newest first.
+    :param journal: The journal the article lives in.
+    :param article: The article to use.
+    :return: The reports.
+    """
+    return TransferReport.objects.filter(journal=journal, article=article).defer("article", "journal").order_by(
+            "-message_date_time_start", "-id")
+
+
+def get_report_logs(transfer_report: TransferReport | None) -> QuerySet:
+    """
+    Gets the logs of a report, newest first.
+    :param transfer_report: The report to use.
+    :return: The logs.
+    """
+    return TransferLogs.objects.filter(report=transfer_report).defer("report", "article", "journal").order_by(
+            "-message_date_time", "-id")
@@ -0,0 +1,82 @@
+"""
+A small in-process cache which evicts the least recently used entries and expires entries after a time to live.
+"""
+__author__ = "Rosetta Reatherford"
+__license__ = "AGPL v3"
+__maintainer__ = "The Public Library of Science (PLOS)"
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Tuple
+
+
+class TTLCache:
+    """
+    A thread-safe LRU cache whose entries expire. None is a valid value, so misses can be cached too.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """
+        Constructor.
+        :param maxsize: The most entries kept. The least recently used entry is evicted past this.
+        :param ttl: The default number of seconds an entry is kept.
+        """
+        self.maxsize: int = maxsize
+        self.ttl: float = ttl
+        self.__entries: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+        self.__lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """
+        Gets the entries which are cached and have not expired.
+        :param keys: The keys to look up.
+        :return: The cached values keyed by key. Keys which are missing or expired are left out.
+        """
+        now: float = time.monotonic()
+        found: Dict[Hashable, Any] = dict()
+        with self.__lock:
+            for key in keys:
+                entry = self.__entries.get(key)
+                if entry is None:
+                    continue
+                expires, value = entry
+                if expires <= now:
+                    del self.__entries[key]
+                    continue
+                self.__entries.move_to_end(key)
+                found[key] = value
+        return found
+
+    def set_many(self, values: Dict[Hashable, Any], ttl: float | None = None) -> None:
+        """
+        Caches many entries, evicting the least recently used entries if the cache is full.
+        :param values: The values to cache keyed by key.
+        :param ttl: The number of seconds to keep them, if not the default.
+        """
+        expires: float = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self.__lock:
+            for key, value in values.items():
+                self.__entries[key] = (expires, value)
+                self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+
+    def delete_many(self, keys: Iterable[Hashable]) -> None:
+        """
+        Drops entries from the cache.
+        :param keys: The keys to drop.
+        """
+        with self.__lock:
+            for key in keys:
+                self.__entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Drops every entry from the cache.
+        """
+        with self.__lock:
+            self.__entries.clear()
@@ -2,18 +2,25 @@ __author__ = "Rosetta Reatherford"
 __license__ = "AGPL v3"
 __maintainer__ = "The Public Library of Science (PLOS)"
 
-from typing import List
-
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
 from django.core.exceptions import ValidationError
+from django.http import HttpResponse
 from django.shortcuts import render
 from journal.models import Journal
-from plugins.editorial_manager_transfer_service import forms
-from plugins.editorial_manager_transfer_service.enums.report_state import ReportState
+from plugins.editorial_manager_transfer_service import consts, forms
 from plugins.editorial_manager_transfer_service.forms import EditorialManagerTransferServiceSectionEditorForm
-from plugins.editorial_manager_transfer_service.models import TransferReport, TransferLogs, EditorialManagerSection
-from plugins.editorial_manager_transfer_service.utils.settings import get_plugin_settings, save_plugin_settings
+from plugins.editorial_manager_transfer_service.models import TransferReport, EditorialManagerSection
+from plugins.editorial_manager_transfer_service.utils.interfaces.KeysetPage import KeysetPage
+from plugins.editorial_manager_transfer_service.utils.jats_cache import get_jats_cache_statistics
+from plugins.editorial_manager_transfer_service.utils.pagination import paginate_keyset
+from plugins.editorial_manager_transfer_service.utils.stage_metrics import render_stage_metrics, \
+    PROMETHEUS_CONTENT_TYPE
+from plugins.editorial_manager_transfer_service.utils.stage_timer import get_ordered_stage_timings
+from plugins.editorial_manager_transfer_service.utils.settings import ExportSettings, get_export_settings, \
+    save_plugin_settings
+from plugins.editorial_manager_transfer_service.utils.transfer_report import get_failed_bundle_reports, \
+    get_article_reports, get_report_logs
 from plugins.production_transporter.utilities import data_fetch
 from security import decorators
 from submission.models import Section
@@ -29,11 +36,14 @@ def manager(request):
     The manager view for the Editorial Manager Service.
     :param request: the request object
     """
-    (
-        submission_partner_code,
-        license_code,
-        em_journal_code,
-    ) = get_plugin_settings(request.journal, True)
+    export_settings: ExportSettings = get_export_settings(request.journal, fetch_fresh=True)
+    submission_partner_code = export_settings.submission_partner_code
+    license_code = export_settings.license_code
+    em_journal_code = export_settings.journal_code
+    compression_policy = export_settings.compression_policy
+    compression_level = export_settings.compression_level
+    jats_builder = export_settings.jats_builder
+    retention_days = export_settings.retention_days
 
     if request.POST:
         form = forms.EditorialManagerTransferServiceForm(request.POST)
@@ -42,12 +52,22 @@ def manager(request):
             submission_partner_code = form.cleaned_data["submission_partner_code"]
             license_code = form.cleaned_data["license_code"]
             em_journal_code = form.cleaned_data["journal_code"]
+            compression_policy = form.cleaned_data["compression_policy"] or consts.COMPRESSION_POLICY_AUTO
+            compression_level = form.cleaned_data["compression_level"] or consts.COMPRESSION_LEVEL_DEFAULT
+            jats_builder = form.cleaned_data["jats_builder"] or consts.JATS_BUILDER_TEMPLATE
+            retention_days = form.cleaned_data["retention_days"]
+            if retention_days is None:
+                retention_days = consts.RETENTION_DAYS_DEFAULT
 
             save_plugin_settings(
                     request.journal,
                     submission_partner_code,
                     license_code,
                     em_journal_code,
+                    compression_policy,
+                    compression_level,
+                    jats_builder,
+                    retention_days,
             )
 
             messages.add_message(
@@ -68,12 +88,17 @@ def manager(request):
                     "submission_partner_code": submission_partner_code,
                     "license_code": license_code,
                     "journal_code": em_journal_code,
+                    "compression_policy": compression_policy,
+                    "compression_level": compression_level,
+                    "jats_builder": jats_builder,
+                    "retention_days": retention_days,
                 }
         )
 
     template = 'editorial_manager_transfer_service/manager.html'
     context = {
         'form': form,
+        'jats_cache_statistics': get_jats_cache_statistics(),
     }
 
     return render(request, template, context)
@@ -204,15 +229,12 @@ def transfer_report(request):
             transfer_report_resend_article(request, journal, article_id_str)
 
     template = 'editorial_manager_transfer_service/listing.html'
-    failed_bundle_transfer_reports = list(TransferReport.objects.filter(
-            journal=journal, report_state=ReportState.FAILED_BUNDLING).select_related("article").only("id",
-                                                                                                      "message_date_time_start",
-                                                                                                      "article__id",
-                                                                                                      "article__title").order_by(
-            "-message_date_time_start"))
+    page: KeysetPage = paginate_keyset(get_failed_bundle_reports(journal), "message_date_time_start",
+                                       after=request.GET.get("after"), before=request.GET.get("before"))
 
     context = {'journal': journal,
-               'failed_bundle_transfer_reports': failed_bundle_transfer_reports}
+               'failed_bundle_transfer_reports': page.items,
+               'page': page}
 
     return render(request, template, context)
 
@@ -242,12 +264,13 @@ def transfer_article_reports(request, article_id: int | None = None):
         raise Exception("No article found")
 
     template = 'editorial_manager_transfer_service/article_report_listing.html'
-    reports = list(TransferReport.objects.filter(journal=journal, article=article).defer("article", "journal").order_by(
-            "-message_date_time_start"))
+    page: KeysetPage = paginate_keyset(get_article_reports(journal, article), "message_date_time_start",
+                                       after=request.GET.get("after"), before=request.GET.get("before"))
 
     context = {'journal': journal,
-               'reports': reports,
-               'article': article}
+               'reports': page.items,
+               'article': article,
+               'page': page}
 
     return render(request, template, context)
 
@@ -257,14 +280,22 @@ def transfer_article_reports(request, article_id: int | None = None):
 def transfer_report_logs(request, report_id: str | None = None):
     journal: Journal = request.journal
     template = 'editorial_manager_transfer_service/report_listing.html'
-    report = TransferReport.objects.filter(id=report_id).select_related("article").only("id", "article__id",
-                                                                                        "article__title").first()
-    logs: List[TransferLogs] = list(
-            TransferLogs.objects.filter(report=report).defer("report", "article", "journal").order_by(
-                    "-message_date_time"))
+    report = TransferReport.objects.filter(id=report_id).select_related("article").only(
+            "id", "stage_timings", "article__id", "article__title").first()
+    page: KeysetPage = paginate_keyset(get_report_logs(report), "message_date_time",
+                                       after=request.GET.get("after"), before=request.GET.get("before"))
 
     context = {'journal': journal,
                'report': report,
-               'logs': logs}
+               'stage_timings': get_ordered_stage_timings(report.stage_timings if report else None),
+               'logs': page.items,
+               'page': page}
 
     return render(request, template, context)
+
+
+@staff_member_required
+@decorators.has_journal
+def transfer_stage_metrics(request):
+    journal: Journal = request.journal
+    return HttpResponse(render_stage_metrics([journal]), content_type=PROMETHEUS_CONTENT_TYPE)